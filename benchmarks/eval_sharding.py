@@ -0,0 +1,138 @@
+"""Eval throughput vs. shard count, with the mock backend standing in for GPUs.
+
+Runs a real :class:`~trainpipe.evals.runner.EvalDriver` against a
+throwaway SQLite database. Each shard gets its own
+:class:`~trainpipe.evals.inference.MockInferenceBackend` whose batches
+take ``--batch-ms`` (a GPU's generate call, which releases the event
+loop just like the real backend's worker thread). Scoring and persisting
+are the real code paths, so the numbers show how far sharding scales
+before the shared pipeline stages or SQLite become the limit.
+
+    python benchmarks/eval_sharding.py [--samples 2000] [--batch-size 16]
+                                       [--batch-ms 40] [--shards 1 2 4 8]
+
+With the defaults, wall time should fall close to 1/N up to 8 shards.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import tempfile
+import time
+from pathlib import Path
+
+from trainpipe.api.schemas import ExperimentSpec, InferenceParams, MetricConfig
+from trainpipe.core import repository
+from trainpipe.core.db import Database
+from trainpipe.evals.inference import MockInferenceBackend
+from trainpipe.evals.runner import EvalDriver
+
+
+class _TimedBackend(MockInferenceBackend):
+    """Echoes the gold answer after a fixed per-batch delay."""
+
+    def __init__(self, batch_sec: float) -> None:
+        super().__init__(response_fn=lambda sample, _params: sample["gold"])
+        self.batch_sec = batch_sec
+
+    async def predict(self, sample, params):
+        await asyncio.sleep(self.batch_sec)
+        return await super().predict(sample, params)
+
+    async def predict_batch(self, samples, params):
+        await asyncio.sleep(self.batch_sec)
+        return await super().predict_batch(samples, params)
+
+
+async def measure(
+    *, shards: int, samples: int, batch_size: int, batch_sec: float, data_dir: Path
+) -> tuple[float, dict]:
+    """Return the wall time of one eval run and its pipeline stats."""
+    data_dir.mkdir(parents=True)
+    dataset = data_dir / "eval.jsonl"
+    dataset.write_text(
+        "".join(
+            json.dumps({"prompt": f"question {i} " + "x" * (i % 97), "gold": str(i)}) + "\n"
+            for i in range(samples)
+        )
+    )
+    db = Database(data_dir / "bench.sqlite3")
+    await db.init()
+    try:
+        async with db.connect() as conn:
+            suite_id = await repository.create_eval_suite(
+                conn,
+                name=f"bench-{shards}",
+                description=None,
+                dataset_path=str(dataset),
+                metrics=[MetricConfig(kind="exact_match"), MetricConfig(kind="rouge_l")],
+                inference_params=InferenceParams(batch_size=batch_size, shards=shards),
+            )
+            exp_id = await repository.create_experiment(
+                conn, ExperimentSpec(model="m", dataset=["d"])
+            )
+            run_id = await repository.create_eval_run(
+                conn,
+                suite_id=suite_id,
+                experiment_id=exp_id,
+                model_ref=exp_id,
+                triggered_by="manual",
+            )
+            await repository.claim_eval_run(conn, run_id)
+            run = await repository.get_eval_run(conn, run_id)
+            suite = await repository.get_eval_suite(conn, suite_id)
+
+        driver = EvalDriver(
+            db=db,
+            run=run,
+            suite=suite,
+            backends=[_TimedBackend(batch_sec) for _ in range(shards)],
+        )
+        started = time.perf_counter()
+        await driver.execute()
+        wall = time.perf_counter() - started
+
+        async with db.read() as conn:
+            finished = await repository.get_eval_run(conn, run_id)
+        if finished.samples_done != samples:
+            raise SystemExit(f"shards={shards}: only {finished.samples_done} samples written")
+        return wall, finished.pipeline_stats or {}
+    finally:
+        await db.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--samples", type=int, default=2000)
+    parser.add_argument("--batch-size", type=int, default=16)
+    parser.add_argument("--batch-ms", type=float, default=40.0)
+    parser.add_argument("--shards", type=int, nargs="+", default=[1, 2, 4, 8])
+    args = parser.parse_args()
+
+    baseline: float | None = None
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in args.shards:
+            wall, stats = asyncio.run(
+                measure(
+                    shards=n,
+                    samples=args.samples,
+                    batch_size=args.batch_size,
+                    batch_sec=args.batch_ms / 1000,
+                    data_dir=Path(tmp) / f"shards-{n}",
+                )
+            )
+            baseline = baseline or wall * args.shards[0]
+            stages = stats.get("stages", {})
+            print(
+                f"shards={n:<3} wall={wall:7.2f} s  "
+                f"samples/s={args.samples / wall:8.1f}  "
+                f"speedup={baseline / wall:5.2f}x  "
+                f"score busy={stages.get('score', {}).get('busy_sec', 0):6.2f} s  "
+                f"persist busy={stages.get('persist', {}).get('busy_sec', 0):6.2f} s"
+            )
+
+
+if __name__ == "__main__":
+    main()
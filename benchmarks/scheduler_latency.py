@@ -0,0 +1,103 @@
+"""Submit-to-launch latency: notification-driven scheduler vs. polling.
+
+Runs a real :class:`~trainpipe.scheduler.loop.Scheduler` against a
+throwaway SQLite database with one fake GPU. MLflow is stubbed out and
+each "training run" is ``python -c pass``, so the numbers isolate the
+time between ``create_experiment`` returning and the subprocess being
+spawned.
+
+    python benchmarks/scheduler_latency.py [--runs 20]
+
+The baseline (``notifications=None``) polls every ``poll_interval_sec``
+(1 s by default) and averages about half an interval; the bus-driven
+scheduler should land in the low milliseconds.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from trainpipe.api.schemas import ExperimentSpec
+from trainpipe.core import repository
+from trainpipe.core.db import Database
+from trainpipe.scheduler import loop as scheduler_loop
+from trainpipe.scheduler.gpu_pool import GpuInfo, GpuPool
+from trainpipe.settings import settings
+
+
+def _fake_mlflow_run(*_args, **_kwargs) -> tuple[str, str]:
+    return "0", "bench-run"
+
+
+def _fake_swift_command(spec, gpu_indices, output_dir, **_kwargs):
+    return [sys.executable, "-c", "pass"], {}
+
+
+async def measure(*, notifications: bool, runs: int, data_dir: Path) -> list[float]:
+    """Return per-experiment submit→spawn latencies in seconds."""
+    settings.data_dir = data_dir
+    db = Database(data_dir / "bench.sqlite3")
+    await db.init()
+    sched = scheduler_loop.Scheduler(
+        db,
+        GpuPool([GpuInfo(index=0, name="bench", memory_total_mb=81920)]),
+        notifications=scheduler_loop.notify.bus if notifications else None,
+    )
+    await sched.start()
+    latencies: list[float] = []
+    try:
+        for i in range(runs):
+            # Let the previous run's exit settle so every submit finds the
+            # GPU free and the scheduler idle.
+            while sched._running or sched._launches:
+                await asyncio.sleep(0.005)
+            await asyncio.sleep(0.05)
+            spec = ExperimentSpec(name=f"bench-{i}", model="m", dataset=["d"])
+            started = time.perf_counter()
+            async with db.connect() as conn:
+                exp_id = await repository.create_experiment(conn, spec)
+            while exp_id not in sched._running and exp_id not in sched._monitors:
+                await asyncio.sleep(0.001)
+            latencies.append(time.perf_counter() - started)
+    finally:
+        await sched.stop()
+        await db.close()
+    return latencies
+
+
+def _report(label: str, latencies: list[float]) -> None:
+    ms = sorted(x * 1000 for x in latencies)
+    p95 = ms[min(len(ms) - 1, int(len(ms) * 0.95))]
+    print(
+        f"{label:<14} n={len(ms):<3} mean={statistics.mean(ms):8.1f} ms  "
+        f"p50={statistics.median(ms):8.1f} ms  p95={p95:8.1f} ms  max={ms[-1]:8.1f} ms"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args()
+
+    scheduler_loop._create_mlflow_run = _fake_mlflow_run
+    scheduler_loop.build_swift_command = _fake_swift_command
+
+    with tempfile.TemporaryDirectory() as tmp:
+        poll = asyncio.run(
+            measure(notifications=False, runs=args.runs, data_dir=Path(tmp) / "poll")
+        )
+        bus = asyncio.run(
+            measure(notifications=True, runs=args.runs, data_dir=Path(tmp) / "bus")
+        )
+    _report("polling", poll)
+    _report("notifications", bus)
+
+
+if __name__ == "__main__":
+    main()
@@ -7,4 +7,5 @@ from trainpipe.core.db import Database
 async def db(tmp_path):
     instance = Database(tmp_path / "test.sqlite3")
     await instance.init()
-    return instance
+    yield instance
+    await instance.close()
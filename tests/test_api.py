@@ -13,6 +13,7 @@ from trainpipe.api.main import app
 from trainpipe.api.schemas import ExperimentSpec, StudyConfig
 from trainpipe.core import repository
 from trainpipe.core.db import Database
+from trainpipe.scheduler import logs
 from trainpipe.scheduler.gpu_pool import GpuPool
 
 HEADERS = {"X-API-Key": "test-key"}
@@ -209,6 +210,17 @@ def test_gpus_empty_pool(state, client):
     assert data["leases"] == []
 
 
+def test_system_db_reports_pool_stats(state, client):
+    assert client.get("/system/db").status_code == 401
+    client.get("/experiments", headers=HEADERS)
+    r = client.get("/system/db", headers=HEADERS)
+    assert r.status_code == 200
+    data = r.json()
+    assert data["readers_max"] >= 1
+    assert data["reader"]["acquires"] >= 1
+    assert "wait_ms_max" in data["writer"]
+
+
 def test_studies_initially_empty(state, client):
     r = client.get("/studies", headers=HEADERS)
     assert r.status_code == 200
@@ -259,6 +271,81 @@ def test_logs_returns_file_content(state, client, tmp_path):
     assert "training-line-2" in r.text
 
 
+def _exp_with_log(state, log_file):
+    async def setup():
+        async with state["db"].connect() as conn:
+            eid = await repository.create_experiment(
+                conn, ExperimentSpec(model="m", dataset=["d"])
+            )
+            await conn.execute(
+                "UPDATE experiments SET log_path = ? WHERE id = ?", (str(log_file), eid)
+            )
+            await conn.commit()
+            return eid
+
+    return _run(setup())
+
+
+def test_logs_joins_rotated_segments_and_tails(state, client, tmp_path):
+    log_file = tmp_path / "x.log"
+    out = logs.RotatingLog(log_file, max_bytes=30, compression="gzip")
+    for i in range(10):
+        segment = out.write(f"training-line-{i}\n".encode())
+        if segment is not None:
+            logs.finish_segment(log_file, segment, out.codec, keep=20)
+    out.close()
+    exp_id = _exp_with_log(state, log_file)
+
+    r = client.get(f"/experiments/{exp_id}/logs", headers=HEADERS)
+    assert r.text == "".join(f"training-line-{i}\n" for i in range(10))
+    r = client.get(f"/experiments/{exp_id}/logs?tail=3", headers=HEADERS)
+    assert r.text == "training-line-7\ntraining-line-8\ntraining-line-9\n"
+
+
+def test_logs_ranges_and_cursor(state, client, tmp_path):
+    log_file = tmp_path / "x.log"
+    out = logs.RotatingLog(log_file, max_bytes=50, compression="gzip")
+    for i in range(10):
+        segment = out.write(f"line-{i}\n".encode())  # 7 bytes
+        if segment is not None:
+            logs.finish_segment(log_file, segment, out.codec, keep=20)
+    out.close()
+    exp_id = _exp_with_log(state, log_file)
+    url = f"/experiments/{exp_id}/logs"
+
+    r = client.get(url, params={"line_start": 3, "line_end": 5}, headers=HEADERS)
+    assert r.text == "line-3\nline-4\n"
+    assert r.headers["x-log-start"] == "21"
+    assert r.headers["x-log-first-line"] == "3"
+
+    r = client.get(url, params={"byte_start": 7, "byte_end": 14}, headers=HEADERS)
+    assert r.text == "line-1\n"
+
+    r = client.get(url, params={"since_offset": 56, "max_bytes": 10}, headers=HEADERS)
+    assert r.text == "line-8\n"
+    cursor = r.headers["x-log-next-offset"]
+    r = client.get(url, params={"since_offset": cursor}, headers=HEADERS)
+    assert r.text == "line-9\n"
+    assert r.headers["x-log-next-offset"] == "70"
+
+    r = client.get(url, params={"tail": 1, "line_start": 0}, headers=HEADERS)
+    assert r.status_code == 422
+
+
+def test_logs_tail_served_from_live_ring(state, client, tmp_path, monkeypatch):
+    exp_id = _exp_with_log(state, tmp_path / "missing.log")
+    ring = logs.LogRing(10)
+    for i in range(5):
+        ring.append(f"live-{i}\n")
+    monkeypatch.setitem(logs.tails, exp_id, ring)
+
+    r = client.get(f"/experiments/{exp_id}/logs?tail=2", headers=HEADERS)
+    assert r.text == "live-3\nlive-4\n"
+    assert r.headers["x-log-next-offset"] == "35"
+    r = client.get(f"/experiments/{exp_id}/logs?since_offset=28", headers=HEADERS)
+    assert r.text == "live-4\n"
+
+
 def test_submit_empty_dataset_returns_422(state, client):
     r = client.post(
         "/experiments",
@@ -186,6 +186,20 @@ def test_create_suite_resolves_ds_ref(eval_state, client):
     assert r.json()["dataset_path"] == str(ds)
 
 
+def test_create_suite_early_stop_metric_must_exist(eval_state, client):
+    ds = _make_dataset(eval_state["tmp_path"])
+    payload = _suite_payload(str(ds), "earlystop")
+    payload["inference_params"]["early_stop"] = {"baseline": "m@production", "metric": "f1"}
+    r = client.post("/evals/suites", json=payload, headers=HEADERS)
+    assert r.status_code == 422
+    assert "early_stop.metric" in str(r.json())
+
+    payload["inference_params"]["early_stop"]["metric"] = "exact_match"
+    r = client.post("/evals/suites", json=payload, headers=HEADERS)
+    assert r.status_code == 201, r.json()
+    assert r.json()["inference_params"]["early_stop"]["min_samples"] == 100
+
+
 def test_create_suite_unknown_ds_ref(eval_state, client):
     payload = _suite_payload("ds:abc123", "missing-ref")
     r = client.post("/evals/suites", json=payload, headers=HEADERS)
@@ -390,6 +404,18 @@ def test_compare_two_runs_with_delta_and_regression(eval_state, client):
     indices = {r["sample_index"] for r in body["regressions"]}
     assert 1 in indices  # diverging sample
     assert 0 not in indices  # both scored 1.0
+    assert body["baseline_run_id"] == rid_a
+    assert body["vs_baseline"][rid_b]["exact_match"] == {
+        "paired": 3, "mean_delta": pytest.approx(-1 / 3), "wins": 0, "losses": 1, "ties": 2,
+    }
+    assert body["regressions_total"] == len(indices)
+
+    page = client.get(
+        f"/evals/compare?run_ids={rid_a},{rid_b}&limit=1&offset={len(indices)}",
+        headers=HEADERS,
+    ).json()
+    assert page["regressions"] == []
+    assert page["regressions_total"] == len(indices)
 
 
 def test_compare_rejects_suite_mismatch(eval_state, client):
@@ -415,3 +441,35 @@ def test_compare_rejects_suite_mismatch(eval_state, client):
     r = client.get(f"/evals/compare?run_ids={rid_a},{rid_b}", headers=HEADERS)
     assert r.status_code == 422
     assert r.json()["detail"]["error"] == "suite_mismatch"
+
+
+def test_purge_prediction_cache(eval_state, client):
+    async def seed(conn):
+        for fingerprint in ("w1", "w2"):
+            await repository.put_cached_predictions(
+                conn,
+                model_fingerprint=fingerprint,
+                entries=[(f"{fingerprint}-a", "x"), (f"{fingerprint}-b", "y")],
+            )
+
+    _in_conn(eval_state, seed)
+    r = client.delete("/evals/prediction-cache?model_fingerprint=w1", headers=HEADERS)
+    assert r.status_code == 200, r.text
+    assert r.json() == {"status": "purged", "removed": 2}
+    left = _in_conn(
+        eval_state,
+        lambda conn: repository.cached_predictions(conn, ["w1-a", "w2-a", "w2-b"]),
+    )
+    assert left == {"w2-a": "x", "w2-b": "y"}
+    assert client.delete("/evals/prediction-cache", headers=HEADERS).json()["removed"] == 2
+
+
+def test_create_suite_rejects_unreadable_dataset_ref(eval_state, client):
+    ds = _make_dataset(eval_state["tmp_path"])
+    for bad in (f"{ds}#zero", str(ds.with_suffix(".xyz"))):
+        r = client.post("/evals/suites", json=_suite_payload(bad), headers=HEADERS)
+        assert r.status_code == 422, r.text
+        assert r.json()["detail"]["error"] == "unsupported_dataset"
+    r = client.post("/evals/suites", json=_suite_payload(f"{ds}#1"), headers=HEADERS)
+    assert r.status_code == 201, r.text
+    assert r.json()["dataset_path"] == f"{ds}#1"
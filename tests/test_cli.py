@@ -146,6 +146,7 @@ def test_generic_api_with_json_body():
 def test_render_logs_tail():
     c = FakeClient(httpx.Response(200, text="a\nb\nc\nd"))
     result, args = _run(["logs", "exp1", "-n", "2"], c)
+    assert c.calls[0][2]["params"] == {"tail": 2}
     assert cli._render(result, args) == "c\nd"
 
 
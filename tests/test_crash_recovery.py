@@ -0,0 +1,113 @@
+"""Tests for checkpoint-aware crash recovery on scheduler start."""
+
+import asyncio
+import json
+import os
+import sys
+from datetime import datetime, timedelta, timezone
+
+from trainpipe.api.schemas import ExperimentSpec, ExperimentStatus
+from trainpipe.core import repository
+from trainpipe.scheduler import loop as scheduler_loop
+from trainpipe.scheduler.gpu_pool import GpuInfo, GpuPool
+from trainpipe.training.checkpoints import find_latest_checkpoint
+
+
+def _checkpoint(root, name, step, *, complete=True):
+    ckpt = root / name / f"checkpoint-{step}"
+    ckpt.mkdir(parents=True)
+    if complete:
+        (ckpt / "trainer_state.json").write_text(json.dumps({"global_step": step}))
+    return ckpt
+
+
+def test_find_latest_checkpoint_skips_partial_saves(tmp_path):
+    assert find_latest_checkpoint(tmp_path / "missing") is None
+    _checkpoint(tmp_path, "v0-20260101-000000", 100)
+    newest = _checkpoint(tmp_path, "v1-20260102-000000", 300)
+    _checkpoint(tmp_path, "v1-20260102-000000", 400, complete=False)
+    (tmp_path / "v1-20260102-000000" / "checkpoint-final").mkdir()
+    ckpt = find_latest_checkpoint(tmp_path)
+    assert ckpt is not None
+    assert (ckpt.path, ckpt.step) == (newest, 300)
+
+
+async def _crash_running(db, spec, *, started_ago_sec, gpu_ids):
+    """Create an experiment and leave it 'running' as a crash would."""
+    async with db.connect() as conn:
+        exp_id = await repository.create_experiment(conn, spec)
+        started = datetime.now(timezone.utc) - timedelta(seconds=started_ago_sec)
+        await conn.execute(
+            "UPDATE experiments SET status = 'running', started_at = ?, gpu_ids = ?, "
+            "pid = 999999 WHERE id = ?",
+            (started.isoformat(), json.dumps(gpu_ids), exp_id),
+        )
+        await conn.commit()
+    return exp_id, started
+
+
+async def _run_until_done(db, exp_id, monkeypatch):
+    launched = []
+
+    def fake_build(spec, gpus, out, *, resume_from=None, **_kw):
+        launched.append(resume_from)
+        return [sys.executable, "-c", "pass"], {}
+
+    monkeypatch.setattr(scheduler_loop, "_create_mlflow_run", lambda *a: ("0", "run"))
+    monkeypatch.setattr(scheduler_loop, "build_swift_command", fake_build)
+    sched = scheduler_loop.Scheduler(
+        db,
+        GpuPool([GpuInfo(index=i, name="fake", memory_total_mb=1024) for i in range(2)]),
+    )
+    await sched.start()
+    try:
+
+        async def until_completed():
+            while True:
+                async with db.read() as conn:
+                    rec = await repository.get_experiment(conn, exp_id)
+                if rec.status == ExperimentStatus.COMPLETED:
+                    return rec
+                await asyncio.sleep(0.02)
+
+        rec = await asyncio.wait_for(until_completed(), timeout=10)
+    finally:
+        await sched.stop()
+    return rec, launched
+
+
+async def test_restart_resumes_from_latest_checkpoint(db, tmp_path, monkeypatch):
+    monkeypatch.setattr("trainpipe.settings.settings.data_dir", tmp_path)
+    out = tmp_path / "out"
+    spec = ExperimentSpec(name="long", model="m", dataset=["d"], gpu_count=2, output_dir=str(out))
+    exp_id, started = await _crash_running(db, spec, started_ago_sec=600, gpu_ids=[0, 1])
+    ckpt = _checkpoint(out, "v0-20260101-000000", 1200)
+    # Checkpoint written 240 s into the crashed attempt → 480 GPU-seconds.
+    saved_at = started.timestamp() + 240
+    os.utime(ckpt / "trainer_state.json", (saved_at, saved_at))
+
+    rec, launched = await _run_until_done(db, exp_id, monkeypatch)
+
+    assert launched == [ckpt]
+    assert rec.resume_from_checkpoint == str(ckpt)
+    assert rec.resumed_from_step == 1200
+    assert abs(rec.gpu_seconds_saved - 480) < 1
+    async with db.read() as conn:
+        cur = await conn.execute(
+            "SELECT payload_json FROM events WHERE experiment_id = ? AND kind = 'recovered'",
+            (exp_id,),
+        )
+        payload = json.loads((await cur.fetchone())[0])
+    assert payload["step"] == 1200
+
+
+async def test_restart_without_checkpoint_starts_over(db, tmp_path, monkeypatch):
+    monkeypatch.setattr("trainpipe.settings.settings.data_dir", tmp_path)
+    spec = ExperimentSpec(name="short", model="m", dataset=["d"])
+    exp_id, _ = await _crash_running(db, spec, started_ago_sec=30, gpu_ids=[0])
+
+    rec, launched = await _run_until_done(db, exp_id, monkeypatch)
+
+    assert launched == [None]
+    assert rec.resumed_from_step is None
+    assert rec.gpu_seconds_saved is None
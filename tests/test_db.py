@@ -1,3 +1,6 @@
+from trainpipe.core.db import Database
+
+
 async def test_init_creates_expected_tables(db):
     async with db.connect() as conn:
         cur = await conn.execute(
@@ -37,3 +40,73 @@ async def test_wal_mode_enabled(db):
         cur = await conn.execute("PRAGMA journal_mode")
         mode = (await cur.fetchone())[0]
     assert mode.lower() == "wal"
+
+
+async def test_connect_reuses_the_writer_connection(db):
+    async with db.connect() as first:
+        pass
+    async with db.connect() as second:
+        pass
+    assert first is second
+    stats = db.pool_stats()
+    assert stats["writer"]["acquires"] == 2
+    assert stats["connections_opened"] == 1
+
+
+async def test_release_rolls_back_uncommitted_writes(db):
+    # The old per-call connection discarded an uncommitted transaction on
+    # close; the pooled writer must not leak it into the next borrower.
+    async with db.connect() as conn:
+        await conn.execute(
+            "INSERT INTO gpu_leases (gpu_index, experiment_id, leased_at) "
+            "VALUES (7, 'x', '')"
+        )
+    async with db.connect() as conn:
+        cur = await conn.execute("SELECT COUNT(*) FROM gpu_leases")
+        assert (await cur.fetchone())[0] == 0
+
+
+async def test_nested_connect_in_same_task_does_not_deadlock(db):
+    import asyncio
+
+    async def nested():
+        async with db.connect() as outer:
+            async with db.connect() as inner:
+                assert inner is not outer
+                cur = await inner.execute("SELECT 1")
+                return (await cur.fetchone())[0]
+
+    assert await asyncio.wait_for(nested(), timeout=5) == 1
+    assert db.pool_stats()["overflow_opened"] == 1
+
+
+async def test_read_connections_are_query_only(db):
+    import sqlite3
+
+    import pytest
+
+    async with db.read() as conn:
+        with pytest.raises(sqlite3.OperationalError):
+            await conn.execute("DELETE FROM experiments")
+
+
+async def test_readers_are_bounded_and_reused(tmp_path):
+    import asyncio
+
+    instance = Database(tmp_path / "pool.sqlite3", readers=2)
+    await instance.init()
+    seen: set[int] = set()
+
+    async def read_once():
+        async with instance.read() as conn:
+            seen.add(id(conn))
+            await asyncio.sleep(0.01)
+
+    await asyncio.gather(*(read_once() for _ in range(8)))
+    stats = instance.pool_stats()
+    assert len(seen) == 2
+    assert stats["readers_open"] == 2
+    assert stats["reader"]["acquires"] == 8
+    assert stats["reader"]["waits"] >= 1
+    await instance.close()
+    assert instance.pool_stats()["readers_open"] == 0
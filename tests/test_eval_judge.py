@@ -0,0 +1,232 @@
+"""llm_as_judge through the async judge engine, against a local HTTP server
+that speaks the Anthropic / OpenAI APIs."""
+
+import asyncio
+import json
+import re
+import socketserver
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from trainpipe.evals import judge
+from trainpipe.evals.judge import TokenBucket
+from trainpipe.evals.metrics.llm_as_judge import LLMAsJudgeMetric
+
+
+class _HTTPServer(ThreadingHTTPServer):
+    def server_bind(self) -> None:
+        # HTTPServer.server_bind looks up the host's FQDN, which can stall
+        # for seconds without DNS.
+        socketserver.TCPServer.server_bind(self)
+        self.server_name, self.server_port = self.server_address[:2]
+
+
+class _JudgeServer:
+    """Scores each candidate with the number it contains. Records every
+    request; can delay, rate-limit or fail them."""
+
+    def __init__(self) -> None:
+        self.requests: list[dict] = []
+        self.rate_limit_first = 0
+        self.fail_status: int | None = None
+        self.delay = 0.0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.lock = threading.Lock()
+        self.url = ""
+
+    def handler(self) -> type[BaseHTTPRequestHandler]:
+        state = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args) -> None:
+                pass
+
+            def do_POST(self) -> None:
+                body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                with state.lock:
+                    state.requests.append(
+                        {
+                            "path": self.path,
+                            "headers": {k.lower(): v for k, v in self.headers.items()},
+                            "body": body,
+                            "port": self.client_address[1],
+                            "at": time.monotonic(),
+                        }
+                    )
+                    n = len(state.requests)
+                    state.in_flight += 1
+                    state.max_in_flight = max(state.max_in_flight, state.in_flight)
+                try:
+                    time.sleep(state.delay)
+                    if n <= state.rate_limit_first:
+                        self._send(429, {"error": "slow down"}, {"Retry-After": "0"})
+                    elif state.fail_status is not None:
+                        self._send(state.fail_status, {"error": "nope"})
+                    else:
+                        self._send(200, state.reply(self.path, body))
+                finally:
+                    with state.lock:
+                        state.in_flight -= 1
+
+            def _send(self, status: int, payload: dict, headers=None) -> None:
+                raw = json.dumps(payload).encode()
+                self.send_response(status)
+                for key, value in (headers or {}).items():
+                    self.send_header(key, value)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(raw)))
+                self.end_headers()
+                self.wfile.write(raw)
+
+        return Handler
+
+    def reply(self, path: str, body: dict) -> dict:
+        prompt = body["messages"][-1]["content"]
+        score = re.search(r"^Candidate: (\d+)", prompt, re.MULTILINE).group(1)
+        text = f'Verdict: {{"score": {score}}}'
+        if path == "/v1/messages":
+            return {"content": [{"type": "text", "text": text}]}
+        return {"choices": [{"message": {"content": text}}]}
+
+
+@pytest.fixture
+def server(monkeypatch, tmp_path):
+    state = _JudgeServer()
+    httpd = _HTTPServer(("127.0.0.1", 0), state.handler())
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    state.url = f"http://127.0.0.1:{httpd.server_port}"
+    monkeypatch.setattr("trainpipe.settings.settings.data_dir", tmp_path)
+    monkeypatch.setenv("ANTHROPIC_API_KEY", "test-key")
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    yield state
+    judge.close()
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def _metric(server, **config) -> LLMAsJudgeMetric:
+    return LLMAsJudgeMetric(
+        {
+            "model": "judge-1",
+            "base_url": server.url,
+            "rubric": {"criteria": "Match the reference.", "scale": {"min": 1, "max": 5}},
+            **config,
+        }
+    )
+
+
+def _samples(n: int) -> list[dict]:
+    return [{"gold": f"reference {i}"} for i in range(n)]
+
+
+def test_judge_scores_batch_over_anthropic_api(server):
+    m = _metric(server)
+    assert m.score_batch(["5", "3", "1"], _samples(3)) == [1.0, 0.5, 0.0]
+
+    req = server.requests[0]
+    assert req["path"] == "/v1/messages"
+    assert req["headers"]["x-api-key"] == "test-key"
+    assert req["headers"]["anthropic-version"] == "2023-06-01"
+    assert req["body"]["model"] == "judge-1"
+    assert req["body"]["system"] == m.system_prompt
+
+
+def test_judge_scores_over_openai_api(server):
+    m = _metric(server, provider="openai")
+    assert m.score("4", {"gold": "ref"}) == 0.75
+
+    req = server.requests[0]
+    assert req["path"] == "/v1/chat/completions"
+    assert req["headers"]["authorization"] == "Bearer test-key"
+    assert req["body"]["messages"][0] == {"role": "system", "content": m.system_prompt}
+
+
+def test_judge_keeps_its_connection_across_batches(server):
+    m = _metric(server, concurrency=1, cache=False)
+    m.score_batch(["2", "3"], _samples(2))
+    m.score_batch(["4"], _samples(1))
+    assert len(server.requests) == 3
+    assert len({r["port"] for r in server.requests}) == 1
+
+
+def test_judge_caches_judgments_on_disk(server, tmp_path):
+    predictions, samples = ["5", "3", "3"], [*_samples(2), {"gold": "reference 1"}]
+    first = _metric(server).score_batch(predictions, samples)
+    # The duplicate (prediction, reference) pair is asked once.
+    assert len(server.requests) == 2
+    assert (tmp_path / "judge_cache.sqlite3").exists()
+
+    # A new metric instance (another run) reads the same cache.
+    assert _metric(server).score_batch(predictions, samples) == first
+    assert len(server.requests) == 2
+
+    # Another rubric, another model or no cache: judged again.
+    _metric(server, rubric={"criteria": "Be strict.", "scale": {"min": 1, "max": 5}}).score(
+        "5", {"gold": "reference 0"}
+    )
+    _metric(server, model="judge-2").score("5", {"gold": "reference 0"})
+    _metric(server, cache=False).score("5", {"gold": "reference 0"})
+    assert len(server.requests) == 5
+
+
+def test_judge_retries_rate_limited_requests(server):
+    server.rate_limit_first = 2
+    m = _metric(server, concurrency=1, max_retries=2)
+    assert m.score_batch(["5", "1"], _samples(2)) == [1.0, 0.0]
+    assert len(server.requests) == 4
+
+
+def test_judge_does_not_retry_or_cache_client_errors(server):
+    server.fail_status = 400
+    m = _metric(server, max_retries=3)
+    assert m.score("5", {"gold": "ref"}) == 0.0
+    assert len(server.requests) == 1
+
+    server.fail_status = None
+    assert m.score("5", {"gold": "ref"}) == 1.0
+
+
+def test_judge_caps_requests_in_flight(server):
+    server.delay = 0.05
+    _metric(server, concurrency=2, cache=False).score_batch(
+        [str(i % 5 + 1) for i in range(8)], _samples(8)
+    )
+    assert server.max_in_flight == 2
+
+    server.max_in_flight = 0
+    _metric(server, concurrency=8, cache=False).score_batch(
+        [str(i % 5 + 1) for i in range(8)], _samples(8)
+    )
+    assert server.max_in_flight > 2
+
+
+def test_judge_rate_limit_spaces_requests(server):
+    # 1200/min = one every 50 ms once the burst of ``concurrency`` is spent.
+    m = _metric(server, concurrency=1, requests_per_minute=1200, cache=False)
+    m.score_batch(["1", "2", "3", "4"], _samples(4))
+    arrivals = [r["at"] for r in server.requests]
+    # From the second request on (the first also opens the connection).
+    assert arrivals[-1] - arrivals[1] >= 0.09
+
+
+def test_judge_requires_api_key(server, monkeypatch):
+    monkeypatch.delenv("ANTHROPIC_API_KEY")
+    with pytest.raises(RuntimeError, match="ANTHROPIC_API_KEY"):
+        _metric(server).score("5", {"gold": "ref"})
+    assert server.requests == []
+
+
+async def test_token_bucket_refills_at_rate():
+    bucket = TokenBucket(rate=40.0, capacity=2)
+    started = time.monotonic()
+    for _ in range(6):
+        await bucket.acquire()
+    # Two banked tokens, then four at 25 ms each.
+    assert time.monotonic() - started >= 0.09
+    await asyncio.sleep(0)
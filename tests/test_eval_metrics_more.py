@@ -1,8 +1,10 @@
 import json
+import random
 
 import pytest
 
-from trainpipe.evals.metrics import get_metric_class
+from trainpipe.evals.metrics import bbox_iou, get_metric_class
+from trainpipe.evals.metrics.base import Metric
 from trainpipe.evals.metrics.field_level_f1 import FieldLevelF1Metric
 from trainpipe.evals.metrics.llm_as_judge import (
     LLMAsJudgeMetric,
@@ -263,3 +265,129 @@ def test_render_prompt_includes_examples_when_provided():
     prompt = _render_prompt(rubric, "candidate", {"gold": "ref"}, "gold", "score")
     assert "Examples:" in prompt
     assert "'p1'" in prompt
+
+
+# ---------------------------------------------------------------------------
+# score_batch — batched paths must agree with per-sample score
+# ---------------------------------------------------------------------------
+
+
+_TEXT_BATCH = (
+    ["Paris", " paris ", "the cat sat on the mat", "", "a b c d e", "Rome", "x"],
+    [
+        {"gold": "Paris"},
+        {"gold": "Paris"},
+        {"gold": "the cat is on the mat"},
+        {"gold": "empty"},
+        {"gold": "a c b d e f"},
+        {"other": "no gold"},
+        {"gold": 7},
+    ],
+)
+_SHARED_GOLD = {"name": "Alice", "items": [{"sku": "A1", "qty": 2}], "meta": {}}
+_FIELD_BATCH = (
+    [
+        json.dumps({"name": "alice ", "items": [{"sku": "A1", "qty": 2}], "meta": {}}),
+        json.dumps({"name": "Bob", "items": [{"sku": "A1", "qty": 3}]}),
+        json.dumps({"name": "Bob", "items": [{"sku": "A1", "qty": 3}]}),
+        "not json",
+        "[1, 2]",
+        json.dumps({"name": "Alice"}),
+    ],
+    [{"gold": _SHARED_GOLD}] * 3 + [{"gold": {"a": 1}}, {"gold": {"a": 1}}, {"gold": "str"}],
+)
+_BOX_BATCH = (
+    [
+        json.dumps([[0, 0, 10, 10], {"box": [20, 20, 30, 30], "label": "b"}]),
+        json.dumps([[10, 10, 0, 0]]),
+        json.dumps([{"box": [0, 0, 10, 10], "label": "a"}]),
+        "",
+        "{",
+        json.dumps([[0, 0, 5, 5], [0, 0, 10, 10]]),
+    ],
+    [
+        {"gold_boxes": [[0, 0, 10, 10], {"box": [21, 21, 30, 30], "label": "b"}]},
+        {"gold_boxes": [[0, 0, 10, 10]]},
+        {"gold_boxes": [{"box": [0, 0, 10, 10], "label": "z"}]},
+        {"gold_boxes": []},
+        {"gold_boxes": [[0, 0, 1, 1]]},
+        {"gold_boxes": [[0, 0, 10, 10]]},
+    ],
+)
+
+
+@pytest.mark.parametrize(
+    ("kind", "config", "batch"),
+    [
+        ("exact_match", {}, _TEXT_BATCH),
+        ("exact_match", {"normalize": False, "strip_punctuation": True}, _TEXT_BATCH),
+        ("bleu", {}, _TEXT_BATCH),
+        ("bleu", {"max_n": 2, "smoothing": False}, _TEXT_BATCH),
+        ("rouge_l", {}, _TEXT_BATCH),
+        ("rouge_l", {"beta": 2.0, "case_insensitive": False}, _TEXT_BATCH),
+        ("field_level_f1", {}, _FIELD_BATCH),
+        ("field_level_f1", {"ignore_keys": ["meta"], "case_insensitive": False}, _FIELD_BATCH),
+        ("bounding_box_iou", {}, _BOX_BATCH),
+        ("bounding_box_iou", {"label_strict": False, "iou_threshold": 0.8}, _BOX_BATCH),
+    ],
+)
+def test_score_batch_matches_score(kind, config, batch):
+    metric = get_metric_class(kind)(config)
+    predictions, samples = batch
+    assert type(metric).score_batch is not Metric.score_batch
+    expected = [metric.score(p, s) for p, s in zip(predictions, samples, strict=True)]
+    assert metric.score_batch(predictions, samples) == expected
+
+
+def _lcs_dp(a, b):
+    prev = [0] * (len(b) + 1)
+    for x in a:
+        curr = [0]
+        for j, y in enumerate(b):
+            curr.append(prev[j] + 1 if x == y else max(prev[j + 1], curr[j]))
+        prev = curr
+    return prev[-1]
+
+
+def test_lcs_length_matches_dynamic_program():
+    a = "the quick brown fox jumps over the lazy dog".split()
+    b = "the quick red fox leaps over the lazy dog".split()
+    assert _lcs_length(a, b) == 7
+    assert _lcs_length(a, a) == len(a)
+    assert _lcs_length(["x"], ["y"]) == 0
+    assert _lcs_length([], a) == 0
+
+    rng = random.Random(0)
+    for _ in range(300):
+        # Small vocabularies force many repeated tokens; lengths cross
+        # the 64-bit word boundary.
+        vocab = [str(i) for i in range(rng.randint(1, 8))]
+        x = [rng.choice(vocab) for _ in range(rng.randint(0, 150))]
+        y = [rng.choice(vocab) for _ in range(rng.randint(0, 150))]
+        assert _lcs_length(x, y) == _lcs_dp(x, y) == _lcs_length(y, x)
+
+
+def test_bbox_iou_numpy_pairs_match_python():
+    pytest.importorskip("numpy")
+    rng = random.Random(0)
+
+    def box():
+        x, y = rng.uniform(0, 100), rng.uniform(0, 100)
+        # Reversed and degenerate corners too.
+        return [x, y, x + rng.choice([-20, 0, 15, 40]), y + rng.uniform(-10, 30)]
+
+    parsed = [
+        bbox_iou._parse(
+            json.dumps([box() for _ in range(rng.randint(0, 6))]),
+            [box() for _ in range(rng.randint(1, 6))],
+        )
+        for _ in range(50)
+    ]
+    expected = [
+        [bbox_iou._prepared_iou(a, b) for a in pred for b in gold]
+        for pred, _, gold, _ in parsed
+    ]
+    assert bbox_iou._pair_ious_numpy(parsed) == expected
+
+    nan = bbox_iou._parse("[[0, 0, NaN, 1]]", [[0, 0, 1, 1]])
+    assert bbox_iou._pair_ious_numpy([nan]) is None
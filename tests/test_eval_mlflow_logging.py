@@ -1,9 +1,9 @@
 """Tests for the MLflow publishing path in EvalDriver.
 
-We don't talk to a real MLflow server. The integration goes through
-``trainpipe.evals.runner._log_eval_to_mlflow``; tests monkeypatch it to
-record the call and verify the driver invokes it with the right args
-under the right conditions, without breaking on MLflow exceptions.
+We don't talk to a real MLflow server. The driver queues its records on
+the MLflow gateway's outbox (``mlflow_outbox`` table); tests check which
+rows land there under which conditions, and that a failing enqueue never
+breaks the eval.
 """
 
 import json
@@ -18,9 +18,9 @@ from trainpipe.api.schemas import (
     MetricConfig,
 )
 from trainpipe.core import repository
-from trainpipe.evals import runner as runner_mod
 from trainpipe.evals.inference import MockInferenceBackend
-from trainpipe.evals.runner import EvalDriver, _log_eval_to_mlflow, _mlflow_key
+from trainpipe.evals.runner import EvalDriver, _eval_mlflow_records, _mlflow_key
+from trainpipe.integrations import mlflow_gateway
 
 
 def test_mlflow_key_normalizes_unsafe_chars():
@@ -29,6 +29,14 @@ def test_mlflow_key_normalizes_unsafe_chars():
     assert _mlflow_key("with:colons!") == "with_colons_"
 
 
+async def _outbox(db):
+    async with db.read() as conn:
+        cur = await conn.execute(
+            "SELECT run_id, kind, key, value FROM mlflow_outbox ORDER BY id"
+        )
+        return [tuple(r) for r in await cur.fetchall()]
+
+
 @pytest_asyncio.fixture
 async def setup(db, tmp_path):
     dataset = tmp_path / "eval.jsonl"
@@ -74,37 +82,25 @@ async def setup(db, tmp_path):
     return run, suite, exp_id
 
 
-async def test_mlflow_logging_called_with_expected_args(db, setup, monkeypatch):
+async def test_mlflow_records_queued_with_expected_args(db, setup):
     run, suite, _exp_id = setup
-    calls: list[dict] = []
-
-    def fake_log(mlflow_run_id, suite_name, eval_run_id, aggregate):
-        calls.append(
-            {
-                "mlflow_run_id": mlflow_run_id,
-                "suite_name": suite_name,
-                "eval_run_id": eval_run_id,
-                "aggregate_keys": sorted(aggregate.keys()),
-                "exact_match_mean": aggregate["exact_match"].mean,
-            }
-        )
-
-    monkeypatch.setattr(runner_mod, "_log_eval_to_mlflow", fake_log)
 
     backend = MockInferenceBackend(default_response="right")
     driver = EvalDriver(db=db, run=run, suite=suite, backend=backend)
     await driver.execute()
 
-    assert len(calls) == 1
-    call = calls[0]
-    assert call["mlflow_run_id"] == "mlflow-run-abc"
-    assert call["suite_name"] == "ml flow suite"  # raw — _mlflow_key applied later
-    assert call["eval_run_id"] == run.id
-    assert call["aggregate_keys"] == ["exact_match"]
-    assert call["exact_match_mean"] == 1.0
+    rows = await _outbox(db)
+    assert {r[0] for r in rows} == {"mlflow-run-abc"}
+    metrics = {key: float(value) for _, kind, key, value in rows if kind == "metric"}
+    tags = {key: value for _, kind, key, value in rows if kind == "tag"}
+    # Suite name "ml flow suite" is normalized for MLflow keys.
+    assert metrics["eval.ml_flow_suite.exact_match"] == 1.0
+    assert metrics["eval.ml_flow_suite.exact_match.count"] == 2.0
+    assert tags["trainpipe.eval.ml_flow_suite"] == run.id
+    assert tags["trainpipe.eval.ml_flow_suite.completed"] == "true"
 
 
-async def test_mlflow_logging_skipped_when_no_experiment(db, tmp_path, monkeypatch):
+async def test_mlflow_logging_skipped_when_no_experiment(db, tmp_path):
     dataset = tmp_path / "x.jsonl"
     dataset.write_text(json.dumps({"prompt": "p", "gold": "y"}) + "\n")
     async with db.connect() as conn:
@@ -127,21 +123,14 @@ async def test_mlflow_logging_skipped_when_no_experiment(db, tmp_path, monkeypat
         run = await repository.get_eval_run(conn, rid)
         suite = await repository.get_eval_suite(conn, sid)
 
-    called = []
-    monkeypatch.setattr(
-        runner_mod, "_log_eval_to_mlflow", lambda *a, **k: called.append(a),
-    )
-
     driver = EvalDriver(
         db=db, run=run, suite=suite, backend=MockInferenceBackend(default_response="y"),
     )
     await driver.execute()
-    assert called == []
+    assert await _outbox(db) == []
 
 
-async def test_mlflow_logging_skipped_when_experiment_lacks_run_id(
-    db, tmp_path, monkeypatch
-):
+async def test_mlflow_logging_skipped_when_experiment_lacks_run_id(db, tmp_path):
     dataset = tmp_path / "x.jsonl"
     dataset.write_text(json.dumps({"prompt": "p", "gold": "y"}) + "\n")
     async with db.connect() as conn:
@@ -169,25 +158,20 @@ async def test_mlflow_logging_skipped_when_experiment_lacks_run_id(
         run = await repository.get_eval_run(conn, rid)
         suite = await repository.get_eval_suite(conn, sid)
 
-    called = []
-    monkeypatch.setattr(
-        runner_mod, "_log_eval_to_mlflow", lambda *a, **k: called.append(a),
-    )
-
     driver = EvalDriver(
         db=db, run=run, suite=suite, backend=MockInferenceBackend(default_response="y"),
     )
     await driver.execute()
-    assert called == []
+    assert await _outbox(db) == []
 
 
 async def test_mlflow_exception_does_not_fail_eval(db, setup, monkeypatch, caplog):
     run, suite, _exp_id = setup
 
-    def explode(*_args, **_kwargs):
-        raise RuntimeError("mlflow connection refused")
+    async def explode(*_args, **_kwargs):
+        raise RuntimeError("outbox write failed")
 
-    monkeypatch.setattr(runner_mod, "_log_eval_to_mlflow", explode)
+    monkeypatch.setattr(mlflow_gateway, "enqueue", explode)
 
     with caplog.at_level("WARNING"):
         await EvalDriver(
@@ -203,7 +187,7 @@ async def test_mlflow_exception_does_not_fail_eval(db, setup, monkeypatch, caplo
     assert any("mlflow publish failed" in r.message for r in caplog.records)
 
 
-async def test_mlflow_not_called_on_failed_run(db, tmp_path, monkeypatch):
+async def test_mlflow_not_called_on_failed_run(db, tmp_path):
     """If the eval fails (no aggregates ever computed), we don't push."""
     async with db.connect() as conn:
         sid = await repository.create_eval_suite(
@@ -233,11 +217,6 @@ async def test_mlflow_not_called_on_failed_run(db, tmp_path, monkeypatch):
         run = await repository.get_eval_run(conn, rid)
         suite = await repository.get_eval_suite(conn, sid)
 
-    called = []
-    monkeypatch.setattr(
-        runner_mod, "_log_eval_to_mlflow", lambda *a, **k: called.append(a),
-    )
-
     driver = EvalDriver(
         db=db, run=run, suite=suite, backend=MockInferenceBackend(),
     )
@@ -246,35 +225,12 @@ async def test_mlflow_not_called_on_failed_run(db, tmp_path, monkeypatch):
     async with db.connect() as conn:
         finished = await repository.get_eval_run(conn, run.id)
     assert finished.status == EvalRunStatus.FAILED
-    assert called == []
-
-
-def test_log_eval_to_mlflow_makes_expected_calls(monkeypatch):
-    """Verify the sync helper itself: which client methods it calls,
-    with which key shapes. We swap mlflow.tracking.MlflowClient for a
-    recording double."""
-    import sys
-    import types
-
-    recorded: dict[str, list] = {"metric": [], "tag": []}
-
-    class FakeClient:
-        def log_metric(self, run_id, key, value):
-            recorded["metric"].append((run_id, key, value))
-
-        def set_tag(self, run_id, key, value):
-            recorded["tag"].append((run_id, key, value))
+    assert await _outbox(db) == []
 
-    fake_mlflow = types.ModuleType("mlflow")
-    fake_mlflow.set_tracking_uri = lambda _uri: None  # type: ignore[attr-defined]
-    fake_tracking = types.ModuleType("mlflow.tracking")
-    fake_tracking.MlflowClient = FakeClient  # type: ignore[attr-defined]
-    fake_mlflow.tracking = fake_tracking  # type: ignore[attr-defined]
-    monkeypatch.setitem(sys.modules, "mlflow", fake_mlflow)
-    monkeypatch.setitem(sys.modules, "mlflow.tracking", fake_tracking)
 
-    _log_eval_to_mlflow(
-        "ml-run-1",
+def test_eval_mlflow_records_key_shapes():
+    """The pure helper decides which metric / tag keys get published."""
+    metrics, tags = _eval_mlflow_records(
         "my suite",  # space — should be normalized to "my_suite"
         "eval-id-7",
         {
@@ -283,20 +239,16 @@ def test_log_eval_to_mlflow_makes_expected_calls(monkeypatch):
         },
     )
 
-    metric_keys = sorted(k for _, k, _ in recorded["metric"])
     # mean + count for each (no std for rouge_l since std=None)
-    assert "eval.my_suite.exact_match" in metric_keys
-    assert "eval.my_suite.exact_match.std" in metric_keys
-    assert "eval.my_suite.exact_match.count" in metric_keys
-    assert "eval.my_suite.rouge_l" in metric_keys
-    assert "eval.my_suite.rouge_l.count" in metric_keys
-    assert "eval.my_suite.rouge_l.std" not in metric_keys
-
-    tag_keys = sorted(k for _, k, _ in recorded["tag"])
-    assert tag_keys == [
-        "trainpipe.eval.my_suite",
-        "trainpipe.eval.my_suite.completed",
-    ]
+    assert metrics == {
+        "eval.my_suite.exact_match": 0.83,
+        "eval.my_suite.exact_match.std": 0.12,
+        "eval.my_suite.exact_match.count": 100.0,
+        "eval.my_suite.rouge_l": 0.45,
+        "eval.my_suite.rouge_l.count": 100.0,
+    }
     # eval_run_id tag value is the eval run id
-    tag_id_value = next(v for _, k, v in recorded["tag"] if k == "trainpipe.eval.my_suite")
-    assert tag_id_value == "eval-id-7"
+    assert tags == {
+        "trainpipe.eval.my_suite": "eval-id-7",
+        "trainpipe.eval.my_suite.completed": "true",
+    }
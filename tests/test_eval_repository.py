@@ -1,3 +1,5 @@
+import pytest
+
 from trainpipe.api.schemas import (
     EvalRunStatus,
     ExperimentSpec,
@@ -247,3 +249,88 @@ async def test_request_cancel_eval_run(db):
     async with db.connect() as conn:
         missing = await repository.request_cancel_eval_run(conn, "deadbeef")
     assert missing == "not_found"
+
+
+async def _run_with_scores(db, sid: str, scores: dict[int, dict[str, float]]) -> str:
+    async with db.connect() as conn:
+        run_id = await repository.create_eval_run(
+            conn, suite_id=sid, experiment_id=None, model_ref="m", triggered_by="manual"
+        )
+        await repository.add_eval_results(
+            conn,
+            run_id=run_id,
+            rows=[
+                {
+                    "sample_index": i,
+                    "input": {"q": i},
+                    "prediction": f"p{i}",
+                    "gold": None,
+                    "scores": s,
+                }
+                for i, s in scores.items()
+            ],
+        )
+    return run_id
+
+
+async def test_compare_eval_scores_counts_wins_losses_ties(db):
+    sid = await _make_suite(db, name="for-compare")
+    base = await _run_with_scores(
+        db,
+        sid,
+        {
+            0: {"em": 1.0, "f1": 0.5},
+            1: {"em": 1.0, "f1": 0.5},
+            2: {"em": 0.0, "f1": 0.5},
+            3: {"em": 0.5, "f1": 0.5},
+        },
+    )
+    other = await _run_with_scores(
+        db,
+        sid,
+        {
+            0: {"em": 1.0, "f1": 0.75},
+            1: {"em": 0.0, "f1": 0.5},
+            2: {"em": 1.0, "f1": 0.5},
+            3: {"em": 0.5 + 1e-12, "f1": 0.5},
+            # Not in the baseline: not paired.
+            4: {"em": 1.0, "f1": 1.0},
+        },
+    )
+    async with db.read() as conn:
+        result = await repository.compare_eval_scores(conn, base, [other])
+    assert result[other]["em"].pop("mean_delta") == pytest.approx(0.0)
+    assert result == {
+        other: {
+            "em": {"paired": 4, "wins": 1, "losses": 1, "ties": 2},
+            "f1": {"paired": 4, "mean_delta": 0.0625, "wins": 1, "losses": 0, "ties": 3},
+        }
+    }
+
+
+async def test_list_diverging_samples_paginates_past_old_cap(db):
+    sid = await _make_suite(db, name="for-diverging")
+    n = 6000
+    a = await _run_with_scores(db, sid, {i: {"em": 1.0} for i in range(n)})
+    b = await _run_with_scores(
+        db, sid, {i: {"em": 0.0 if i % 3 == 0 else 1.0} for i in range(n)}
+    )
+    # A third run missing most samples doesn't hide the a/b divergence.
+    c = await _run_with_scores(db, sid, {0: {"em": 1.0}})
+    async with db.read() as conn:
+        first, total = await repository.list_diverging_samples(
+            conn, [a, b, c], limit=3, offset=0
+        )
+        last, _ = await repository.list_diverging_samples(
+            conn, [a, b, c], limit=3, offset=total - 1
+        )
+        beyond, beyond_total = await repository.list_diverging_samples(
+            conn, [a, b, c], limit=3, offset=total
+        )
+        rows = await repository.list_eval_results_for_samples(conn, [a, c], first)
+    assert total == n // 3
+    assert first == [0, 3, 6]
+    assert last == [n - 3]
+    assert (beyond, beyond_total) == ([], total)
+    assert [(r.sample_index, r.run_id) for r in rows].count((0, c)) == 1
+    assert {r.sample_index for r in rows} == {0, 3, 6}
@@ -7,29 +7,33 @@ deploy host (separate manual smoke).
 
 import asyncio
 import json
+import threading
 
 import pytest
 import pytest_asyncio
 
 from trainpipe.api.schemas import (
+    EarlyStopConfig,
     EvalRunStatus,
     ExperimentSpec,
     InferenceParams,
     MetricConfig,
 )
 from trainpipe.core import repository
+from trainpipe.evals.datasets import DatasetReadError, EvalDataset
 from trainpipe.evals.dispatcher import EvalDispatcher
 from trainpipe.evals.inference import (
     MockInferenceBackend,
     default_prompt_extractor,
+    length_buckets,
+    weights_fingerprint,
 )
-from trainpipe.evals.runner import (
-    DatasetReadError,
-    EvalDriver,
-    _instantiate_metrics,
-    _load_samples,
-)
-from trainpipe.scheduler.gpu_pool import GpuPool
+from trainpipe.evals.metrics.exact_match import ExactMatchMetric
+from trainpipe.evals.runner import EvalDriver, _instantiate_metrics
+from trainpipe.inference.residency import ModelResidency
+from trainpipe.inference.service import InferenceService, ModelRef
+from trainpipe.scheduler.gpu_pool import GpuInfo, GpuPool
+from trainpipe.scheduler.loop import Scheduler
 
 # ---------------------------------------------------------------------------
 # default_prompt_extractor
@@ -71,7 +75,7 @@ def test_load_samples_jsonl(tmp_path):
     f.write_text(
         '{"q": "a", "gold": "1"}\n{"q": "b", "gold": "2"}\n', encoding="utf-8"
     )
-    samples = _load_samples(f, limit=None)
+    samples = list(EvalDataset.from_ref(f))
     assert len(samples) == 2
     assert samples[0]["q"] == "a"
 
@@ -82,21 +86,21 @@ def test_load_samples_respects_limit(tmp_path):
         json.dumps({"i": i, "gold": str(i)}) for i in range(10)
     )
     f.write_text(lines + "\n", encoding="utf-8")
-    samples = _load_samples(f, limit=3)
+    samples = list(EvalDataset.from_ref(f, limit=3))
     assert [s["i"] for s in samples] == [0, 1, 2]
 
 
 def test_load_samples_json_list(tmp_path):
     f = tmp_path / "evals.json"
     f.write_text(json.dumps([{"a": 1}, {"a": 2}]), encoding="utf-8")
-    samples = _load_samples(f, limit=None)
+    samples = list(EvalDataset.from_ref(f))
     assert samples == [{"a": 1}, {"a": 2}]
 
 
 def test_load_samples_csv(tmp_path):
     f = tmp_path / "evals.csv"
     f.write_text("q,gold\nfoo,1\nbar,2\n", encoding="utf-8")
-    samples = _load_samples(f, limit=None)
+    samples = list(EvalDataset.from_ref(f))
     assert samples[0] == {"q": "foo", "gold": "1"}
 
 
@@ -104,25 +108,62 @@ def test_load_samples_unknown_extension(tmp_path):
     f = tmp_path / "evals.xyz"
     f.write_text("anything", encoding="utf-8")
     with pytest.raises(DatasetReadError):
-        _load_samples(f, limit=None)
+        list(EvalDataset.from_ref(f))
 
 
 def test_load_samples_broken_jsonl(tmp_path):
     f = tmp_path / "broken.jsonl"
     f.write_text('{"ok": 1}\nthis is not json\n', encoding="utf-8")
     with pytest.raises(DatasetReadError):
-        _load_samples(f, limit=None)
+        list(EvalDataset.from_ref(f))
 
 
-def test_load_samples_rejects_parquet(tmp_path):
-    # Parquet is a valid *upload* format but the eval runner does in-process
-    # streaming reads and deliberately does not support it (spec: eval
-    # datasets are jsonl/json/csv/tsv only). The suffix is rejected before any
-    # read, so the file contents don't matter.
+def test_load_samples_parquet(tmp_path):
+    pa = pytest.importorskip("pyarrow")
+    pq = pytest.importorskip("pyarrow.parquet")
     f = tmp_path / "evals.parquet"
-    f.write_text("not really parquet", encoding="utf-8")
-    with pytest.raises(DatasetReadError, match="parquet"):
-        _load_samples(f, limit=None)
+    rows = [{"prompt": f"q{i}", "gold": str(i)} for i in range(2500)]
+    pq.write_table(pa.Table.from_pylist(rows), f, row_group_size=1000)
+    dataset = EvalDataset.from_ref(f)
+    assert dataset.count() == 2500
+    assert list(dataset) == rows
+    assert [len(w) for w in dataset.windows(1024)] == [1024, 1024, 452]
+
+
+def test_load_samples_streams_lazily(tmp_path):
+    # A broken line far down the file only fails once it's reached.
+    f = tmp_path / "evals.jsonl"
+    f.write_text('{"i": 0}\n{"i": 1}\nnot json\n', encoding="utf-8")
+    it = iter(EvalDataset.from_ref(f))
+    assert next(it) == {"i": 0}
+    assert next(it) == {"i": 1}
+    with pytest.raises(DatasetReadError, match="line 3"):
+        next(it)
+
+
+def test_load_samples_subsample_suffix(tmp_path):
+    f = tmp_path / "evals.jsonl"
+    f.write_text("".join(json.dumps({"i": i}) + "\n" for i in range(100)), encoding="utf-8")
+    dataset = EvalDataset.from_ref(f"{f}#10")
+    picked = [s["i"] for s in dataset]
+    assert dataset.count() == 10
+    assert len(set(picked)) == 10 and picked == sorted(picked)
+    # Same seed on every read, so a resumed run sees the same samples.
+    assert [s["i"] for s in EvalDataset.from_ref(f"{f}#10")] == picked
+    assert [s["i"] for s in EvalDataset.from_ref(f"{f}#10", limit=3)] == picked[:3]
+    assert EvalDataset.from_ref(f"{f}#1000").count() == 100
+    with pytest.raises(DatasetReadError, match="sub-sample"):
+        EvalDataset.from_ref(f"{f}#many")
+
+
+def test_hash_in_directory_name_is_not_a_suffix(tmp_path):
+    d = tmp_path / "run#2"
+    d.mkdir()
+    f = d / "evals.jsonl"
+    f.write_text("".join(json.dumps({"i": i}) + "\n" for i in range(5)), encoding="utf-8")
+    assert EvalDataset.from_ref(str(f)) == EvalDataset(f)
+    assert EvalDataset.from_ref(f"{f}#2") == EvalDataset(f, 2)
+    assert EvalDataset.from_ref(f"{f}#2").count() == 2
 
 
 # ---------------------------------------------------------------------------
@@ -270,6 +311,34 @@ async def test_eval_driver_predict_failure_persisted(db, eval_setup):
     assert failed_row.scores["exact_match"] == 0.0
 
 
+async def test_eval_driver_failed_score_batch_rescores_per_sample(
+    db, eval_setup, monkeypatch
+):
+    run, suite, _ = eval_setup
+    suite = suite.model_copy(update={"inference_params": InferenceParams(batch_size=3)})
+    original = ExactMatchMetric.score
+
+    def fail_batch(self, predictions, samples):
+        raise RuntimeError("batch path broke")
+
+    def picky_score(self, prediction, sample):
+        if prediction == "Berlin":
+            raise ValueError("no Berlin")
+        return original(self, prediction, sample)
+
+    monkeypatch.setattr(ExactMatchMetric, "score_batch", fail_batch)
+    monkeypatch.setattr(ExactMatchMetric, "score", picky_score)
+    backend = MockInferenceBackend(response_fn=lambda s, _p: s["gold"])
+    await EvalDriver(db=db, run=run, suite=suite, backend=backend).execute()
+
+    async with db.connect() as conn:
+        finished = await repository.get_eval_run(conn, run.id)
+        results = await repository.list_eval_results(conn, run.id)
+    assert finished.status == EvalRunStatus.COMPLETED
+    assert [r.scores["exact_match"] for r in results] == [1.0, 0.0, 1.0]
+    assert [r.error for r in results] == [None, "exact_match: no Berlin", None]
+
+
 async def test_eval_driver_missing_dataset_fails_run(db):
     async with db.connect() as conn:
         sid = await repository.create_eval_suite(
@@ -372,6 +441,380 @@ async def test_eval_driver_sample_limit_applied(db, tmp_path):
     assert finished.aggregate["exact_match"].mean == pytest.approx(0.25)
 
 
+def test_length_buckets_group_similar_prompts():
+    samples = [{"prompt": "x" * n} for n in (9, 1, 7, 2, 8)] + [{"no": "prompt"}]
+    assert length_buckets(samples, 2) == [[5, 1], [3, 2], [4, 0]]
+    assert length_buckets(samples, 1) == [[i] for i in range(6)]
+
+
+async def test_eval_driver_predicts_in_batches(db, eval_setup):
+    run, suite, _ = eval_setup
+    suite = suite.model_copy(update={"inference_params": InferenceParams(batch_size=2)})
+    backend = MockInferenceBackend(response_fn=lambda s, _p: s["gold"])
+    driver = EvalDriver(db=db, run=run, suite=suite, backend=backend)
+    await driver.execute()
+
+    async with db.connect() as conn:
+        finished = await repository.get_eval_run(conn, run.id)
+        results = await repository.list_eval_results(conn, run.id)
+    assert backend.batch_sizes == [2]  # the trailing single sample goes alone
+    assert finished.aggregate["exact_match"].mean == 1.0
+    assert [r.sample_index for r in results] == [0, 1, 2]
+    assert [r.prediction for r in results] == ["Paris", "Berlin", "Rome"]
+
+
+async def test_eval_driver_streams_dataset_in_windows(db, eval_setup, monkeypatch):
+    monkeypatch.setattr("trainpipe.settings.settings.eval_read_window", 2)
+    run, suite, _ = eval_setup
+    suite = suite.model_copy(update={"inference_params": InferenceParams(batch_size=16)})
+    backend = MockInferenceBackend(response_fn=lambda s, _p: s["gold"])
+    await EvalDriver(db=db, run=run, suite=suite, backend=backend).execute()
+
+    async with db.connect() as conn:
+        finished = await repository.get_eval_run(conn, run.id)
+    # Batches never span a window, so at most a window is in flight; the
+    # last window's single sample goes through plain predict.
+    assert backend.batch_sizes == [2]
+    assert len(backend.predict_calls) == 3
+    assert finished.aggregate["exact_match"].mean == 1.0
+    assert finished.pipeline_stats["read_window"] == 2
+
+
+async def test_eval_driver_reads_subsampled_parquet(db, eval_setup):
+    pa = pytest.importorskip("pyarrow")
+    pq = pytest.importorskip("pyarrow.parquet")
+    run, suite, dataset = eval_setup
+    path = dataset.with_suffix(".parquet")
+    rows = [{"prompt": f"q{i}", "gold": str(i)} for i in range(50)]
+    pq.write_table(pa.Table.from_pylist(rows), path, row_group_size=8)
+    suite = suite.model_copy(update={"dataset_path": f"{path}#20"})
+    backend = MockInferenceBackend(response_fn=lambda s, _p: s["gold"])
+    await EvalDriver(db=db, run=run, suite=suite, backend=backend).execute()
+
+    async with db.connect() as conn:
+        finished = await repository.get_eval_run(conn, run.id)
+        results = await repository.list_eval_results(conn, run.id)
+    assert finished.status == EvalRunStatus.COMPLETED, finished.error
+    assert finished.sample_count == 20
+    assert [r.input for r in results] == list(EvalDataset.from_ref(f"{path}#20"))
+
+
+async def test_eval_driver_failed_batch_retries_per_sample(db, eval_setup):
+    run, suite, _ = eval_setup
+    suite = suite.model_copy(update={"inference_params": InferenceParams(batch_size=3)})
+
+    def boom(sample, _params):
+        if sample["prompt"] == "capital of Germany":
+            raise RuntimeError("simulated model crash")
+        return sample["gold"]
+
+    backend = MockInferenceBackend(response_fn=boom)
+    driver = EvalDriver(db=db, run=run, suite=suite, backend=backend)
+    await driver.execute()
+
+    async with db.connect() as conn:
+        results = await repository.list_eval_results(conn, run.id)
+    assert backend.batch_sizes == [3]
+    assert [r.scores["exact_match"] for r in results] == [1.0, 0.0, 1.0]
+    assert "simulated model crash" in (results[1].error or "")
+
+
+async def test_eval_driver_scores_while_predicting(db, eval_setup, monkeypatch):
+    """Scoring of the first sample waits until the last one was predicted,
+    which only finishes if the stages run concurrently."""
+    run, suite, _ = eval_setup
+    all_predicted = threading.Event()
+    original = ExactMatchMetric.score_batch
+
+    def blocking_score(self, predictions, samples):
+        assert all_predicted.wait(timeout=5)
+        return original(self, predictions, samples)
+
+    def respond(sample, _params):
+        if sample["prompt"] == "capital of Italy":
+            all_predicted.set()
+        return sample["gold"]
+
+    monkeypatch.setattr(ExactMatchMetric, "score_batch", blocking_score)
+    driver = EvalDriver(
+        db=db, run=run, suite=suite, backend=MockInferenceBackend(response_fn=respond)
+    )
+    await driver.execute()
+
+    async with db.connect() as conn:
+        finished = await repository.get_eval_run(conn, run.id)
+    assert finished.status == EvalRunStatus.COMPLETED
+    assert finished.aggregate["exact_match"].mean == 1.0
+    stats = finished.pipeline_stats
+    assert {n: st["items"] for n, st in stats["stages"].items()} == {
+        "predict": 3,
+        "score": 3,
+        "persist": 3,
+    }
+    assert stats["score_workers"] >= 1
+    assert stats["stages"]["score"]["queue_max"] >= 1
+
+
+async def test_eval_driver_resumes_after_restart(db, eval_setup):
+    """A requeued run predicts only the samples without a result row and
+    aggregates over old and new rows alike."""
+    run, suite, _ = eval_setup
+    async with db.connect() as conn:
+        await repository.add_eval_results(
+            conn,
+            run_id=run.id,
+            rows=[
+                {
+                    "sample_index": 1,
+                    "input": {"prompt": "capital of Germany"},
+                    "prediction": "Munich",
+                    "gold": None,
+                    "scores": {"exact_match": 0.0},
+                    "error": None,
+                }
+            ],
+        )
+        await repository.recover_eval_runs(conn)
+        await repository.claim_eval_run(conn, run.id)
+
+    backend = MockInferenceBackend(response_fn=lambda s, _p: s["gold"])
+    await EvalDriver(db=db, run=run, suite=suite, backend=backend).execute()
+
+    async with db.connect() as conn:
+        finished = await repository.get_eval_run(conn, run.id)
+        results = await repository.list_eval_results(conn, run.id)
+    assert [c["sample"]["prompt"] for c in backend.predict_calls] == [
+        "capital of France",
+        "capital of Italy",
+    ]
+    assert finished.status == EvalRunStatus.COMPLETED
+    assert finished.aggregate["exact_match"].mean == pytest.approx(2 / 3)
+    assert (finished.samples_done, finished.resumed_samples) == (3, 1)
+    assert finished.pipeline_stats["resumed_samples"] == 1
+    assert [r.prediction for r in results] == ["Paris", "Munich", "Rome"]
+
+
+async def test_eval_driver_fully_scored_run_skips_model_load(db, eval_setup):
+    run, suite, _ = eval_setup
+    rows = [
+        {"sample_index": i, "input": {}, "prediction": "x", "scores": {"exact_match": 1.0}}
+        for i in range(3)
+    ]
+    async with db.connect() as conn:
+        await repository.add_eval_results(conn, run_id=run.id, rows=rows)
+
+    backend = MockInferenceBackend()
+    await EvalDriver(db=db, run=run, suite=suite, backend=backend).execute()
+
+    async with db.connect() as conn:
+        finished = await repository.get_eval_run(conn, run.id)
+    assert finished.status == EvalRunStatus.COMPLETED
+    assert finished.aggregate["exact_match"].mean == 1.0
+    assert not backend._opened
+    assert backend.predict_calls == []
+
+
+async def test_eval_driver_splits_samples_across_shards(db, eval_setup):
+    run, suite, _ = eval_setup
+    backends = [MockInferenceBackend(response_fn=lambda s, _p: s["gold"]) for _ in range(2)]
+    await EvalDriver(db=db, run=run, suite=suite, backends=backends).execute()
+
+    async with db.connect() as conn:
+        finished = await repository.get_eval_run(conn, run.id)
+    seen = [[c["sample"]["prompt"] for c in b.predict_calls] for b in backends]
+    assert seen == [["capital of France", "capital of Italy"], ["capital of Germany"]]
+    assert all(b._opened and b._closed for b in backends)
+    assert finished.aggregate["exact_match"].mean == 1.0
+    assert finished.samples_done == 3
+    shards = finished.pipeline_stats["shards"]
+    assert [sh["samples"] for sh in shards] == [2, 1]
+    assert finished.pipeline_stats["stages"]["persist"]["items"] == 3
+
+
+async def _rerun(db, suite, **suite_changes):
+    """A fresh queued + claimed run of ``suite`` (optionally edited)."""
+    suite = suite.model_copy(update=suite_changes)
+    async with db.connect() as conn:
+        run_id = await repository.create_eval_run(
+            conn, suite_id=suite.id, experiment_id=None, model_ref="m", triggered_by="manual"
+        )
+        await repository.claim_eval_run(conn, run_id)
+        return await repository.get_eval_run(conn, run_id), suite
+
+
+async def test_eval_driver_reuses_cached_predictions(db, eval_setup):
+    run, suite, _ = eval_setup
+    first = MockInferenceBackend(response_fn=lambda s, _p: s["gold"], fingerprint="w1")
+    await EvalDriver(db=db, run=run, suite=suite, backend=first).execute()
+    assert len(first.predict_calls) == 3
+
+    # Re-scoring with another metric: no inference, the model isn't loaded.
+    run2, suite2 = await _rerun(
+        db, suite, metrics=[MetricConfig(kind="exact_match"), MetricConfig(kind="rouge_l")]
+    )
+    second = MockInferenceBackend(default_response="wrong", fingerprint="w1")
+    await EvalDriver(db=db, run=run2, suite=suite2, backend=second).execute()
+    async with db.connect() as conn:
+        finished = await repository.get_eval_run(conn, run2.id)
+    assert finished.status == EvalRunStatus.COMPLETED
+    assert finished.aggregate["exact_match"].mean == 1.0
+    assert finished.aggregate["rouge_l"].mean == 1.0
+    assert finished.pipeline_stats["prediction_cache"] == {"hits": 3, "misses": 0}
+    assert second.predict_calls == [] and not second._opened
+
+    # New weights or new generation params miss the cache.
+    for fingerprint, params in (
+        ("w2", InferenceParams()),
+        ("w1", InferenceParams(temperature=0.7)),
+    ):
+        run3, suite3 = await _rerun(db, suite, inference_params=params)
+        backend = MockInferenceBackend(default_response="wrong", fingerprint=fingerprint)
+        await EvalDriver(db=db, run=run3, suite=suite3, backend=backend).execute()
+        assert len(backend.predict_calls) == 3
+
+    # Backends without a fingerprint never read or fill the cache.
+    run4, suite4 = await _rerun(db, suite)
+    plain = MockInferenceBackend(default_response="wrong")
+    await EvalDriver(db=db, run=run4, suite=suite4, backend=plain).execute()
+    async with db.connect() as conn:
+        finished = await repository.get_eval_run(conn, run4.id)
+    assert len(plain.predict_calls) == 3
+    assert "prediction_cache" not in finished.pipeline_stats
+
+
+async def test_eval_driver_caches_only_successful_predictions(db, eval_setup):
+    run, suite, _ = eval_setup
+
+    def flaky(sample, _params):
+        if sample["prompt"] == "capital of Germany":
+            raise RuntimeError("simulated model crash")
+        return sample["gold"]
+
+    await EvalDriver(
+        db=db,
+        run=run,
+        suite=suite,
+        backend=MockInferenceBackend(response_fn=flaky, fingerprint="w1"),
+    ).execute()
+    run2, suite2 = await _rerun(db, suite)
+    retry = MockInferenceBackend(response_fn=lambda s, _p: s["gold"], fingerprint="w1")
+    await EvalDriver(db=db, run=run2, suite=suite2, backend=retry).execute()
+    assert [c["sample"]["prompt"] for c in retry.predict_calls] == ["capital of Germany"]
+
+
+async def _early_stop_suite(db, tmp_path, n: int) -> tuple:
+    """An ``n``-sample suite and a completed baseline run that answers
+    every other sample right."""
+    dataset = tmp_path / "many.jsonl"
+    dataset.write_text(
+        "".join(json.dumps({"prompt": f"q{i}", "gold": str(i)}) + "\n" for i in range(n)),
+        encoding="utf-8",
+    )
+    async with db.connect() as conn:
+        suite_id = await repository.create_eval_suite(
+            conn,
+            name="many",
+            description=None,
+            dataset_path=str(dataset),
+            metrics=[MetricConfig(kind="exact_match")],
+            inference_params=InferenceParams(batch_size=8),
+        )
+        exp_id = await repository.create_experiment(
+            conn, ExperimentSpec(model="m", dataset=["d"])
+        )
+        run_id = await repository.create_eval_run(
+            conn, suite_id=suite_id, experiment_id=exp_id, model_ref="m", triggered_by="manual"
+        )
+        await repository.claim_eval_run(conn, run_id)
+        run = await repository.get_eval_run(conn, run_id)
+        suite = await repository.get_eval_suite(conn, suite_id)
+    half = MockInferenceBackend(
+        response_fn=lambda s, _p: s["gold"] if int(s["gold"]) % 2 else "wrong"
+    )
+    await EvalDriver(db=db, run=run, suite=suite, backend=half).execute()
+    return suite, run, exp_id
+
+
+def _with_early_stop(suite, **early_stop):
+    return suite.inference_params.model_copy(
+        update={"early_stop": EarlyStopConfig(metric="exact_match", **early_stop)}
+    )
+
+
+async def test_eval_driver_stops_early_once_better_than_baseline(db, tmp_path, monkeypatch):
+    monkeypatch.setattr("trainpipe.settings.settings.eval_read_window", 64)
+    monkeypatch.setattr("trainpipe.settings.settings.eval_pipeline_depth", 1)
+    suite, baseline, exp_id = await _early_stop_suite(db, tmp_path, 2000)
+
+    run, suite2 = await _rerun(
+        db, suite, inference_params=_with_early_stop(suite, baseline=f"exp:{exp_id}")
+    )
+    backend = MockInferenceBackend(response_fn=lambda s, _p: s["gold"])
+    await EvalDriver(db=db, run=run, suite=suite2, backend=backend).execute()
+
+    async with db.connect() as conn:
+        finished = await repository.get_eval_run(conn, run.id)
+    early = finished.pipeline_stats["early_stop"]
+    assert finished.status == EvalRunStatus.COMPLETED
+    assert early["decision"] == "better"
+    assert early["baseline_run_id"] == baseline.id
+    assert early["ci_low"] > 0
+    assert early["samples_scored"] == finished.sample_count == len(backend.predict_calls)
+    assert early["samples_saved"] == 2000 - finished.sample_count > 1000
+    assert finished.aggregate["exact_match"].mean == 1.0
+
+
+async def test_eval_driver_stops_early_when_equivalent(db, tmp_path):
+    suite, baseline, _ = await _early_stop_suite(db, tmp_path, 1000)
+    run, suite2 = await _rerun(
+        db, suite, inference_params=_with_early_stop(suite, baseline=baseline.id, margin=0.2)
+    )
+    same = MockInferenceBackend(
+        response_fn=lambda s, _p: s["gold"] if int(s["gold"]) % 2 else "wrong"
+    )
+    await EvalDriver(db=db, run=run, suite=suite2, backend=same).execute()
+
+    async with db.connect() as conn:
+        finished = await repository.get_eval_run(conn, run.id)
+    early = finished.pipeline_stats["early_stop"]
+    assert early["decision"] == "equivalent"
+    assert early["mean_delta"] == 0.0
+    assert early["samples_saved"] > 0
+
+
+async def test_eval_driver_runs_every_sample_without_baseline(db, eval_setup):
+    run, suite, _ = eval_setup
+    suite = suite.model_copy(
+        update={"inference_params": _with_early_stop(suite, baseline="invoice@production")}
+    )
+    backend = MockInferenceBackend(response_fn=lambda s, _p: s["gold"])
+    await EvalDriver(db=db, run=run, suite=suite, backend=backend).execute()
+
+    async with db.connect() as conn:
+        finished = await repository.get_eval_run(conn, run.id)
+    assert finished.status == EvalRunStatus.COMPLETED
+    assert finished.sample_count == 3
+    assert finished.pipeline_stats["early_stop"] == {
+        "baseline": "invoice@production",
+        "error": "registered model not found",
+    }
+
+
+def test_weights_fingerprint_follows_content(tmp_path):
+    (tmp_path / "adapter_config.json").write_text("{}")
+    (tmp_path / "adapter_model.safetensors").write_bytes(b"a" * 64)
+    (tmp_path / "train.log").write_text("step 1")
+    (tmp_path / "checkpoint-10").mkdir()
+    before = weights_fingerprint(tmp_path)
+
+    (tmp_path / "train.log").write_text("step 2")
+    (tmp_path / "checkpoint-10" / "adapter_model.safetensors").write_bytes(b"b")
+    assert weights_fingerprint(tmp_path) == before
+
+    (tmp_path / "adapter_model.safetensors").write_bytes(b"c" * 65)
+    assert weights_fingerprint(tmp_path) != before
+
+
 # ---------------------------------------------------------------------------
 # EvalDispatcher
 # ---------------------------------------------------------------------------
@@ -452,3 +895,166 @@ async def test_dispatcher_requeues_running_on_start(db):
         recovered = await repository.get_eval_run(conn, run_id)
     assert touched >= 1
     assert recovered.status == EvalRunStatus.QUEUED
+
+
+async def test_dispatcher_shards_run_across_free_gpus(db, tmp_path):
+    dataset = tmp_path / "eval.jsonl"
+    dataset.write_text(
+        "".join(json.dumps({"prompt": f"q{i}", "gold": "y"}) + "\n" for i in range(6))
+    )
+    pool = GpuPool([GpuInfo(index=i, name="fake", memory_total_mb=1024) for i in range(2)])
+    async with db.connect() as conn:
+        sid = await repository.create_eval_suite(
+            conn,
+            name="sharded",
+            description=None,
+            dataset_path=str(dataset),
+            metrics=[MetricConfig(kind="exact_match")],
+            inference_params=InferenceParams(shards=4),
+        )
+        run_id = await repository.create_eval_run(
+            conn, suite_id=sid, experiment_id=None, model_ref="x", triggered_by="manual"
+        )
+
+    backends: list[MockInferenceBackend] = []
+
+    def factory(_run, _suite):
+        backends.append(MockInferenceBackend(default_response="y"))
+        return backends[-1]
+
+    dispatcher = EvalDispatcher(db, pool, backend_factory=factory, poll_interval_sec=0.05)
+    claimed = await dispatcher._claim_next()
+    # Only two of the four requested shards fit on the two GPUs.
+    assert claimed == (run_id, [[0], [1]])
+    async with db.connect() as conn:
+        assert (await repository.get_eval_run(conn, run_id)).gpu_ids == [0, 1]
+        await pool.sync_leases(conn)  # shard leases of a running run survive
+        cur = await conn.execute("SELECT experiment_id FROM gpu_leases ORDER BY gpu_index")
+        assert [r[0] for r in await cur.fetchall()] == [run_id, f"{run_id}#1"]
+
+    await dispatcher._run_one(*claimed)
+
+    async with db.connect() as conn:
+        finished = await repository.get_eval_run(conn, run_id)
+        cur = await conn.execute("SELECT COUNT(*) FROM gpu_leases")
+        assert (await cur.fetchone())[0] == 0
+    assert finished.status == EvalRunStatus.COMPLETED
+    assert finished.aggregate["exact_match"].mean == 1.0
+    assert [len(b.predict_calls) for b in backends] == [3, 3]
+
+
+async def _queue_run(db, dataset, name: str) -> str:
+    async with db.connect() as conn:
+        suite = await repository.get_eval_suite_by_name(conn, name)
+        sid = suite.id if suite else await repository.create_eval_suite(
+            conn,
+            name=name,
+            description=None,
+            dataset_path=str(dataset),
+            metrics=[MetricConfig(kind="exact_match")],
+            inference_params=InferenceParams(),
+        )
+        return await repository.create_eval_run(
+            conn, suite_id=sid, experiment_id=None, model_ref=name, triggered_by="manual"
+        )
+
+
+async def _leases(db) -> list[tuple[int, str]]:
+    async with db.connect() as conn:
+        cur = await conn.execute("SELECT gpu_index, experiment_id FROM gpu_leases")
+        return [tuple(r) for r in await cur.fetchall()]
+
+
+async def test_dispatcher_keeps_model_resident_between_runs(db, tmp_path, monkeypatch):
+    monkeypatch.setattr("trainpipe.settings.settings.eval_model_keepalive_sec", 60.0)
+    dataset = tmp_path / "eval.jsonl"
+    dataset.write_text(json.dumps({"prompt": "x", "gold": "y"}) + "\n")
+    pool = GpuPool([GpuInfo(index=0, name="fake", memory_total_mb=1024)])
+    built: list[MockInferenceBackend] = []
+
+    def factory(_run, suite):
+        built.append(MockInferenceBackend(default_response="y", model_key=(suite.name, None)))
+        return built[-1]
+
+    residency = ModelResidency()
+    dispatcher = EvalDispatcher(db, pool, backend_factory=factory, residency=residency)
+
+    first = await _queue_run(db, dataset, "m")
+    await dispatcher._run_one(*await dispatcher._claim_next())
+    # The model stays loaded and keeps the run's GPU under a resident holder.
+    assert built[0]._opened and not built[0]._closed
+    assert await _leases(db) == [(0, f"resident:{first}")]
+
+    # The next run on the same weights needs no lease of its own.
+    second = await _queue_run(db, dataset, "m")
+    assert await dispatcher._claim_next() == (second, [[]])
+    await dispatcher._run_one(second, [[]])
+    assert residency.loads == 1
+    assert not any(b._opened for b in built[1:])
+    async with db.connect() as conn:
+        run = await repository.get_eval_run(conn, second)
+    assert run.status == EvalRunStatus.COMPLETED
+    assert run.gpu_ids == [0]
+
+    # Other weights: the idle resident model is evicted to free the GPU.
+    third = await _queue_run(db, dataset, "other")
+    assert await dispatcher._claim_next() == (third, [[0]])
+    assert built[0]._closed
+    assert await _leases(db) == [(0, third)]
+    await dispatcher._run_one(third, [[0]])
+    await residency.close_all()
+    assert await _leases(db) == []
+
+
+async def test_training_claim_evicts_idle_resident_model(db, tmp_path, monkeypatch):
+    monkeypatch.setattr("trainpipe.settings.settings.eval_model_keepalive_sec", 60.0)
+    dataset = tmp_path / "eval.jsonl"
+    dataset.write_text(json.dumps({"prompt": "x", "gold": "y"}) + "\n")
+    pool = GpuPool([GpuInfo(index=0, name="fake", memory_total_mb=1024)])
+    backend = MockInferenceBackend(default_response="y", model_key=("m", None))
+    residency = ModelResidency()
+    dispatcher = EvalDispatcher(
+        db, pool, backend_factory=lambda _run, _suite: backend, residency=residency
+    )
+    scheduler = Scheduler(db, pool, notifications=None)
+
+    run_id = await _queue_run(db, dataset, "m")
+    await dispatcher._run_one(*await dispatcher._claim_next())
+    assert await _leases(db) == [(0, f"resident:{run_id}")]
+
+    async with db.connect() as conn:
+        exp_id = await repository.create_experiment(
+            conn, ExperimentSpec(model="m", dataset=["d"])
+        )
+    claim = await scheduler._claim_next()
+    assert claim is not None and claim[0] == exp_id
+    assert backend._closed
+    assert await _leases(db) == [(0, exp_id)]
+
+    await dispatcher.stop()
+    assert pool.reclaimers == {}
+
+
+async def test_eval_borrows_model_loaded_by_inference_service(db, tmp_path):
+    dataset = tmp_path / "eval.jsonl"
+    dataset.write_text(json.dumps({"prompt": "x", "gold": "y"}) + "\n")
+    residency = ModelResidency()
+    loaded = MockInferenceBackend(default_response="y", model_key=("m", None))
+    service = InferenceService(db, residency=residency, backend_factory=lambda _ref: loaded)
+    await service.get(ModelRef(base_model="m", adapter_path=None))
+
+    own = MockInferenceBackend(default_response="n", model_key=("m", None))
+    dispatcher = EvalDispatcher(
+        db, GpuPool([]), backend_factory=lambda _r, _s: own, gpus_per_run=0,
+        residency=residency,
+    )
+    run_id = await _queue_run(db, dataset, "m")
+    await dispatcher._run_one(*await dispatcher._claim_next())
+
+    async with db.connect() as conn:
+        run = await repository.get_eval_run(conn, run_id)
+    assert run.aggregate["exact_match"].mean == 1.0
+    assert len(loaded.predict_calls) == 1
+    assert not own._opened
+    assert residency.loads == 1 and residency.refs(("m", None)) == 0
+    await service.close_all()
@@ -0,0 +1,88 @@
+"""Bootstrap intervals and the sequential early-stopping test."""
+
+import random
+import statistics
+
+import pytest
+
+from trainpipe.api.schemas import EarlyStopConfig
+from trainpipe.evals import stats
+from trainpipe.evals.stats import RunningMean, SequentialComparison, bootstrap_ci
+
+
+def test_running_mean_matches_statistics():
+    values = [random.Random(1).random() for _ in range(500)]
+    running = RunningMean()
+    for v in values:
+        running.add(v)
+    assert running.count == 500
+    assert running.mean == pytest.approx(statistics.fmean(values))
+    assert running.std == pytest.approx(statistics.stdev(values))
+
+
+def test_bootstrap_ci_brackets_mean_and_is_seeded():
+    values = [float(i % 4 == 0) for i in range(400)]
+    low, high = bootstrap_ci(values, level=0.95, resamples=2000)
+    assert low < 0.25 < high
+    # ~1.96 standard errors each side.
+    se = statistics.stdev(values) / len(values) ** 0.5
+    assert high - low == pytest.approx(2 * 1.96 * se, rel=0.15)
+    assert bootstrap_ci(values, level=0.95, resamples=2000) == (low, high)
+    assert bootstrap_ci([0.3], level=0.95, resamples=10) == (0.3, 0.3)
+
+
+def test_bootstrap_ci_without_numpy_agrees(monkeypatch):
+    values = [random.Random(2).gauss(0.5, 0.2) for _ in range(300)]
+    with_numpy = bootstrap_ci(values, level=0.9, resamples=2000)
+    monkeypatch.setattr(stats, "_bootstrap_means_numpy", lambda *a: None)
+    pure = bootstrap_ci(values, level=0.9, resamples=2000)
+    assert pure == pytest.approx(with_numpy, abs=0.01)
+
+
+def _comparison(pairable=1000) -> SequentialComparison:
+    return SequentialComparison(
+        EarlyStopConfig(baseline="b", metric="m", min_samples=100),
+        baseline_run_id="b",
+        baseline={i: 0.5 for i in range(pairable)},
+        pairable=pairable,
+    )
+
+
+def test_sequential_looks_when_paired_count_doubles():
+    comparison = _comparison()
+    # Looks at 100, 200, 400, 800 paired samples.
+    assert comparison.planned_looks == 4
+    assert comparison.look_level == pytest.approx(1 - 0.05 / 4)
+    for i in range(99):
+        comparison.add(i, 0.5)
+    assert comparison.claim_look() is None
+    comparison.add(99, 0.5)
+    deltas = comparison.claim_look()
+    assert deltas == [0.0] * 100
+    assert comparison.claim_look() is None  # one look at a time
+    assert comparison.look(deltas) is None  # Δ = 0 with no margin never decides
+    comparison.add(5000, 1.0)  # not in the baseline: unpaired
+    assert comparison.delta.count == 100
+    for i in range(100, 450):
+        comparison.add(i, 0.5)
+    # 450 paired: the looks at 200 and 400 are due at once and count as one.
+    assert comparison.claim_look() is not None
+    assert comparison.looks == 3
+
+
+@pytest.mark.parametrize(
+    ("score", "higher_is_better", "decision"),
+    [(1.0, True, "better"), (0.0, True, "worse"), (1.0, False, "worse")],
+)
+def test_sequential_decides_direction(score, higher_is_better, decision):
+    comparison = SequentialComparison(
+        EarlyStopConfig(baseline="b", metric="m", min_samples=100),
+        baseline_run_id="b",
+        baseline={i: 0.5 for i in range(1000)},
+        pairable=1000,
+        higher_is_better=higher_is_better,
+    )
+    for i in range(100):
+        comparison.add(i, score if i % 10 else 0.5)
+    assert comparison.look(comparison.claim_look()) == decision
+    assert comparison.summary()["decision"] == decision
@@ -0,0 +1,152 @@
+"""Tests for GPU lease accounting and VRAM-aware bin-packing."""
+
+import pytest
+
+from trainpipe.api.schemas import ExperimentSpec
+from trainpipe.core import repository
+from trainpipe.core.db import MIGRATIONS, Database
+from trainpipe.scheduler.gpu_pool import GpuInfo, GpuPool
+from trainpipe.scheduler.loop import Scheduler
+from trainpipe.scheduler.resources import FakeNvmlBackend
+
+
+def _pool(*mem_mb, telemetry=None):
+    return GpuPool(
+        [GpuInfo(index=i, name="fake", memory_total_mb=m) for i, m in enumerate(mem_mb)],
+        telemetry=telemetry,
+    )
+
+
+async def test_whole_gpu_leases_take_lowest_free_devices(db):
+    pool = _pool(80000, 80000, 80000)
+    async with db.connect() as conn:
+        assert await pool.try_allocate(conn, 2, "a") == [0, 1]
+        assert await pool.try_allocate(conn, 2, "b") is None
+        assert await pool.try_allocate(conn, 1, "c") == [2]
+        await pool.release(conn, "a")
+        assert await pool.try_allocate(conn, 1, "d") == [0]
+
+
+async def test_fractional_leases_share_a_device(db):
+    pool = _pool(80000, 80000)
+    async with db.connect() as conn:
+        assert await pool.try_allocate(conn, 1, "a", vram_mb=30000) == [0]
+        # Best fit: GPU 0 has 50 GB left, GPU 1 has 80 GB — pack onto 0.
+        assert await pool.try_allocate(conn, 1, "b", vram_mb=30000) == [0]
+        # 20 GB left on GPU 0 isn't enough; spill to GPU 1.
+        assert await pool.try_allocate(conn, 1, "c", vram_mb=30000) == [1]
+        # A whole-GPU request needs a device with no leases at all.
+        assert await pool.try_allocate(conn, 1, "d") is None
+        status = await pool.status(conn)
+    assert status[0]["reserved_mb"] == 60000
+    assert [h["experiment_id"] for h in status[0]["holders"]] == ["a", "b"]
+    assert status[0]["experiment_id"] == "a"
+
+
+async def test_whole_gpu_lease_blocks_packing(db):
+    pool = _pool(80000)
+    async with db.connect() as conn:
+        assert await pool.try_allocate(conn, 1, "whole") == [0]
+        assert await pool.try_allocate(conn, 1, "small", vram_mb=1000) is None
+
+
+async def test_packing_respects_live_nvml_usage(db):
+    nvml = FakeNvmlBackend()
+    nvml.set(0, memory_used_mb=70000)  # something outside trainpipe
+    nvml.set(1, memory_used_mb=0)
+    pool = _pool(80000, 80000, telemetry=nvml)
+    async with db.connect() as conn:
+        assert await pool.try_allocate(conn, 1, "a", vram_mb=20000) == [1]
+        # Tighter fit wins once it is actually free.
+        assert await pool.try_allocate(conn, 1, "b", vram_mb=5000) == [0]
+
+
+async def test_exclusive_mode_ignores_vram(db, monkeypatch):
+    monkeypatch.setattr("trainpipe.settings.settings.gpu_allocation", "exclusive")
+    pool = _pool(80000, 80000)
+    async with db.connect() as conn:
+        assert await pool.try_allocate(conn, 1, "a", vram_mb=1000) == [0]
+        assert await pool.try_allocate(conn, 1, "b", vram_mb=1000) == [1]
+        assert await pool.try_allocate(conn, 1, "c", vram_mb=1000) is None
+
+
+async def test_sync_leases_drops_orphans(db):
+    pool = _pool(80000)
+    async with db.connect() as conn:
+        await pool.try_allocate(conn, 1, "ghost", vram_mb=1000)
+        await pool.sync_leases(conn)
+        assert (await pool.capacity(conn)).idle_count == 1
+
+
+async def test_reclaim_frees_cached_leases_only_when_that_makes_room(db):
+    pool = _pool(80000, 80000)
+    calls = []
+
+    async def evict() -> int:
+        calls.append(1)
+        await pool.release(conn, "cache:a")
+        return 1
+
+    pool.reclaimers["cache:"] = evict
+    async with db.connect() as conn:
+        await pool.try_allocate(conn, 1, "cache:a")
+        await pool.try_allocate(conn, 1, "busy")
+        # Wouldn't fit even without the cache, or already fits: leave it.
+        assert not await pool.reclaim(conn, 2, None)
+        await pool.release(conn, "busy")
+        assert not await pool.reclaim(conn, 1, None)
+        assert calls == []
+
+        assert await pool.reclaim(conn, 2, None)
+        assert calls == [1]
+        assert (await pool.capacity(conn)).idle_count == 2
+
+
+async def test_scheduler_packs_small_jobs_onto_one_gpu(db):
+    pool = _pool(80000, 80000)
+    sched = Scheduler(db, pool, notifications=None)
+    async with db.connect() as conn:
+        for i in range(3):
+            spec = ExperimentSpec(name=f"lora-{i}", model="m", dataset=["d"], vram_mb=20000)
+            await repository.create_experiment(conn, spec)
+        big = ExperimentSpec(name="full", model="m", dataset=["d"])
+        await repository.create_experiment(conn, big)
+
+    claims = [await sched._claim_next() for _ in range(4)]
+    assert [c[2] for c in claims] == [[0], [0], [0], [1]]
+
+
+async def test_scheduler_fails_job_larger_than_any_gpu(db):
+    sched = Scheduler(db, _pool(24000), notifications=None)
+    async with db.connect() as conn:
+        exp_id = await repository.create_experiment(
+            conn, ExperimentSpec(model="m", dataset=["d"], vram_mb=48000)
+        )
+    assert await sched._claim_next() is None
+    async with db.read() as conn:
+        rec = await repository.get_experiment(conn, exp_id)
+    assert rec.status.value == "failed"
+    assert "vram_mb=48000" in rec.error
+
+
+@pytest.mark.parametrize("holder", [None, "exp-1"])
+async def test_v17_migration_keeps_held_leases(tmp_path, holder):
+    path = tmp_path / "old.sqlite3"
+    old = Database(path)
+    # Build the pre-v17 schema by hand, then let init() migrate it.
+    async with old.connect() as conn:
+        await conn.execute("CREATE TABLE schema_version (version INTEGER PRIMARY KEY)")
+        for v, sql in enumerate(MIGRATIONS[:16], start=1):
+            await conn.executescript(sql)
+            await conn.execute("INSERT INTO schema_version (version) VALUES (?)", (v,))
+        await conn.execute(
+            "INSERT INTO gpu_leases (gpu_index, experiment_id, leased_at) VALUES (0, ?, ?)",
+            (holder, "2026-01-01T00:00:00"),
+        )
+        await conn.commit()
+    await old.init()
+    async with old.read() as conn:
+        cur = await conn.execute("SELECT gpu_index, experiment_id, vram_mb FROM gpu_leases")
+        rows = [tuple(r) for r in await cur.fetchall()]
+    await old.close()
+    assert rows == ([] if holder is None else [(0, holder, None)])
@@ -0,0 +1,134 @@
+"""Tests for the shared SSE log / status broadcaster."""
+
+import asyncio
+
+import pytest
+
+from trainpipe.api.log_hub import LogHub
+from trainpipe.api.schemas import ExperimentSpec
+from trainpipe.core import notify, repository
+from trainpipe.scheduler import logs
+
+
+async def _experiment(db, status, log_path):
+    async with db.connect() as conn:
+        eid = await repository.create_experiment(conn, ExperimentSpec(model="m", dataset=["d"]))
+        await conn.execute(
+            "UPDATE experiments SET status = ?, log_path = ? WHERE id = ?",
+            (status, str(log_path), eid),
+        )
+        await conn.commit()
+    return eid
+
+
+async def _set_status(db, eid, status):
+    async with db.connect() as conn:
+        await conn.execute("UPDATE experiments SET status = ? WHERE id = ?", (status, eid))
+        await conn.commit()
+
+
+async def _next(it, kind="log"):
+    while True:
+        event = await asyncio.wait_for(anext(it), timeout=2)
+        if event["event"] == kind:
+            return event
+
+
+@pytest.fixture
+def ring():
+    rings = []
+
+    def make(eid):
+        rings.append(eid)
+        logs.tails[eid] = logs.LogRing(100)
+        return logs.tails[eid]
+
+    yield make
+    for eid in rings:
+        logs.tails.pop(eid, None)
+
+
+async def test_subscribers_share_one_broadcaster(db, tmp_path, ring):
+    hub = LogHub()
+    eid = await _experiment(db, "running", tmp_path / "x.log")
+    r = ring(eid)
+    r.append("before\n")
+
+    subs = [await hub.subscribe(db, eid) for _ in range(3)]
+    its = [aiter(s) for s in subs]
+    assert hub.stats()["broadcasters"] == 1
+    assert hub.stats()["subscribers"] == 3
+    for it in its:
+        assert (await _next(it, "status"))["data"] == "running"
+        assert (await _next(it))["data"] == "before\n"
+
+    r.append("step 1\n")
+    r.append("step 2\n")
+    for it in its:
+        event = await _next(it)
+        assert event["data"] == "step 1\nstep 2\n"
+        assert event["id"] == str(r.end_offset)
+
+    await _set_status(db, eid, "completed")
+    notify.bus.publish(notify.PROCESS_EXITED)
+    for it in its:
+        assert (await _next(it, "end"))["data"] == "completed"
+    # One status read per wakeup, however many clients are attached.
+    assert hub.stats()["status_reads"] == 2
+    await asyncio.sleep(0)
+    assert hub.stats()["broadcasters"] == 0
+
+
+async def test_slow_subscriber_is_dropped(db, tmp_path, ring, monkeypatch):
+    monkeypatch.setattr("trainpipe.settings.settings.sse_subscriber_queue", 3)
+    hub = LogHub()
+    eid = await _experiment(db, "running", tmp_path / "x.log")
+    r = ring(eid)
+    fast, slow = await hub.subscribe(db, eid), await hub.subscribe(db, eid)
+    fast_it = aiter(fast)
+    await _next(fast_it, "status")
+
+    for i in range(6):
+        r.append(f"line {i}\n")
+        assert (await _next(fast_it))["data"] == f"line {i}\n"
+
+    assert slow.dropped
+    assert hub.stats() | {"status_reads": 0} == {
+        "broadcasters": 1,
+        "subscribers": 1,
+        "dropped": 1,
+        "status_reads": 0,
+    }
+    # The dropped stream just ends after what it was sent up front.
+    assert [e["event"] async for e in slow] == ["status"]
+    fast.close()
+
+
+async def test_resume_from_last_event_id(db, tmp_path, ring):
+    hub = LogHub()
+    eid = await _experiment(db, "running", tmp_path / "x.log")
+    r = ring(eid)
+    r.append("one\n")
+    cursor = r.end_offset
+    r.append("two\n")
+    r.append("three\n")
+
+    sub = await hub.subscribe(db, eid, cursor=cursor)
+    assert (await _next(aiter(sub)))["data"] == "two\nthree\n"
+    sub.close()
+
+
+async def test_finished_run_replays_file_then_ends(db, tmp_path):
+    hub = LogHub()
+    path = tmp_path / "x.log"
+    path.write_bytes(b"alpha\nbeta\n")
+    eid = await _experiment(db, "failed", path)
+
+    events = [e async for e in await hub.subscribe(db, eid)]
+    assert events == [
+        {"event": "status", "data": "failed"},
+        {"event": "log", "data": "alpha\nbeta\n", "id": "11"},
+        {"event": "end", "data": "failed"},
+    ]
+    resumed = [e async for e in await hub.subscribe(db, eid, cursor=6)]
+    assert resumed[1] == {"event": "log", "data": "beta\n", "id": "11"}
@@ -0,0 +1,104 @@
+"""Tests for the line-offset index and ranged log reads."""
+
+import pytest
+
+from trainpipe.scheduler import logs
+
+
+def _line(i):
+    return f"line {i:04d}\n".encode()  # 10 bytes
+
+
+def _write(path, start, n, *, max_bytes=200, keep=20):
+    out = logs.RotatingLog(path, max_bytes=max_bytes, compression="gzip")
+    for i in range(start, start + n):
+        segment = out.write(_line(i))
+        if segment is not None:
+            logs.finish_segment(path, segment, out.codec, keep)
+    out.close()
+    return out
+
+
+@pytest.fixture
+def log(tmp_path, monkeypatch):
+    monkeypatch.setattr(logs, "INDEX_EVERY", 7)
+    path = tmp_path / "x.log"
+    _write(path, 0, 105)  # five gzip segments of 20 lines + 5 live lines
+    return path
+
+
+def test_index_records_checkpoints_and_rolls(log):
+    index = logs.LogIndex.load(log)
+    assert index.checkpoints[:3] == [(0, 0), (7, 70), (14, 140)]
+    assert index.rolls[1] == (20, 200)
+    parts = index.parts(log)
+    assert [(p.start, p.end, p.line) for p in parts] == [
+        (0, 200, 0),
+        (200, 400, 20),
+        (400, 600, 40),
+        (600, 800, 60),
+        (800, 1000, 80),
+        (1000, 1050, 100),
+    ]
+    assert logs.log_size(log) == 1050
+
+
+def test_byte_range_spans_compressed_segments(log):
+    data, start = logs.read_range(log, 195, 215)
+    assert start == 195
+    assert data == (_line(19) + _line(20) + _line(21))[5:25]
+
+
+def test_line_range_seeks_from_checkpoint(log):
+    data, start, first = logs.read_lines(log, 33, 36, max_bytes=1000)
+    assert (start, first) == (330, 33)
+    assert data == _line(33) + _line(34) + _line(35)
+    # Capped by bytes, but never below one line.
+    data, _, _ = logs.read_lines(log, 98, None, max_bytes=25)
+    assert data == _line(98) + _line(99)
+    data, _, _ = logs.read_lines(log, 98, None, max_bytes=3)
+    assert data == _line(98)[:3]
+
+
+def test_since_offset_cursor_follows_growth(log):
+    data, start = logs.read_since(log, 1030, max_bytes=1000)
+    assert (data, start) == (_line(103) + _line(104), 1030)
+    _write(log, 105, 3)
+    data, start = logs.read_since(log, start + len(data), max_bytes=15)
+    assert (data, start) == (_line(105), 1050)
+
+
+def test_tail_reports_its_offset(log):
+    data, start = logs.read_tail(log, 8)
+    assert data == b"".join(_line(i) for i in range(97, 105))
+    assert start == 970
+
+
+def test_pruned_range_clamps_to_oldest_on_disk(tmp_path, monkeypatch):
+    monkeypatch.setattr(logs, "INDEX_EVERY", 7)
+    path = tmp_path / "x.log"
+    _write(path, 0, 105, keep=2)
+    assert logs.read_range(path, 0, 20) == (b"", 600)
+    assert logs.read_range(path, 0, 620) == (_line(60) + _line(61), 600)
+    _, start, first = logs.read_lines(path, 0, 1, max_bytes=100)
+    assert (start, first) == (600, 60)
+
+
+def test_reopen_restores_offsets_and_line_count(log):
+    out = _write(log, 105, 20)
+    assert out.offset == 1250
+    assert out.lines == 125
+    data, _, _ = logs.read_lines(log, 110, 112, max_bytes=100)
+    assert data == _line(110) + _line(111)
+
+
+def test_ring_answers_cursor_from_memory():
+    ring = logs.LogRing(4, offset=500)
+    for i in range(6):
+        ring.append(_line(i).decode())
+    # Lines 2..5 are held, starting at 520.
+    assert ring.from_offset(520, 1000) == ([_line(i).decode() for i in range(2, 6)], 560)
+    assert ring.from_offset(540, 15) == ([_line(4).decode()], 550)
+    assert ring.from_offset(560, 10) == ([], 560)
+    assert ring.from_offset(510, 100) is None  # evicted
+    assert ring.from_offset(525, 100) is None  # mid-line
@@ -0,0 +1,123 @@
+"""Tests for training-log rotation, compressed segments and the tail ring."""
+
+import sys
+
+import pytest
+
+from trainpipe.scheduler import logs
+from trainpipe.scheduler.runner import spawn_training_subprocess
+
+
+def _lines(n, start=0):
+    return [f"line {i:04d}\n".encode() for i in range(start, start + n)]
+
+
+def _roll(path, lines, *, max_bytes, compression="gzip", keep=20):
+    out = logs.RotatingLog(path, max_bytes=max_bytes, compression=compression)
+    for line in lines:
+        segment = out.write(line)
+        if segment is not None:
+            logs.finish_segment(path, segment, out.codec, keep)
+    out.close()
+
+
+def test_ring_since_and_tail():
+    ring = logs.LogRing(3)
+    for i in range(5):
+        ring.append(f"{i}\n")
+    assert len(ring) == 3
+    assert ring.first == 2
+    assert ring.since(0) == (["2\n", "3\n", "4\n"], 5)
+    assert ring.since(4) == (["4\n"], 5)
+    assert ring.since(5) == ([], 5)
+    assert ring.tail(2) == (["3\n", "4\n"], 6)
+    assert ring.end_offset == 10
+
+
+def test_rotation_splits_on_lines_and_keeps_everything(tmp_path):
+    path = tmp_path / "x.log"
+    lines = _lines(100)
+    _roll(path, lines, max_bytes=200)
+
+    segments = logs.log_segments(path)
+    assert len(segments) == 5
+    assert all(s.suffix == ".gz" for s in segments)
+    assert b"".join(logs.iter_log(path)) == b"".join(lines)
+    for segment in segments:
+        with logs.open_segment(segment) as f:
+            assert f.read().endswith(b"\n")
+
+
+def test_rotation_prunes_oldest_segments(tmp_path):
+    path = tmp_path / "x.log"
+    lines = _lines(100)
+    _roll(path, lines, max_bytes=200, keep=2)
+
+    assert [s.name for s in logs.log_segments(path)] == ["x.log.4.gz", "x.log.5.gz"]
+    assert b"".join(logs.iter_log(path)) == b"".join(lines[-40:])
+
+
+def test_reopened_log_continues_segment_numbers(tmp_path):
+    path = tmp_path / "x.log"
+    _roll(path, _lines(40), max_bytes=200)
+    _roll(path, _lines(40, start=40), max_bytes=200)
+    names = [s.name for s in logs.log_segments(path)]
+    assert names == [f"x.log.{n}.gz" for n in range(1, len(names) + 1)]
+    assert b"".join(logs.iter_log(path)) == b"".join(_lines(80))
+
+
+def test_tail_reaches_into_compressed_segments(tmp_path):
+    path = tmp_path / "x.log"
+    _roll(path, _lines(100), max_bytes=200)
+    tail = logs.tail_lines(path, 30)
+    assert tail == [line.decode() for line in _lines(30, start=70)]
+    assert logs.tail_lines(path, 1000)[0] == "line 0000\n"
+
+
+@pytest.mark.parametrize("compression", ["gzip", "zstd"])
+def test_tail_decompresses_only_the_last_frames(tmp_path, monkeypatch, compression):
+    if compression == "zstd":
+        pytest.importorskip("zstandard")
+    monkeypatch.setattr(logs, "FRAME_BYTES", 100)
+    path = tmp_path / "x.log"
+    lines = _lines(200)
+    _roll(path, lines, max_bytes=1000, compression=compression)
+    segment = logs.log_segments(path)[-1]
+    frames = logs.segment_frames(segment)
+    assert len(frames) > 5 and frames[-1].line == 100
+
+    opened = []
+    real = logs.open_segment
+    monkeypatch.setattr(logs, "open_segment", lambda s, at=0: opened.append(at) or real(s, at))
+    assert logs.tail_lines(path, 3) == [line.decode() for line in lines[-3:]]
+    assert opened == [frames[-2].at]
+    assert logs.tail_lines(path, 150) == [line.decode() for line in lines[-150:]]
+    assert b"".join(logs.iter_log(path)) == b"".join(lines)
+
+
+def test_zstd_segments(tmp_path):
+    pytest.importorskip("zstandard")
+    path = tmp_path / "x.log"
+    _roll(path, _lines(50), max_bytes=200, compression="zstd")
+    assert {s.suffix for s in logs.log_segments(path)} == {".zst"}
+    assert b"".join(logs.iter_log(path)) == b"".join(_lines(50))
+
+
+async def test_tee_rotates_and_fills_ring(tmp_path, monkeypatch):
+    monkeypatch.setattr("trainpipe.settings.settings.log_max_bytes", 1000)
+    monkeypatch.setattr("trainpipe.settings.settings.log_compression", "gzip")
+    monkeypatch.setattr("trainpipe.settings.settings.log_ring_lines", 50)
+    path = tmp_path / "exp.log"
+    script = "for i in range(500): print(f'step {i}')"
+
+    rp = await spawn_training_subprocess("exp", [sys.executable, "-c", script], {}, path)
+    assert logs.tails["exp"] is rp.ring
+    assert await rp.wait() == 0
+
+    assert "exp" not in logs.tails
+    assert rp.ring.closed
+    assert rp.ring.tail(2)[0] == ["step 498\n", "step 499\n"]
+    assert logs.log_segments(path)
+    assert all(s.suffix == ".gz" for s in logs.log_segments(path))
+    expected = "".join(f"step {i}\n" for i in range(500))
+    assert b"".join(logs.iter_log(path)).decode() == expected
@@ -0,0 +1,280 @@
+"""Tests for the process-wide MLflow gateway and its write outbox."""
+
+import asyncio
+import sys
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from trainpipe.api.schemas import ExperimentSpec, ExperimentStatus
+from trainpipe.core import repository
+from trainpipe.integrations import mlflow_gateway
+from trainpipe.integrations.mlflow_gateway import MlflowGateway, MlflowUnavailable
+from trainpipe.scheduler import loop as scheduler_loop
+from trainpipe.scheduler.gpu_pool import GpuInfo, GpuPool
+
+
+class FakeClient:
+    def __init__(self):
+        self.calls: list[tuple] = []
+        self.fail = False
+
+    def _record(self, *call):
+        self.calls.append(call)
+        if self.fail:
+            raise ConnectionError("connection refused")
+
+    def get_experiment_by_name(self, name):
+        self._record("get_experiment_by_name", name)
+        return None
+
+    def create_experiment(self, name):
+        self._record("create_experiment", name)
+        return "exp-1"
+
+    def create_run(self, experiment_id, run_name, tags):
+        self._record("create_run", experiment_id, run_name)
+        return SimpleNamespace(info=SimpleNamespace(run_id=f"run-{len(self.calls)}"))
+
+    def log_batch(self, run_id, metrics, params, tags):
+        self._record("log_batch", run_id, len(metrics), len(params), len(tags))
+
+    def set_terminated(self, run_id, status):
+        self._record("set_terminated", run_id, status)
+
+
+@pytest.fixture
+def client():
+    return FakeClient()
+
+
+@pytest.fixture
+def gateway(client):
+    return MlflowGateway(client_factory=lambda: client)
+
+
+async def _enqueue(db, run_id, **kw):
+    async with db.connect() as conn:
+        await mlflow_gateway.enqueue(conn, run_id, **kw)
+        await conn.commit()
+
+
+async def _pending(db):
+    async with db.read() as conn:
+        cur = await conn.execute("SELECT COUNT(*) FROM mlflow_outbox")
+        return (await cur.fetchone())[0]
+
+
+def test_experiment_id_is_cached(gateway, client):
+    gateway.create_run("exp", "a", {})
+    gateway.create_run("exp", "b", {})
+    assert [c[0] for c in client.calls] == [
+        "get_experiment_by_name",
+        "create_experiment",
+        "create_run",
+        "create_run",
+    ]
+    assert gateway.stats()["runs_created"] == 2
+
+
+def test_create_run_fails_fast_after_an_error(gateway, client):
+    client.fail = True
+    with pytest.raises(ConnectionError):
+        gateway.create_run("exp", "a", {})
+    client.fail = False
+    n = len(client.calls)
+    with pytest.raises(MlflowUnavailable):
+        gateway.create_run("exp", "b", {})
+    assert len(client.calls) == n
+    assert not gateway.available
+
+
+async def test_outbox_replays_in_batches_and_terminates_last(db, gateway, client, monkeypatch):
+    monkeypatch.setattr(mlflow_gateway, "_MAX_BATCH", {"metric": 2, "param": 100, "tag": 100})
+    gateway.db = db
+    await _enqueue(db, "r1", metrics={"a": 1, "b": 2, "c": 3}, tags={"t": "x"})
+    await _enqueue(db, "r1", terminate="FINISHED")
+    await _enqueue(db, "r2", params={"lr": 0.1})
+
+    assert await gateway.flush() == 6
+    assert client.calls == [
+        ("log_batch", "r1", 2, 0, 0),
+        ("log_batch", "r1", 1, 0, 1),
+        ("set_terminated", "r1", "FINISHED"),
+        ("log_batch", "r2", 0, 1, 0),
+    ]
+    assert await _pending(db) == 0
+
+
+async def test_outbox_keeps_rows_while_server_is_down(db, gateway, client, monkeypatch):
+    monkeypatch.setattr("trainpipe.settings.settings.mlflow_retry_sec", 0.0)
+    gateway.db = db
+    await _enqueue(db, "r1", metrics={"loss": 0.5}, terminate="FAILED")
+    client.fail = True
+    assert await gateway.flush() == 0
+    assert await _pending(db) == 2
+    assert gateway.stats()["flush_failures"] == 1
+
+    client.fail = False
+    assert await gateway.flush() == 2
+    assert await _pending(db) == 0
+
+
+class Rejected(Exception):
+    """What MlflowException looks like for a 4xx answer."""
+
+    def get_http_status_code(self):
+        return 404
+
+
+async def test_rejected_run_does_not_block_other_runs(db, gateway, client, monkeypatch):
+    monkeypatch.setattr("trainpipe.settings.settings.mlflow_outbox_max_attempts", 2)
+    gateway.db = db
+    await _enqueue(db, "deleted", metrics={"loss": 0.5})
+    await _enqueue(db, "r2", params={"lr": 0.1}, terminate="FINISHED")
+    real_log_batch = client.log_batch
+
+    def log_batch(run_id, metrics, params, tags):
+        if run_id == "deleted":
+            raise Rejected("run not found")
+        real_log_batch(run_id, metrics, params, tags)
+
+    client.log_batch = log_batch
+    assert await gateway.flush() == 2
+    # No breaker: launches stay tracked, and the rejected row is retried.
+    assert gateway.available
+    assert await _pending(db) == 1
+    assert await gateway.flush() == 0
+    assert await _pending(db) == 0
+    assert gateway.stats()["ops_dropped"] == 1
+
+
+async def test_batches_accepted_before_a_failure_are_not_resent(db, gateway, client, monkeypatch):
+    monkeypatch.setattr("trainpipe.settings.settings.mlflow_retry_sec", 0.0)
+    monkeypatch.setattr(mlflow_gateway, "_MAX_BATCH", {"metric": 2, "param": 100, "tag": 100})
+    gateway.db = db
+    await _enqueue(db, "r1", metrics={"a": 1, "b": 2, "c": 3}, terminate="FINISHED")
+    real_set_terminated = client.set_terminated
+
+    def set_terminated(run_id, status):
+        raise ConnectionError("connection reset")
+
+    client.set_terminated = set_terminated
+    # Both metric batches went through; only the terminate is left.
+    assert await gateway.flush() == 3
+    assert await _pending(db) == 1
+
+    client.set_terminated = real_set_terminated
+    assert await gateway.flush() == 1
+    assert [c[0] for c in client.calls] == ["log_batch", "log_batch", "set_terminated"]
+    assert await _pending(db) == 0
+
+
+async def test_outbox_drops_rows_after_max_attempts(db, gateway, client, monkeypatch):
+    monkeypatch.setattr("trainpipe.settings.settings.mlflow_retry_sec", 0.0)
+    monkeypatch.setattr("trainpipe.settings.settings.mlflow_outbox_max_attempts", 2)
+    gateway.db = db
+    await _enqueue(db, "r1", tags={"t": "x"})
+    client.fail = True
+    await gateway.flush()
+    assert await _pending(db) == 1
+    await gateway.flush()
+    assert await _pending(db) == 0
+    assert gateway.stats()["ops_dropped"] == 1
+
+
+async def test_launch_proceeds_untracked_when_mlflow_is_down(db, tmp_path, monkeypatch):
+    monkeypatch.setattr("trainpipe.settings.settings.data_dir", tmp_path)
+    down = MlflowGateway(client_factory=FakeClient)
+    down.mark_down()
+    monkeypatch.setattr(mlflow_gateway, "gateway", down)
+    reported = []
+
+    def fake_build(spec, gpus, out, *, report_to="mlflow", **_kw):
+        reported.append(report_to)
+        return [sys.executable, "-c", "pass"], {}
+
+    monkeypatch.setattr(scheduler_loop, "build_swift_command", fake_build)
+    sched = scheduler_loop.Scheduler(
+        db, GpuPool([GpuInfo(index=0, name="fake", memory_total_mb=1024)])
+    )
+    await sched.start()
+    try:
+        async with db.connect() as conn:
+            exp_id = await repository.create_experiment(
+                conn, ExperimentSpec(name="untracked", model="m", dataset=["d"])
+            )
+
+        async def until_completed():
+            while True:
+                async with db.read() as conn:
+                    rec = await repository.get_experiment(conn, exp_id)
+                if rec.status == ExperimentStatus.COMPLETED:
+                    return rec
+                await asyncio.sleep(0.02)
+
+        rec = await asyncio.wait_for(until_completed(), timeout=10)
+    finally:
+        await sched.stop()
+
+    assert reported == ["none"]
+    assert rec.mlflow_run_id is None
+    async with db.read() as conn:
+        cur = await conn.execute(
+            "SELECT COUNT(*) FROM events WHERE experiment_id = ? AND kind = 'mlflow_unavailable'",
+            (exp_id,),
+        )
+        assert (await cur.fetchone())[0] == 1
+    assert await _pending(db) == 0
+
+
+async def test_run_created_after_launch_timeout_is_terminated(db, tmp_path, monkeypatch):
+    monkeypatch.setattr("trainpipe.settings.settings.data_dir", tmp_path)
+    monkeypatch.setattr("trainpipe.settings.settings.mlflow_timeout_sec", 0.05)
+    monkeypatch.setattr(mlflow_gateway, "gateway", MlflowGateway(client_factory=FakeClient))
+
+    def slow_create(*_a):
+        time.sleep(0.3)
+        return "0", "late-run"
+
+    monkeypatch.setattr(scheduler_loop, "_create_mlflow_run", slow_create)
+    reported = []
+
+    def fake_build(spec, gpus, out, *, report_to="mlflow", **_kw):
+        reported.append(report_to)
+        return [sys.executable, "-c", "pass"], {}
+
+    monkeypatch.setattr(scheduler_loop, "build_swift_command", fake_build)
+    sched = scheduler_loop.Scheduler(
+        db, GpuPool([GpuInfo(index=0, name="fake", memory_total_mb=1024)])
+    )
+    await sched.start()
+    try:
+        async with db.connect() as conn:
+            exp_id = await repository.create_experiment(
+                conn, ExperimentSpec(name="late", model="m", dataset=["d"])
+            )
+
+        async def abandoned():
+            while True:
+                async with db.read() as conn:
+                    cur = await conn.execute(
+                        "SELECT payload_json FROM events "
+                        "WHERE experiment_id = ? AND kind = 'mlflow_run_abandoned'",
+                        (exp_id,),
+                    )
+                    row = await cur.fetchone()
+                if row is not None:
+                    return row[0]
+                await asyncio.sleep(0.02)
+
+        payload = await asyncio.wait_for(abandoned(), timeout=10)
+    finally:
+        await sched.stop()
+
+    assert reported == ["none"]
+    assert "late-run" in payload
+    async with db.read() as conn:
+        cur = await conn.execute("SELECT run_id, kind, value FROM mlflow_outbox")
+        assert [tuple(r) for r in await cur.fetchall()] == [("late-run", "terminate", "KILLED")]
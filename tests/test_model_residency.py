@@ -0,0 +1,111 @@
+"""ModelResidency: the loaded models shared by the playground and eval runs."""
+
+import asyncio
+
+from trainpipe.evals.inference import MockInferenceBackend
+from trainpipe.inference.residency import ModelResidency, ResidentBackend
+
+
+class _SlowOpen(MockInferenceBackend):
+    async def open(self) -> None:
+        await asyncio.sleep(0.02)
+        await super().open()
+
+
+class _Factory:
+    def __init__(self) -> None:
+        self.built: list[MockInferenceBackend] = []
+
+    def __call__(self) -> MockInferenceBackend:
+        self.built.append(_SlowOpen(default_response="y"))
+        return self.built[-1]
+
+
+async def test_concurrent_misses_share_one_load():
+    residency, factory = ModelResidency(), _Factory()
+    backends = await asyncio.gather(
+        *(residency.acquire(("m", None), factory) for _ in range(3))
+    )
+    assert len(factory.built) == 1
+    assert all(b is factory.built[0] for b in backends)
+    assert residency.refs(("m", None)) == 3
+    assert (residency.loads, residency.reuses) == (1, 2)
+    await residency.close_all()
+
+
+async def test_pinned_models_are_not_evicted():
+    residency, factory = ModelResidency(max_loaded=1), _Factory()
+    pinned = await residency.acquire(("a", None), factory)
+    async with residency.borrow(("b", None), factory):
+        # Over budget rather than closing a model someone is using.
+        assert residency.keys() == [("a", None), ("b", None)]
+    assert not pinned._closed
+
+    await residency.release(("a", None), pinned)
+    async with residency.borrow(("c", None), factory):
+        pass
+    # Both idle entries made room, least recently used first.
+    assert residency.keys() == [("c", None)]
+    assert pinned._closed and factory.built[1]._closed
+    await residency.close_all()
+
+
+async def test_idle_model_expires_after_keep_alive():
+    residency, factory = ModelResidency(), _Factory()
+    closed: list[str] = []
+
+    async def on_close() -> None:
+        closed.append("m")
+
+    backend = await residency.acquire(
+        ("m", None), factory, keep_idle_sec=0.05, on_close=on_close
+    )
+    await residency.release(("m", None), backend)
+    # Borrowed again within the keep-alive: the timer is cancelled.
+    backend = await residency.acquire(("m", None), factory)
+    await asyncio.sleep(0.1)
+    assert residency.keys() == [("m", None)]
+
+    await residency.release(("m", None), backend)
+    await asyncio.sleep(0.1)
+    assert residency.keys() == []
+    assert backend._closed and closed == ["m"]
+    assert len(factory.built) == 1
+
+
+async def test_invalidate_closes_pinned_model_on_last_release():
+    residency, factory = ModelResidency(), _Factory()
+    old = await residency.acquire(("m", None), factory)
+    await residency.invalidate(("m", None))
+    assert not old._closed
+
+    new = await residency.acquire(("m", None), factory)
+    assert new is not old
+    await residency.release(("m", None), old)
+    assert old._closed and not new._closed
+    await residency.close_all()
+    assert new._closed
+
+
+async def test_resident_backend_borrows_on_open_and_returns_on_close():
+    residency, factory = ModelResidency(), _Factory()
+    loaded: list[bool] = []
+
+    async def on_load() -> None:
+        loaded.append(True)
+
+    first = ResidentBackend(residency, ("m", None), factory(), on_load=on_load)
+    await first.open()
+    await first.predict({"prompt": "x"}, None)
+    await first.close()
+    assert first.loaded and loaded == [True]
+    assert residency.refs(("m", None)) == 0
+
+    second = ResidentBackend(residency, ("m", None), factory(), on_load=on_load)
+    await second.open()
+    # Served by the resident model; its own template was never opened.
+    assert not second.loaded and not factory.built[1]._opened
+    assert len(factory.built[0].predict_calls) == 1
+    await second.close()
+    assert loaded == [True]
+    await residency.close_all()
@@ -0,0 +1,87 @@
+import asyncio
+import sys
+import threading
+
+from trainpipe.api.schemas import ExperimentSpec, ExperimentStatus
+from trainpipe.core import notify, repository
+from trainpipe.scheduler import loop as scheduler_loop
+from trainpipe.scheduler.gpu_pool import GpuInfo, GpuPool
+
+
+async def test_subscription_coalesces_and_filters_topics():
+    bus = notify.NotificationBus()
+    sub = bus.subscribe(notify.EXPERIMENT_QUEUED, notify.LEASE_RELEASED)
+    bus.publish(notify.EXPERIMENT_QUEUED)
+    bus.publish(notify.EXPERIMENT_QUEUED)
+    bus.publish(notify.LEASE_RELEASED)
+    bus.publish(notify.PROCESS_EXITED)  # not subscribed
+    fired = await sub.wait(timeout=1)
+    assert fired == {notify.EXPERIMENT_QUEUED, notify.LEASE_RELEASED}
+    # Everything was consumed by the single wait above.
+    assert await sub.wait(timeout=0.01) == set()
+    assert bus.published[notify.EXPERIMENT_QUEUED] == 2
+    sub.close()
+    bus.publish(notify.EXPERIMENT_QUEUED)
+    assert await sub.wait(timeout=0.01) == set()
+
+
+async def test_publish_from_another_thread_wakes_loop():
+    bus = notify.NotificationBus()
+    sub = bus.subscribe(notify.PROCESS_EXITED)
+    threading.Thread(target=bus.publish, args=(notify.PROCESS_EXITED,)).start()
+    assert await sub.wait(timeout=2) == {notify.PROCESS_EXITED}
+    sub.close()
+
+
+async def test_repository_publishes_after_commit(db):
+    sub = notify.bus.subscribe(notify.EXPERIMENT_QUEUED, notify.EXPERIMENT_CANCELLED)
+    try:
+        spec = ExperimentSpec(name="n", model="m", dataset=["d"])
+        async with db.connect() as conn:
+            exp_id = await repository.create_experiment(conn, spec)
+        assert await sub.wait(timeout=1) == {notify.EXPERIMENT_QUEUED}
+        async with db.connect() as conn:
+            assert await repository.request_cancel(conn, exp_id) == "cancelled"
+        assert await sub.wait(timeout=1) == {notify.EXPERIMENT_CANCELLED}
+    finally:
+        sub.close()
+
+
+async def test_scheduler_launches_on_submit_without_polling(
+    db, tmp_path, monkeypatch
+):
+    monkeypatch.setattr("trainpipe.settings.settings.data_dir", tmp_path)
+    monkeypatch.setattr("trainpipe.settings.settings.scheduler_safety_poll_sec", 60.0)
+    monkeypatch.setattr(scheduler_loop, "_create_mlflow_run", lambda *a: ("0", "run"))
+    monkeypatch.setattr(
+        scheduler_loop,
+        "build_swift_command",
+        lambda spec, gpus, out, **kw: ([sys.executable, "-c", "pass"], {}),
+    )
+    sched = scheduler_loop.Scheduler(
+        db, GpuPool([GpuInfo(index=0, name="fake", memory_total_mb=1024)])
+    )
+    await sched.start()
+    try:
+        spec = ExperimentSpec(name="n", model="m", dataset=["d"])
+        async with db.connect() as conn:
+            first = await repository.create_experiment(conn, spec)
+            second = await repository.create_experiment(conn, spec)
+
+        async def status(exp_id):
+            async with db.read() as conn:
+                return (await repository.get_experiment(conn, exp_id)).status
+
+        # The second experiment only fits once the first exits and its
+        # lease is released — both must be picked up via the bus, well
+        # inside the 60s safety poll.
+        async def until_completed():
+            while await status(second) != ExperimentStatus.COMPLETED:
+                await asyncio.sleep(0.02)
+
+        await asyncio.wait_for(until_completed(), timeout=10)
+        assert await status(first) == ExperimentStatus.COMPLETED
+        assert "poll" not in sched.wakeup_counts
+        assert sched.wakeup_counts.get(notify.LEASE_RELEASED, 0) >= 1
+    finally:
+        await sched.stop()
@@ -2,6 +2,7 @@
 
 import asyncio
 import json
+from contextlib import asynccontextmanager
 
 import pytest
 from fastapi.testclient import TestClient
@@ -323,14 +324,16 @@ def test_routes_require_auth(state, client):
 
 
 def test_run_falls_back_to_failed_on_scorer_crash(state, client, monkeypatch):
-    """If the inference backend raises during ``get``, the run should
+    """If the inference backend raises during ``borrow``, the run should
     finalize as FAILED rather than 500-ing the route."""
     ds_path = _write_unlabeled(state["tmp"])
 
-    async def broken_get(ref):
+    @asynccontextmanager
+    async def broken_borrow(ref):
         raise RuntimeError("simulated load failure")
+        yield
 
-    state["service"].get = broken_get  # type: ignore[assignment]
+    state["service"].borrow = broken_borrow  # type: ignore[assignment]
 
     r = client.post(
         "/active-learning/runs",
@@ -0,0 +1,277 @@
+"""Tests for priority preemption with checkpoint-and-resume."""
+
+import asyncio
+import json
+import sys
+
+import pytest
+
+from trainpipe.api.schemas import ExperimentSpec, ExperimentStatus
+from trainpipe.core import repository
+from trainpipe.scheduler import loop as scheduler_loop
+from trainpipe.scheduler.gpu_pool import GpuInfo, GpuPool
+from trainpipe.scheduler.resources import FakeNvmlBackend
+
+# A "trainer" that writes a checkpoint and exits when asked to stop
+# (non-zero: it was interrupted, not finished).
+_TRAINER = """
+import json, pathlib, signal, sys, time
+out = pathlib.Path(sys.argv[1])
+def stop(*_):
+    ckpt = out / "v0-20260101-000000" / "checkpoint-50"
+    ckpt.mkdir(parents=True)
+    (ckpt / "trainer_state.json").write_text(json.dumps({"global_step": 50}))
+    sys.exit(143)
+signal.signal(signal.SIGTERM, stop)
+out.mkdir(parents=True, exist_ok=True)
+(out / "ready").touch()
+time.sleep(30)
+"""
+
+# One that is on its last steps: ignores the signal and finishes cleanly.
+_FINISHER = """
+import pathlib, signal, sys, time
+out = pathlib.Path(sys.argv[1])
+signal.signal(signal.SIGTERM, signal.SIG_IGN)
+out.mkdir(parents=True, exist_ok=True)
+(out / "ready").touch()
+time.sleep(0.5)
+"""
+
+
+@pytest.fixture
+def launches(tmp_path, monkeypatch):
+    monkeypatch.setattr("trainpipe.settings.settings.data_dir", tmp_path)
+    monkeypatch.setattr("trainpipe.settings.settings.preemption_enabled", True)
+    monkeypatch.setattr("trainpipe.settings.settings.preemption_grace_sec", 10.0)
+    monkeypatch.setattr("trainpipe.settings.settings.preemption_min_runtime_sec", 0.0)
+    monkeypatch.setattr(scheduler_loop, "_create_mlflow_run", lambda *a: ("0", "run"))
+    seen: list[tuple[str, object]] = []
+
+    def fake_build(spec, gpus, out, *, resume_from=None, **_kw):
+        seen.append((spec.name, resume_from))
+        if spec.name.startswith("sweep") and resume_from is None:
+            return [sys.executable, "-c", _TRAINER, str(out)], {}
+        if spec.name.startswith("finish"):
+            return [sys.executable, "-c", _FINISHER, str(out)], {}
+        return [sys.executable, "-c", "pass"], {}
+
+    monkeypatch.setattr(scheduler_loop, "build_swift_command", fake_build)
+    return seen
+
+
+async def _submit(db, name, priority, tmp_path, **fields):
+    spec = ExperimentSpec(
+        name=name,
+        model="m",
+        dataset=["d"],
+        priority=priority,
+        output_dir=str(tmp_path / name),
+        **fields,
+    )
+    async with db.connect() as conn:
+        return await repository.create_experiment(conn, spec)
+
+
+async def _until(predicate, timeout=15):
+    async def poll():
+        while not await predicate():
+            await asyncio.sleep(0.02)
+
+    await asyncio.wait_for(poll(), timeout=timeout)
+
+
+def _trainer_ready(tmp_path, *names):
+    # Preempting before the handler is installed would kill the trainer
+    # without a checkpoint.
+    async def ready():
+        return all((tmp_path / n / "ready").exists() for n in names)
+
+    return ready
+
+
+async def _status(db, exp_id):
+    async with db.read() as conn:
+        return (await repository.get_experiment(conn, exp_id)).status
+
+
+async def test_urgent_job_preempts_and_victim_resumes(db, tmp_path, launches, monkeypatch):
+    scans: list[bool] = []  # was the writer held during the checkpoint scan?
+    find = scheduler_loop.find_latest_checkpoint
+
+    def spy(out):
+        scans.append(db._writer_lock.locked())
+        return find(out)
+
+    monkeypatch.setattr(scheduler_loop, "find_latest_checkpoint", spy)
+    sched = scheduler_loop.Scheduler(
+        db, GpuPool([GpuInfo(index=0, name="fake", memory_total_mb=1024)])
+    )
+    await sched.start()
+    try:
+        low = await _submit(db, "sweep-0", 0, tmp_path)
+
+        await _until(_trainer_ready(tmp_path, "sweep-0"))
+        urgent = await _submit(db, "urgent", 10, tmp_path)
+
+        async def both_done():
+            return await _status(db, low) == ExperimentStatus.COMPLETED
+
+        await _until(both_done)
+        assert await _status(db, urgent) == ExperimentStatus.COMPLETED
+    finally:
+        await sched.stop()
+
+    ckpt = tmp_path / "sweep-0" / "v0-20260101-000000" / "checkpoint-50"
+    assert launches == [("sweep-0", None), ("urgent", None), ("sweep-0", ckpt)]
+    async with db.read() as conn:
+        rec = await repository.get_experiment(conn, low)
+        cur = await conn.execute(
+            "SELECT payload_json FROM events WHERE experiment_id = ? AND kind = 'preempted'",
+            (low,),
+        )
+        payload = json.loads((await cur.fetchone())[0])
+    assert rec.preemptions == 1
+    assert rec.resumed_from_step == 50
+    assert rec.preemption_lost_gpu_seconds is not None
+    assert payload["by"] == urgent
+    assert payload["step"] == 50
+    assert sched.preemption_stats["preemptions"] == 1
+    assert scans == [False]
+
+
+async def test_only_lowest_priority_victim_is_evicted(db, tmp_path, launches):
+    gpus = [GpuInfo(index=i, name="fake", memory_total_mb=1024) for i in range(2)]
+    sched = scheduler_loop.Scheduler(db, GpuPool(gpus))
+    await sched.start()
+    try:
+        keep = await _submit(db, "sweep-keep", 5, tmp_path)
+        evict = await _submit(db, "sweep-evict", 1, tmp_path)
+
+        await _until(_trainer_ready(tmp_path, "sweep-keep", "sweep-evict"))
+        urgent = await _submit(db, "urgent", 10, tmp_path)
+
+        async def urgent_done():
+            return await _status(db, urgent) == ExperimentStatus.COMPLETED
+
+        await _until(urgent_done)
+        assert keep in sched._running
+        async with db.read() as conn:
+            assert (await repository.get_experiment(conn, keep)).preemptions == 0
+            assert (await repository.get_experiment(conn, evict)).preemptions == 1
+    finally:
+        await sched.stop()
+
+
+async def test_equal_priority_never_preempts(db, tmp_path, launches):
+    sched = scheduler_loop.Scheduler(
+        db, GpuPool([GpuInfo(index=0, name="fake", memory_total_mb=1024)])
+    )
+    await sched.start()
+    try:
+        first = await _submit(db, "sweep-a", 3, tmp_path)
+
+        await _until(_trainer_ready(tmp_path, "sweep-a"))
+        second = await _submit(db, "sweep-b", 3, tmp_path)
+        await asyncio.sleep(0.3)
+        assert first in sched._running
+        assert await _status(db, second) == ExperimentStatus.QUEUED
+        assert sched.preemption_stats["preemptions"] == 0
+    finally:
+        await sched.stop()
+
+
+async def test_victim_that_finishes_in_grace_is_completed(db, tmp_path, launches):
+    sched = scheduler_loop.Scheduler(
+        db, GpuPool([GpuInfo(index=0, name="fake", memory_total_mb=1024)])
+    )
+    await sched.start()
+    try:
+        low = await _submit(db, "finisher", 0, tmp_path)
+        await _until(_trainer_ready(tmp_path, "finisher"))
+        urgent = await _submit(db, "urgent", 10, tmp_path)
+
+        async def urgent_done():
+            return await _status(db, urgent) == ExperimentStatus.COMPLETED
+
+        await _until(urgent_done)
+    finally:
+        await sched.stop()
+
+    assert launches == [("finisher", None), ("urgent", None)]
+    async with db.read() as conn:
+        rec = await repository.get_experiment(conn, low)
+    assert rec.status == ExperimentStatus.COMPLETED
+    assert rec.preemptions == 0
+
+
+async def test_cancelled_urgent_job_preempts_nobody(db, tmp_path, launches):
+    pool = GpuPool([GpuInfo(index=0, name="fake", memory_total_mb=1024)])
+    sched = scheduler_loop.Scheduler(db, pool, notifications=None)
+    running = await _submit(db, "sweep-low", 0, tmp_path)
+    assert await sched._claim_next() is not None
+    urgent = await _submit(db, "urgent", 10, tmp_path)
+    async with db.connect() as conn:
+        await sched._sync_queue(conn)
+        # Cancelled after the index saw it, before the next resync.
+        assert await repository.request_cancel(conn, urgent) == "cancelled"
+
+    class _Victim:
+        preempted = False
+
+        async def preempt(self, *_a):
+            self.preempted = True
+
+    victim = sched._running[running] = _Victim()
+    await sched._maybe_preempt()
+    assert not victim.preempted
+    assert sched._evicting == {}
+    assert urgent not in sched._queue.ids()
+
+
+async def test_requeue_of_a_row_no_longer_running_records_nothing(db, tmp_path, launches):
+    sched = scheduler_loop.Scheduler(
+        db, GpuPool([GpuInfo(index=0, name="fake", memory_total_mb=1024)])
+    )
+    exp_id = await _submit(db, "sweep-gone", 0, tmp_path)  # still 'queued'
+
+    assert await sched._requeue_preempted(exp_id, None, 143, None) is None
+    async with db.read() as conn:
+        cur = await conn.execute("SELECT COUNT(*) FROM events WHERE kind = 'preempted'")
+        assert (await cur.fetchone())[0] == 0
+    assert sched.preemption_stats["preemptions"] == 0
+
+
+async def test_victim_planning_samples_gpus_once(db, tmp_path, launches):
+    class Counting(FakeNvmlBackend):
+        calls = 0
+
+        def sample(self, indices):
+            Counting.calls += 1
+            return super().sample(indices)
+
+    class Victim:
+        async def preempt(self, grace, sig):
+            pass
+
+    gpus = [GpuInfo(index=i, name="fake", memory_total_mb=1024) for i in range(3)]
+    pool = GpuPool(gpus, telemetry=Counting())
+    sched = scheduler_loop.Scheduler(db, pool)
+    async with db.connect() as conn:
+        for i, holder in enumerate(["keep", "low-a", "low-b"]):
+            await conn.execute(
+                "INSERT INTO gpu_leases (gpu_index, experiment_id, vram_mb, leased_at) "
+                "VALUES (?, ?, NULL, '2026-01-01')",
+                (i, holder),
+            )
+        await conn.commit()
+    for holder, priority in [("keep", 5), ("low-a", 1), ("low-b", 2)]:
+        sched._placements[holder] = scheduler_loop._Placement(priority, 0.0)
+        sched._running[holder] = Victim()
+    await _submit(db, "urgent", 10, tmp_path, gpu_count=2)
+    async with db.connect() as conn:
+        await sched._sync_queue(conn)
+
+    await sched._maybe_preempt()
+    assert set(sched._evicting) == {"low-a", "low-b"}
+    assert Counting.calls == 1
@@ -0,0 +1,117 @@
+from trainpipe.api.schemas import ExperimentSpec, ExperimentStatus
+from trainpipe.core import notify, repository
+from trainpipe.scheduler.gpu_pool import GpuInfo, GpuPool
+from trainpipe.scheduler.loop import Scheduler
+from trainpipe.scheduler.queue_index import QueuedJob, QueueIndex
+
+
+def _job(exp_id, *, priority=0, queued_at="2026-01-01T00:00:00", gpus=1):
+    spec = ExperimentSpec(name=exp_id, model="m", dataset=["d"], gpu_count=gpus)
+    return QueuedJob(exp_id, spec, priority, queued_at)
+
+
+def test_best_orders_by_priority_then_age():
+    q = QueueIndex()
+    q.add(_job("old", queued_at="2026-01-01T00:00:00"))
+    q.add(_job("new", queued_at="2026-01-02T00:00:00"))
+    q.add(_job("urgent", priority=5, queued_at="2026-01-03T00:00:00"))
+    assert q.best(lambda n, vram: n <= 8).experiment_id == "urgent"
+    q.discard("urgent")
+    assert q.best(lambda n, vram: n <= 8).experiment_id == "old"
+    assert len(q) == 2
+
+
+def test_best_skips_jobs_that_do_not_fit():
+    q = QueueIndex()
+    q.add(_job("big", priority=9, gpus=4))
+    q.add(_job("small", gpus=1))
+    assert q.best(lambda n, vram: n <= 2).experiment_id == "small"
+    assert q.best(lambda n, vram: n <= 4).experiment_id == "big"
+    assert q.best(lambda n, vram: False) is None
+
+
+def test_readd_supersedes_and_compact_drops_dead_entries():
+    q = QueueIndex()
+    q.add(_job("a", queued_at="2026-01-01T00:00:00"))
+    q.add(_job("b", queued_at="2026-01-02T00:00:00"))
+    # Requeue "a" with a newer queued_at: it now sorts after "b".
+    q.add(_job("a", queued_at="2026-01-03T00:00:00"))
+    assert q.best(lambda n, vram: n <= 1).experiment_id == "b"
+    q.discard("b")
+    q.compact()
+    assert sum(len(h) for h in q._buckets.values()) == 1
+    assert q.best(lambda n, vram: n <= 1).experiment_id == "a"
+
+
+async def _scheduler(db, gpus):
+    pool = GpuPool([GpuInfo(index=i, name="fake", memory_total_mb=1024) for i in range(gpus)])
+    async with db.connect() as conn:
+        await pool.sync_leases(conn)
+    return Scheduler(db, pool, notifications=None)
+
+
+async def _submit(db, name, *, priority=0, gpus=1):
+    spec = ExperimentSpec(name=name, model="m", dataset=["d"], gpu_count=gpus, priority=priority)
+    async with db.connect() as conn:
+        return await repository.create_experiment(conn, spec)
+
+
+async def test_claim_parses_each_spec_once(db, monkeypatch):
+    sched = await _scheduler(db, 2)
+    ids = [await _submit(db, f"e{i}") for i in range(5)]
+
+    parsed: list[str] = []
+    real = ExperimentSpec.model_validate_json.__func__
+
+    def counting(cls, data, *a, **kw):
+        parsed.append(data)
+        return real(cls, data, *a, **kw)
+
+    monkeypatch.setattr(ExperimentSpec, "model_validate_json", classmethod(counting))
+    first = await sched._claim_next()
+    second = await sched._claim_next()
+    assert await sched._claim_next() is None  # pool exhausted
+    assert [first[0], second[0]] == ids[:2]
+    assert len(parsed) == 5
+
+
+async def test_claim_picks_up_new_submits_and_skips_cancelled(db):
+    sched = await _scheduler(db, 1)
+    low = await _submit(db, "low")
+    assert await sched._claim_next() is not None  # takes "low"
+    async with db.connect() as conn:
+        await sched.gpu_pool.release(conn, low)
+
+    doomed = await _submit(db, "doomed", priority=9)
+    kept = await _submit(db, "kept", priority=1)
+    async with db.connect() as conn:
+        assert await repository.request_cancel(conn, doomed) == "cancelled"
+    claim = await sched._claim_next()
+    assert claim[0] == kept
+
+
+async def test_oversized_experiment_fails_without_blocking_queue(db):
+    sched = await _scheduler(db, 2)
+    huge = await _submit(db, "huge", priority=9, gpus=4)
+    ok = await _submit(db, "ok")
+    claim = await sched._claim_next()
+    assert claim[0] == ok
+    async with db.read() as conn:
+        rec = await repository.get_experiment(conn, huge)
+    assert rec.status == ExperimentStatus.FAILED
+    assert "exceeds pool size" in rec.error
+
+
+async def test_cancel_wakeup_drops_job_from_index(db):
+    sched = await _scheduler(db, 1)
+    doomed = await _submit(db, "doomed")
+    async with db.connect() as conn:
+        await sched._sync_queue(conn)
+        assert doomed in sched._queue.ids()
+        assert await repository.request_cancel(conn, doomed) == "cancelled"
+        await sched._sync_queue(conn)
+        assert doomed in sched._queue.ids()  # the rowid scan can't see it
+
+        sched._note_wakeup({notify.EXPERIMENT_CANCELLED})
+        await sched._sync_queue(conn)
+    assert doomed not in sched._queue.ids()
@@ -0,0 +1,159 @@
+"""Tests for the NVML resource sampler (scheduler/resources.py)."""
+
+import asyncio
+import sys
+
+import pytest
+
+from trainpipe.api.schemas import ExperimentSpec, ExperimentStatus, StudyConfig
+from trainpipe.core import repository
+from trainpipe.scheduler import loop as scheduler_loop
+from trainpipe.scheduler.gpu_pool import GpuInfo, GpuPool
+from trainpipe.scheduler.resources import (
+    FakeNvmlBackend,
+    GpuSample,
+    LeaseUsage,
+    ResourceSampler,
+)
+
+
+def test_lease_usage_tracks_peak_and_integrates_power():
+    usage = LeaseUsage("e", [0, 1])
+    usage.add([GpuSample(0, 1000, 50, 100), GpuSample(1, 3000, 100, 200)], at=0.0)
+    usage.add([GpuSample(0, 2000, 50, 100), GpuSample(1, 2500, 100, 100)], at=3600.0)
+    assert usage.peak_vram_mb == 3000
+    # Trapezoid over one hour: (300 W + 200 W) / 2.
+    assert usage.energy_wh == pytest.approx(250.0)
+    assert usage.mean_utilization_pct == pytest.approx(75.0)
+
+
+def test_lease_usage_ignores_empty_readings():
+    usage = LeaseUsage("e", [0])
+    usage.add([], at=1.0)
+    assert usage.samples == 0
+    assert usage.peak_vram_mb is None
+    assert usage.mean_utilization_pct is None
+
+
+async def _running_experiment(db, study_id=None):
+    spec = ExperimentSpec(model="m", dataset=["/x"])
+    async with db.connect() as conn:
+        exp_id = await repository.create_experiment(conn, spec, study_id=study_id)
+        await conn.execute(
+            "UPDATE experiments SET status = 'running' WHERE id = ?", (exp_id,)
+        )
+        await conn.commit()
+    return exp_id
+
+
+async def test_flush_writes_heartbeat_and_rollups(db):
+    exp_id = await _running_experiment(db)
+    backend = FakeNvmlBackend()
+    backend.set(0, memory_used_mb=12000, utilization_pct=90, power_w=250)
+    sampler = ResourceSampler(db, backend)
+    sampler.watch(exp_id, [0])
+    await sampler.sample_once()
+    await sampler.sample_once()
+    await sampler.flush()
+    usage = await sampler.unwatch(exp_id)
+
+    async with db.read() as conn:
+        rec = await repository.get_experiment(conn, exp_id)
+    assert rec.last_heartbeat_at is not None
+    assert rec.peak_vram_mb == 12000
+    assert rec.energy_wh == pytest.approx(usage.energy_wh)
+    assert sampler.latest[0].utilization_pct == 90
+    assert backend.calls == 2
+
+
+async def test_sampler_without_nvml_still_heartbeats(db):
+    exp_id = await _running_experiment(db)
+    sampler = ResourceSampler(db, None)
+    sampler.watch(exp_id, [0])
+    await sampler.sample_once()
+    await sampler.flush()
+    await sampler.unwatch(exp_id)
+    async with db.read() as conn:
+        rec = await repository.get_experiment(conn, exp_id)
+    assert rec.last_heartbeat_at is not None
+    assert rec.peak_vram_mb is None
+
+
+async def test_scheduler_records_usage_and_feeds_study_cost(db, tmp_path, monkeypatch):
+    monkeypatch.setattr("trainpipe.settings.settings.data_dir", tmp_path)
+    monkeypatch.setattr(scheduler_loop, "_create_mlflow_run", lambda *a: ("0", "run"))
+    monkeypatch.setattr(
+        scheduler_loop,
+        "build_swift_command",
+        lambda spec, gpus, out, **kw: ([sys.executable, "-c", "import time; time.sleep(0.4)"], {}),
+    )
+    backend = FakeNvmlBackend()
+    backend.set(0, memory_used_mb=20000, utilization_pct=80, power_w=300)
+    sampler = ResourceSampler(
+        db, backend, sample_interval_sec=0.02, heartbeat_interval_sec=0.05
+    )
+    sched = scheduler_loop.Scheduler(
+        db,
+        GpuPool([GpuInfo(index=0, name="fake", memory_total_mb=40960)]),
+        sampler=sampler,
+    )
+    async with db.connect() as conn:
+        study_id = await repository.create_study(
+            conn,
+            StudyConfig(
+                name="s",
+                base_spec=ExperimentSpec(model="m", dataset=["/x"]),
+                search_space={},
+                target_metric="loss",
+                direction="minimize",
+            ),
+            "sqlite:///x",
+        )
+    await sched.start()
+    try:
+        async with db.connect() as conn:
+            exp_id = await repository.create_experiment(
+                conn, ExperimentSpec(model="m", dataset=["/x"]), study_id=study_id
+            )
+
+        async def until_done():
+            while True:
+                async with db.read() as conn:
+                    rec = await repository.get_experiment(conn, exp_id)
+                if rec.status == ExperimentStatus.COMPLETED:
+                    return rec
+                await asyncio.sleep(0.02)
+
+        rec = await asyncio.wait_for(until_done(), timeout=10)
+    finally:
+        await sched.stop()
+
+    assert backend.closed
+    assert rec.peak_vram_mb == 20000
+    assert rec.energy_wh > 0
+    assert rec.last_heartbeat_at > rec.started_at
+    async with db.read() as conn:
+        summary = await repository.study_cost_summary(conn, study_id)
+    assert summary["peak_vram_mb"] == 20000
+    assert summary["total_energy_wh"] == pytest.approx(rec.energy_wh)
+
+
+async def test_shared_gpu_readings_are_split_by_reservation(db):
+    backend = FakeNvmlBackend()
+    backend.set(0, memory_used_mb=12000, utilization_pct=80, power_w=300)
+    backend.set(1, memory_used_mb=5000, utilization_pct=50, power_w=100)
+    sampler = ResourceSampler(db, backend)
+    sampler.watch("small", [0], vram_mb=4000)
+    sampler.watch("large", [0], vram_mb=8000)
+    sampler.watch("alone", [1], vram_mb=4000)
+    await sampler.sample_once()
+    await asyncio.sleep(0.01)
+    await sampler.sample_once()
+
+    small, large, alone = (sampler.usage(e) for e in ("small", "large", "alone"))
+    assert (small.peak_vram_mb, large.peak_vram_mb) == (4000, 8000)
+    assert alone.peak_vram_mb == 5000
+    # The card's energy is counted once across its tenants, not per tenant.
+    assert small.energy_wh > 0
+    assert small.energy_wh / large.energy_wh == pytest.approx(0.5)
+    assert small.mean_utilization_pct == large.mean_utilization_pct == 80
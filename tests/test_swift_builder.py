@@ -108,3 +108,12 @@ def test_raises_on_empty_gpu_ids():
     except ValueError:
         return
     raise AssertionError("expected ValueError")
+
+
+def test_resume_from_checkpoint_flag():
+    spec = ExperimentSpec(model="m", dataset=["d"])
+    argv, _ = build_swift_command(spec, gpu_ids=[0], output_dir=Path("/o"))
+    assert "--resume_from_checkpoint" not in argv
+    ckpt = Path("/o/v0-20260101-000000/checkpoint-500")
+    argv, _ = build_swift_command(spec, gpu_ids=[0], output_dir=Path("/o"), resume_from=ckpt)
+    assert _argv_pair(argv, "--resume_from_checkpoint") == str(ckpt)
@@ -0,0 +1,88 @@
+"""Tests for topology-aware multi-GPU placement."""
+
+from itertools import combinations
+
+import pytest
+
+from trainpipe.api.schemas import ExperimentSpec
+from trainpipe.core import repository
+from trainpipe.scheduler.gpu_pool import GpuInfo, GpuPool
+from trainpipe.scheduler.loop import Scheduler
+from trainpipe.scheduler.topology import GpuTopology, detect_topology
+
+
+def _pool(n, topology, mem_mb=80000):
+    return GpuPool(
+        [GpuInfo(index=i, name="fake", memory_total_mb=mem_mb) for i in range(n)],
+        topology=topology,
+    )
+
+
+# Two NVLink pairs that don't follow index order: {0, 2} and {1, 3}.
+CROSSED = GpuTopology.from_links({(0, 2): "nvlink", (1, 3): "nvlink"}, default="node")
+
+
+def test_score_and_cost():
+    assert CROSSED.set_cost([0, 2]) == 1
+    assert CROSSED.set_cost([0, 1, 2]) == 1 + 6 + 6
+    assert CROSSED.score([0, 2]) == 1.0
+    assert CROSSED.score([0, 1]) == round(1 / 6, 4)
+    assert CROSSED.score([3]) is None
+    assert CROSSED.as_dict() == {"0-2": "nvlink", "1-3": "nvlink"}
+    with pytest.raises(ValueError, match="bogus"):
+        GpuTopology.from_links({(0, 1): "bogus"})
+
+
+def test_detect_topology_needs_two_gpus():
+    assert detect_topology([0]) is None
+
+
+async def test_two_gpu_job_lands_on_nvlink_pair(db):
+    pool = _pool(4, CROSSED)
+    async with db.connect() as conn:
+        assert await pool.try_allocate(conn, 2, "a") == [0, 2]
+        assert await pool.try_allocate(conn, 2, "b") == [1, 3]
+
+
+async def test_single_gpu_job_keeps_nvlink_pair_intact(db):
+    # 0-1 is the only NVLink pair; GPU 2 sits on the other socket.
+    topo = GpuTopology.from_links({(0, 1): "nvlink"})
+    pool = _pool(3, topo)
+    async with db.connect() as conn:
+        assert await pool.try_allocate(conn, 1, "small") == [2]
+        assert await pool.try_allocate(conn, 2, "pair") == [0, 1]
+
+
+async def test_fractional_placement_packs_within_nvlink_pairs(db):
+    pool = _pool(4, CROSSED)
+    async with db.connect() as conn:
+        # Both NVLink pairs have room; the half-full one is the tighter fit.
+        assert await pool.try_allocate(conn, 1, "x", vram_mb=40000) == [0]
+        assert await pool.try_allocate(conn, 2, "y", vram_mb=30000) == [0, 2]
+
+
+async def test_greedy_fallback_for_large_pools(db):
+    # C(16, 8) is above the exhaustive-search cap.
+    island = range(8, 16)
+    topo = GpuTopology.from_links({p: "nvlink" for p in combinations(island, 2)})
+    pool = _pool(16, topo)
+    async with db.connect() as conn:
+        assert await pool.try_allocate(conn, 8, "big") == list(island)
+
+
+async def test_scheduler_records_placement_score(db):
+    sched = Scheduler(db, _pool(4, CROSSED), notifications=None)
+    async with db.connect() as conn:
+        exp_id = await repository.create_experiment(
+            conn, ExperimentSpec(name="ds", model="m", dataset=["d"], gpu_count=2)
+        )
+        single = await repository.create_experiment(
+            conn, ExperimentSpec(name="one", model="m", dataset=["d"])
+        )
+    claims = [await sched._claim_next() for _ in range(2)]
+    assert [c[2] for c in claims] == [[0, 2], [1]]
+    async with db.read() as conn:
+        rec = await repository.get_experiment(conn, exp_id)
+        one = await repository.get_experiment(conn, single)
+    assert rec.placement_score == 1.0
+    assert one.placement_score is None
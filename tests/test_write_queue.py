@@ -0,0 +1,134 @@
+import asyncio
+import sys
+
+import pytest
+
+from trainpipe.api.schemas import ExperimentSpec, ExperimentStatus
+from trainpipe.core import repository
+from trainpipe.core.write_queue import WriteQueue
+from trainpipe.integrations import mlflow_gateway
+from trainpipe.integrations.mlflow_gateway import MlflowGateway
+from trainpipe.scheduler import loop as scheduler_loop
+from trainpipe.scheduler.gpu_pool import GpuInfo, GpuPool
+
+
+async def _make_table(db):
+    async with db.connect() as conn:
+        await conn.execute("CREATE TABLE wq (k INTEGER PRIMARY KEY, v TEXT)")
+        await conn.commit()
+
+
+def _insert(k, v="x"):
+    async def op(conn):
+        await conn.execute("INSERT INTO wq (k, v) VALUES (?, ?)", (k, v))
+        return k
+
+    return op
+
+
+async def _count(db):
+    async with db.read() as conn:
+        cur = await conn.execute("SELECT COUNT(*) FROM wq")
+        return (await cur.fetchone())[0]
+
+
+async def test_enqueued_ops_share_one_commit(db):
+    await _make_table(db)
+    queue = WriteQueue(db, delay_sec=0.05)
+    futures = [await queue.enqueue(_insert(i)) for i in range(20)]
+    await queue.flush()
+    assert [f.result() for f in futures] == list(range(20))
+    assert await _count(db) == 20
+    stats = queue.stats()
+    assert stats["batches"] == 1
+    assert stats["batch_size_max"] == 20
+    await queue.close()
+
+
+async def test_failing_op_rolls_back_alone(db):
+    await _make_table(db)
+    queue = WriteQueue(db, delay_sec=0.05)
+    ok1 = await queue.enqueue(_insert(1))
+    dup = await queue.enqueue(_insert(1, "dup"))
+    ok2 = await queue.enqueue(_insert(2))
+    await queue.flush()
+    assert ok1.result() == 1 and ok2.result() == 2
+    with pytest.raises(Exception, match="UNIQUE"):
+        dup.result()
+    assert await _count(db) == 2
+    assert queue.stats()["failed_ops"] == 1
+    await queue.close()
+
+
+async def test_execute_commits_without_waiting_for_window(db):
+    await _make_table(db)
+    queue = WriteQueue(db, delay_sec=30.0)
+    result = await asyncio.wait_for(queue.execute(_insert(7)), timeout=5)
+    assert result == 7
+    assert await _count(db) == 1
+    assert queue.stats()["durable_ops"] == 1
+    await queue.close()
+
+
+async def test_max_batch_splits_batches(db):
+    await _make_table(db)
+    queue = WriteQueue(db, delay_sec=0.05, max_batch=4)
+    futures = [await queue.enqueue(_insert(i)) for i in range(10)]
+    await queue.flush()
+    assert all(f.done() and f.exception() is None for f in futures)
+    stats = queue.stats()
+    assert stats["batch_size_max"] <= 4
+    assert stats["batches"] >= 3
+    await queue.close()
+
+
+async def test_close_drains_pending_ops(db):
+    await _make_table(db)
+    queue = WriteQueue(db, delay_sec=30.0)
+    for i in range(5):
+        await queue.enqueue(_insert(i))
+    await queue.close()
+    assert await _count(db) == 5
+
+
+async def test_database_exposes_shared_queue(db):
+    await _make_table(db)
+    await db.writes.execute(_insert(1))
+    assert await _count(db) == 1
+    assert db.writes.stats()["ops"] == 1
+
+
+async def test_scheduler_status_transitions_are_durable_ops(db, tmp_path, monkeypatch):
+    monkeypatch.setattr("trainpipe.settings.settings.data_dir", tmp_path)
+    down = MlflowGateway(client_factory=lambda: None)
+    down.mark_down()
+    monkeypatch.setattr(mlflow_gateway, "gateway", down)
+    monkeypatch.setattr(
+        scheduler_loop,
+        "build_swift_command",
+        lambda *_a, **_kw: ([sys.executable, "-c", "pass"], {}),
+    )
+    sched = scheduler_loop.Scheduler(
+        db, GpuPool([GpuInfo(index=0, name="fake", memory_total_mb=1024)])
+    )
+    await sched.start()
+    try:
+        async with db.connect() as conn:
+            exp_id = await repository.create_experiment(
+                conn, ExperimentSpec(name="wq", model="m", dataset=["d"])
+            )
+        for _ in range(500):
+            async with db.read() as conn:
+                rec = await repository.get_experiment(conn, exp_id)
+            if rec.status == ExperimentStatus.COMPLETED:
+                break
+            await asyncio.sleep(0.02)
+    finally:
+        await sched.stop()
+
+    assert rec.status == ExperimentStatus.COMPLETED
+    # 'started' and 'completed', each with its events and lease release.
+    assert db.writes.stats()["durable_ops"] == 2
+    async with db.read() as conn:
+        cur = await conn.execute("SELECT COUNT(*) FROM gpu_leases")
+        assert (await cur.fetchone())[0] == 0
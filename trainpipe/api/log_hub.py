@@ -0,0 +1,338 @@
+"""Shared SSE fan-out for experiment log / status streams.
+
+Each ``/experiments/{id}/logs/stream`` client used to run its own loop:
+re-read the experiment twice a second and poll the log file. The hub runs
+one :class:`_Broadcaster` per watched experiment instead. It
+
+* follows the log from the run's in-memory ring (:mod:`..scheduler.logs`),
+  woken on every append, while the subprocess lives in this process, and
+  otherwise polls the file every 0.5 s via the offset index;
+* re-reads the experiment only when the notification bus reports a start,
+  exit or cancel, plus a ``sse_status_poll_sec`` safety poll for writes
+  from other processes;
+
+and fans each event out to any number of subscribers through bounded
+queues. It keeps a short in-memory backlog so a new subscriber starts
+with recent output, not an empty screen.
+
+``log`` events carry the log byte cursor as their SSE id. A subscriber
+that falls ``sse_subscriber_queue`` events behind is dropped: its response
+just ends, and the browser's EventSource reconnects with ``Last-Event-ID``
+and resumes from that cursor.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections import deque
+from collections.abc import AsyncIterator
+from pathlib import Path
+from typing import Any
+
+from ..core import notify, repository
+from ..core.db import Database
+from ..scheduler import logs
+from ..settings import settings
+from .schemas import ExperimentStatus
+
+logger = logging.getLogger(__name__)
+
+_TERMINAL = {
+    ExperimentStatus.COMPLETED,
+    ExperimentStatus.FAILED,
+    ExperimentStatus.CANCELLED,
+}
+_LOG_APPENDED = "log.appended"  # private wake topic, fired by ring listeners
+_FILE_POLL_SEC = 0.5
+_BACKLOG_BYTES = 256 * 1024
+_CHUNK_BYTES = 256 * 1024
+_GAP_BYTES = 1024 * 1024  # most a resuming subscriber gets back from disk
+_DROPPED = None  # queue sentinel
+
+
+class Subscriber:
+    def __init__(self, broadcaster: _Broadcaster, prefix: list[dict[str, Any]]) -> None:
+        self._broadcaster = broadcaster
+        self._prefix = prefix
+        self.queue: asyncio.Queue[dict[str, Any] | None] = asyncio.Queue(
+            maxsize=settings.sse_subscriber_queue
+        )
+        self.dropped = False
+
+    async def __aiter__(self) -> AsyncIterator[dict[str, Any]]:
+        prefix, self._prefix = self._prefix, []
+        for event in prefix:
+            yield event
+            if event["event"] == "end":
+                return
+        while True:
+            event = await self.queue.get()
+            if event is _DROPPED:
+                return
+            yield event
+            if event["event"] == "end":
+                return
+
+    def close(self) -> None:
+        self._broadcaster.remove(self)
+
+
+class _Broadcaster:
+    def __init__(self, hub: LogHub, db: Database, experiment_id: str) -> None:
+        self.hub = hub
+        self.db = db
+        self.experiment_id = experiment_id
+        self.subscribers: list[Subscriber] = []
+        self._joining = 0
+        self.ready = asyncio.Event()
+        self.offset = 0
+        # (start, end, text) of recent log events, for late joiners.
+        self.backlog: deque[tuple[int, int, str]] = deque()
+        self._backlog_bytes = 0
+        self._ring: logs.LogRing | None = None
+        self._path: Path | None = None
+        self._status: ExperimentStatus | None = None
+        self._ended: dict[str, Any] | None = None
+        self._wake: notify.Subscription | None = None
+        self.loop = asyncio.get_running_loop()
+        self.task = asyncio.create_task(self._run(), name=f"trainpipe-sse-{experiment_id}")
+
+    # -- subscribers -------------------------------------------------------
+
+    async def join(self, cursor: int | None) -> Subscriber:
+        self._joining += 1
+        try:
+            await self.ready.wait()
+        finally:
+            self._joining -= 1
+        # Snapshot and register without awaiting in between, so the prefix
+        # and the queue meet exactly at ``self.offset``.
+        replay = [c for c in self.backlog if cursor is None or c[1] > cursor]
+        gap_from = None
+        if cursor is not None and cursor < (replay[0][0] if replay else self.offset):
+            gap_from = max(cursor, (replay[0][0] if replay else self.offset) - _GAP_BYTES)
+        gap_to = replay[0][0] if replay else self.offset
+        prefix = [self._log_event(*self._clip(c, cursor)) for c in replay]
+        if self._status is not None:
+            prefix.insert(0, {"event": "status", "data": self._status.value})
+        if self._ended is not None:
+            prefix.append(self._ended)
+        sub = Subscriber(self, prefix)
+        if self._ended is None:
+            self.subscribers.append(sub)
+        if gap_from is not None and self._path is not None:
+            data, start = await asyncio.to_thread(logs.read_range, self._path, gap_from, gap_to)
+            if data:
+                prefix.insert(
+                    1 if self._status is not None else 0,
+                    self._log_event(start, start + len(data), data.decode("utf-8", "replace")),
+                )
+        return sub
+
+    def remove(self, sub: Subscriber) -> None:
+        if sub in self.subscribers:
+            self.subscribers.remove(sub)
+        if not self.subscribers and self._ended is None and self._wake is not None:
+            # Last one gone: wake the loop so it can exit.
+            self._wake.notify(_LOG_APPENDED)
+
+    def _broadcast(self, event: dict[str, Any]) -> None:
+        for sub in list(self.subscribers):
+            try:
+                sub.queue.put_nowait(event)
+            except asyncio.QueueFull:
+                self._drop(sub)
+
+    def _drop(self, sub: Subscriber) -> None:
+        self.subscribers.remove(sub)
+        sub.dropped = True
+        self.hub.dropped += 1
+        while not sub.queue.empty():
+            sub.queue.get_nowait()
+        sub.queue.put_nowait(_DROPPED)
+        logger.info("sse: dropped slow subscriber of experiment=%s", self.experiment_id)
+
+    @staticmethod
+    def _clip(chunk: tuple[int, int, str], cursor: int | None) -> tuple[int, int, str]:
+        start, end, text = chunk
+        if cursor is None or cursor <= start:
+            return chunk
+        data = text.encode()[cursor - start :]
+        return cursor, end, data.decode("utf-8", "replace")
+
+    @staticmethod
+    def _log_event(start: int, end: int, text: str) -> dict[str, Any]:
+        return {"event": "log", "data": text, "id": str(end)}
+
+    def _emit_log(self, start: int, end: int, text: str) -> None:
+        if not text:
+            self.offset = max(self.offset, end)
+            return
+        self.backlog.append((start, end, text))
+        self._backlog_bytes += end - start
+        while self._backlog_bytes > _BACKLOG_BYTES and len(self.backlog) > 1:
+            old = self.backlog.popleft()
+            self._backlog_bytes -= old[1] - old[0]
+        self.offset = end
+        self._broadcast(self._log_event(start, end, text))
+
+    # -- sources -----------------------------------------------------------
+
+    def _attach(self, ring: logs.LogRing) -> None:
+        assert self._wake is not None
+        if self._ring is not None:
+            self._ring.listeners.discard(self._listener)
+        self._ring = ring
+        ring.listeners.add(self._listener)
+
+    def _listener(self) -> None:
+        if self._wake is not None:
+            self._wake.notify(_LOG_APPENDED)
+
+    def _pump_ring(self, ring: logs.LogRing) -> None:
+        while True:
+            held = ring.from_offset(self.offset, _CHUNK_BYTES)
+            if held is None:
+                # Fell behind the ring (or it starts past our cursor): skip
+                # ahead to what it still holds.
+                lines, start = ring.tail(len(ring))
+                held = lines, ring.end_offset
+                self.offset = start
+            lines, end = held
+            if not lines:
+                return
+            self._emit_log(self.offset, end, "".join(lines))
+
+    async def _pump_file(self) -> None:
+        if self._path is None:
+            return
+        while True:
+            data, start = await asyncio.to_thread(
+                logs.read_since, self._path, self.offset, _CHUNK_BYTES
+            )
+            if not data:
+                return
+            self._emit_log(start, start + len(data), data.decode("utf-8", "replace"))
+
+    async def _pump(self) -> None:
+        live = logs.tails.get(self.experiment_id)
+        if live is not None and live is not self._ring and (
+            self._ring is None or self._ring.closed
+        ):
+            if self._ring is not None:
+                self._pump_ring(self._ring)  # drain the previous attempt
+            self._attach(live)
+        if self._ring is not None:
+            self._pump_ring(self._ring)
+        else:
+            await self._pump_file()
+
+    async def _seed(self) -> None:
+        ring = logs.tails.get(self.experiment_id)
+        if ring is not None:
+            self._attach(ring)
+            lines, start = ring.tail(settings.log_ring_lines)
+            self.offset = start
+            self._emit_log(start, ring.end_offset, "".join(lines))
+        elif self._path is not None and self._path.exists():
+            data, start = await asyncio.to_thread(
+                logs.read_tail, self._path, settings.log_ring_lines
+            )
+            self.offset = start
+            self._emit_log(start, start + len(data), data.decode("utf-8", "replace"))
+
+    async def _check_status(self) -> bool:
+        """Refresh status; True once the experiment is gone or finished."""
+        async with self.db.read() as conn:
+            rec = await repository.get_experiment(conn, self.experiment_id)
+        self.hub.status_reads += 1
+        if rec is None:
+            self._ended = {"event": "end", "data": "not_found"}
+            return True
+        if rec.log_path:
+            self._path = Path(rec.log_path)
+        if rec.status != self._status:
+            self._status = rec.status
+            if self.ready.is_set():
+                self._broadcast({"event": "status", "data": rec.status.value})
+        if rec.status in _TERMINAL:
+            self._ended = {"event": "end", "data": rec.status.value}
+            return True
+        return False
+
+    # -- loop --------------------------------------------------------------
+
+    async def _run(self) -> None:
+        self._wake = notify.bus.subscribe(
+            notify.EXPERIMENT_STARTED, notify.PROCESS_EXITED, notify.EXPERIMENT_CANCELLED
+        )
+        try:
+            done = await self._check_status()
+            await self._seed()
+            self.ready.set()
+            last_status = time.monotonic()
+            while not done and (self.subscribers or self._joining):
+                polling = self._ring is None
+                fired = await self._wake.wait(
+                    timeout=_FILE_POLL_SEC if polling else settings.sse_status_poll_sec
+                )
+                if fired - {_LOG_APPENDED} or (
+                    time.monotonic() - last_status >= settings.sse_status_poll_sec
+                ):
+                    done = await self._check_status()
+                    last_status = time.monotonic()
+                await self._pump()
+            if done:
+                await self._pump()
+                assert self._ended is not None
+                self._broadcast(self._ended)
+        except Exception:
+            logger.exception("sse broadcaster for experiment=%s crashed", self.experiment_id)
+            self._ended = {"event": "end", "data": "error"}
+            self._broadcast(self._ended)
+        finally:
+            self.ready.set()
+            self._wake.close()
+            if self._ring is not None:
+                self._ring.listeners.discard(self._listener)
+            self.hub._forget(self)
+
+
+class LogHub:
+    """One broadcaster per watched experiment, created on first subscribe."""
+
+    def __init__(self) -> None:
+        self._broadcasters: dict[str, _Broadcaster] = {}
+        self.dropped = 0
+        self.status_reads = 0
+
+    async def subscribe(
+        self, db: Database, experiment_id: str, *, cursor: int | None = None
+    ) -> Subscriber:
+        b = self._broadcasters.get(experiment_id)
+        if (
+            b is None
+            or b.task.done()
+            or b._ended is not None
+            or b.loop is not asyncio.get_running_loop()
+        ):
+            b = _Broadcaster(self, db, experiment_id)
+            self._broadcasters[experiment_id] = b
+        return await b.join(cursor)
+
+    def _forget(self, b: _Broadcaster) -> None:
+        if self._broadcasters.get(b.experiment_id) is b:
+            del self._broadcasters[b.experiment_id]
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "broadcasters": len(self._broadcasters),
+            "subscribers": sum(len(b.subscribers) for b in self._broadcasters.values()),
+            "dropped": self.dropped,
+            "status_reads": self.status_reads,
+        }
+
+
+hub = LogHub()
@@ -1,3 +1,4 @@
+import asyncio
 import logging
 from contextlib import asynccontextmanager
 from pathlib import Path
@@ -9,11 +10,16 @@ from fastapi.responses import FileResponse
 from ..acquisition.manager import AcquisitionManager
 from ..autoresearch.manager import StudyManager
 from ..core.db import Database
+from ..evals import judge
 from ..evals.dispatcher import EvalDispatcher
+from ..inference.residency import ModelResidency
 from ..inference.service import InferenceService
+from ..integrations import mlflow_gateway
 from ..pipelines.manager import PipelineManager
 from ..scheduler.gpu_pool import GpuPool, detect_gpus
 from ..scheduler.loop import Scheduler
+from ..scheduler.resources import PynvmlBackend, ResourceSampler
+from ..scheduler.topology import detect_topology
 from ..settings import settings
 from ..watches.manager import WatchManager
 from .routes import (
@@ -29,6 +35,7 @@ from .routes import (
     pipelines,
     studies,
     synth,
+    system,
     watches,
 )
 
@@ -64,20 +71,32 @@ async def lifespan(app: FastAPI):
 
     db = Database(settings.sqlite_path)
     await db.init()
+    # Replays queued MLflow writes (including any left from the last run).
+    await mlflow_gateway.gateway.start(db)
 
     detected = detect_gpus(settings.visible_gpus)
-    gpu_pool = GpuPool(detected)
-
-    scheduler = Scheduler(db, gpu_pool)
+    nvml = PynvmlBackend.open() if detected else None
+    # One NVML session serves both bin-packing (live free memory) and the
+    # per-lease resource sampler.
+    gpu_pool = GpuPool(
+        detected,
+        telemetry=nvml,
+        topology=detect_topology([g.index for g in detected]),
+    )
+
+    scheduler = Scheduler(db, gpu_pool, sampler=ResourceSampler(db, nvml))
     await scheduler.start()
 
     study_manager = StudyManager(db)
     await study_manager.start_existing()
 
-    eval_dispatcher = EvalDispatcher(db, gpu_pool)
+    # One set of loaded models for eval runs and the playground.
+    residency = ModelResidency(max_loaded=settings.model_residency_max_loaded)
+
+    eval_dispatcher = EvalDispatcher(db, gpu_pool, residency=residency)
     await eval_dispatcher.start()
 
-    inference_service = InferenceService(db)
+    inference_service = InferenceService(db, residency=residency)
 
     # Phase 11: clear out any 'running' active-learning rows left by a
     # process restart. AL runs are synchronous-in-request and have no
@@ -109,10 +128,13 @@ async def lifespan(app: FastAPI):
         await acquisition_manager.stop_all()
         await watch_manager.stop()
         await pipeline_manager.stop_all()
-        await inference_service.close_all()
         await eval_dispatcher.stop()
+        await inference_service.close_all()
+        await asyncio.to_thread(judge.close)
         await study_manager.stop_all()
         await scheduler.stop()
+        await mlflow_gateway.gateway.stop()
+        await db.close()
 
 
 app = FastAPI(title="trainpipe", version="0.1.0", lifespan=lifespan)
@@ -147,3 +169,4 @@ app.include_router(synth.router)
 app.include_router(watches.router)
 app.include_router(compliance.router)
 app.include_router(acquisitions.router)
+app.include_router(system.router)
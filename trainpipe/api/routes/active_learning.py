@@ -18,7 +18,7 @@ Endpoints
   into a Label Studio project as pre-annotations.
 
 The runner uses the same :class:`InferenceService` as the playground,
-so model loads are LRU-cached and shared with ``POST /inferences``.
+so model loads are shared with ``POST /inferences`` and eval runs.
 """
 
 from __future__ import annotations
@@ -149,19 +149,21 @@ async def _execute_run(
             conn, run_id, status=ALRunStatus.RUNNING
         )
     try:
-        backend = await service.get(resolved_ref)
         scorer = make_scorer(request.scorer)
         # Drop sub-sample suffix at path level (#N) — the runner reads
         # the raw JSONL and applies sample_limit itself.
         ds_file = Path(dataset_path.split("#", 1)[0])
-        result = await run_active_learning(
-            backend=backend,
-            dataset_path=ds_file,
-            scorer=scorer,
-            top_n=request.top_n,
-            inference_params=InferenceParams(),
-            sample_limit=request.sample_limit,
-        )
+        # Borrowed for the whole pass so an eval or playground load can't
+        # evict the model mid-scoring.
+        async with service.borrow(resolved_ref) as backend:
+            result = await run_active_learning(
+                backend=backend,
+                dataset_path=ds_file,
+                scorer=scorer,
+                top_n=request.top_n,
+                inference_params=InferenceParams(),
+                sample_limit=request.sample_limit,
+            )
     except BaseException as e:
         # Catch ``BaseException`` (NOT ``Exception``) so an
         # ``asyncio.CancelledError`` — fired when the HTTP request is
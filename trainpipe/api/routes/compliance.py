@@ -29,7 +29,7 @@ async def forget_scan(
     body: ForgetScanRequest,
     db: Annotated[Database, Depends(get_db)],
 ) -> dict:
-    async with db.connect() as conn:
+    async with db.read() as conn:
         try:
             report = await scan_datasets_for_term(
                 conn,
@@ -143,7 +143,7 @@ async def upload_dataset(
 async def list_datasets(
     db: Annotated[Database, Depends(get_db)],
 ) -> list[Dataset]:
-    async with db.connect() as conn:
+    async with db.read() as conn:
         return await repository.list_datasets(conn)
 
 
@@ -152,7 +152,7 @@ async def get_dataset(
     dataset_id: str,
     db: Annotated[Database, Depends(get_db)],
 ) -> Dataset:
-    async with db.connect() as conn:
+    async with db.read() as conn:
         rec = await repository.get_dataset(conn, dataset_id)
     if rec is None:
         raise HTTPException(404, "dataset not found")
@@ -165,7 +165,7 @@ async def preview_dataset(
     db: Annotated[Database, Depends(get_db)],
     n: int = Query(10, ge=1, le=1000),
 ) -> PlainTextResponse:
-    async with db.connect() as conn:
+    async with db.read() as conn:
         rec = await repository.get_dataset(conn, dataset_id)
     if rec is None:
         raise HTTPException(404, "dataset not found")
@@ -373,7 +373,7 @@ async def get_media(
     ``path`` is a relative path under the bundle's ``image_root``. Path
     traversal (``..``, absolute paths) is rejected.
     """
-    async with db.connect() as conn:
+    async with db.read() as conn:
         rec = await repository.get_dataset(conn, dataset_id)
     if rec is None:
         raise HTTPException(404, "dataset not found")
@@ -777,7 +777,7 @@ async def models_using_dataset(
     Use this for the proper GDPR "forget" query — direct usage misses
     indirect chains.
     """
-    async with db.connect() as conn:
+    async with db.read() as conn:
         rec = await repository.get_dataset(conn, dataset_id)
         if rec is None:
             raise HTTPException(404, "dataset not found")
@@ -6,8 +6,9 @@ Endpoints
 Suites (reusable eval configs):
 
 * ``POST /evals/suites`` — create. ``ds:<id>`` refs are resolved at
-  submit time, the dataset file must exist, and every metric is
-  instantiated (validates its config) before persisting.
+  submit time, the dataset's format and ``#N`` sub-sample suffix are
+  checked, and every metric is instantiated (validates its config)
+  before persisting.
 * ``GET /evals/suites`` — list newest first.
 * ``GET /evals/suites/{id}`` — single.
 * ``DELETE /evals/suites/{id}`` — 409 if any non-terminal eval_run
@@ -23,11 +24,18 @@ Runs (one execution against one model target):
 * ``GET /evals/runs/{id}/results`` — per-sample predictions + scores.
 * ``POST /evals/runs/{id}/cancel`` — request cancel.
 
+Prediction cache (predictions reused across runs of the same weights):
+
+* ``DELETE /evals/prediction-cache`` — drop cached predictions, all of
+  them or one model's (``?model_fingerprint=``).
+
 Compare (Δ between N runs against the same suite):
 
 * ``GET /evals/compare?run_ids=a,b,c`` — n-way comparison: aggregate
-  per metric per run, plus the list of samples where at least one run
-  scored lower than another (regressions).
+  per metric per run, each run's mean Δ and win/loss/tie counts against
+  the first (baseline) run, plus the samples where at least one run
+  scored lower than another (regressions), paginated with ``limit`` /
+  ``offset``. Computed in SQLite, so it doesn't load the suite's rows.
 """
 
 from typing import Annotated
@@ -36,6 +44,7 @@ from fastapi import APIRouter, Depends, HTTPException, Query
 
 from ...core import repository
 from ...core.db import Database
+from ...evals.datasets import DatasetReadError, EvalDataset
 from ...evals.metrics import UnknownMetricKind, get_metric_class
 from ...training.dataset_refs import (
     MalformedDatasetRef,
@@ -84,6 +93,12 @@ async def create_suite(
             raise HTTPException(
                 422, {"error": "malformed_dataset_ref", "value": e.raw},
             ) from None
+        try:
+            EvalDataset.from_ref(dataset_path)
+        except DatasetReadError as e:
+            raise HTTPException(
+                422, {"error": "unsupported_dataset", "detail": str(e)},
+            ) from None
 
         for cfg in spec.metrics:
             try:
@@ -121,7 +136,7 @@ async def create_suite(
 async def list_suites(
     db: Annotated[Database, Depends(get_db)],
 ) -> list[EvalSuite]:
-    async with db.connect() as conn:
+    async with db.read() as conn:
         return await repository.list_eval_suites(conn)
 
 
@@ -130,7 +145,7 @@ async def get_suite(
     suite_id: str,
     db: Annotated[Database, Depends(get_db)],
 ) -> EvalSuite:
-    async with db.connect() as conn:
+    async with db.read() as conn:
         suite = await repository.get_eval_suite(conn, suite_id)
     if suite is None:
         raise HTTPException(404, "eval suite not found")
@@ -204,7 +219,7 @@ async def list_runs(
     limit: int = Query(100, ge=1, le=500),
     offset: int = Query(0, ge=0),
 ) -> list[EvalRun]:
-    async with db.connect() as conn:
+    async with db.read() as conn:
         return await repository.list_eval_runs(
             conn,
             suite_id=suite_id,
@@ -220,7 +235,7 @@ async def get_run(
     run_id: str,
     db: Annotated[Database, Depends(get_db)],
 ) -> EvalRun:
-    async with db.connect() as conn:
+    async with db.read() as conn:
         run = await repository.get_eval_run(conn, run_id)
     if run is None:
         raise HTTPException(404, "eval run not found")
@@ -234,7 +249,7 @@ async def list_results(
     limit: int = Query(500, ge=1, le=5000),
     offset: int = Query(0, ge=0),
 ) -> list[EvalResult]:
-    async with db.connect() as conn:
+    async with db.read() as conn:
         run = await repository.get_eval_run(conn, run_id)
         if run is None:
             raise HTTPException(404, "eval run not found")
@@ -255,18 +270,30 @@ async def cancel_run(
     return {"status": result}
 
 
+@router.delete("/prediction-cache")
+async def purge_prediction_cache(
+    db: Annotated[Database, Depends(get_db)],
+    model_fingerprint: str | None = None,
+) -> dict[str, str | int]:
+    async with db.connect() as conn:
+        removed = await repository.purge_prediction_cache(conn, model_fingerprint)
+    return {"status": "purged", "removed": removed}
+
+
 @router.get("/compare", response_model=EvalComparison)
 async def compare_runs(
     db: Annotated[Database, Depends(get_db)],
     run_ids: str = Query(
         ..., description="Comma-separated eval run IDs (2+ runs against the same suite)"
     ),
+    limit: int = Query(100, ge=1, le=1000),
+    offset: int = Query(0, ge=0),
 ) -> EvalComparison:
-    ids = [r.strip() for r in run_ids.split(",") if r.strip()]
+    ids = list(dict.fromkeys(r.strip() for r in run_ids.split(",") if r.strip()))
     if len(ids) < 2:
         raise HTTPException(422, "compare requires at least two run_ids")
 
-    async with db.connect() as conn:
+    async with db.read() as conn:
         runs: list[EvalRun] = []
         for rid in ids:
             r = await repository.get_eval_run(conn, rid)
@@ -293,66 +320,44 @@ async def compare_runs(
                 for name, agg in r.aggregate.items():
                     aggregate_delta.setdefault(name, {})[r.id] = agg.mean
 
-        per_run_results: dict[str, dict[int, dict]] = {}
-        for r in runs:
-            rows = await repository.list_eval_results(conn, r.id, limit=5000)
-            per_run_results[r.id] = {
-                row.sample_index: {
-                    "prediction": row.prediction,
-                    "scores": row.scores,
-                    "error": row.error,
-                    "input": row.input,
-                    "gold": row.gold,
-                }
-                for row in rows
-            }
+        # Joins, counts and pagination run in SQLite; only the page's rows
+        # are loaded.
+        vs_baseline = await repository.compare_eval_scores(conn, ids[0], ids[1:])
+        page, total = await repository.list_diverging_samples(
+            conn, ids, limit=limit, offset=offset
+        )
+        rows = await repository.list_eval_results_for_samples(conn, ids, page)
 
+    by_sample: dict[int, dict[str, EvalResult]] = {}
+    for row in rows:
+        by_sample.setdefault(row.sample_index, {})[row.run_id] = row
     regressions: list[EvalComparisonSample] = []
-    all_sample_indices: set[int] = set()
-    for d in per_run_results.values():
-        all_sample_indices.update(d.keys())
-
-    for idx in sorted(all_sample_indices):
-        per_run_entry: dict[str, dict] = {}
-        score_vectors: list[tuple[str, dict[str, float]]] = []
-        sample_inputs: dict = {}
-        sample_gold = None
-        for r in runs:
-            row = per_run_results[r.id].get(idx)
-            if row is None:
-                continue
-            per_run_entry[r.id] = {
-                "prediction": row["prediction"],
-                "scores": row["scores"],
-                "error": row["error"],
-            }
-            score_vectors.append((r.id, row["scores"]))
-            if not sample_inputs:
-                sample_inputs = row["input"]
-                sample_gold = row["gold"]
-
-        if len(score_vectors) < 2:
-            continue
-        metric_names = set().union(*(set(s) for _, s in score_vectors))
-        is_regression = False
-        for name in metric_names:
-            vals = [s.get(name) for _, s in score_vectors if name in s]
-            if len(vals) >= 2 and max(vals) - min(vals) > 1e-9:
-                is_regression = True
-                break
-        if is_regression:
-            regressions.append(
-                EvalComparisonSample(
-                    sample_index=idx,
-                    input=sample_inputs,
-                    gold=sample_gold,
-                    per_run=per_run_entry,
-                )
+    for idx in page:
+        per_run = [by_sample[idx][rid] for rid in ids if rid in by_sample[idx]]
+        regressions.append(
+            EvalComparisonSample(
+                sample_index=idx,
+                input=per_run[0].input,
+                gold=per_run[0].gold,
+                per_run={
+                    row.run_id: {
+                        "prediction": row.prediction,
+                        "scores": row.scores,
+                        "error": row.error,
+                    }
+                    for row in per_run
+                },
             )
+        )
 
     return EvalComparison(
         suite_id=next(iter(suite_ids)),
         runs=runs,
         aggregate_delta=aggregate_delta,
+        baseline_run_id=ids[0],
+        vs_baseline=vs_baseline,
         regressions=regressions,
+        regressions_total=total,
+        offset=offset,
+        limit=limit,
     )
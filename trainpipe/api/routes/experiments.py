@@ -3,16 +3,18 @@ from pathlib import Path
 from typing import Annotated
 
 from fastapi import APIRouter, Depends, HTTPException, Query, Request
-from fastapi.responses import PlainTextResponse
+from fastapi.responses import PlainTextResponse, StreamingResponse
 from sse_starlette.sse import EventSourceResponse
 
 from ...core import repository
 from ...core.db import Database
+from ...scheduler import logs
 from ...training.dataset_refs import (
     MalformedDatasetRef,
     UnknownDatasetRef,
     resolve_spec,
 )
+from .. import log_hub
 from ..auth import require_api_key
 from ..deps import get_db, get_scheduler
 from ..schemas import ExperimentRecord, ExperimentSpec, ExperimentStatus
@@ -25,13 +27,6 @@ router = APIRouter(
 )
 
 
-_TERMINAL = {
-    ExperimentStatus.COMPLETED,
-    ExperimentStatus.FAILED,
-    ExperimentStatus.CANCELLED,
-}
-
-
 async def _resolve_and_validate(
     specs: list[ExperimentSpec], db: Database
 ) -> list[ExperimentSpec]:
@@ -90,7 +85,7 @@ async def list_experiments(
     limit: int = Query(100, ge=1, le=500),
     offset: int = Query(0, ge=0),
 ) -> list[ExperimentRecord]:
-    async with db.connect() as conn:
+    async with db.read() as conn:
         return await repository.list_experiments(
             conn,
             status=status,
@@ -105,7 +100,7 @@ async def get_experiment(
     experiment_id: str,
     db: Annotated[Database, Depends(get_db)],
 ) -> ExperimentRecord:
-    async with db.connect() as conn:
+    async with db.read() as conn:
         rec = await repository.get_experiment(conn, experiment_id)
     if rec is None:
         raise HTTPException(404, "experiment not found")
@@ -129,21 +124,85 @@ async def cancel_experiment(
     return {"status": result}
 
 
-@router.get("/{experiment_id}/logs")
+def _log_chunk(
+    data: bytes, start: int, *, end: int | None = None, first_line: int | None = None
+) -> PlainTextResponse:
+    # ``end`` overrides when ``data`` was re-encoded from ring text.
+    end = start + len(data) if end is None else end
+    headers = {"X-Log-Start": str(start), "X-Log-Next-Offset": str(end)}
+    if first_line is not None:
+        headers["X-Log-First-Line"] = str(first_line)
+    return PlainTextResponse(data, headers=headers)
+
+
+@router.get("/{experiment_id}/logs", response_model=None)
 async def download_logs(
     experiment_id: str,
     db: Annotated[Database, Depends(get_db)],
-) -> PlainTextResponse:
-    async with db.connect() as conn:
+    tail: int | None = Query(None, ge=1, le=100_000),
+    since_offset: int | None = Query(None, ge=0),
+    byte_start: int | None = Query(None, ge=0),
+    byte_end: int | None = Query(None, ge=0),
+    line_start: int | None = Query(None, ge=0),
+    line_end: int | None = Query(None, ge=0),
+    max_bytes: int = Query(1024 * 1024, ge=1, le=64 * 1024 * 1024),
+) -> PlainTextResponse | StreamingResponse:
+    """The full log (rotated segments decompressed in order), or one slice:
+
+    * ``tail=N`` — the last N lines (from memory while the run is live);
+    * ``since_offset=B`` — new output from byte cursor B, cut at a line end;
+    * ``byte_start`` / ``byte_end`` — a byte range (end exclusive);
+    * ``line_start`` / ``line_end`` — a line range (0-based, end exclusive).
+
+    Offsets and line numbers count from the start of the experiment's log,
+    across rotated segments. Slices are capped at ``max_bytes`` and carry
+    ``X-Log-Start`` and ``X-Log-Next-Offset`` (the next ``since_offset``);
+    line ranges also ``X-Log-First-Line``.
+    """
+    modes = [
+        tail is not None,
+        since_offset is not None,
+        byte_start is not None or byte_end is not None,
+        line_start is not None or line_end is not None,
+    ]
+    if sum(modes) > 1:
+        raise HTTPException(
+            422, "use only one of tail, since_offset, byte_start/byte_end, line_start/line_end"
+        )
+    async with db.read() as conn:
         rec = await repository.get_experiment(conn, experiment_id)
     if rec is None:
         raise HTTPException(404, "experiment not found")
+
+    ring = logs.tails.get(experiment_id)
+    if ring is not None and tail is not None and tail <= len(ring):
+        lines, start = ring.tail(tail)
+        return _log_chunk("".join(lines).encode(), start, end=ring.end_offset)
+    if ring is not None and since_offset is not None:
+        held = ring.from_offset(since_offset, max_bytes)
+        if held is not None:
+            lines, end = held
+            return _log_chunk("".join(lines).encode(), since_offset, end=end)
+
     if not rec.log_path:
         return PlainTextResponse("")
     path = Path(rec.log_path)
     if not path.exists():
         return PlainTextResponse("")
-    return PlainTextResponse(path.read_text(encoding="utf-8", errors="replace"))
+    if tail is not None:
+        return _log_chunk(*await asyncio.to_thread(logs.read_tail, path, tail))
+    if since_offset is not None:
+        return _log_chunk(*await asyncio.to_thread(logs.read_since, path, since_offset, max_bytes))
+    if modes[2]:
+        first = byte_start or 0
+        last = first + max_bytes if byte_end is None else min(byte_end, first + max_bytes)
+        return _log_chunk(*await asyncio.to_thread(logs.read_range, path, first, last))
+    if modes[3]:
+        data, start, first_line = await asyncio.to_thread(
+            logs.read_lines, path, line_start or 0, line_end, max_bytes
+        )
+        return _log_chunk(data, start, first_line=first_line)
+    return StreamingResponse(logs.iter_log(path), media_type="text/plain; charset=utf-8")
 
 
 @router.get("/{experiment_id}/logs/stream")
@@ -152,38 +211,22 @@ async def stream_logs(
     request: Request,
     db: Annotated[Database, Depends(get_db)],
 ) -> EventSourceResponse:
-    async with db.connect() as conn:
+    async with db.read() as conn:
         rec = await repository.get_experiment(conn, experiment_id)
     if rec is None:
         raise HTTPException(404, "experiment not found")
 
+    # Every client of one experiment shares a single broadcaster; a
+    # reconnecting EventSource resumes from the byte cursor in its last id.
+    last_id = request.headers.get("last-event-id", "")
+    cursor = int(last_id) if last_id.isdigit() else None
+    sub = await log_hub.hub.subscribe(db, experiment_id, cursor=cursor)
+
     async def event_source():
-        last_size = 0
-        while True:
-            if await request.is_disconnected():
-                return
-            async with db.connect() as conn:
-                current = await repository.get_experiment(conn, experiment_id)
-            if current is None:
-                yield {"event": "end", "data": "not_found"}
-                return
-            if current.log_path:
-                path = Path(current.log_path)
-                if path.exists():
-                    size = path.stat().st_size
-                    if size > last_size:
-                        with path.open("rb") as f:
-                            f.seek(last_size)
-                            chunk = f.read()
-                        last_size = size
-                        if chunk:
-                            yield {
-                                "event": "log",
-                                "data": chunk.decode("utf-8", errors="replace"),
-                            }
-            if current.status in _TERMINAL:
-                yield {"event": "end", "data": current.status.value}
-                return
-            await asyncio.sleep(0.5)
+        try:
+            async for event in sub:
+                yield event
+        finally:
+            sub.close()
 
     return EventSourceResponse(event_source())
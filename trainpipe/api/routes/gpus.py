@@ -19,11 +19,12 @@ async def list_gpus(
     db: Annotated[Database, Depends(get_db)],
     gpu_pool: Annotated[GpuPool, Depends(get_gpu_pool)],
 ) -> dict:
-    async with db.connect() as conn:
+    async with db.read() as conn:
         leases = await gpu_pool.status(conn)
     free = [g["index"] for g in leases if g["experiment_id"] is None]
     return {
         "total": gpu_pool.total,
         "free": free,
         "leases": leases,
+        "topology": gpu_pool.topology.as_dict() if gpu_pool.topology else None,
     }
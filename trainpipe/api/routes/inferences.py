@@ -23,6 +23,7 @@ from __future__ import annotations
 
 import asyncio
 import logging
+from contextlib import AsyncExitStack
 from typing import Annotated, Any
 
 from fastapi import APIRouter, Depends, HTTPException
@@ -88,16 +89,16 @@ async def _resolve_and_predict(
             422,
             {"error": "unknown_model_ref", "ref": e.raw, "reason": e.reason},
         ) from None
-    backend = await service.get(resolved)
-    try:
-        prediction = await backend.predict({"prompt": prompt}, params)
-    except Exception:
-        # Predict raised on a cached backend — its state is suspect
-        # (CUDA OOM, half-detokenized state, etc.). Evict so the next
-        # request triggers a fresh load instead of reusing the broken one.
-        logger.exception("predict failed for %s", raw_ref)
-        await service.invalidate(resolved)
-        raise
+    async with service.borrow(resolved) as backend:
+        try:
+            prediction = await backend.predict({"prompt": prompt}, params)
+        except Exception:
+            # Predict raised on a cached backend — its state is suspect
+            # (CUDA OOM, half-detokenized state, etc.). Evict so the next
+            # request triggers a fresh load instead of reusing the broken one.
+            logger.exception("predict failed for %s", raw_ref)
+            await service.invalidate(resolved)
+            raise
     return InferenceResponse(
         model_ref=raw_ref,
         base_model=resolved.base_model,
@@ -138,22 +139,23 @@ async def infer_stream(
         ) from None
 
     async def event_source():
-        try:
-            backend = await service.get(resolved)
-        except Exception as e:
-            logger.exception("stream load failed")
-            yield {"event": "error", "data": str(e)}
-            return
-        try:
-            prediction = await backend.predict(
-                {"prompt": request.prompt}, request.params
-            )
-        except Exception as e:
-            logger.exception("stream predict failed")
-            # Evict broken backend so the next request reloads.
-            await service.invalidate(resolved)
-            yield {"event": "error", "data": str(e)}
-            return
+        async with AsyncExitStack() as stack:
+            try:
+                backend = await stack.enter_async_context(service.borrow(resolved))
+            except Exception as e:
+                logger.exception("stream load failed")
+                yield {"event": "error", "data": str(e)}
+                return
+            try:
+                prediction = await backend.predict(
+                    {"prompt": request.prompt}, request.params
+                )
+            except Exception as e:
+                logger.exception("stream predict failed")
+                # Evict broken backend so the next request reloads.
+                await service.invalidate(resolved)
+                yield {"event": "error", "data": str(e)}
+                return
         # ``~64-char`` chunks. Use len(prediction) as ground truth so the
         # consumer sees roughly streaming UX without forcing a tokenizer.
         chunk_size = 64
@@ -192,11 +194,12 @@ async def infer_compare(
 async def inspect_cache(
     service: Annotated[InferenceService, Depends(get_inference_service)],
 ) -> dict[str, Any]:
-    """Diagnostic: which backends are currently loaded (LRU order)."""
+    """Diagnostic: which backends are currently loaded (LRU order) and
+    how many borrowers (requests, eval runs) each has right now."""
     return {
         "max_loaded": service.max_loaded,
         "loaded": [
-            {"base_model": b, "adapter_path": a}
+            {"base_model": b, "adapter_path": a, "in_use": service.residency.refs((b, a))}
             for (b, a) in service.cache_keys()
         ],
     }
@@ -167,7 +167,7 @@ async def list_models(
     name: str | None = None,
     alias: str | None = None,
 ) -> list[RegisteredModel]:
-    async with db.connect() as conn:
+    async with db.read() as conn:
         return await repository.list_models(conn, name=name, alias=alias)
 
 
@@ -176,7 +176,7 @@ async def list_models_by_name(
     name: str,
     db: Annotated[Database, Depends(get_db)],
 ) -> list[RegisteredModel]:
-    async with db.connect() as conn:
+    async with db.read() as conn:
         return await repository.list_models_by_name(conn, name)
 
 
@@ -211,7 +211,7 @@ async def list_trained_on_datasets(
     like ``GET /models/<hex>/datasets`` would resolve to the alias
     lookup with ``alias_or_version = "datasets"``.
     """
-    async with db.connect() as conn:
+    async with db.read() as conn:
         model = await repository.get_model(conn, model_id)
         if model is None:
             raise HTTPException(404, "model not found")
@@ -247,7 +247,7 @@ async def resolve_model(
     alias_or_version: str,
     db: Annotated[Database, Depends(get_db)],
 ) -> RegisteredModel:
-    async with db.connect() as conn:
+    async with db.read() as conn:
         model: RegisteredModel | None
         if alias_or_version.isdigit():
             model = await repository.get_model_by_name_version(
@@ -40,7 +40,7 @@ async def create_pipeline(
 async def list_pipelines(
     db: Annotated[Database, Depends(get_db)],
 ) -> list[Pipeline]:
-    async with db.connect() as conn:
+    async with db.read() as conn:
         return await repository.list_pipelines(conn)
 
 
@@ -48,7 +48,7 @@ async def list_pipelines(
 async def get_pipeline(
     pipeline_id: str, db: Annotated[Database, Depends(get_db)]
 ) -> Pipeline:
-    async with db.connect() as conn:
+    async with db.read() as conn:
         pipeline = await repository.get_pipeline(conn, pipeline_id)
     if pipeline is None:
         raise HTTPException(404, "pipeline not found")
@@ -54,7 +54,7 @@ async def create_study(
 async def list_studies(
     db: Annotated[Database, Depends(get_db)],
 ) -> list[StudyRecord]:
-    async with db.connect() as conn:
+    async with db.read() as conn:
         return await repository.list_studies(conn)
 
 
@@ -86,7 +86,7 @@ async def studies_cost_summary(
     to ``get_study`` with ``study_id="cost-summary"`` and 404.
     """
     out: list[StudyCostPoint] = []
-    async with db.connect() as conn:
+    async with db.read() as conn:
         studies = await repository.list_studies(conn)
         for s in studies:
             cost = await repository.study_cost_summary(conn, s.id)
@@ -111,7 +111,7 @@ async def get_study(
     study_id: str,
     db: Annotated[Database, Depends(get_db)],
 ) -> StudyRecord:
-    async with db.connect() as conn:
+    async with db.read() as conn:
         rec = await repository.get_study(conn, study_id)
     if rec is None:
         raise HTTPException(404, "study not found")
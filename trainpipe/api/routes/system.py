@@ -0,0 +1,50 @@
+"""Process-internal health counters for operators (connection pool, write queue,
+scheduler, MLflow outbox, SSE streams)."""
+
+from typing import Annotated
+
+from fastapi import APIRouter, Depends
+
+from ...core.db import Database
+from ...integrations import mlflow_gateway
+from ...scheduler.loop import Scheduler
+from .. import log_hub
+from ..auth import require_api_key
+from ..deps import get_db, get_scheduler
+
+router = APIRouter(
+    prefix="/system",
+    tags=["system"],
+    dependencies=[Depends(require_api_key)],
+)
+
+
+@router.get("/db")
+async def db_stats(db: Annotated[Database, Depends(get_db)]) -> dict:
+    """SQLite pool size, acquire wait times and group-commit counters."""
+    stats = db.pool_stats()
+    stats["write_queue"] = db.writes.stats()
+    return stats
+
+
+@router.get("/scheduler")
+async def scheduler_stats(scheduler: Annotated[Scheduler, Depends(get_scheduler)]) -> dict:
+    """Wakeup reasons and preemption cost counters."""
+    return {
+        "wakeups": scheduler.wakeup_counts,
+        "preemption": scheduler.preemption_stats,
+    }
+
+
+@router.get("/mlflow")
+async def mlflow_stats() -> dict:
+    """MLflow gateway availability, RPC counters and outbox backlog."""
+    stats = mlflow_gateway.gateway.stats()
+    stats["outbox_pending"] = await mlflow_gateway.gateway.pending()
+    return stats
+
+
+@router.get("/streams")
+async def stream_stats() -> dict:
+    """Live SSE log broadcasters, subscribers and slow-consumer drops."""
+    return log_hub.hub.stats()
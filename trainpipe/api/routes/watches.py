@@ -76,7 +76,7 @@ async def list_watches(
     db: Annotated[Database, Depends(get_db)],
     enabled: bool | None = None,
 ) -> list[Watch]:
-    async with db.connect() as conn:
+    async with db.read() as conn:
         return await repository.list_watches(
             conn, only_enabled=bool(enabled) if enabled is not None else False
         )
@@ -86,7 +86,7 @@ async def list_watches(
 async def get_watch(
     watch_id: str, db: Annotated[Database, Depends(get_db)]
 ) -> Watch:
-    async with db.connect() as conn:
+    async with db.read() as conn:
         w = await repository.get_watch(conn, watch_id)
     if w is None:
         raise HTTPException(404, "watch not found")
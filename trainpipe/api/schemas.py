@@ -140,6 +140,9 @@ class ExperimentSpec(BaseModel):
     val_dataset: list[str] = Field(default_factory=list)
 
     gpu_count: int = Field(1, ge=1, le=8)
+    # Estimated VRAM per GPU. When set, the pool may pack this job onto a
+    # GPU shared with other fractional leases; unset takes whole GPUs.
+    vram_mb: int | None = Field(None, ge=1)
     priority: int = 0
 
     hyperparameters: TrainingHyperparameters = Field(default_factory=TrainingHyperparameters)
@@ -223,6 +226,15 @@ class ExperimentRecord(BaseModel):
     gpu_seconds: float | None = None
     peak_vram_mb: float | None = None
     energy_wh: float | None = None
+    # 1.0 = every GPU pair on NVLink; None for single-GPU runs.
+    placement_score: float | None = None
+    # Crash recovery: the checkpoint the current attempt resumed from.
+    resume_from_checkpoint: str | None = None
+    resumed_from_step: int | None = None
+    gpu_seconds_saved: float | None = None
+    # Priority preemption: evictions so far and work lost to them.
+    preemptions: int = 0
+    preemption_lost_gpu_seconds: float | None = None
 
 
 class SearchSpaceEntry(BaseModel):
@@ -320,6 +332,27 @@ class MetricConfig(BaseModel):
         return self.name or self.kind
 
 
+class EarlyStopConfig(BaseModel):
+    """Stop an eval run once its paired Δ against a baseline run is decided.
+
+    ``baseline`` is an eval run id, ``exp:<experiment_id>`` or
+    ``<model>@<alias|version>``; the latter two mean that experiment's
+    (model version's) latest completed run of the same suite. The run
+    stops when the bootstrap interval of ``mean(run - baseline)`` on
+    ``metric`` clears ``±margin`` (better / worse) or fits inside it
+    (equivalent) — see evals/stats.py.
+    """
+
+    model_config = ConfigDict(extra="forbid")
+
+    baseline: str = Field(..., min_length=1)
+    metric: str = Field(..., min_length=1)
+    margin: float = Field(0.0, ge=0.0)
+    confidence: float = Field(0.95, gt=0.5, lt=1.0)
+    # Paired samples at the first look; later looks each time it doubles.
+    min_samples: int = Field(100, ge=10)
+
+
 class InferenceParams(BaseModel):
     """Generation + sampling parameters for the eval runner."""
 
@@ -330,6 +363,14 @@ class InferenceParams(BaseModel):
     top_p: float = Field(1.0, gt=0.0, le=1.0)
     sample_limit: int | None = Field(None, ge=1)
     batch_size: int = Field(1, ge=1, le=64)
+    # Estimated VRAM for the run's model; lets the dispatcher pack eval
+    # runs onto a shared GPU instead of leasing a whole one.
+    vram_mb: int | None = Field(None, ge=1)
+    # Split a run into up to this many shards by sample index, each with
+    # its own GPU lease and model copy. Shards that find no free GPU at
+    # claim time are folded into the others.
+    shards: int = Field(1, ge=1, le=64)
+    early_stop: EarlyStopConfig | None = None
 
 
 class EvalSuiteSpec(BaseModel):
@@ -343,6 +384,17 @@ class EvalSuiteSpec(BaseModel):
     metrics: list[MetricConfig] = Field(..., min_length=1)
     inference_params: InferenceParams = Field(default_factory=InferenceParams)
 
+    @model_validator(mode="after")
+    def _early_stop_metric_exists(self) -> "EvalSuiteSpec":
+        early_stop = self.inference_params.early_stop
+        names = [m.metric_name for m in self.metrics]
+        if early_stop is not None and early_stop.metric not in names:
+            raise ValueError(
+                f"early_stop.metric '{early_stop.metric}' is not one of the suite's "
+                f"metrics {names}"
+            )
+        return self
+
 
 class EvalSuite(BaseModel):
     """Persisted eval suite (dataset already resolved to a real path)."""
@@ -379,6 +431,9 @@ class MetricAggregate(BaseModel):
     mean: float
     std: float | None = None
     count: int
+    # Bootstrap interval of the mean at settings.eval_ci_level.
+    ci_low: float | None = None
+    ci_high: float | None = None
     extras: dict[str, Any] = Field(default_factory=dict)
 
 
@@ -393,6 +448,13 @@ class EvalRun(BaseModel):
     error: str | None = None
     aggregate: dict[str, MetricAggregate] | None = None
     sample_count: int | None = None
+    # Result rows written so far; ``resumed_samples`` of them were reused
+    # from before a restart instead of being predicted again.
+    samples_done: int = 0
+    resumed_samples: int | None = None
+    # Per-stage items, busy seconds, throughput and input-queue depth of
+    # the predict → score → persist pipeline (evals/runner.py).
+    pipeline_stats: dict[str, Any] | None = None
     triggered_by: EvalTriggeredBy
     created_at: datetime
     started_at: datetime | None = None
@@ -422,13 +484,31 @@ class EvalComparisonSample(BaseModel):
     per_run: dict[str, dict[str, Any]]  # run_id -> {prediction, scores, error}
 
 
+class EvalMetricDelta(BaseModel):
+    """One run against the baseline run on one metric, over the samples
+    both scored."""
+
+    paired: int
+    mean_delta: float  # mean(run - baseline)
+    wins: int  # samples the run scored higher
+    losses: int
+    ties: int
+
+
 class EvalComparison(BaseModel):
     """N-way comparison of eval runs against the same suite."""
 
     suite_id: str
     runs: list[EvalRun]
     aggregate_delta: dict[str, dict[str, float]]  # metric_name -> {run_id -> mean}
+    # The first requested run; every other run is scored against it.
+    baseline_run_id: str
+    vs_baseline: dict[str, dict[str, EvalMetricDelta]]  # run_id -> metric_name -> Δ
     regressions: list[EvalComparisonSample]  # samples where any run scored lower
+    # ``regressions`` is one page (``offset`` / ``limit``) of this many.
+    regressions_total: int
+    offset: int
+    limit: int
 
 
 # ---------------------------------------------------------------------------
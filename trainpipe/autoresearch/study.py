@@ -15,7 +15,7 @@ import logging
 from ..api.schemas import ExperimentStatus, StudyConfig, StudyStatus
 from ..core import repository
 from ..core.db import Database
-from ..settings import settings
+from ..integrations import mlflow_gateway
 from .search_spaces import sample_spec
 
 logger = logging.getLogger(__name__)
@@ -254,12 +254,7 @@ def _summarize_study(study) -> tuple[float | None, str | None, int]:
 
 def _read_metric(mlflow_run_id: str, metric_name: str) -> float | None:
     try:
-        import mlflow
-        from mlflow.tracking import MlflowClient
-
-        mlflow.set_tracking_uri(settings.mlflow_tracking_uri)
-        client = MlflowClient()
-        run = client.get_run(mlflow_run_id)
+        run = mlflow_gateway.gateway.client().get_run(mlflow_run_id)
         return run.data.metrics.get(metric_name)
     except Exception:
         logger.exception(
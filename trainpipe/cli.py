@@ -101,7 +101,10 @@ def _cmd_cancel(client: httpx.Client, args: argparse.Namespace) -> Any:
 
 
 def _cmd_logs(client: httpx.Client, args: argparse.Namespace) -> Any:
-    return client.get(f"/experiments/{args.experiment_id}/logs")
+    # The server tails (from memory for live runs) instead of shipping the
+    # whole, possibly rotated, log.
+    params = {"tail": args.n} if args.n > 0 else None
+    return client.get(f"/experiments/{args.experiment_id}/logs", params=params)
 
 
 def _cmd_datasets(client: httpx.Client, args: argparse.Namespace) -> Any:
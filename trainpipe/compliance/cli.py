@@ -104,13 +104,16 @@ async def _run_async(args: argparse.Namespace) -> int:
         )
         return 2
     db = Database(db_path)
-    async with db.connect() as conn:
-        report = await scan_datasets_for_term(
-            conn,
-            args.term,
-            is_regex=args.regex,
-            case_sensitive=args.case_sensitive,
-        )
+    try:
+        async with db.read() as conn:
+            report = await scan_datasets_for_term(
+                conn,
+                args.term,
+                is_regex=args.regex,
+                case_sensitive=args.case_sensitive,
+            )
+    finally:
+        await db.close()
     if args.output:
         args.output.write_text(
             json.dumps(report.to_dict(), indent=2, ensure_ascii=False),
@@ -1,9 +1,38 @@
+"""SQLite schema migrations and the process-wide connection pool.
+
+:class:`Database` hands out pooled, long-lived aiosqlite connections
+instead of opening one (thread + PRAGMA round-trip) per ``connect()``:
+
+* ``connect()`` yields the single dedicated *writer* connection. SQLite
+  admits one writer at a time anyway, so callers queue on an asyncio lock
+  instead of on SQLite's busy handler. Re-entering ``connect()`` from the
+  task that already holds the writer yields a short-lived overflow
+  connection, so helpers that open their own block from inside a
+  caller's block (e.g. ``InferenceService.resolve``) don't deadlock.
+* ``read()`` yields one of up to ``readers`` ``query_only`` connections.
+  WAL mode lets them run concurrently with the writer; use it for paths
+  that never mutate (list/get endpoints, SSE polling).
+
+Releasing a connection rolls back any transaction the caller left open,
+which is what closing the old per-call connection did implicitly.
+
+``Database.writes`` is the group-commit :class:`~.write_queue.WriteQueue`
+for high-frequency writes; it borrows the same writer connection.
+"""
+
+import asyncio
+import threading
+import time
 from collections.abc import AsyncIterator
 from contextlib import asynccontextmanager
 from pathlib import Path
+from typing import Any
 
 import aiosqlite
 
+from ..settings import settings
+from .write_queue import WriteQueue
+
 MIGRATIONS: list[str] = [
     # v1: initial schema
     """
@@ -425,12 +454,117 @@ MIGRATIONS: list[str] = [
     ALTER TABLE acquisition_runs ADD COLUMN max_llm_calls INTEGER NOT NULL DEFAULT 0;
     ALTER TABLE acquisition_runs ADD COLUMN redaction_json TEXT;
     """,
+    # v17: fractional GPU leases. ``gpu_leases`` becomes one row per
+    # (gpu_index, holder) instead of one row per device, so several
+    # VRAM-sized leases can share a GPU. ``vram_mb IS NULL`` keeps the old
+    # whole-device meaning; free devices simply have no rows.
+    """
+    CREATE TABLE gpu_leases_v17 (
+        gpu_index INTEGER NOT NULL,
+        experiment_id TEXT NOT NULL,
+        vram_mb INTEGER,
+        leased_at TEXT NOT NULL,
+        PRIMARY KEY (gpu_index, experiment_id)
+    );
+    INSERT INTO gpu_leases_v17 (gpu_index, experiment_id, vram_mb, leased_at)
+        SELECT gpu_index, experiment_id, NULL, COALESCE(leased_at, '')
+        FROM gpu_leases WHERE experiment_id IS NOT NULL;
+    DROP TABLE gpu_leases;
+    ALTER TABLE gpu_leases_v17 RENAME TO gpu_leases;
+    CREATE INDEX idx_gpu_leases_holder ON gpu_leases(experiment_id);
+    """,
+    # v18: interconnect quality of the device set a run was placed on
+    # (see scheduler/topology.py). NULL for single-GPU runs and hosts
+    # without topology information.
+    """
+    ALTER TABLE experiments ADD COLUMN placement_score REAL;
+    """,
+    # v19: checkpoint-aware crash recovery. Scheduler start records the
+    # newest complete checkpoint of each interrupted run so the relaunch
+    # resumes from it; ``gpu_seconds_saved`` accumulates the GPU time those
+    # checkpoints preserved across every recovery of the experiment.
+    """
+    ALTER TABLE experiments ADD COLUMN resume_from_checkpoint TEXT;
+    ALTER TABLE experiments ADD COLUMN resumed_from_step INTEGER;
+    ALTER TABLE experiments ADD COLUMN gpu_seconds_saved REAL;
+    """,
+    # v20: priority preemption. How often a run was evicted for a
+    # higher-priority job and the GPU time lost to work after its last
+    # checkpoint.
+    """
+    ALTER TABLE experiments ADD COLUMN preemptions INTEGER NOT NULL DEFAULT 0;
+    ALTER TABLE experiments ADD COLUMN preemption_lost_gpu_seconds REAL;
+    """,
+    # v21: MLflow write outbox (integrations/mlflow_gateway.py). Metric,
+    # param and tag writes plus run termination are queued here in the
+    # caller's transaction and replayed in batches while the tracking
+    # server is reachable. ``value`` is JSON for metrics, text otherwise.
+    """
+    CREATE TABLE mlflow_outbox (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        run_id TEXT NOT NULL,
+        kind TEXT NOT NULL,
+        key TEXT,
+        value TEXT,
+        step INTEGER NOT NULL DEFAULT 0,
+        timestamp_ms INTEGER NOT NULL,
+        attempts INTEGER NOT NULL DEFAULT 0
+    );
+    """,
+    # v22: per-stage throughput and queue depth of the eval pipeline
+    # (evals/runner.py), JSON. NULL for runs that never finished.
+    """
+    ALTER TABLE eval_runs ADD COLUMN pipeline_stats_json TEXT;
+    """,
+    # v23: resumable eval runs. ``samples_done`` advances in the same
+    # transaction as each batch of eval_results rows; a requeued run skips
+    # the samples already written and counts them in ``resumed_samples``.
+    """
+    ALTER TABLE eval_runs ADD COLUMN samples_done INTEGER NOT NULL DEFAULT 0;
+    ALTER TABLE eval_runs ADD COLUMN resumed_samples INTEGER;
+    UPDATE eval_runs SET samples_done =
+        (SELECT COUNT(*) FROM eval_results WHERE eval_results.run_id = eval_runs.id);
+    """,
+    # v24: eval prediction cache (evals/runner.py). ``key`` is a sha256 of
+    # the weights fingerprint, the prompt and the generation parameters,
+    # so re-scoring a model only pays for the metrics.
+    """
+    CREATE TABLE eval_prediction_cache (
+        key TEXT PRIMARY KEY,
+        model_fingerprint TEXT NOT NULL,
+        prediction TEXT NOT NULL,
+        created_at TEXT NOT NULL
+    );
+    CREATE INDEX idx_eval_prediction_cache_model
+        ON eval_prediction_cache(model_fingerprint);
+    """,
 ]
 
 
 class Database:
-    def __init__(self, path: Path) -> None:
+    def __init__(self, path: Path, *, readers: int | None = None) -> None:
         self.path = path
+        self.readers = max(1, readers if readers is not None else settings.db_pool_readers)
+        self._writer: aiosqlite.Connection | None = None
+        self._writer_owner: asyncio.Task | None = None
+        self._idle_readers: list[aiosqlite.Connection] = []
+        self._open_readers = 0
+        # asyncio primitives bind to the loop that first waits on them.
+        # Tests drive one Database from several ``asyncio.run`` calls, so
+        # they are rebuilt whenever the running loop changes; the
+        # connections themselves are loop-agnostic and survive.
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._loop_guard: AsyncIterator[None] | None = None
+        self._writer_lock = asyncio.Lock()
+        self._reader_slots = asyncio.Semaphore(self.readers)
+        self._stats: dict[str, dict[str, float]] = {
+            "writer": _new_stats(),
+            "reader": _new_stats(),
+        }
+        self._connections_opened = 0
+        self._overflow_opened = 0
+        # Group-commit queue for hot writes; shares the writer connection.
+        self.writes = WriteQueue(self)
 
     async def init(self) -> None:
         self.path.parent.mkdir(parents=True, exist_ok=True)
@@ -443,10 +577,153 @@ class Database:
 
     @asynccontextmanager
     async def connect(self) -> AsyncIterator[aiosqlite.Connection]:
-        async with aiosqlite.connect(self.path) as conn:
-            conn.row_factory = aiosqlite.Row
-            await conn.execute("PRAGMA foreign_keys = ON")
-            yield conn
+        """Borrow the writer connection for the duration of the block."""
+        await self._bind_loop()
+        task = asyncio.current_task()
+        if task is not None and task is self._writer_owner:
+            # Nested block in the task that already holds the writer:
+            # waiting on the lock would deadlock on ourselves, so fall
+            # back to a throwaway connection (the pre-pool behaviour).
+            self._overflow_opened += 1
+            conn = await self._open(query_only=False)
+            try:
+                yield conn
+            finally:
+                await conn.close()
+            return
+
+        started = time.monotonic()
+        async with self._writer_lock:
+            _record_wait(self._stats["writer"], time.monotonic() - started)
+            if self._writer is None:
+                self._writer = await self._open(query_only=False)
+            conn = self._writer
+            self._writer_owner = task
+            try:
+                yield conn
+            finally:
+                self._writer_owner = None
+                if not await self._reset(conn):
+                    self._writer = None
+
+    @asynccontextmanager
+    async def read(self) -> AsyncIterator[aiosqlite.Connection]:
+        """Borrow a read-only connection. Writes on it raise ``OperationalError``."""
+        await self._bind_loop()
+        started = time.monotonic()
+        async with self._reader_slots:
+            _record_wait(self._stats["reader"], time.monotonic() - started)
+            if self._idle_readers:
+                conn = self._idle_readers.pop()
+            else:
+                conn = await self._open(query_only=True)
+                self._open_readers += 1
+            try:
+                yield conn
+            finally:
+                if await self._reset(conn):
+                    self._idle_readers.append(conn)
+                else:
+                    self._open_readers -= 1
+
+    async def close(self) -> None:
+        """Commit queued writes, then close every pooled connection.
+
+        The pool reopens lazily on next use.
+        """
+        await self.writes.close()
+        conns = list(self._idle_readers)
+        if self._writer is not None:
+            conns.append(self._writer)
+        self._idle_readers.clear()
+        self._open_readers = 0
+        self._writer = None
+        self._writer_owner = None
+        for conn in conns:
+            try:
+                await conn.close()
+            except Exception:
+                pass
+
+    def pool_stats(self) -> dict[str, Any]:
+        """Connection counts + acquire wait times, for ``GET /system/db``."""
+        out: dict[str, Any] = {
+            "readers_max": self.readers,
+            "readers_open": self._open_readers,
+            "readers_idle": len(self._idle_readers),
+            "writer_open": self._writer is not None,
+            "writer_busy": self._writer_lock.locked(),
+            "connections_opened": self._connections_opened,
+            "overflow_opened": self._overflow_opened,
+        }
+        for role, st in self._stats.items():
+            n = int(st["acquires"])
+            out[role] = {
+                "acquires": n,
+                "waits": int(st["waits"]),
+                "wait_ms_total": round(st["wait_total"] * 1000, 3),
+                "wait_ms_max": round(st["wait_max"] * 1000, 3),
+                "wait_ms_avg": round(st["wait_total"] * 1000 / n, 3) if n else 0.0,
+            }
+        return out
+
+    async def _bind_loop(self) -> None:
+        loop = asyncio.get_running_loop()
+        if loop is self._loop:
+            return
+        # Anything borrowed on the old loop was released (or abandoned)
+        # when that loop shut down.
+        self._loop = loop
+        self._writer_lock = asyncio.Lock()
+        self._writer_owner = None
+        self._reader_slots = asyncio.Semaphore(self.readers)
+        self._open_readers = len(self._idle_readers)
+        # asyncio.run / Runner call ``loop.shutdown_asyncgens()`` before
+        # closing the loop, which finalizes this generator and closes the
+        # pool while the loop can still resolve aiosqlite's futures. That
+        # keeps ``asyncio.run(...)``-per-call users (CLIs, tests) from
+        # leaking connections that would otherwise be torn down by GC on
+        # a dead loop.
+        self._loop_guard = self._close_with_loop()
+        await self._loop_guard.__anext__()
+
+    async def _close_with_loop(self) -> AsyncIterator[None]:
+        try:
+            yield
+        finally:
+            if self._loop is asyncio.get_running_loop():
+                await self.close()
+
+    async def _open(self, *, query_only: bool) -> aiosqlite.Connection:
+        conn = aiosqlite.connect(self.path)
+        # Pooled connections outlive any single ``async with``. Mark the
+        # worker thread daemon so a Database nobody closed (tests, CLIs)
+        # can't hang interpreter exit; SQLite's journal keeps the file
+        # consistent if the thread dies mid-statement.
+        thread = getattr(conn, "_thread", conn)
+        if isinstance(thread, threading.Thread):
+            thread.daemon = True
+        await conn
+        conn.row_factory = aiosqlite.Row
+        await conn.execute("PRAGMA foreign_keys = ON")
+        if query_only:
+            await conn.execute("PRAGMA query_only = ON")
+        self._connections_opened += 1
+        return conn
+
+    @staticmethod
+    async def _reset(conn: aiosqlite.Connection) -> bool:
+        """Roll back a transaction the borrower left open. False = discard."""
+        try:
+            if conn.in_transaction:
+                await conn.rollback()
+            return True
+        except Exception:
+            try:
+                await conn.close()
+            except Exception:
+                pass
+            return False
 
     async def _migrate(self, conn: aiosqlite.Connection) -> None:
         await conn.execute(
@@ -461,3 +738,16 @@ class Database:
                 continue
             await conn.executescript(sql)
             await conn.execute("INSERT INTO schema_version (version) VALUES (?)", (version,))
+
+
+def _new_stats() -> dict[str, float]:
+    return {"acquires": 0, "waits": 0, "wait_total": 0.0, "wait_max": 0.0}
+
+
+def _record_wait(stats: dict[str, float], waited: float) -> None:
+    stats["acquires"] += 1
+    # Sub-millisecond acquires are the uncontended fast path, not a wait.
+    if waited >= 0.001:
+        stats["waits"] += 1
+    stats["wait_total"] += waited
+    stats["wait_max"] = max(stats["wait_max"], waited)
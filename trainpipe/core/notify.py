@@ -0,0 +1,95 @@
+"""In-process notification bus for scheduler wakeups.
+
+State changes that can make a queued experiment dispatchable — a new
+submit, a cancel, a GPU lease released, a training subprocess exiting —
+publish a topic on :data:`bus` *after* their transaction commits. The
+scheduler subscribes and ticks as soon as one arrives instead of sleeping
+out a poll interval; polling stays only as a slow safety net for writers
+outside this process (a second API worker, manual SQL). The SSE log hub
+(:mod:`..api.log_hub`) listens to the same topics, plus
+``EXPERIMENT_STARTED``, to know when an experiment's status changed.
+
+Notifications carry no payload and coalesce: ten submits while the
+scheduler is busy claiming produce one extra tick, not ten. Subscribers
+re-read SQLite, which stays the source of truth.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+
+EXPERIMENT_QUEUED = "experiment.queued"
+EXPERIMENT_CANCELLED = "experiment.cancelled"
+EXPERIMENT_STARTED = "experiment.started"
+LEASE_RELEASED = "gpu.lease_released"
+PROCESS_EXITED = "process.exited"
+
+
+class Subscription:
+    """One subscriber's coalesced view of the topics it asked for."""
+
+    def __init__(self, bus: NotificationBus, topics: frozenset[str]) -> None:
+        self._bus = bus
+        self.topics = topics
+        self._loop = asyncio.get_running_loop()
+        self._event = asyncio.Event()
+        self._fired: set[str] = set()
+
+    def notify(self, topic: str) -> None:
+        """Mark ``topic`` as fired and wake the waiter. Thread-safe."""
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is self._loop:
+            self._fired.add(topic)
+            self._event.set()
+        elif not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self.notify, topic)
+
+    async def wait(self, timeout: float | None = None) -> set[str]:
+        """Block until something fires or ``timeout`` elapses.
+
+        Returns the topics fired since the last call (empty on timeout).
+        """
+        if not self._event.is_set():
+            try:
+                await asyncio.wait_for(self._event.wait(), timeout=timeout)
+            except asyncio.TimeoutError:
+                pass
+        self._event.clear()
+        fired, self._fired = self._fired, set()
+        return fired
+
+    def close(self) -> None:
+        self._bus._unsubscribe(self)
+
+
+class NotificationBus:
+    def __init__(self) -> None:
+        self._subs: list[Subscription] = []
+        self._lock = threading.Lock()
+        self.published: dict[str, int] = {}
+
+    def subscribe(self, *topics: str) -> Subscription:
+        """Subscribe the running event loop to ``topics``."""
+        sub = Subscription(self, frozenset(topics))
+        with self._lock:
+            self._subs.append(sub)
+        return sub
+
+    def publish(self, topic: str) -> None:
+        with self._lock:
+            self.published[topic] = self.published.get(topic, 0) + 1
+            subs = [s for s in self._subs if topic in s.topics]
+        for sub in subs:
+            sub.notify(topic)
+
+    def _unsubscribe(self, sub: Subscription) -> None:
+        with self._lock:
+            if sub in self._subs:
+                self._subs.remove(sub)
+
+
+bus = NotificationBus()
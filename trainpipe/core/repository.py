@@ -43,6 +43,7 @@ from ..api.schemas import (
     StudyStatus,
     Watch,
 )
+from . import notify
 
 
 def utcnow() -> datetime:
@@ -86,6 +87,12 @@ def _row_to_experiment_record(row: aiosqlite.Row) -> ExperimentRecord:
         gpu_seconds=_maybe_get("gpu_seconds"),
         peak_vram_mb=_maybe_get("peak_vram_mb"),
         energy_wh=_maybe_get("energy_wh"),
+        placement_score=_maybe_get("placement_score"),
+        resume_from_checkpoint=_maybe_get("resume_from_checkpoint"),
+        resumed_from_step=_maybe_get("resumed_from_step"),
+        gpu_seconds_saved=_maybe_get("gpu_seconds_saved"),
+        preemptions=_maybe_get("preemptions") or 0,
+        preemption_lost_gpu_seconds=_maybe_get("preemption_lost_gpu_seconds"),
     )
 
 
@@ -134,8 +141,13 @@ async def set_experiment_resource_usage(
     gpu_seconds: float | None = None,
     peak_vram_mb: float | None = None,
     energy_wh: float | None = None,
+    commit: bool = True,
 ) -> None:
-    """Write Phase 20 cost columns. NULL inputs leave the column alone."""
+    """Write Phase 20 cost columns. NULL inputs leave the column alone.
+
+    ``commit=False`` leaves the write in the caller's transaction (use it
+    from :class:`~trainpipe.core.write_queue.WriteQueue` ops).
+    """
     fields: list[str] = []
     args: list[Any] = []
     if gpu_seconds is not None:
@@ -154,7 +166,20 @@ async def set_experiment_resource_usage(
         f"UPDATE experiments SET {', '.join(fields)} WHERE id = ?",
         args,
     )
-    await conn.commit()
+    if commit:
+        await conn.commit()
+
+
+async def touch_experiment_heartbeat(
+    conn: aiosqlite.Connection, experiment_id: str, *, commit: bool = True
+) -> None:
+    """Bump ``last_heartbeat_at`` on a running experiment."""
+    await conn.execute(
+        "UPDATE experiments SET last_heartbeat_at = ? WHERE id = ? AND status = 'running'",
+        (utcnow_iso(), experiment_id),
+    )
+    if commit:
+        await conn.commit()
 
 
 async def create_experiment(
@@ -185,6 +210,7 @@ async def create_experiment(
         (experiment_id, study_id, "{}", now),
     )
     await conn.commit()
+    notify.bus.publish(notify.EXPERIMENT_QUEUED)
     return experiment_id
 
 
@@ -238,6 +264,7 @@ async def request_cancel(conn: aiosqlite.Connection, experiment_id: str) -> str:
             (now, experiment_id),
         )
         await conn.commit()
+        notify.bus.publish(notify.EXPERIMENT_CANCELLED)
         return "cancelled"
     if status == ExperimentStatus.RUNNING.value:
         return "running"
@@ -603,6 +630,11 @@ def _row_to_eval_run(row: aiosqlite.Row) -> EvalRun:
         error=row["error"],
         aggregate=aggregate,
         sample_count=row["sample_count"],
+        samples_done=row["samples_done"],
+        resumed_samples=row["resumed_samples"],
+        pipeline_stats=(
+            json.loads(row["pipeline_stats_json"]) if row["pipeline_stats_json"] else None
+        ),
         triggered_by=row["triggered_by"],
         created_at=datetime.fromisoformat(row["created_at"]),
         started_at=datetime.fromisoformat(row["started_at"]) if row["started_at"] else None,
@@ -676,6 +708,19 @@ async def list_eval_runs(
     return [_row_to_eval_run(r) for r in rows]
 
 
+async def latest_completed_eval_run(
+    conn: aiosqlite.Connection, *, suite_id: str, experiment_id: str
+) -> EvalRun | None:
+    """The experiment's most recently finished completed run of the suite."""
+    cur = await conn.execute(
+        "SELECT * FROM eval_runs WHERE suite_id = ? AND experiment_id = ? "
+        "AND status = 'completed' ORDER BY finished_at DESC LIMIT 1",
+        (suite_id, experiment_id),
+    )
+    row = await cur.fetchone()
+    return _row_to_eval_run(row) if row else None
+
+
 async def claim_eval_run(conn: aiosqlite.Connection, run_id: str) -> bool:
     """Atomically flip a queued eval run to 'running'. Returns False if it
     was already taken or cancelled."""
@@ -697,6 +742,7 @@ async def update_eval_run_progress(
     log_path: str | None = None,
     pid: int | None = None,
     sample_count: int | None = None,
+    resumed_samples: int | None = None,
 ) -> None:
     fields: list[str] = []
     args: list[Any] = []
@@ -712,6 +758,9 @@ async def update_eval_run_progress(
     if sample_count is not None:
         fields.append("sample_count = ?")
         args.append(sample_count)
+    if resumed_samples is not None:
+        fields.append("resumed_samples = ?")
+        args.append(resumed_samples)
     if not fields:
         return
     args.append(run_id)
@@ -729,6 +778,7 @@ async def finalize_eval_run(
     aggregate: dict[str, MetricAggregate] | None = None,
     sample_count: int | None = None,
     error: str | None = None,
+    pipeline_stats: dict[str, Any] | None = None,
 ) -> None:
     aggregate_json = (
         json.dumps({k: v.model_dump() for k, v in aggregate.items()})
@@ -737,13 +787,15 @@ async def finalize_eval_run(
     )
     await conn.execute(
         "UPDATE eval_runs SET status = ?, finished_at = ?, aggregate_json = ?, "
-        "sample_count = COALESCE(?, sample_count), error = ? WHERE id = ?",
+        "sample_count = COALESCE(?, sample_count), error = ?, "
+        "pipeline_stats_json = COALESCE(?, pipeline_stats_json) WHERE id = ?",
         (
             status.value,
             utcnow_iso(),
             aggregate_json,
             sample_count,
             error,
+            json.dumps(pipeline_stats) if pipeline_stats is not None else None,
             run_id,
         ),
     )
@@ -800,7 +852,9 @@ async def add_eval_result(
     gold: dict[str, Any] | None,
     scores: dict[str, float],
     error: str | None = None,
+    commit: bool = True,
 ) -> int:
+    """Insert one per-sample result. ``commit=False`` for WriteQueue ops."""
     cur = await conn.execute(
         "INSERT INTO eval_results (run_id, sample_index, input_json, prediction, "
         "gold_json, scores_json, error, created_at) "
@@ -816,10 +870,114 @@ async def add_eval_result(
             utcnow_iso(),
         ),
     )
-    await conn.commit()
+    if commit:
+        await conn.commit()
     return cur.lastrowid
 
 
+async def add_eval_results(
+    conn: aiosqlite.Connection,
+    *,
+    run_id: str,
+    rows: list[dict[str, Any]],
+    commit: bool = True,
+) -> None:
+    """Insert a batch of per-sample results in one statement and advance
+    the run's ``samples_done`` checkpoint in the same transaction.
+
+    Each row carries the keyword arguments of :func:`add_eval_result`
+    (``sample_index``, ``input``, ``prediction``, ``gold``, ``scores``,
+    ``error``). ``commit=False`` for WriteQueue ops.
+    """
+    now = utcnow_iso()
+    await conn.executemany(
+        "INSERT INTO eval_results (run_id, sample_index, input_json, prediction, "
+        "gold_json, scores_json, error, created_at) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+        [
+            (
+                run_id,
+                row["sample_index"],
+                json.dumps(row["input"]),
+                row["prediction"],
+                json.dumps(row["gold"]) if row.get("gold") is not None else None,
+                json.dumps(row["scores"]),
+                row.get("error"),
+                now,
+            )
+            for row in rows
+        ],
+    )
+    await conn.execute(
+        "UPDATE eval_runs SET samples_done = samples_done + ? WHERE id = ?",
+        (len(rows), run_id),
+    )
+    if commit:
+        await conn.commit()
+
+
+async def eval_result_scores(
+    conn: aiosqlite.Connection, run_id: str
+) -> dict[int, dict[str, float]]:
+    """Scores of every persisted result of ``run_id`` by sample index —
+    the checkpoint an interrupted eval run resumes from."""
+    cur = await conn.execute(
+        "SELECT sample_index, scores_json FROM eval_results WHERE run_id = ?",
+        (run_id,),
+    )
+    return {row[0]: json.loads(row[1]) for row in await cur.fetchall()}
+
+
+async def cached_predictions(
+    conn: aiosqlite.Connection, keys: list[str]
+) -> dict[str, str]:
+    """Predictions already in the eval prediction cache, by cache key."""
+    out: dict[str, str] = {}
+    # Chunked to stay under SQLite's bound-parameter limit.
+    for start in range(0, len(keys), 500):
+        chunk = keys[start : start + 500]
+        cur = await conn.execute(
+            "SELECT key, prediction FROM eval_prediction_cache "
+            f"WHERE key IN ({','.join('?' * len(chunk))})",
+            chunk,
+        )
+        out.update({row[0]: row[1] for row in await cur.fetchall()})
+    return out
+
+
+async def put_cached_predictions(
+    conn: aiosqlite.Connection,
+    *,
+    model_fingerprint: str,
+    entries: list[tuple[str, str]],
+    commit: bool = True,
+) -> None:
+    """Store ``(key, prediction)`` pairs; an existing key keeps its value."""
+    now = utcnow_iso()
+    await conn.executemany(
+        "INSERT OR IGNORE INTO eval_prediction_cache "
+        "(key, model_fingerprint, prediction, created_at) VALUES (?, ?, ?, ?)",
+        [(key, model_fingerprint, prediction, now) for key, prediction in entries],
+    )
+    if commit:
+        await conn.commit()
+
+
+async def purge_prediction_cache(
+    conn: aiosqlite.Connection, model_fingerprint: str | None = None
+) -> int:
+    """Drop cached predictions of one model (or all). Returns rows removed."""
+    if model_fingerprint is None:
+        cur = await conn.execute("DELETE FROM eval_prediction_cache")
+    else:
+        cur = await conn.execute(
+            "DELETE FROM eval_prediction_cache WHERE model_fingerprint = ?",
+            (model_fingerprint,),
+        )
+    await conn.commit()
+    return cur.rowcount
+
+
 async def list_eval_results(
     conn: aiosqlite.Connection,
     run_id: str,
@@ -844,6 +1002,97 @@ async def count_eval_results(conn: aiosqlite.Connection, run_id: str) -> int:
     return int(row[0]) if row else 0
 
 
+# Score differences at or below this are ties (float noise, not a change).
+_SCORE_TIE_EPS = 1e-9
+
+
+async def compare_eval_scores(
+    conn: aiosqlite.Connection, baseline_id: str, run_ids: list[str]
+) -> dict[str, dict[str, dict[str, float | int]]]:
+    """Each run in ``run_ids`` against ``baseline_id``, per metric, over
+    the samples both scored: ``{run_id: {metric: {paired, mean_delta,
+    wins, losses, ties}}}`` (``mean_delta`` is run minus baseline).
+
+    Joined on ``sample_index`` in SQLite, so no result rows are loaded.
+    """
+    if not run_ids:
+        return {}
+    marks = ",".join("?" * len(run_ids))
+    cur = await conn.execute(
+        f"""
+        SELECT o.run_id, oj.key,
+               COUNT(*),
+               AVG(oj.value - bj.value),
+               SUM(oj.value - bj.value > ?),
+               SUM(oj.value - bj.value < -?)
+        FROM eval_results AS o
+        JOIN eval_results AS b
+            ON b.run_id = ? AND b.sample_index = o.sample_index
+        JOIN json_each(o.scores_json) AS oj
+        JOIN json_each(b.scores_json) AS bj ON bj.key = oj.key
+        WHERE o.run_id IN ({marks})
+        GROUP BY o.run_id, oj.key
+        """,
+        (_SCORE_TIE_EPS, _SCORE_TIE_EPS, baseline_id, *run_ids),
+    )
+    out: dict[str, dict[str, dict[str, float | int]]] = {}
+    for run_id, metric, paired, mean_delta, wins, losses in await cur.fetchall():
+        out.setdefault(run_id, {})[metric] = {
+            "paired": paired,
+            "mean_delta": mean_delta,
+            "wins": wins,
+            "losses": losses,
+            "ties": paired - wins - losses,
+        }
+    return out
+
+
+async def list_diverging_samples(
+    conn: aiosqlite.Connection, run_ids: list[str], *, limit: int, offset: int
+) -> tuple[list[int], int]:
+    """Sample indices (ascending, paginated) where at least two of
+    ``run_ids`` disagree on some metric, and how many there are."""
+    marks = ",".join("?" * len(run_ids))
+    diverging = f"""
+        SELECT DISTINCT sample_index FROM (
+            SELECT r.sample_index
+            FROM eval_results AS r, json_each(r.scores_json) AS j
+            WHERE r.run_id IN ({marks})
+            GROUP BY r.sample_index, j.key
+            HAVING COUNT(*) >= 2 AND MAX(j.value) - MIN(j.value) > ?
+        )
+    """
+    params = (*run_ids, _SCORE_TIE_EPS)
+    cur = await conn.execute(
+        f"SELECT sample_index, COUNT(*) OVER () FROM ({diverging}) "
+        "ORDER BY sample_index LIMIT ? OFFSET ?",
+        (*params, limit, offset),
+    )
+    rows = await cur.fetchall()
+    if rows:
+        return [r[0] for r in rows], rows[0][1]
+    # Past the last page: the window total came back with no rows.
+    cur = await conn.execute(f"SELECT COUNT(*) FROM ({diverging})", params)
+    row = await cur.fetchone()
+    return [], int(row[0]) if row else 0
+
+
+async def list_eval_results_for_samples(
+    conn: aiosqlite.Connection, run_ids: list[str], sample_indices: list[int]
+) -> list[EvalResult]:
+    """The rows of ``run_ids`` at ``sample_indices``."""
+    if not run_ids or not sample_indices:
+        return []
+    run_marks = ",".join("?" * len(run_ids))
+    sample_marks = ",".join("?" * len(sample_indices))
+    cur = await conn.execute(
+        f"SELECT * FROM eval_results WHERE run_id IN ({run_marks}) "
+        f"AND sample_index IN ({sample_marks}) ORDER BY sample_index",
+        (*run_ids, *sample_indices),
+    )
+    return [_row_to_eval_result(r) for r in await cur.fetchall()]
+
+
 # ---------------------------------------------------------------------------
 # Model registry (Phase 7)
 # ---------------------------------------------------------------------------
@@ -1379,6 +1628,7 @@ async def enqueue_stage_with_experiment(
         except aiosqlite.Error:
             pass
         raise
+    notify.bus.publish(notify.EXPERIMENT_QUEUED)
     return experiment_id
 
 
@@ -1866,8 +2116,10 @@ async def delete_model(conn: aiosqlite.Connection, model_id: str) -> bool:
 async def recover_eval_runs(conn: aiosqlite.Connection) -> int:
     """Requeue 'running' eval runs on scheduler start (crash recovery).
 
-    Mirrors the experiment recovery in scheduler.start(). Returns the
-    number of rows touched.
+    Mirrors the experiment recovery in scheduler.start(). Result rows
+    already written stay; the re-claimed run skips those samples and
+    reuses their scores (see ``EvalDriver``). Returns the number of rows
+    touched.
     """
     now = utcnow_iso()
     cur = await conn.execute(
@@ -0,0 +1,232 @@
+"""Group-commit write queue for high-frequency repository writes.
+
+Every ``conn.commit()`` is its own WAL transaction, and since the pool
+(see :mod:`.db`) has a single writer connection they serialize. Hot
+paths — per-sample eval results, event rows, resource samples — instead
+hand the queue a small *op* (``async def op(conn) -> Any``); every op that
+arrives within ``delay`` (or until ``max_batch`` is reached) runs inside
+one transaction that is committed once.
+
+Two ways to submit:
+
+* :meth:`WriteQueue.enqueue` — write-behind. Returns a future that
+  resolves once the op's batch has committed (or carries the op's
+  exception). Callers that need to read their own writes call
+  :meth:`WriteQueue.flush` first.
+* :meth:`WriteQueue.execute` — durable. Cuts the batching window short
+  and returns the op's result only after it is committed. Use it for
+  status transitions that a crash must not lose.
+
+Each op runs under its own SAVEPOINT, so one failing op (a UNIQUE
+violation, say) rolls back alone and the rest of the batch still commits.
+Ops must not commit themselves — pass ``commit=False`` to repository
+helpers that take it.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections.abc import Awaitable, Callable
+from typing import TYPE_CHECKING, Any
+
+import aiosqlite
+
+from ..settings import settings
+
+if TYPE_CHECKING:
+    from .db import Database
+
+logger = logging.getLogger(__name__)
+
+WriteOp = Callable[[aiosqlite.Connection], Awaitable[Any]]
+
+
+class WriteQueue:
+    """Batches writes from many callers into one transaction per window."""
+
+    def __init__(
+        self,
+        db: Database,
+        *,
+        delay_sec: float | None = None,
+        max_batch: int | None = None,
+    ) -> None:
+        self.db = db
+        self.delay_sec = (
+            settings.write_queue_delay_ms / 1000.0 if delay_sec is None else delay_sec
+        )
+        self.max_batch = max(1, max_batch or settings.write_queue_max_batch)
+        self._pending: list[tuple[WriteOp, asyncio.Future]] = []
+        self._inflight: list[tuple[WriteOp, asyncio.Future]] = []
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._task: asyncio.Task | None = None
+        self._wakeup = asyncio.Event()
+        self._urgent = asyncio.Event()
+        self._stats = {
+            "batches": 0,
+            "ops": 0,
+            "failed_ops": 0,
+            "durable_ops": 0,
+            "batch_size_max": 0,
+            "commit_sec_total": 0.0,
+            "commit_sec_max": 0.0,
+        }
+
+    async def enqueue(self, op: WriteOp) -> asyncio.Future:
+        """Queue ``op`` for the next batch. Returns its completion future."""
+        self._ensure_running()
+        assert self._loop is not None
+        fut = self._loop.create_future()
+        fut.add_done_callback(_log_failure)
+        self._pending.append((op, fut))
+        if len(self._pending) >= self.max_batch:
+            self._urgent.set()
+        self._wakeup.set()
+        return fut
+
+    async def execute(self, op: WriteOp) -> Any:
+        """Run ``op`` in the next batch, commit it now, and return its result."""
+        fut = await self.enqueue(op)
+        self._stats["durable_ops"] += 1
+        self._urgent.set()
+        return await fut
+
+    async def flush(self) -> None:
+        """Wait until everything queued before this call is committed.
+
+        Never raises for failed ops; inspect the futures ``enqueue``
+        returned for that.
+        """
+        if self._loop is not asyncio.get_running_loop():
+            return
+        tail = self._pending or self._inflight
+        if not tail:
+            return
+        self._ensure_running()
+        self._urgent.set()
+        # Batches commit in FIFO order, so the newest op finishing implies
+        # every earlier one has too.
+        await asyncio.wait([tail[-1][1]])
+
+    async def close(self) -> None:
+        """Stop the background task, committing whatever is still queued."""
+        if self._loop is not asyncio.get_running_loop():
+            self._pending.clear()
+            return
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+        while self._pending:
+            batch = self._pending[: self.max_batch]
+            del self._pending[: len(batch)]
+            await self._commit(batch)
+
+    def stats(self) -> dict[str, Any]:
+        """Batch-size and commit-latency counters, for ``GET /system/db``."""
+        st = self._stats
+        batches = st["batches"]
+        return {
+            "pending": len(self._pending),
+            "batches": batches,
+            "ops": st["ops"],
+            "failed_ops": st["failed_ops"],
+            "durable_ops": st["durable_ops"],
+            "batch_size_avg": round(st["ops"] / batches, 2) if batches else 0.0,
+            "batch_size_max": st["batch_size_max"],
+            "commit_ms_avg": (
+                round(st["commit_sec_total"] * 1000 / batches, 3) if batches else 0.0
+            ),
+            "commit_ms_max": round(st["commit_sec_max"] * 1000, 3),
+        }
+
+    def _ensure_running(self) -> None:
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            # Futures from a previous loop can't be resolved any more;
+            # Database drains the queue when that loop shuts down.
+            self._loop = loop
+            self._pending.clear()
+            self._inflight = []
+            self._wakeup = asyncio.Event()
+            self._urgent = asyncio.Event()
+            self._task = None
+        if self._task is None or self._task.done():
+            self._task = loop.create_task(self._run(), name="trainpipe-write-queue")
+
+    async def _run(self) -> None:
+        while True:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+            if not self._pending:
+                continue
+            if not self._urgent.is_set() and self.delay_sec > 0:
+                try:
+                    await asyncio.wait_for(self._urgent.wait(), timeout=self.delay_sec)
+                except asyncio.TimeoutError:
+                    pass
+            self._urgent.clear()
+            batch = self._pending[: self.max_batch]
+            del self._pending[: len(batch)]
+            self._inflight = batch
+            try:
+                await self._commit(batch)
+            except asyncio.CancelledError:
+                # The writer rolled the half-done batch back on release;
+                # put it back in front so close() can still commit it.
+                self._pending[:0] = [item for item in batch if not item[1].done()]
+                raise
+            finally:
+                self._inflight = []
+            if self._pending:
+                self._wakeup.set()
+
+    async def _commit(self, batch: list[tuple[WriteOp, asyncio.Future]]) -> None:
+        started = time.monotonic()
+        outcomes: list[tuple[bool, Any]] = []
+        try:
+            async with self.db.connect() as conn:
+                await conn.execute("BEGIN")
+                for op, _fut in batch:
+                    await conn.execute("SAVEPOINT write_queue_op")
+                    try:
+                        outcomes.append((True, await op(conn)))
+                    except Exception as e:
+                        await conn.execute("ROLLBACK TO write_queue_op")
+                        outcomes.append((False, e))
+                    await conn.execute("RELEASE write_queue_op")
+                await conn.commit()
+        except Exception as e:
+            logger.exception("write queue batch of %d failed to commit", len(batch))
+            outcomes = [(False, e)] * len(batch)
+        elapsed = time.monotonic() - started
+
+        st = self._stats
+        st["batches"] += 1
+        st["ops"] += len(batch)
+        st["batch_size_max"] = max(st["batch_size_max"], len(batch))
+        st["commit_sec_total"] += elapsed
+        st["commit_sec_max"] = max(st["commit_sec_max"], elapsed)
+        for (_op, fut), (ok, value) in zip(batch, outcomes, strict=True):
+            if fut.done():
+                continue
+            if ok:
+                fut.set_result(value)
+            else:
+                st["failed_ops"] += 1
+                fut.set_exception(value)
+
+
+def _log_failure(fut: asyncio.Future) -> None:
+    # Retrieving the exception here also keeps asyncio from warning about
+    # write-behind futures nobody awaited.
+    if fut.cancelled():
+        return
+    exc = fut.exception()
+    if exc is not None:
+        logger.warning("queued write failed: %s", exc)
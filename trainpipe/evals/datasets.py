@@ -0,0 +1,228 @@
+"""Streaming readers for eval suite datasets.
+
+An eval suite's ``dataset_path`` is a file path, optionally with the
+``#N`` sub-sample suffix that :func:`~trainpipe.training.dataset_refs.resolve_single`
+preserves. :class:`EvalDataset` reads it lazily so a suite's memory cost
+doesn't grow with its size:
+
+* JSONL / CSV / TSV are read line by line;
+* Parquet is read in record batches via ``pyarrow`` (row group by row
+  group, never the whole table);
+* a JSON array has to be parsed whole — use JSONL for big suites.
+
+``#N`` picks N rows uniformly at random with a fixed seed, so a requeued
+run sees the same samples at the same indices. It costs one counting pass
+and N integers of memory, not N samples. ``sample_limit`` then takes the
+first rows of that selection.
+"""
+
+import csv
+import json
+import random
+import re
+from collections.abc import Callable, Iterable, Iterator
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+# Only a ``#`` in the last path component starts the suffix; directories
+# may contain ``#``.
+_SUBSAMPLE = re.compile(r"^(?P<path>.*)#(?P<n>[^/]*)$")
+# ms-swift samples ``dataset#N`` with seed 42 too.
+SUBSAMPLE_SEED = 42
+_PARQUET_BATCH_ROWS = 1024
+
+
+class DatasetReadError(RuntimeError):
+    """Raised when the suite's dataset can't be loaded."""
+
+
+@dataclass(frozen=True)
+class EvalDataset:
+    """A suite's dataset, iterated lazily as sample dicts."""
+
+    path: Path
+    subsample: int | None = None
+    limit: int | None = None
+
+    @classmethod
+    def from_ref(cls, ref: str | Path, limit: int | None = None) -> "EvalDataset":
+        """Parse ``path[#N]``. Raises :class:`DatasetReadError` on a bad
+        suffix or an unsupported extension (the file isn't opened)."""
+        raw = str(ref)
+        subsample: int | None = None
+        m = _SUBSAMPLE.match(raw)
+        if m:
+            if not m["n"].isdigit() or int(m["n"]) < 1:
+                raise DatasetReadError(
+                    f"bad sub-sample suffix '#{m['n']}' (expected '#N' with N >= 1)"
+                )
+            raw, subsample = m["path"], int(m["n"])
+        dataset = cls(Path(raw), subsample, limit)
+        dataset._reader()
+        return dataset
+
+    def count(self) -> int:
+        """Number of samples :meth:`__iter__` yields. Streams the file
+        once (Parquet reads only its footer)."""
+        if self.subsample is None and self.limit is not None:
+            # Stop counting at the limit.
+            return sum(1 for _ in self._rows())
+        total = self._count_raw()
+        if self.subsample is not None:
+            total = min(total, self.subsample)
+        if self.limit is not None:
+            total = min(total, self.limit)
+        return total
+
+    def __iter__(self) -> Iterator[dict[str, Any]]:
+        return self._rows()
+
+    def windows(self, size: int) -> Iterator[list[tuple[int, dict[str, Any]]]]:
+        """``(sample_index, sample)`` pairs in chunks of up to ``size``."""
+        window: list[tuple[int, dict[str, Any]]] = []
+        for item in enumerate(self._rows()):
+            window.append(item)
+            if len(window) >= size:
+                yield window
+                window = []
+        if window:
+            yield window
+
+    def _rows(self) -> Iterator[dict[str, Any]]:
+        rows = self._reader()(self.path)
+        chosen = self._chosen()
+        if chosen is not None:
+            rows = _pick(rows, chosen)
+        return _take(rows, self.limit)
+
+    def _chosen(self) -> list[int] | None:
+        """Sorted row positions picked by ``#N``; ``None`` keeps every row."""
+        if self.subsample is None:
+            return None
+        total = self._count_raw()
+        if self.subsample >= total:
+            return None
+        return sorted(random.Random(SUBSAMPLE_SEED).sample(range(total), self.subsample))
+
+    def _count_raw(self) -> int:
+        path = self.path
+        if path.suffix.lower() == ".parquet":
+            pq = _pyarrow_parquet()
+            try:
+                return pq.ParquetFile(str(path)).metadata.num_rows
+            except OSError as e:
+                raise DatasetReadError(f"failed to open dataset {path}: {e}") from None
+            except Exception as e:
+                raise DatasetReadError(f"parquet dataset {path} is unreadable: {e}") from None
+        return sum(1 for _ in self._reader()(self.path))
+
+    def _reader(self) -> Callable[[Path], Iterator[dict[str, Any]]]:
+        suffix = self.path.suffix.lower().lstrip(".")
+        if suffix in ("jsonl", "ndjson"):
+            return _iter_jsonl
+        if suffix == "json":
+            return _iter_json
+        if suffix == "csv":
+            return lambda path: _iter_delimited(path, ",")
+        if suffix == "tsv":
+            return lambda path: _iter_delimited(path, "\t")
+        if suffix == "parquet":
+            return _iter_parquet
+        raise DatasetReadError(
+            f"unsupported eval-dataset extension '.{suffix}' "
+            "(need jsonl/json/csv/tsv/parquet)"
+        )
+
+
+def _iter_jsonl(path: Path) -> Iterator[dict[str, Any]]:
+    try:
+        f = path.open("r", encoding="utf-8")
+    except OSError as e:
+        raise DatasetReadError(f"failed to open dataset {path}: {e}") from None
+    with f:
+        for lineno, raw in enumerate(f, start=1):
+            line = raw.strip()
+            if not line:
+                continue
+            try:
+                obj = json.loads(line)
+            except json.JSONDecodeError as e:
+                raise DatasetReadError(
+                    f"jsonl line {lineno} not valid JSON: {e}"
+                ) from None
+            if not isinstance(obj, dict):
+                raise DatasetReadError(
+                    f"jsonl line {lineno} must decode to an object, got {type(obj).__name__}"
+                )
+            yield obj
+
+
+def _iter_json(path: Path) -> Iterator[dict[str, Any]]:
+    try:
+        with path.open("r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, json.JSONDecodeError) as e:
+        raise DatasetReadError(f"failed to load json dataset {path}: {e}") from None
+    if not isinstance(data, list):
+        raise DatasetReadError("json dataset must be a list of records")
+    return (d for d in data if isinstance(d, dict))
+
+
+def _iter_delimited(path: Path, delim: str) -> Iterator[dict[str, Any]]:
+    try:
+        f = path.open("r", encoding="utf-8", newline="")
+    except OSError as e:
+        raise DatasetReadError(f"failed to open dataset {path}: {e}") from None
+    with f:
+        reader = csv.DictReader(f, delimiter=delim)
+        for row in reader:
+            yield dict(row)
+
+
+def _iter_parquet(path: Path) -> Iterator[dict[str, Any]]:
+    pq = _pyarrow_parquet()
+    try:
+        batches = pq.ParquetFile(str(path)).iter_batches(batch_size=_PARQUET_BATCH_ROWS)
+        for batch in batches:
+            yield from batch.to_pylist()
+    except OSError as e:
+        raise DatasetReadError(f"failed to open dataset {path}: {e}") from None
+    except Exception as e:
+        raise DatasetReadError(f"parquet dataset {path} is unreadable: {e}") from None
+
+
+def _pyarrow_parquet():
+    try:
+        import pyarrow.parquet as pq  # type: ignore[import-not-found]
+    except ImportError as e:
+        raise DatasetReadError(
+            "parquet eval datasets require pyarrow (the [parquet] extra) "
+            "but it isn't installed"
+        ) from e
+    return pq
+
+
+def _pick(rows: Iterable[dict[str, Any]], chosen: list[int]) -> Iterator[dict[str, Any]]:
+    """Rows at the sorted positions ``chosen``, in file order."""
+    if not chosen:
+        return
+    it = iter(chosen)
+    want = next(it)
+    for pos, row in enumerate(rows):
+        if pos != want:
+            continue
+        yield row
+        want = next(it, None)
+        if want is None:
+            return
+
+
+def _take(it: Iterable[dict[str, Any]], limit: int | None) -> Iterator[dict[str, Any]]:
+    if limit is None:
+        yield from it
+        return
+    for i, item in enumerate(it):
+        if i >= limit:
+            return
+        yield item
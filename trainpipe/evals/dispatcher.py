@@ -6,9 +6,27 @@ no MLflow run is created, no subprocess is spawned (the inference backend
 runs in-process).
 
 Crash recovery: on start, any ``'running'`` rows are flipped back to
-``'queued'`` so the dispatcher re-claims them after restart. GPU leases
+``'queued'`` so the dispatcher re-claims them after restart; the driver
+then resumes from the samples not yet persisted. GPU leases
 are released by the shared :meth:`GpuPool.sync_leases` call in the
 :class:`Scheduler` startup, which now exempts running eval_runs.
+
+Sharding: a suite with ``inference_params.shards = N`` claims up to N
+leases of ``gpus_per_run`` GPUs (at least one; extra shards only if they
+fit right now) and gets one backend per lease. The driver splits the
+samples between them by index and merges the results.
+
+Model residency: with the process-wide :class:`ModelResidency` (shared
+with the inference playground), shard 0 borrows its model from there
+instead of loading a private copy. A model a run loads stays resident
+for ``eval_model_keepalive_sec`` and keeps the shard's GPU lease, handed
+to the holder ``resident:<run id>`` and released when the residency
+closes the model. The next run on the same weights rides on that lease
+instead of claiming a GPU; a run on other weights that finds no free GPU
+first evicts the idle models earlier runs left resident. The dispatcher
+registers the same eviction as the ``resident:`` reclaimer of the
+:class:`GpuPool`, so a queued training job that only lacks those GPUs gets
+them too. Extra shards always load their own copy on their own GPU.
 """
 
 import asyncio
@@ -16,9 +34,16 @@ import logging
 from collections.abc import Callable
 from pathlib import Path
 
-from ..api.schemas import EvalRun, EvalRunStatus, EvalSuite, ExperimentSpec
+from ..api.schemas import (
+    EvalRun,
+    EvalRunStatus,
+    EvalSuite,
+    ExperimentSpec,
+    InferenceParams,
+)
 from ..core import repository
 from ..core.db import Database
+from ..inference.residency import ModelKey, ModelResidency, ResidentBackend
 from ..scheduler.gpu_pool import GpuPool
 from ..settings import settings
 from .inference import (
@@ -33,6 +58,14 @@ logger = logging.getLogger(__name__)
 
 BackendFactory = Callable[[EvalRun, EvalSuite], InferenceBackend]
 
+# Lease holder prefix of models a run left resident.
+_RESIDENT = "resident:"
+
+
+def _shard_holder(run_id: str, shard: int) -> str:
+    """Lease holder id of one shard; shard 0 holds under the run id."""
+    return run_id if shard == 0 else f"{run_id}#{shard}"
+
 
 def _default_backend_factory(
     base_model: str | None,
@@ -66,9 +99,11 @@ class EvalDispatcher:
         backend_factory: BackendFactory | None = None,
         gpus_per_run: int = 1,
         poll_interval_sec: float | None = None,
+        residency: ModelResidency | None = None,
     ) -> None:
         self.db = db
         self.gpu_pool = gpu_pool
+        self.residency = residency
         self._backend_factory = backend_factory or self._default_factory
         self._gpus_per_run = max(0, gpus_per_run)
         self._poll = poll_interval_sec or settings.poll_interval_sec
@@ -76,6 +111,13 @@ class EvalDispatcher:
         self._main_task: asyncio.Task | None = None
         self._active: dict[str, asyncio.Task] = {}
         self._dispatch_lock = asyncio.Lock()
+        # Resident models a run loaded on leased GPUs -> those GPUs.
+        self._resident_gpus: dict[ModelKey, list[int]] = {}
+        # Runs claimed onto a resident model: the pin that keeps it loaded
+        # until the run's own backend borrows it.
+        self._claim_pins: dict[str, tuple[ModelKey, InferenceBackend]] = {}
+        if residency is not None:
+            gpu_pool.reclaimers[_RESIDENT] = self._evict_idle
 
     async def start(self) -> None:
         async with self.db.connect() as conn:
@@ -88,6 +130,8 @@ class EvalDispatcher:
 
     async def stop(self) -> None:
         self._stop.set()
+        if self.gpu_pool.reclaimers.get(_RESIDENT) == self._evict_idle:
+            del self.gpu_pool.reclaimers[_RESIDENT]
         if self._main_task is not None:
             try:
                 await self._main_task
@@ -118,47 +162,113 @@ class EvalDispatcher:
             claimed = await self._claim_next()
             if claimed is None:
                 return
-            run_id, gpu_indices = claimed
+            run_id, shard_gpus = claimed
             task = asyncio.create_task(
-                self._run_one(run_id, gpu_indices),
+                self._run_one(run_id, shard_gpus),
                 name=f"trainpipe-eval-run-{run_id}",
             )
             self._active[run_id] = task
             task.add_done_callback(lambda t, rid=run_id: self._active.pop(rid, None))
 
-    async def _claim_next(self) -> tuple[str, list[int]] | None:
+    async def _claim_next(self) -> tuple[str, list[list[int]]] | None:
         async with self._dispatch_lock:
             async with self.db.connect() as conn:
                 cur = await conn.execute(
-                    "SELECT id FROM eval_runs WHERE status = 'queued' "
-                    "ORDER BY created_at ASC LIMIT 1"
+                    "SELECT r.id, s.inference_params_json FROM eval_runs r "
+                    "LEFT JOIN eval_suites s ON s.id = r.suite_id "
+                    "WHERE r.status = 'queued' "
+                    "ORDER BY r.created_at ASC LIMIT 1"
                 )
                 row = await cur.fetchone()
                 if row is None:
                     return None
                 run_id = row[0]
+                # A suite that declares vram_mb gets a fractional lease and
+                # can share a GPU with other small jobs.
+                params = InferenceParams.model_validate_json(row[1]) if row[1] else None
+                vram_mb = params.vram_mb if params else None
+                shards = params.shards if params else 1
 
-                gpu_indices: list[int] = []
+                shard_gpus: list[list[int]] = []
+                resident_gpus: list[int] = []
                 if self._gpus_per_run > 0 and self.gpu_pool.total > 0:
-                    allocated = await self.gpu_pool.try_allocate(
-                        conn, self._gpus_per_run, run_id
-                    )
-                    if allocated is None:
+                    resident_gpus = await self._pin_resident(conn, run_id)
+                    for shard in range(shards):
+                        if shard == 0 and run_id in self._claim_pins:
+                            shard_gpus.append([])
+                            continue
+                        allocated = await self._allocate(
+                            conn, _shard_holder(run_id, shard), vram_mb, evict=shard == 0
+                        )
+                        if allocated is None:
+                            break
+                        shard_gpus.append(allocated)
+                    if not shard_gpus:
                         return None
-                    gpu_indices = allocated
+                else:
+                    shard_gpus = [[] for _ in range(shards)]
 
                 claimed = await repository.claim_eval_run(conn, run_id)
                 if not claimed:
-                    if gpu_indices:
-                        await self.gpu_pool.release(conn, run_id)
+                    await self._release(conn, run_id, shard_gpus)
+                    await self._unpin(run_id)
                     return None
-                if gpu_indices:
-                    await repository.update_eval_run_progress(
-                        conn, run_id, gpu_ids=gpu_indices
-                    )
-                return run_id, gpu_indices
+                gpu_ids = [*resident_gpus, *(i for gpus in shard_gpus for i in gpus)]
+                if gpu_ids:
+                    await repository.update_eval_run_progress(conn, run_id, gpu_ids=gpu_ids)
+                return run_id, shard_gpus
+
+    async def _pin_resident(self, conn, run_id: str) -> list[int]:
+        """Pin the run's model if an earlier run left it resident on leased
+        GPUs (shard 0 then needs no lease of its own); returns those GPUs."""
+        if self.residency is None or not self._resident_gpus:
+            return []
+        run = await repository.get_eval_run(conn, run_id)
+        suite = await repository.get_eval_suite(conn, run.suite_id) if run else None
+        if suite is None:
+            return []
+        base_model = await self._resolve_base_model(conn, run)
+        key = self._build_backend(run, suite, base_model, []).model_key()
+        if key is None or key not in self._resident_gpus:
+            return []
+        backend = await self.residency.pin(key)
+        if backend is None:
+            return []
+        self._claim_pins[run_id] = (key, backend)
+        return self._resident_gpus[key]
+
+    async def _unpin(self, run_id: str) -> None:
+        pinned = self._claim_pins.pop(run_id, None)
+        if pinned is not None and self.residency is not None:
+            await self.residency.release(*pinned)
+
+    async def _allocate(
+        self, conn, holder: str, vram_mb: int | None, *, evict: bool
+    ) -> list[int] | None:
+        allocated = await self.gpu_pool.try_allocate(
+            conn, self._gpus_per_run, holder, vram_mb=vram_mb
+        )
+        if allocated is None and evict:
+            # Idle models earlier runs left resident may hold the GPUs.
+            if await self._evict_idle():
+                allocated = await self.gpu_pool.try_allocate(
+                    conn, self._gpus_per_run, holder, vram_mb=vram_mb
+                )
+        return allocated
 
-    async def _run_one(self, run_id: str, gpu_indices: list[int]) -> None:
+    async def _evict_idle(self) -> int:
+        """Close the idle models earlier runs left resident; their leases
+        go with them. Returns how many were closed."""
+        if self.residency is None or not self._resident_gpus:
+            return 0
+        return await self.residency.evict_idle(set(self._resident_gpus))
+
+    async def _release(self, conn, run_id: str, shard_gpus: list[list[int]]) -> None:
+        for shard, gpus in enumerate(shard_gpus):
+            if gpus:
+                await self.gpu_pool.release(conn, _shard_holder(run_id, shard))
+
+    async def _run_one(self, run_id: str, shard_gpus: list[list[int]]) -> None:
         try:
             async with self.db.connect() as conn:
                 run = await repository.get_eval_run(conn, run_id)
@@ -177,21 +287,70 @@ class EvalDispatcher:
                     )
                 return
 
-            backend = self._backend_factory(run, suite)
-            if isinstance(backend, TransformersInferenceBackend):
-                # Production default needs late-bound GPU + model info.
-                backend.gpu_indices = gpu_indices
-                if base_model and not backend.base_model:
-                    backend.base_model = base_model
+            backends = [
+                self._build_backend(run, suite, base_model, gpu_indices)
+                for gpu_indices in shard_gpus
+            ]
+            backends[0] = self._resident(run_id, backends[0], shard_gpus[0])
 
             driver = EvalDriver(
-                db=self.db, run=run, suite=suite, backend=backend,
+                db=self.db, run=run, suite=suite, backends=backends,
             )
             await driver.execute()
         finally:
-            if gpu_indices:
+            await self._unpin(run_id)
+            if any(shard_gpus):
                 async with self.db.connect() as conn:
-                    await self.gpu_pool.release(conn, run_id)
+                    await self._release(conn, run_id, shard_gpus)
+
+    def _build_backend(
+        self,
+        run: EvalRun,
+        suite: EvalSuite,
+        base_model: str | None,
+        gpu_indices: list[int],
+    ) -> InferenceBackend:
+        backend = self._backend_factory(run, suite)
+        if isinstance(backend, TransformersInferenceBackend):
+            # Production default needs late-bound GPU + model info.
+            backend.gpu_indices = gpu_indices
+            if base_model and not backend.base_model:
+                backend.base_model = base_model
+        return backend
+
+    def _resident(
+        self, run_id: str, backend: InferenceBackend, gpu_indices: list[int]
+    ) -> InferenceBackend:
+        """Shard 0's backend, borrowed from the residency when it has a
+        ``model_key``."""
+        key = backend.model_key()
+        if self.residency is None or key is None:
+            return backend
+        holder = f"{_RESIDENT}{run_id}"
+
+        async def on_load() -> None:
+            if not gpu_indices:
+                return
+            async with self.db.connect() as conn:
+                await self.gpu_pool.transfer(conn, run_id, holder)
+            self._resident_gpus[key] = gpu_indices
+
+        async def on_close() -> None:
+            if not gpu_indices:
+                return
+            if self._resident_gpus.get(key) is gpu_indices:
+                del self._resident_gpus[key]
+            async with self.db.connect() as conn:
+                await self.gpu_pool.release(conn, holder)
+
+        return ResidentBackend(
+            self.residency,
+            key,
+            backend,
+            keep_idle_sec=settings.eval_model_keepalive_sec,
+            on_load=on_load,
+            on_close=on_close,
+        )
 
     async def _resolve_base_model(self, conn, run: EvalRun) -> str | None:
         if not run.experiment_id:
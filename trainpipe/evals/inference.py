@@ -1,21 +1,32 @@
 """Inference backends for the eval runner.
 
 Architecture: the runner doesn't care *how* predictions are produced — it
-just needs ``predict(sample, params) -> str``. The concrete backend is
-swapped per-deployment:
+just needs ``predict(sample, params) -> str``, or ``predict_batch`` for
+``InferenceParams.batch_size`` samples at once (the base class falls back
+to one ``predict`` per sample). The concrete backend is swapped
+per-deployment:
 
 * :class:`TransformersInferenceBackend` — production default. Loads the
   base model + LoRA adapter via Hugging Face ``transformers`` and ``peft``
-  and generates greedy/sampled text. Lazy-imports the heavy deps so the
-  trainpipe API still boots without ``torch`` available.
+  and generates greedy/sampled text, one left-padded ``generate`` call
+  per batch. Lazy-imports the heavy deps so the trainpipe API still boots
+  without ``torch`` available.
 * :class:`MockInferenceBackend` — for tests. Maps prompt-derived keys to
   canned responses; no model load, no network.
 
+A backend that can name the exact weights it serves (``fingerprint``)
+lets the runner reuse predictions from the prediction cache; one that
+returns ``None`` is always asked. One that names what it loads
+(``model_key``) can share its loaded model with the inference playground
+and later eval runs through a
+:class:`~trainpipe.inference.residency.ModelResidency`.
+
 Adding a new backend (e.g. swift CLI, vLLM, sglang) means subclassing
 :class:`InferenceBackend` and wiring it in via the dispatcher's
 ``backend_factory``.
 """
 
+import hashlib
 import logging
 from abc import ABC, abstractmethod
 from collections.abc import Callable
@@ -53,9 +64,78 @@ def default_prompt_extractor(sample: dict[str, Any]) -> str:
     )
 
 
+def length_buckets(
+    samples: list[dict[str, Any]],
+    batch_size: int,
+    extractor: PromptExtractor = default_prompt_extractor,
+) -> list[list[int]]:
+    """Group sample indices into batches of similar prompt length.
+
+    Indices are sorted by prompt length (characters, a cheap stand-in for
+    tokens) and cut into runs of ``batch_size``, so a padded batch wastes
+    little compute on padding. Samples without a prompt sort first; the
+    backend reports their error per sample. ``batch_size`` 1 keeps the
+    dataset order.
+    """
+    if batch_size <= 1:
+        return [[i] for i in range(len(samples))]
+
+    def length(i: int) -> int:
+        try:
+            return len(extractor(samples[i]))
+        except ValueError:
+            return 0
+
+    order = sorted(range(len(samples)), key=length)
+    return [order[i : i + batch_size] for i in range(0, len(order), batch_size)]
+
+
+# Files ``from_pretrained`` reads from a model / adapter directory. Sub-
+# directories (intermediate checkpoints) and logs don't change the weights.
+_WEIGHT_SUFFIXES = frozenset(
+    {".safetensors", ".bin", ".pt", ".pth", ".json", ".model", ".tiktoken"}
+)
+_fingerprints: dict[tuple, str] = {}
+
+
+def weights_fingerprint(path: Path) -> str:
+    """sha256 over the weight, config and tokenizer files of a model or
+    adapter directory (or of a single weights file).
+
+    Content-addressed, so a retrained adapter written to the same path
+    gets a new fingerprint. Hashing a base model is slow, so results are
+    memoized per process on each file's name, size and mtime.
+    """
+    if path.is_file():
+        files = [path]
+    else:
+        files = sorted(
+            f for f in path.iterdir() if f.is_file() and f.suffix in _WEIGHT_SUFFIXES
+        )
+    stats = [(f.name, f.stat()) for f in files]
+    signature = (
+        str(path.resolve()),
+        *((name, st.st_size, st.st_mtime_ns) for name, st in stats),
+    )
+    cached = _fingerprints.get(signature)
+    if cached is not None:
+        return cached
+    sha = hashlib.sha256()
+    for f in files:
+        sha.update(f.name.encode() + b"\0")
+        with f.open("rb") as fh:
+            while chunk := fh.read(1 << 20):
+                sha.update(chunk)
+        sha.update(b"\0")
+    _fingerprints[signature] = digest = sha.hexdigest()
+    return digest
+
+
 class InferenceBackend(ABC):
     """Stateful: ``open`` loads the model, ``predict`` per sample, ``close`` frees."""
 
+    _extractor: PromptExtractor = staticmethod(default_prompt_extractor)
+
     @abstractmethod
     async def open(self) -> None: ...
 
@@ -64,16 +144,42 @@ class InferenceBackend(ABC):
         self, sample: dict[str, Any], params: InferenceParams
     ) -> str: ...
 
+    async def predict_batch(
+        self, samples: list[dict[str, Any]], params: InferenceParams
+    ) -> list[str]:
+        """One prediction per sample, in order. Raises if any sample fails;
+        callers retry the batch sample by sample to attribute the error."""
+        return [await self.predict(sample, params) for sample in samples]
+
     @abstractmethod
     async def close(self) -> None: ...
 
+    async def fingerprint(self) -> str | None:
+        """Identity of the weights this backend serves, for the prediction
+        cache; ``None`` (the default) opts out of caching. Called before
+        ``open``."""
+        return None
+
+    def model_key(self) -> tuple[str, str | None] | None:
+        """``(base_model, adapter_path)`` this backend loads, under which
+        a model residency shares it; ``None`` (the default) always loads
+        a private copy."""
+        return None
+
+    def prompt_of(self, sample: dict[str, Any]) -> str:
+        """The prompt the backend would generate from (``ValueError`` if
+        the sample has none)."""
+        return self._extractor(sample)
+
 
 class MockInferenceBackend(InferenceBackend):
     """Returns canned responses for tests.
 
     Configure either with ``responses_by_key`` (lookup keyed by the
     extracted prompt) or ``response_fn`` (full programmatic control).
-    A missing key falls back to ``default_response``.
+    A missing key falls back to ``default_response``. Predictions are
+    only cached when a ``fingerprint`` is given, and the backend is only
+    shared through a model residency under a ``model_key``.
     """
 
     def __init__(
@@ -83,12 +189,17 @@ class MockInferenceBackend(InferenceBackend):
         response_fn: Callable[[dict[str, Any], InferenceParams], str] | None = None,
         default_response: str = "",
         prompt_extractor: PromptExtractor = default_prompt_extractor,
+        fingerprint: str | None = None,
+        model_key: tuple[str, str | None] | None = None,
     ) -> None:
         self._by_key = dict(responses_by_key or {})
+        self._model_key = model_key
         self._fn = response_fn
         self._default = default_response
         self._extractor = prompt_extractor
+        self._fingerprint = fingerprint
         self.predict_calls: list[dict[str, Any]] = []
+        self.batch_sizes: list[int] = []
         self._opened = False
         self._closed = False
 
@@ -99,6 +210,16 @@ class MockInferenceBackend(InferenceBackend):
         self, sample: dict[str, Any], params: InferenceParams
     ) -> str:
         self.predict_calls.append({"sample": sample, "params": params})
+        return self._respond(sample, params)
+
+    async def predict_batch(
+        self, samples: list[dict[str, Any]], params: InferenceParams
+    ) -> list[str]:
+        self.batch_sizes.append(len(samples))
+        self.predict_calls.extend({"sample": s, "params": params} for s in samples)
+        return [self._respond(s, params) for s in samples]
+
+    def _respond(self, sample: dict[str, Any], params: InferenceParams) -> str:
         if self._fn is not None:
             return self._fn(sample, params)
         try:
@@ -110,6 +231,12 @@ class MockInferenceBackend(InferenceBackend):
     async def close(self) -> None:
         self._closed = True
 
+    async def fingerprint(self) -> str | None:
+        return self._fingerprint
+
+    def model_key(self) -> tuple[str, str | None] | None:
+        return self._model_key
+
 
 class TransformersInferenceBackend(InferenceBackend):
     """Loads base + LoRA adapter via HF transformers + peft.
@@ -140,6 +267,25 @@ class TransformersInferenceBackend(InferenceBackend):
 
         await asyncio.to_thread(self._open_sync)
 
+    async def fingerprint(self) -> str | None:
+        import asyncio
+
+        return await asyncio.to_thread(self._fingerprint_sync)
+
+    def _fingerprint_sync(self) -> str:
+        # A local base model is hashed like the adapter; a hub id stands
+        # for itself (pin a revision by downloading it to a local path).
+        base = Path(self.base_model)
+        parts = [
+            weights_fingerprint(base) if base.exists() else f"hub:{self.base_model}",
+            weights_fingerprint(self.adapter_path) if self.adapter_path else "no-adapter",
+        ]
+        return hashlib.sha256("\n".join(parts).encode()).hexdigest()
+
+    def model_key(self) -> tuple[str, str | None]:
+        # Same shape as the inference service's ModelRef.cache_key.
+        return self.base_model, str(self.adapter_path) if self.adapter_path else None
+
     def _open_sync(self) -> None:
         import os
 
@@ -149,19 +295,27 @@ class TransformersInferenceBackend(InferenceBackend):
             AutoTokenizer,
         )
 
-        if self.gpu_indices:
+        device_map: str | dict[str, str] | None = None
+        if len(self.gpu_indices) == 1:
+            # Pin to the leased card by index: CUDA_VISIBLE_DEVICES is read
+            # once per process, so it can't keep the backends of several
+            # eval shards apart.
+            self._device = f"cuda:{self.gpu_indices[0]}"
+            device_map = {"": self._device}
+        elif self.gpu_indices:
             os.environ["CUDA_VISIBLE_DEVICES"] = ",".join(
                 str(i) for i in self.gpu_indices
             )
             self._device = "cuda"
+            device_map = "auto"
         else:
             self._device = "cpu"
 
         self._tokenizer = AutoTokenizer.from_pretrained(self.base_model)
         model = AutoModelForCausalLM.from_pretrained(
             self.base_model,
-            torch_dtype=torch.float16 if self._device == "cuda" else torch.float32,
-            device_map="auto" if self._device == "cuda" else None,
+            torch_dtype=torch.float16 if device_map is not None else torch.float32,
+            device_map=device_map,
         )
 
         if self.adapter_path is not None:
@@ -176,20 +330,33 @@ class TransformersInferenceBackend(InferenceBackend):
     ) -> str:
         import asyncio
 
-        return await asyncio.to_thread(self._predict_sync, sample, params)
+        return (await asyncio.to_thread(self._generate_sync, [sample], params))[0]
 
-    def _predict_sync(
-        self, sample: dict[str, Any], params: InferenceParams
-    ) -> str:
+    async def predict_batch(
+        self, samples: list[dict[str, Any]], params: InferenceParams
+    ) -> list[str]:
+        import asyncio
+
+        return await asyncio.to_thread(self._generate_sync, samples, params)
+
+    def _generate_sync(
+        self, samples: list[dict[str, Any]], params: InferenceParams
+    ) -> list[str]:
         import torch  # type: ignore[import-not-found]
 
         if self._model is None or self._tokenizer is None:
             raise RuntimeError("backend not opened")
 
-        prompt = self._extractor(sample)
-        inputs = self._tokenizer(prompt, return_tensors="pt")
-        if self._device == "cuda":
-            inputs = {k: v.to("cuda") for k, v in inputs.items()}
+        prompts = [self._extractor(sample) for sample in samples]
+        # Decoder-only models continue from the right edge of the prompt,
+        # so a batch is padded on the left and every row's new tokens
+        # start at the same column.
+        self._tokenizer.padding_side = "left"
+        if self._tokenizer.pad_token is None:
+            self._tokenizer.pad_token = self._tokenizer.eos_token
+        inputs = self._tokenizer(prompts, return_tensors="pt", padding=True)
+        if self._device != "cpu":
+            inputs = {k: v.to(self._device) for k, v in inputs.items()}
 
         do_sample = params.temperature > 0
         with torch.no_grad():
@@ -199,11 +366,10 @@ class TransformersInferenceBackend(InferenceBackend):
                 do_sample=do_sample,
                 temperature=params.temperature if do_sample else 1.0,
                 top_p=params.top_p,
-                pad_token_id=self._tokenizer.eos_token_id,
+                pad_token_id=self._tokenizer.pad_token_id,
             )
         prompt_len = inputs["input_ids"].shape[1]
-        new_tokens = out[0][prompt_len:]
-        return self._tokenizer.decode(new_tokens, skip_special_tokens=True)
+        return self._tokenizer.batch_decode(out[:, prompt_len:], skip_special_tokens=True)
 
     async def close(self) -> None:
         import asyncio
@@ -216,7 +382,7 @@ class TransformersInferenceBackend(InferenceBackend):
 
             del self._model
             self._model = None
-            if self._device == "cuda":
+            if self._device and self._device != "cpu":
                 torch.cuda.empty_cache()
         except Exception:
             logger.exception("error closing TransformersInferenceBackend")
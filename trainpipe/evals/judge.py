@@ -0,0 +1,387 @@
+"""Async engine behind the ``llm_as_judge`` metric.
+
+Metrics score synchronously on the eval runner's scoring threads, so the
+engine runs its own event loop on a daemon thread and
+:meth:`JudgeEngine.judge` blocks the calling thread while a whole batch
+is judged concurrently:
+
+* one persistent ``httpx.AsyncClient`` per provider endpoint, shared by
+  every judge in the process, so requests reuse warm connections;
+* at most ``concurrency`` requests in flight per judge and, optionally, a
+  token bucket of ``requests_per_minute`` (bursts up to ``concurrency``);
+* retries with exponential backoff on 429 / 5xx / network errors,
+  honouring ``Retry-After``. Other 4xx (bad key, bad model) aren't
+  retried;
+* a SQLite cache under ``data_dir`` keyed by provider, model, system
+  prompt and the rendered prompt (rubric, prediction and reference), so
+  a re-run or another suite asking the same question doesn't pay twice.
+
+Providers are called over their HTTP APIs like
+:mod:`trainpipe.synth.runner` does; no SDK needed. ``ANTHROPIC_BASE_URL``
+/ ``OPENAI_BASE_URL`` (or the metric's ``base_url``) point them at a
+proxy or a compatible server.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections.abc import Callable
+from datetime import datetime, timezone
+from pathlib import Path
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+_DEFAULT_BASE_URLS = {
+    "anthropic": ("ANTHROPIC_BASE_URL", "https://api.anthropic.com"),
+    "openai": ("OPENAI_BASE_URL", "https://api.openai.com"),
+}
+_API_KEY_ENV = {"anthropic": "ANTHROPIC_API_KEY", "openai": "OPENAI_API_KEY"}
+_MAX_TOKENS = 256
+_BACKOFF_BASE_SEC = 1.0
+_MAX_BACKOFF_SEC = 60.0
+
+
+class JudgeHTTPError(RuntimeError):
+    """The judge endpoint answered with an HTTP error."""
+
+    def __init__(self, status: int, body: str, retry_after: float | None = None) -> None:
+        super().__init__(f"HTTP {status}: {body[:512]}")
+        self.status = status
+        self.retry_after = retry_after
+
+    @property
+    def retriable(self) -> bool:
+        return self.status == 429 or 500 <= self.status < 600
+
+
+class TokenBucket:
+    """``rate`` tokens per second, at most ``capacity`` banked; each
+    :meth:`acquire` takes one, waiting for it if the bucket is empty."""
+
+    def __init__(self, rate: float, capacity: float) -> None:
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(
+                    self.capacity, self._tokens + (now - self._updated) * self.rate
+                )
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+class JudgeCache:
+    """Judge scores on disk, keyed by :func:`cache_key`.
+
+    Only the engine's loop thread touches the connection; WAL and a busy
+    timeout let several trainpipe processes share the file.
+    """
+
+    def __init__(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(
+            path, isolation_level=None, check_same_thread=False, timeout=30.0
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS judgments (
+                key TEXT PRIMARY KEY,
+                model TEXT NOT NULL,
+                score REAL NOT NULL,
+                created_at TEXT NOT NULL
+            )
+            """
+        )
+
+    def get_many(self, keys: list[str]) -> dict[str, float]:
+        found: dict[str, float] = {}
+        unique = list(dict.fromkeys(keys))
+        for start in range(0, len(unique), 500):
+            chunk = unique[start : start + 500]
+            marks = ",".join("?" * len(chunk))
+            found.update(
+                self._conn.execute(
+                    f"SELECT key, score FROM judgments WHERE key IN ({marks})", chunk
+                ).fetchall()
+            )
+        return found
+
+    def put(self, key: str, model: str, score: float) -> None:
+        self._conn.execute(
+            "INSERT OR REPLACE INTO judgments (key, model, score, created_at) "
+            "VALUES (?, ?, ?, ?)",
+            (key, model, score, datetime.now(timezone.utc).isoformat()),
+        )
+
+    def close(self) -> None:
+        self._conn.close()
+
+
+def cache_key(provider: str, model: str, system_prompt: str, prompt: str) -> str:
+    """Everything the judgment depends on: the rendered prompt carries the
+    rubric (criteria, scale, examples, output field), the prediction and
+    the reference."""
+    payload = json.dumps([provider, model, system_prompt, prompt], ensure_ascii=False)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+# The loop, its HTTP clients and the caches are process-wide; judges
+# (one per metric instance) only own their limits.
+_loop: asyncio.AbstractEventLoop | None = None
+_clients: dict[tuple[str, str, str], httpx.AsyncClient] = {}
+_caches: dict[Path, JudgeCache] = {}
+_lock = threading.Lock()
+
+
+def _engine_loop() -> asyncio.AbstractEventLoop:
+    global _loop
+    with _lock:
+        if _loop is None:
+            loop = asyncio.new_event_loop()
+            threading.Thread(
+                target=loop.run_forever, name="trainpipe-judge", daemon=True
+            ).start()
+            _loop = loop
+        return _loop
+
+
+def open_cache(path: Path) -> JudgeCache:
+    """The process's cache for ``path`` (opened on first use)."""
+    with _lock:
+        cache = _caches.get(path)
+        if cache is None:
+            cache = _caches[path] = JudgeCache(path)
+        return cache
+
+
+def close() -> None:
+    """Close the shared HTTP clients and caches; the next judgment reopens
+    them. Called on app shutdown."""
+    with _lock:
+        loop, clients = _loop, list(_clients.values())
+        _clients.clear()
+        caches = list(_caches.values())
+        _caches.clear()
+    if loop is not None and clients:
+        asyncio.run_coroutine_threadsafe(
+            _close_clients(clients), loop
+        ).result(timeout=10)
+    for cache in caches:
+        cache.close()
+
+
+async def _close_clients(clients: list[httpx.AsyncClient]) -> None:
+    for client in clients:
+        await client.aclose()
+
+
+def _client(provider: str, base_url: str, api_key: str) -> httpx.AsyncClient:
+    # Only called on the engine loop, which is the only user of the dict
+    # apart from close().
+    key = (provider, base_url, api_key)
+    client = _clients.get(key)
+    if client is None:
+        if provider == "anthropic":
+            headers = {"x-api-key": api_key, "anthropic-version": "2023-06-01"}
+        else:
+            headers = {"Authorization": f"Bearer {api_key}"}
+        client = _clients[key] = httpx.AsyncClient(
+            base_url=base_url,
+            headers={**headers, "content-type": "application/json"},
+            timeout=httpx.Timeout(60.0, connect=10.0),
+        )
+    return client
+
+
+class JudgeEngine:
+    """Judges prompts for one metric: its provider, model and limits.
+
+    ``cache_path`` enables the disk cache. ``call`` replaces the HTTP
+    request (tests); it bypasses the cache too.
+    """
+
+    def __init__(
+        self,
+        *,
+        provider: str,
+        model: str,
+        system_prompt: str,
+        max_retries: int = 2,
+        concurrency: int = 8,
+        requests_per_minute: float = 0.0,
+        base_url: str | None = None,
+        cache_path: Path | None = None,
+        call: Callable[[str], str] | None = None,
+    ) -> None:
+        self.provider = provider
+        self.model = model
+        self.system_prompt = system_prompt
+        self.max_retries = max_retries
+        self.concurrency = concurrency
+        self.requests_per_minute = requests_per_minute
+        self.base_url = base_url
+        self.cache_path = cache_path if call is None else None
+        self._call = call
+        self._limits: tuple[asyncio.Semaphore, TokenBucket | None] | None = None
+
+    def judge(
+        self, prompts: list[str], parse: Callable[[str], float]
+    ) -> list[float | None]:
+        """``parse`` of the judge's reply to each prompt, or ``None`` where
+        the judge failed after retries. Blocks the calling thread; must not
+        be called from the engine loop itself. Raises ``RuntimeError`` if
+        the provider's API key isn't set."""
+        if self._call is None and not os.environ.get(_API_KEY_ENV[self.provider]):
+            raise RuntimeError(
+                f"{_API_KEY_ENV[self.provider]} must be set to use llm_as_judge "
+                f"with provider={self.provider}"
+            )
+        future = asyncio.run_coroutine_threadsafe(
+            self._judge_all(prompts, parse), _engine_loop()
+        )
+        return future.result()
+
+    async def _judge_all(
+        self, prompts: list[str], parse: Callable[[str], float]
+    ) -> list[float | None]:
+        keys = [
+            cache_key(self.provider, self.model, self.system_prompt, p) for p in prompts
+        ]
+        cache = open_cache(self.cache_path) if self.cache_path is not None else None
+        cached = cache.get_many(keys) if cache is not None else {}
+        # Duplicate prompts within a batch are asked once.
+        pending = {
+            key: prompt
+            for key, prompt in zip(keys, prompts, strict=True)
+            if key not in cached
+        }
+        results = await asyncio.gather(
+            *(
+                self._judge_one(prompt, key, parse, cache)
+                for key, prompt in pending.items()
+            )
+        )
+        judged = dict(zip(pending, results, strict=True))
+        return [cached[key] if key in cached else judged[key] for key in keys]
+
+    async def _judge_one(
+        self,
+        prompt: str,
+        key: str,
+        parse: Callable[[str], float],
+        cache: JudgeCache | None,
+    ) -> float | None:
+        semaphore, bucket = self._limiters()
+        last_err: Exception | None = None
+        for attempt in range(self.max_retries + 1):
+            try:
+                async with semaphore:
+                    if bucket is not None:
+                        await bucket.acquire()
+                    reply = await self._send(prompt)
+                score = parse(reply)
+            except JudgeHTTPError as e:
+                last_err = e
+                if not e.retriable:
+                    break
+                delay = e.retry_after
+                if delay is None:
+                    delay = _BACKOFF_BASE_SEC * 2**attempt
+            except httpx.TransportError as e:
+                last_err = e
+                delay = _BACKOFF_BASE_SEC * 2**attempt
+            except Exception as e:
+                # Unparseable replies are retried straight away.
+                last_err = e
+                delay = 0.0
+            else:
+                if cache is not None:
+                    cache.put(key, self.model, score)
+                return score
+            logger.warning(
+                "llm_as_judge attempt %d/%d failed: %s",
+                attempt + 1,
+                self.max_retries + 1,
+                last_err,
+            )
+            if attempt < self.max_retries and delay > 0:
+                await asyncio.sleep(min(delay, _MAX_BACKOFF_SEC))
+        logger.error("llm_as_judge giving up: %s", last_err)
+        return None
+
+    def _limiters(self) -> tuple[asyncio.Semaphore, TokenBucket | None]:
+        # Created on first use so they belong to the engine loop.
+        if self._limits is None:
+            bucket = None
+            if self.requests_per_minute > 0:
+                bucket = TokenBucket(self.requests_per_minute / 60.0, self.concurrency)
+            self._limits = (asyncio.Semaphore(self.concurrency), bucket)
+        return self._limits
+
+    async def _send(self, prompt: str) -> str:
+        if self._call is not None:
+            return await asyncio.to_thread(self._call, prompt)
+        api_key = os.environ.get(_API_KEY_ENV[self.provider], "")
+        url_env, url_default = _DEFAULT_BASE_URLS[self.provider]
+        base_url = self.base_url or os.environ.get(url_env, url_default)
+        client = _client(self.provider, base_url, api_key)
+        if self.provider == "anthropic":
+            resp = await client.post(
+                "/v1/messages",
+                json={
+                    "model": self.model,
+                    "max_tokens": _MAX_TOKENS,
+                    "system": self.system_prompt,
+                    "messages": [{"role": "user", "content": prompt}],
+                },
+            )
+        else:
+            resp = await client.post(
+                "/v1/chat/completions",
+                json={
+                    "model": self.model,
+                    "max_tokens": _MAX_TOKENS,
+                    "messages": [
+                        {"role": "system", "content": self.system_prompt},
+                        {"role": "user", "content": prompt},
+                    ],
+                },
+            )
+        if resp.is_error:
+            raise JudgeHTTPError(resp.status_code, resp.text, _retry_after(resp))
+        body = resp.json()
+        if self.provider == "anthropic":
+            # Text blocks only (ignores tool_use blocks).
+            return "".join(
+                b.get("text", "") for b in body.get("content") or [] if b.get("type") == "text"
+            )
+        choices = body.get("choices") or []
+        if not choices:
+            return ""
+        return choices[0].get("message", {}).get("content", "") or ""
+
+
+def _retry_after(resp: httpx.Response) -> float | None:
+    try:
+        return max(0.0, float(resp.headers["retry-after"]))
+    except (KeyError, ValueError):
+        return None
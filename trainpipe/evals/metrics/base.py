@@ -5,6 +5,8 @@ from math import sqrt
 from typing import Any, ClassVar
 
 from ...api.schemas import MetricAggregate
+from ...settings import settings
+from ..stats import bootstrap_ci
 
 _REGISTRY: dict[str, type["Metric"]] = {}
 
@@ -49,6 +51,10 @@ class Metric(ABC):
     2. Implement :meth:`score`, returning a float per sample. Higher is
        better by default — see ``higher_is_better`` for exceptions.
 
+    The eval runner scores whole batches through :meth:`score_batch`,
+    which loops over :meth:`score` unless a metric overrides it to share
+    work across the batch (parse config once, cache references, numpy).
+
     Config validation (optional) goes in :meth:`_validate_config`, which
     runs in ``__init__`` so misconfigured metrics fail at suite-creation
     time rather than mid-eval.
@@ -69,8 +75,24 @@ class Metric(ABC):
     def score(self, prediction: str, sample: dict[str, Any]) -> float:
         """Score one prediction against the sample's gold data."""
 
+    def score_batch(
+        self, predictions: list[str], samples: list[dict[str, Any]]
+    ) -> list[float]:
+        """Score a batch; one float per prediction, equal to what
+        :meth:`score` returns for it.
+
+        If this raises, the runner rescores the batch sample by sample so
+        the error lands on the sample that caused it.
+        """
+        return [
+            self.score(prediction, sample)
+            for prediction, sample in zip(predictions, samples, strict=True)
+        ]
+
     def aggregate(self, scores: list[float]) -> MetricAggregate:
-        """Mean + sample-std over per-sample scores.
+        """Mean + sample-std over per-sample scores, and a bootstrap
+        interval of the mean (``settings.eval_bootstrap_resamples``
+        resamples at ``settings.eval_ci_level``; skipped when 0).
 
         Subclasses can override to include extras (e.g. per-class breakdown
         for classification metrics) in :class:`MetricAggregate.extras`.
@@ -84,4 +106,11 @@ class Metric(ABC):
             std = sqrt(var)
         else:
             std = 0.0
-        return MetricAggregate(mean=mean, std=std, count=n)
+        ci_low = ci_high = None
+        if settings.eval_bootstrap_resamples > 0:
+            ci_low, ci_high = bootstrap_ci(
+                scores,
+                level=settings.eval_ci_level,
+                resamples=settings.eval_bootstrap_resamples,
+            )
+        return MetricAggregate(mean=mean, std=std, count=n, ci_low=ci_low, ci_high=ci_high)
@@ -25,6 +25,10 @@ Config:
 * ``iou_threshold`` (float, default 0.5).
 * ``label_strict`` (bool, default True) — if True and both sides supply a
   ``label``, mismatched labels disqualify the match even at high IoU.
+
+``score_batch`` computes every pred x gold IoU of the batch in one pass
+with numpy when it's installed (same float ops, same results); without
+it the pairs are computed in Python.
 """
 
 import json
@@ -55,28 +59,150 @@ def _box_of(item: Any) -> tuple[list[float], str | None] | None:
 
 
 def _iou(a: list[float], b: list[float]) -> float:
-    ax1, ay1, ax2, ay2 = a
-    bx1, by1, bx2, by2 = b
-    # Tolerate reversed coords.
-    ax1, ax2 = sorted((ax1, ax2))
-    ay1, ay2 = sorted((ay1, ay2))
-    bx1, bx2 = sorted((bx1, bx2))
-    by1, by2 = sorted((by1, by2))
-    ix1 = max(ax1, bx1)
-    iy1 = max(ay1, by1)
-    ix2 = min(ax2, bx2)
-    iy2 = min(ay2, by2)
-    iw = max(0.0, ix2 - ix1)
-    ih = max(0.0, iy2 - iy1)
+    # Tolerates reversed coords.
+    return _prepared_iou(_prepared(a), _prepared(b))
+
+
+_Prepared = tuple[float, float, float, float, float]
+_Parsed = tuple[list[_Prepared], list[str | None], list[_Prepared], list[str | None]]
+
+# Below this many pairs per batch, numpy's per-call overhead costs more
+# than it saves.
+_NUMPY_MIN_PAIRS = 256
+
+
+def _prepared(box: list[float]) -> _Prepared:
+    """``(x1, y1, x2, y2, area)`` with corners ordered, as :func:`_iou` sees them."""
+    x1, y1, x2, y2 = box
+    x1, x2 = sorted((x1, x2))
+    y1, y2 = sorted((y1, y2))
+    return x1, y1, x2, y2, max(0.0, x2 - x1) * max(0.0, y2 - y1)
+
+
+def _prepared_iou(a: _Prepared, b: _Prepared) -> float:
+    ax1, ay1, ax2, ay2, area_a = a
+    bx1, by1, bx2, by2, area_b = b
+    iw = max(0.0, min(ax2, bx2) - max(ax1, bx1))
+    ih = max(0.0, min(ay2, by2) - max(ay1, by1))
     inter = iw * ih
-    area_a = max(0.0, ax2 - ax1) * max(0.0, ay2 - ay1)
-    area_b = max(0.0, bx2 - bx1) * max(0.0, by2 - by1)
     union = area_a + area_b - inter
     if union <= 0:
         return 0.0
     return inter / union
 
 
+def _parse(prediction: str, gold_raw: Any) -> _Parsed | None:
+    """Prepared pred and gold boxes with their labels; None scores 0.0."""
+    try:
+        pred_raw = json.loads(prediction) if prediction.strip() else []
+    except json.JSONDecodeError:
+        return None
+    if not isinstance(pred_raw, list):
+        return None
+    gold_raw = gold_raw or []
+    if not isinstance(gold_raw, list):
+        return None
+
+    preds = [b for b in (_box_of(x) for x in pred_raw) if b is not None]
+    golds = [b for b in (_box_of(x) for x in gold_raw) if b is not None]
+    if not preds and not golds:
+        # Returning 1.0 here would reward a model that predicts ``[]``
+        # on every sample. Anchor at 0.0 instead — see module docstring.
+        return None
+    # Corner order and areas once per box, not once per pair.
+    return (
+        [_prepared(box) for box, _ in preds],
+        [label for _, label in preds],
+        [_prepared(box) for box, _ in golds],
+        [label for _, label in golds],
+    )
+
+
+def _pair_ious(parsed: list[_Parsed]) -> list[list[float]]:
+    """Row-major pred x gold IoUs of each sample."""
+    pairs = sum(len(p[0]) * len(p[2]) for p in parsed)
+    if pairs >= _NUMPY_MIN_PAIRS:
+        ious = _pair_ious_numpy(parsed)
+        if ious is not None:
+            return ious
+    return [[_prepared_iou(a, b) for a in pred for b in gold] for pred, _, gold, _ in parsed]
+
+
+def _pair_ious_numpy(parsed: list[_Parsed]) -> list[list[float]] | None:
+    """:func:`_pair_ious` as array ops over every pair of the batch.
+
+    Bit-identical to :func:`_prepared_iou` for finite coords; ``None``
+    (fall back to Python) without numpy or on NaN / inf, where numpy's
+    min/max propagate NaN and Python's don't.
+    """
+    try:
+        import numpy as np
+    except ImportError:
+        return None
+    n_pred = np.array([len(p[0]) for p in parsed])
+    n_gold = np.array([len(p[2]) for p in parsed])
+    n_pairs = n_pred * n_gold
+    pred = np.array([b for p in parsed for b in p[0]], dtype=float).reshape(-1, 5)
+    gold = np.array([b for p in parsed for b in p[2]], dtype=float).reshape(-1, 5)
+    if not (np.isfinite(pred).all() and np.isfinite(gold).all()):
+        return None
+
+    # Pair k of sample s is (pred k // n_gold[s], gold k % n_gold[s]).
+    sample = np.repeat(np.arange(len(parsed)), n_pairs)
+    k = np.arange(int(n_pairs.sum())) - (np.cumsum(n_pairs) - n_pairs)[sample]
+    per_row = n_gold[sample]
+    a = pred[(np.cumsum(n_pred) - n_pred)[sample] + k // per_row]
+    b = gold[(np.cumsum(n_gold) - n_gold)[sample] + k % per_row]
+
+    iw = np.maximum(0.0, np.minimum(a[:, 2], b[:, 2]) - np.maximum(a[:, 0], b[:, 0]))
+    ih = np.maximum(0.0, np.minimum(a[:, 3], b[:, 3]) - np.maximum(a[:, 1], b[:, 1]))
+    inter = iw * ih
+    union = a[:, 4] + b[:, 4] - inter
+    positive = union > 0
+    flat = np.where(positive, inter / np.where(positive, union, 1.0), 0.0).tolist()
+
+    out: list[list[float]] = []
+    start = 0
+    for n in n_pairs.tolist():
+        out.append(flat[start : start + n])
+        start += n
+    return out
+
+
+def _greedy_f1(
+    parsed: _Parsed, ious: list[float], threshold: float, label_strict: bool
+) -> float:
+    _, pred_labels, _, gold_labels = parsed
+    n_gold = len(gold_labels)
+    used_gold = [False] * n_gold
+    tp = 0
+    for j, p_label in enumerate(pred_labels):
+        row = j * n_gold
+        best_iou = -1.0
+        best_idx = -1
+        for i, g_label in enumerate(gold_labels):
+            if used_gold[i]:
+                continue
+            if label_strict and p_label and g_label and p_label != g_label:
+                continue
+            iou = ious[row + i]
+            if iou > best_iou:
+                best_iou = iou
+                best_idx = i
+        if best_idx >= 0 and best_iou >= threshold:
+            tp += 1
+            used_gold[best_idx] = True
+    fp = len(pred_labels) - tp
+    fn = n_gold - tp
+    if tp == 0:
+        return 0.0
+    precision = tp / (tp + fp)
+    recall = tp / (tp + fn)
+    if precision + recall == 0:
+        return 0.0
+    return 2 * precision * recall / (precision + recall)
+
+
 @register
 class BboxIoUMetric(Metric):
     kind = "bounding_box_iou"
@@ -93,51 +219,21 @@ class BboxIoUMetric(Metric):
             raise ValueError("gold_field must be a non-empty string")
 
     def score(self, prediction: str, sample: dict[str, Any]) -> float:
+        return self.score_batch([prediction], [sample])[0]
+
+    def score_batch(
+        self, predictions: list[str], samples: list[dict[str, Any]]
+    ) -> list[float]:
         gold_field = self.config.get("gold_field", "gold_boxes")
         threshold = float(self.config.get("iou_threshold", 0.5))
         label_strict = bool(self.config.get("label_strict", True))
-
-        try:
-            pred_raw = json.loads(prediction) if prediction.strip() else []
-        except json.JSONDecodeError:
-            return 0.0
-        if not isinstance(pred_raw, list):
-            return 0.0
-        gold_raw = sample.get(gold_field) or []
-        if not isinstance(gold_raw, list):
-            return 0.0
-
-        preds = [b for b in (_box_of(x) for x in pred_raw) if b is not None]
-        golds = [b for b in (_box_of(x) for x in gold_raw) if b is not None]
-
-        if not preds and not golds:
-            # Returning 1.0 here would reward a model that predicts ``[]``
-            # on every sample. Anchor at 0.0 instead — see module docstring.
-            return 0.0
-
-        used_gold: set[int] = set()
-        tp = 0
-        for p_box, p_label in preds:
-            best_iou = -1.0
-            best_idx = -1
-            for i, (g_box, g_label) in enumerate(golds):
-                if i in used_gold:
-                    continue
-                if label_strict and p_label and g_label and p_label != g_label:
-                    continue
-                iou = _iou(p_box, g_box)
-                if iou > best_iou:
-                    best_iou = iou
-                    best_idx = i
-            if best_idx >= 0 and best_iou >= threshold:
-                tp += 1
-                used_gold.add(best_idx)
-        fp = len(preds) - tp
-        fn = len(golds) - tp
-        if tp == 0:
-            return 0.0
-        precision = tp / (tp + fp)
-        recall = tp / (tp + fn)
-        if precision + recall == 0:
-            return 0.0
-        return 2 * precision * recall / (precision + recall)
+        parsed = [
+            _parse(prediction, sample.get(gold_field))
+            for prediction, sample in zip(predictions, samples, strict=True)
+        ]
+        scorable = [p for p in parsed if p is not None]
+        ious = iter(_pair_ious(scorable))
+        return [
+            0.0 if p is None else _greedy_f1(p, next(ious), threshold, label_strict)
+            for p in parsed
+        ]
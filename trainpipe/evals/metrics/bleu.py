@@ -2,8 +2,9 @@
 
 Self-contained implementation — no ``sacrebleu`` / ``nltk`` dependency.
 We use sentence-BLEU rather than corpus-BLEU because the eval runner
-scores one prediction at a time; per-sample scores then aggregate via
-mean (the standard :meth:`Metric.aggregate`).
+scores each prediction on its own; per-sample scores then aggregate via
+mean (the standard :meth:`Metric.aggregate`). ``score_batch`` counts each
+distinct reference's n-grams once per batch.
 
 Sentence-BLEU degenerates to 0 whenever a higher-order n-gram has zero
 matches, which is common on short outputs. Chen & Cherry (2014)
@@ -39,7 +40,7 @@ def _tokenize(text: str, *, case_insensitive: bool) -> list[str]:
 def _ngram_counts(tokens: list[str], n: int) -> Counter:
     if len(tokens) < n:
         return Counter()
-    return Counter(tuple(tokens[i : i + n]) for i in range(len(tokens) - n + 1))
+    return Counter(zip(*(tokens[k:] for k in range(n)), strict=False))
 
 
 def sentence_bleu(
@@ -52,11 +53,37 @@ def sentence_bleu(
 ) -> float:
     if not prediction or not reference:
         return 0.0
+    n = min(max_n, len(prediction), len(reference))
+    return _bleu(
+        [_ngram_counts(prediction, k) for k in range(1, n + 1)],
+        [_ngram_counts(reference, k) for k in range(1, n + 1)],
+        len(prediction),
+        len(reference),
+        max_n=max_n,
+        smoothing=smoothing,
+        weights=weights,
+    )
+
+
+def _bleu(
+    pred_counts: list[Counter],
+    ref_counts: list[Counter],
+    pred_len: int,
+    ref_len: int,
+    *,
+    max_n: int,
+    smoothing: bool,
+    weights: list[float],
+) -> float:
+    """BLEU from per-order n-gram counts (index 0 = unigrams). Each list
+    must cover at least the effective order."""
+    if not pred_len or not ref_len:
+        return 0.0
 
     # Effective order: drop max_n to whatever the prediction (or reference)
     # can actually produce. Otherwise short outputs always score 0 because
     # we'd have no 4-grams to count.
-    effective_n = min(max_n, len(prediction), len(reference))
+    effective_n = min(max_n, pred_len, ref_len)
     if effective_n < 1:
         return 0.0
 
@@ -67,8 +94,8 @@ def sentence_bleu(
 
     log_precisions: list[float] = []
     for n in range(1, effective_n + 1):
-        pred_ng = _ngram_counts(prediction, n)
-        ref_ng = _ngram_counts(reference, n)
+        pred_ng = pred_counts[n - 1]
+        ref_ng = ref_counts[n - 1]
         total = sum(pred_ng.values())
         if total == 0:
             return 0.0
@@ -86,8 +113,6 @@ def sentence_bleu(
     )
     geo_mean = math.exp(weighted_log_prec)
 
-    pred_len = len(prediction)
-    ref_len = len(reference)
     if pred_len > ref_len:
         bp = 1.0
     else:
@@ -137,3 +162,40 @@ class BleuMetric(Metric):
             smoothing=self.smoothing,
             weights=self.weights,
         )
+
+    def score_batch(
+        self, predictions: list[str], samples: list[dict[str, Any]]
+    ) -> list[float]:
+        # References repeat across a suite (shared gold answers); tokenize
+        # and count each distinct one once per batch, at every order.
+        refs: dict[str, tuple[int, list[Counter]]] = {}
+        ci = self.case_insensitive
+        out: list[float] = []
+        for prediction, sample in zip(predictions, samples, strict=True):
+            gold = sample.get(self.gold_field)
+            if gold is None:
+                out.append(0.0)
+                continue
+            gold_str = str(gold)
+            ref = refs.get(gold_str)
+            if ref is None:
+                tokens = _tokenize(gold_str, case_insensitive=ci)
+                ref = refs[gold_str] = (
+                    len(tokens),
+                    [_ngram_counts(tokens, n) for n in range(1, self.max_n + 1)],
+                )
+            ref_len, ref_counts = ref
+            pred_tokens = _tokenize(prediction, case_insensitive=ci)
+            n = min(self.max_n, len(pred_tokens), ref_len)
+            out.append(
+                _bleu(
+                    [_ngram_counts(pred_tokens, k) for k in range(1, n + 1)],
+                    ref_counts,
+                    len(pred_tokens),
+                    ref_len,
+                    max_n=self.max_n,
+                    smoothing=self.smoothing,
+                    weights=self.weights,
+                )
+            )
+        return out
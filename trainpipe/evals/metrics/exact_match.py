@@ -48,3 +48,22 @@ class ExactMatchMetric(Metric):
         pred = self._norm(prediction)
         gold_str = self._norm(str(gold))
         return 1.0 if pred == gold_str else 0.0
+
+    def score_batch(
+        self, predictions: list[str], samples: list[dict[str, Any]]
+    ) -> list[float]:
+        norm = self._norm
+        field = self.gold_field
+        golds: dict[str, str] = {}  # repeated labels are normalized once
+        out: list[float] = []
+        for prediction, sample in zip(predictions, samples, strict=True):
+            gold = sample.get(field)
+            if gold is None:
+                out.append(0.0)
+                continue
+            gold_str = str(gold)
+            normed = golds.get(gold_str)
+            if normed is None:
+                normed = golds[gold_str] = norm(gold_str)
+            out.append(1.0 if norm(prediction) == normed else 0.0)
+        return out
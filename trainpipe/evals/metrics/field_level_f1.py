@@ -31,32 +31,32 @@ from typing import Any
 from .base import Metric, register
 
 
-def _flatten(obj: Any, prefix: str, sep: str, out: dict[str, Any]) -> None:
+def _flatten_normalized(
+    obj: Any, prefix: str, sep: str, case_insensitive: bool, out: dict[str, Any]
+) -> None:
+    """Flatten nested dicts / lists to ``{dotted.path: leaf}``, stripping
+    (and optionally lowercasing) string leaves. Empty containers are leaves."""
     if isinstance(obj, dict):
         if not obj:
             out[prefix] = obj
             return
         for k, v in obj.items():
             key = f"{prefix}{sep}{k}" if prefix else str(k)
-            _flatten(v, key, sep, out)
+            _flatten_normalized(v, key, sep, case_insensitive, out)
     elif isinstance(obj, list):
         if not obj:
             out[prefix] = obj
             return
         for i, v in enumerate(obj):
             key = f"{prefix}{sep}{i}" if prefix else str(i)
-            _flatten(v, key, sep, out)
+            _flatten_normalized(v, key, sep, case_insensitive, out)
+    elif isinstance(obj, str):
+        s = obj.strip()
+        out[prefix] = s.lower() if case_insensitive else s
     else:
         out[prefix] = obj
 
 
-def _normalize_scalar(v: Any, *, case_insensitive: bool) -> Any:
-    if isinstance(v, str):
-        s = v.strip()
-        return s.lower() if case_insensitive else s
-    return v
-
-
 @register
 class FieldLevelF1Metric(Metric):
     kind = "field_level_f1"
@@ -82,38 +82,38 @@ class FieldLevelF1Metric(Metric):
 
     def _flatten_for_comparison(self, obj: dict[str, Any]) -> dict[str, Any]:
         flat: dict[str, Any] = {}
-        _flatten(obj, "", self.flatten_separator, flat)
-        return {k: v for k, v in flat.items() if k not in self.ignore_keys}
+        _flatten_normalized(obj, "", self.flatten_separator, self.case_insensitive, flat)
+        if self.ignore_keys:
+            for key in self.ignore_keys & flat.keys():
+                del flat[key]
+        return flat
 
     def score(self, prediction: str, sample: dict[str, Any]) -> float:
-        gold_raw = sample.get(self.gold_field)
-        if not isinstance(gold_raw, dict):
-            return 0.0
-        pred = self._parse_prediction(prediction)
-        if pred is None:
-            return 0.0
-
-        pred_flat = self._flatten_for_comparison(pred)
-        gold_flat = self._flatten_for_comparison(gold_raw)
-
-        pred_keys = set(pred_flat)
-        gold_keys = set(gold_flat)
-        common = pred_keys & gold_keys
-
-        tp = 0
-        for k in common:
-            if _normalize_scalar(
-                pred_flat[k], case_insensitive=self.case_insensitive
-            ) == _normalize_scalar(
-                gold_flat[k], case_insensitive=self.case_insensitive
-            ):
-                tp += 1
-
-        fp = len(pred_keys - gold_keys) + (len(common) - tp)
-        fn = len(gold_keys - pred_keys) + (len(common) - tp)
-
-        if tp == 0:
-            return 0.0
-        precision = tp / (tp + fp)
-        recall = tp / (tp + fn)
-        return 2 * precision * recall / (precision + recall)
+        return self.score_batch([prediction], [sample])[0]
+
+    def score_batch(
+        self, predictions: list[str], samples: list[dict[str, Any]]
+    ) -> list[float]:
+        gold_field = self.gold_field
+        parse = self._parse_prediction
+        flatten = self._flatten_for_comparison
+        out: list[float] = []
+        for prediction, sample in zip(predictions, samples, strict=True):
+            gold_raw = sample.get(gold_field)
+            pred = parse(prediction) if isinstance(gold_raw, dict) else None
+            out.append(0.0 if pred is None else _f1(flatten(pred), flatten(gold_raw)))
+        return out
+
+
+def _f1(pred_flat: dict[str, Any], gold_flat: dict[str, Any]) -> float:
+    """Field F1 over flattened, normalized field -> value maps."""
+    common = pred_flat.keys() & gold_flat.keys()
+    tp = sum(1 for k in common if pred_flat[k] == gold_flat[k])
+    fp = len(pred_flat) - len(common) + (len(common) - tp)
+    fn = len(gold_flat) - len(common) + (len(common) - tp)
+
+    if tp == 0:
+        return 0.0
+    precision = tp / (tp + fp)
+    recall = tp / (tp + fn)
+    return 2 * precision * recall / (precision + recall)
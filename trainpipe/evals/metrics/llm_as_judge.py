@@ -1,8 +1,10 @@
 """LLM-as-judge metric.
 
 A teacher LLM scores each prediction against the gold reference using a
-YAML-style rubric. Anthropic and OpenAI providers are first-class
-(architectural decision: direct SDK, provider env-configurable).
+YAML-style rubric. Anthropic and OpenAI providers are first-class, called
+over HTTP by the async engine in :mod:`trainpipe.evals.judge`: a batch is
+judged concurrently through a persistent client, within the configured
+limits, and answers are cached on disk (``data_dir/judge_cache.sqlite3``).
 
 Config:
 
@@ -22,25 +24,32 @@ Config:
   judge prompt as the reference answer.
 * ``max_retries`` (int, default 2) — judge API failures retried this many
   times before falling back to 0.0.
+* ``concurrency`` (int, default 8) — judge requests in flight at once.
+* ``requests_per_minute`` (float, default 0 = unlimited) — token-bucket
+  rate limit, bursting up to ``concurrency``. Both limits apply per eval
+  run (per metric instance).
+* ``cache`` (bool, default True) — reuse earlier judgments of the same
+  provider, model, rubric, prediction and reference.
+* ``base_url`` (str, optional) — provider endpoint; defaults to
+  ``ANTHROPIC_BASE_URL`` / ``OPENAI_BASE_URL`` or the public API.
 
 The judge's output must be valid JSON containing the chosen score field.
 The score is then normalized to ``[0, 1]`` using ``scale.min/max``.
 
-Tests bypass the real SDK by passing a callable in the constructor via
-``judge_callable`` (kw-only); production code never sets this.
+Tests bypass HTTP (and the cache) by passing a callable in the
+constructor via ``judge_callable`` (kw-only); production code never sets
+this.
 """
 
 import json
-import logging
-import os
+import threading
 from collections.abc import Callable
 from typing import Any
 
+from ...settings import settings
+from ..judge import JudgeEngine
 from .base import Metric, register
 
-logger = logging.getLogger(__name__)
-
-
 _DEFAULT_SYSTEM = (
     "You are a strict evaluator. Compare the candidate answer to the "
     "reference answer using the supplied rubric, then reply with a single "
@@ -105,6 +114,8 @@ class LLMAsJudgeMetric(Metric):
         judge_callable: Callable[[str], str] | None = None,
     ) -> None:
         self._judge_override = judge_callable
+        self._engine: JudgeEngine | None = None
+        self._engine_lock = threading.Lock()
         super().__init__(config)
 
     def _validate_config(self) -> None:
@@ -141,82 +152,52 @@ class LLMAsJudgeMetric(Metric):
 
         self.gold_field: str = self.config.get("gold_field", "gold")
         self.max_retries: int = int(self.config.get("max_retries", 2))
-
-    def _call_judge(self, prompt: str) -> str:
-        if self._judge_override is not None:
-            return self._judge_override(prompt)
-        if self.provider == "anthropic":
-            return _call_anthropic(self.model, self.system_prompt, prompt)
-        if self.provider == "openai":
-            return _call_openai(self.model, self.system_prompt, prompt)
-        raise RuntimeError(f"unsupported provider: {self.provider}")
+        self.concurrency: int = int(self.config.get("concurrency", 8))
+        if self.concurrency < 1:
+            raise ValueError("llm_as_judge.concurrency must be >= 1")
+        self.requests_per_minute: float = float(self.config.get("requests_per_minute", 0))
+        if self.requests_per_minute < 0:
+            raise ValueError("llm_as_judge.requests_per_minute must be >= 0")
+        self.cache: bool = bool(self.config.get("cache", True))
+        base_url = self.config.get("base_url")
+        if base_url is not None and not isinstance(base_url, str):
+            raise ValueError("llm_as_judge.base_url must be a string")
+        self.base_url: str | None = base_url or None
 
     def score(self, prediction: str, sample: dict[str, Any]) -> float:
-        prompt = _render_prompt(
-            self.rubric, prediction, sample, self.gold_field, self.output_field
-        )
-        last_err: Exception | None = None
-        for attempt in range(self.max_retries + 1):
-            try:
-                reply = self._call_judge(prompt)
-                raw = _parse_score(reply, self.output_field)
-                norm = (raw - self.scale_min) / (self.scale_max - self.scale_min)
-                return max(0.0, min(1.0, norm))
-            except Exception as e:
-                last_err = e
-                logger.warning(
-                    "llm_as_judge attempt %d/%d failed: %s",
-                    attempt + 1,
-                    self.max_retries + 1,
-                    e,
+        return self.score_batch([prediction], [sample])[0]
+
+    def score_batch(
+        self, predictions: list[str], samples: list[dict[str, Any]]
+    ) -> list[float]:
+        prompts = [
+            _render_prompt(self.rubric, prediction, sample, self.gold_field, self.output_field)
+            for prediction, sample in zip(predictions, samples, strict=True)
+        ]
+        raws = self._judge().judge(prompts, self._parse)
+        span = self.scale_max - self.scale_min
+        return [
+            0.0 if raw is None else max(0.0, min(1.0, (raw - self.scale_min) / span))
+            for raw in raws
+        ]
+
+    def _parse(self, reply: str) -> float:
+        return _parse_score(reply, self.output_field)
+
+    def _judge(self) -> JudgeEngine:
+        # Built on first use, not at suite validation; shared by the
+        # scoring threads so the limits cover the whole run.
+        with self._engine_lock:
+            if self._engine is None:
+                self._engine = JudgeEngine(
+                    provider=self.provider,
+                    model=self.model,
+                    system_prompt=self.system_prompt,
+                    max_retries=self.max_retries,
+                    concurrency=self.concurrency,
+                    requests_per_minute=self.requests_per_minute,
+                    base_url=self.base_url,
+                    cache_path=settings.judge_cache_path if self.cache else None,
+                    call=self._judge_override,
                 )
-        logger.error("llm_as_judge giving up after retries: %s", last_err)
-        return 0.0
-
-
-def _call_anthropic(model: str, system: str, prompt: str) -> str:
-    try:
-        import anthropic
-    except ImportError as e:
-        raise RuntimeError(
-            "llm_as_judge with provider=anthropic requires the 'anthropic' SDK"
-        ) from e
-    api_key = os.environ.get("ANTHROPIC_API_KEY")
-    if not api_key:
-        raise RuntimeError(
-            "ANTHROPIC_API_KEY must be set to use llm_as_judge with provider=anthropic"
-        )
-    client = anthropic.Anthropic(api_key=api_key)
-    resp = client.messages.create(
-        model=model,
-        max_tokens=256,
-        system=system,
-        messages=[{"role": "user", "content": prompt}],
-    )
-    # Concatenate text-typed content blocks (ignores tool_use blocks).
-    parts = [b.text for b in resp.content if getattr(b, "type", None) == "text"]
-    return "".join(parts)
-
-
-def _call_openai(model: str, system: str, prompt: str) -> str:
-    try:
-        from openai import OpenAI
-    except ImportError as e:
-        raise RuntimeError(
-            "llm_as_judge with provider=openai requires the 'openai' SDK"
-        ) from e
-    api_key = os.environ.get("OPENAI_API_KEY")
-    if not api_key:
-        raise RuntimeError(
-            "OPENAI_API_KEY must be set to use llm_as_judge with provider=openai"
-        )
-    client = OpenAI(api_key=api_key)
-    resp = client.chat.completions.create(
-        model=model,
-        messages=[
-            {"role": "system", "content": system},
-            {"role": "user", "content": prompt},
-        ],
-        max_tokens=256,
-    )
-    return resp.choices[0].message.content or ""
+            return self._engine
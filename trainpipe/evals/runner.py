@@ -2,17 +2,45 @@
 
 Lifecycle (called by the dispatcher after a successful ``claim_eval_run``):
 
-1. Load the suite's dataset (JSONL/JSON/CSV/TSV/Parquet) up to
-   ``sample_limit`` samples.
+1. Count the suite's dataset (JSONL/JSON/CSV/TSV/Parquet, optional
+   ``#N`` sub-sample suffix; see :mod:`.datasets`) up to ``sample_limit``
+   samples. Samples are then streamed in windows of ``eval_read_window``,
+   never held all at once. A run requeued after a crash skips the
+   samples whose ``eval_results`` rows already exist and reuses their
+   scores; ``samples_done`` tracks that checkpoint batch by batch.
 2. Instantiate each :class:`Metric` from the suite's :class:`MetricConfig`
    list, validating their configs.
-3. ``await backend.open()`` — loads model + adapter.
-4. For each sample: predict → score with every metric → persist one
-   ``eval_results`` row.
-5. Aggregate per-metric statistics, finalize the ``eval_runs`` row.
-6. Push the aggregates as metrics + tags to the originating experiment's
-   MLflow run (best-effort; never fails the eval).
-7. ``await backend.close()``.
+3. Look each window's pending samples up in the prediction cache, keyed
+   by the backend's weights fingerprint, the prompt and the generation
+   params. Hits skip inference.
+4. ``await backend.open()`` — loads model + adapter on the first cache
+   miss; if every sample hits, the model is never loaded.
+5. Run a three-stage pipeline joined by bounded queues, so the GPU never
+   waits on scoring or SQLite:
+
+   * *predict* — per window, cache hits first, then ``predict_batch`` on
+     batches of ``inference_params.batch_size`` samples of similar prompt
+     length, whose predictions are added to the cache;
+   * *score* — ``eval_score_workers`` workers score each batch with every
+     metric's ``score_batch`` on a thread pool;
+   * *persist* — one ``eval_results`` insert per batch on the database's
+     group-commit write queue.
+
+   Per-stage throughput and queue depth land in ``pipeline_stats``. A run
+   given several backends (``InferenceParams.shards``, one GPU lease
+   each) runs one such pipeline per shard, over every N-th pending
+   sample of each window.
+   With ``inference_params.early_stop`` set, each scored sample's
+   metric is paired with a baseline run's score for it, and the run
+   stops reading samples once a bootstrap interval of the Δ decides the
+   comparison (see :mod:`.stats`); ``pipeline_stats["early_stop"]``
+   records the decision and the samples saved.
+6. Aggregate per-metric statistics (mean, std, bootstrap CI), finalize
+   the ``eval_runs`` row.
+7. Queue the aggregates as metrics + tags for the originating
+   experiment's MLflow run on the MLflow gateway's outbox (never fails
+   the eval; replayed in the background).
+8. ``await backend.close()``.
 
 Errors at any stage flip the run to FAILED with a descriptive ``error``
 field. Per-sample errors don't kill the run; they're persisted on the
@@ -20,26 +48,33 @@ result row and the metric contributes 0.0 for that sample.
 """
 
 import asyncio
-import csv
+import functools
+import hashlib
 import json
 import logging
 import re
-from collections.abc import Iterable
-from pathlib import Path
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from typing import Any
 
 from ..api.schemas import (
+    EarlyStopConfig,
     EvalRun,
     EvalRunStatus,
     EvalSuite,
+    InferenceParams,
     MetricAggregate,
     MetricConfig,
 )
 from ..core import repository
 from ..core.db import Database
+from ..integrations import mlflow_gateway
 from ..settings import settings
-from .inference import InferenceBackend
+from .datasets import DatasetReadError, EvalDataset
+from .inference import InferenceBackend, length_buckets
 from .metrics import Metric, UnknownMetricKind, get_metric_class
+from .stats import SequentialComparison
 
 logger = logging.getLogger(__name__)
 
@@ -56,81 +91,6 @@ def _mlflow_key(name: str) -> str:
     return _MLFLOW_KEY_SAFE.sub("_", name)
 
 
-class DatasetReadError(RuntimeError):
-    """Raised when the suite's dataset can't be loaded."""
-
-
-def _load_samples(path: Path, limit: int | None) -> list[dict[str, Any]]:
-    """Read up to ``limit`` records from ``path``. Format inferred from suffix.
-
-    Returns a list of dicts. Lines that fail to parse raise
-    :class:`DatasetReadError` with the offending line number so the user
-    can fix the file rather than silently dropping samples.
-    """
-    suffix = path.suffix.lower().lstrip(".")
-    if suffix in ("jsonl", "ndjson"):
-        return list(_take(_iter_jsonl(path), limit))
-    if suffix == "json":
-        try:
-            with path.open("r", encoding="utf-8") as f:
-                data = json.load(f)
-        except (OSError, json.JSONDecodeError) as e:
-            raise DatasetReadError(f"failed to load json dataset {path}: {e}") from None
-        if not isinstance(data, list):
-            raise DatasetReadError("json dataset must be a list of records")
-        return list(_take((d for d in data if isinstance(d, dict)), limit))
-    if suffix in ("csv", "tsv"):
-        delim = "," if suffix == "csv" else "\t"
-        return list(_take(_iter_delimited(path, delim), limit))
-    raise DatasetReadError(
-        f"unsupported eval-dataset extension '.{suffix}' (need jsonl/json/csv/tsv)"
-    )
-
-
-def _iter_jsonl(path: Path) -> Iterable[dict[str, Any]]:
-    try:
-        f = path.open("r", encoding="utf-8")
-    except OSError as e:
-        raise DatasetReadError(f"failed to open dataset {path}: {e}") from None
-    with f:
-        for lineno, raw in enumerate(f, start=1):
-            line = raw.strip()
-            if not line:
-                continue
-            try:
-                obj = json.loads(line)
-            except json.JSONDecodeError as e:
-                raise DatasetReadError(
-                    f"jsonl line {lineno} not valid JSON: {e}"
-                ) from None
-            if not isinstance(obj, dict):
-                raise DatasetReadError(
-                    f"jsonl line {lineno} must decode to an object, got {type(obj).__name__}"
-                )
-            yield obj
-
-
-def _iter_delimited(path: Path, delim: str) -> Iterable[dict[str, Any]]:
-    try:
-        f = path.open("r", encoding="utf-8", newline="")
-    except OSError as e:
-        raise DatasetReadError(f"failed to open dataset {path}: {e}") from None
-    with f:
-        reader = csv.DictReader(f, delimiter=delim)
-        for row in reader:
-            yield dict(row)
-
-
-def _take(it: Iterable[dict[str, Any]], limit: int | None) -> Iterable[dict[str, Any]]:
-    if limit is None:
-        yield from it
-        return
-    for i, item in enumerate(it):
-        if i >= limit:
-            return
-        yield item
-
-
 def _instantiate_metrics(configs: list[MetricConfig]) -> list[tuple[str, Metric]]:
     """Resolve each MetricConfig to a (display_name, Metric instance) pair.
 
@@ -155,8 +115,87 @@ def _instantiate_metrics(configs: list[MetricConfig]) -> list[tuple[str, Metric]
     return out
 
 
+# InferenceParams fields that change what the model generates; batching,
+# sharding and limits don't, so they stay out of the cache key.
+_GENERATION_PARAMS = frozenset({"max_new_tokens", "temperature", "top_p"})
+
+
+def _prediction_key(fingerprint: str, prompt: str, params: InferenceParams) -> str:
+    payload = json.dumps(
+        {
+            "model": fingerprint,
+            "prompt": prompt,
+            "params": params.model_dump(include=_GENERATION_PARAMS),
+        },
+        sort_keys=True,
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+@dataclass
+class _Window:
+    """One shard's share of a dataset window, split by the prediction
+    cache: ``hits`` carry their cached prediction, ``misses`` their cache
+    key in ``keys`` (when caching is on)."""
+
+    hits: list[tuple[int, dict[str, Any], str]]
+    misses: list[tuple[int, dict[str, Any]]]
+    keys: dict[int, str]
+
+
+class _BackendOpenError(RuntimeError):
+    """A shard's backend failed to load its model."""
+
+
+@dataclass
+class _StageStats:
+    """Work done by one pipeline stage and the depth of the queue feeding it."""
+
+    items: int = 0
+    busy_sec: float = 0.0
+    queue_max: int = 0
+    _depth_sum: int = 0
+    _depth_samples: int = 0
+
+    def took(self, queue: asyncio.Queue) -> None:
+        depth = queue.qsize()
+        self.queue_max = max(self.queue_max, depth)
+        self._depth_sum += depth
+        self._depth_samples += 1
+
+    def merge(self, other: "_StageStats") -> None:
+        self.items += other.items
+        self.busy_sec += other.busy_sec
+        self.queue_max = max(self.queue_max, other.queue_max)
+        self._depth_sum += other._depth_sum
+        self._depth_samples += other._depth_samples
+
+    def as_dict(self, wall_sec: float) -> dict[str, Any]:
+        return {
+            "items": self.items,
+            "busy_sec": round(self.busy_sec, 4),
+            "items_per_sec": round(self.items / self.busy_sec, 2) if self.busy_sec else None,
+            "utilization": round(self.busy_sec / wall_sec, 3) if wall_sec else None,
+            "queue_max": self.queue_max,
+            "queue_mean": (
+                round(self._depth_sum / self._depth_samples, 2) if self._depth_samples else None
+            ),
+        }
+
+
+# (sample indices, samples, [(prediction, predict error)]) and the scored
+# rows for the persist stage; None ends a stage.
+_Predicted = tuple[list[int], list[dict[str, Any]], list[tuple[str, str | None]]]
+
+
 class EvalDriver:
-    """Runs one queued (already-claimed) eval to completion."""
+    """Runs one queued (already-claimed) eval to completion.
+
+    With several ``backends`` (one per GPU lease) the pending samples are
+    split into that many shards by sample index; each shard runs its own
+    pipeline into the same run's ``eval_results`` and the aggregate is
+    computed once over all rows.
+    """
 
     def __init__(
         self,
@@ -164,12 +203,18 @@ class EvalDriver:
         db: Database,
         run: EvalRun,
         suite: EvalSuite,
-        backend: InferenceBackend,
+        backend: InferenceBackend | None = None,
+        backends: list[InferenceBackend] | None = None,
     ) -> None:
+        if not backends:
+            if backend is None:
+                raise ValueError("EvalDriver needs a backend")
+            backends = [backend]
         self.db = db
         self.run = run
         self.suite = suite
-        self.backend = backend
+        self.backends = backends
+        self.backend = backends[0]
 
     async def execute(self) -> None:
         try:
@@ -179,72 +224,548 @@ class EvalDriver:
             return
 
         try:
-            samples = _load_samples(
-                Path(self.suite.dataset_path),
-                self.suite.inference_params.sample_limit,
+            dataset = EvalDataset.from_ref(
+                self.suite.dataset_path, self.suite.inference_params.sample_limit
             )
+            total = await asyncio.to_thread(dataset.count)
         except DatasetReadError as e:
             await self._fail(str(e))
             return
 
-        if not samples:
+        if total == 0:
             await self._fail("eval dataset is empty")
             return
 
-        per_metric_scores: dict[str, list[float]] = {n: [] for n, _ in metrics}
+        # Rows written before a crash/restart are the checkpoint: skip
+        # those samples and reuse their scores.
+        async with self.db.connect() as conn:
+            done = await repository.eval_result_scores(conn, self.run.id)
+            done = {i: scores for i, scores in done.items() if i < total}
+            await repository.update_eval_run_progress(
+                conn,
+                self.run.id,
+                sample_count=total,
+                resumed_samples=len(done) if done else None,
+            )
+        if done:
+            logger.info(
+                "eval run=%s resumes with %d/%d samples already scored",
+                self.run.id,
+                len(done),
+                total,
+            )
 
-        try:
-            await self.backend.open()
-        except Exception as e:
-            logger.exception("backend.open failed for eval run=%s", self.run.id)
-            await self._fail(f"inference backend failed to open: {e}")
-            return
+        early_stop = self.suite.inference_params.early_stop
+        stopper, early_stop_stats = None, None
+        if early_stop is not None:
+            stopper, reason = await self._early_stopper(early_stop, metrics, done, total)
+            if stopper is None:
+                logger.warning(
+                    "eval run=%s runs every sample: early_stop baseline %r: %s",
+                    self.run.id,
+                    early_stop.baseline,
+                    reason,
+                )
+                early_stop_stats = {"baseline": early_stop.baseline, "error": reason}
 
+        fingerprint = await self._fingerprint() if len(done) < total else None
+        # One shard per backend, never more shards than samples. A shard
+        # opens its backend on its first cache miss.
+        backends = self.backends[: max(1, min(len(self.backends), total - len(done)))]
         try:
-            for idx, sample in enumerate(samples):
-                prediction, predict_err = await self._predict_one(sample)
-                scores, sample_err = self._score_one(
-                    prediction, sample, metrics, per_metric_scores
-                )
-                gold = sample.get("gold") if isinstance(sample.get("gold"), dict) else None
-                async with self.db.connect() as conn:
-                    await repository.add_eval_result(
-                        conn,
-                        run_id=self.run.id,
-                        sample_index=idx,
-                        input=sample,
-                        prediction=prediction,
-                        gold=gold,
-                        scores=scores,
-                        error=predict_err or sample_err,
+            if stopper is not None and (deltas := stopper.claim_look()) is not None:
+                await asyncio.to_thread(stopper.look, deltas)
+            scores_by_index, pipeline_stats = await self._run_shards(
+                dataset, done, metrics, backends, fingerprint, stopper
+            )
+            scores_by_index.update(done)
+            pipeline_stats["resumed_samples"] = len(done)
+            indices = sorted(scores_by_index)
+            if stopper is not None:
+                early_stop_stats = {
+                    **stopper.summary(),
+                    "samples_scored": len(indices),
+                    "samples_saved": total - len(indices),
+                }
+                if stopper.decision is not None:
+                    logger.info(
+                        "eval run=%s stopped early: %s than %s after %d/%d samples",
+                        self.run.id,
+                        stopper.decision,
+                        stopper.baseline_run_id,
+                        len(indices),
+                        total,
                     )
-
-            aggregate = self._aggregate(metrics, per_metric_scores)
+            if early_stop_stats is not None:
+                pipeline_stats["early_stop"] = early_stop_stats
+            per_metric_scores = {
+                name: [scores_by_index[i].get(name, 0.0) for i in indices]
+                for name, _ in metrics
+            }
+            # Bootstrap CIs are CPU work; keep them off the event loop.
+            aggregate = await asyncio.to_thread(self._aggregate, metrics, per_metric_scores)
             async with self.db.connect() as conn:
                 await repository.finalize_eval_run(
                     conn,
                     self.run.id,
                     status=EvalRunStatus.COMPLETED,
                     aggregate=aggregate,
-                    sample_count=len(samples),
+                    sample_count=len(indices),
+                    pipeline_stats=pipeline_stats,
                 )
             await self._publish_aggregates_to_mlflow(aggregate)
+        except _BackendOpenError as e:
+            logger.exception("backend.open failed for eval run=%s", self.run.id)
+            await self._fail(f"inference backend failed to open: {e}")
+        except DatasetReadError as e:
+            await self._fail(str(e))
         except Exception as e:
             logger.exception("eval run=%s crashed mid-execution", self.run.id)
             await self._fail(f"unexpected runner error: {e}")
         finally:
+            await self._close(self.backends)
+
+    async def _close(self, backends: list[InferenceBackend]) -> None:
+        for backend in backends:
             try:
-                await self.backend.close()
+                await backend.close()
             except Exception:
                 logger.exception(
                     "backend.close raised for eval run=%s (ignored)", self.run.id
                 )
 
+    async def _early_stopper(
+        self,
+        config: EarlyStopConfig,
+        metrics: list[tuple[str, Metric]],
+        done: dict[int, dict[str, float]],
+        total: int,
+    ) -> tuple[SequentialComparison | None, str | None]:
+        """The sequential test against ``config.baseline``, fed with the
+        resumed samples' scores, or ``None`` and why there's no baseline."""
+        ref = config.baseline.strip()
+        async with self.db.read() as conn:
+            if ref.startswith("exp:") or "@" in ref:
+                if ref.startswith("exp:"):
+                    experiment_id: str | None = ref[len("exp:") :]
+                else:
+                    name, _, version = ref.partition("@")
+                    model = (
+                        await repository.get_model_by_name_version(conn, name, int(version))
+                        if version.isdigit()
+                        else await repository.resolve_model_alias(conn, name, version)
+                    )
+                    if model is None:
+                        return None, "registered model not found"
+                    experiment_id = model.experiment_id
+                if not experiment_id:
+                    return None, "model has no originating experiment"
+                baseline = await repository.latest_completed_eval_run(
+                    conn, suite_id=self.suite.id, experiment_id=experiment_id
+                )
+                if baseline is None:
+                    return None, "no completed run of this suite"
+            else:
+                baseline = await repository.get_eval_run(conn, ref)
+                if baseline is None:
+                    return None, "eval run not found"
+                if baseline.suite_id != self.suite.id:
+                    return None, "baseline run is of another suite"
+                if baseline.status != EvalRunStatus.COMPLETED:
+                    return None, f"baseline run is {baseline.status.value}"
+            if baseline.id == self.run.id:
+                return None, "baseline is this run"
+            scores = await repository.eval_result_scores(conn, baseline.id)
+        baseline_scores = {
+            i: s[config.metric] for i, s in scores.items() if i < total and config.metric in s
+        }
+        metric = dict(metrics)[config.metric]
+        stopper = SequentialComparison(
+            config,
+            baseline_run_id=baseline.id,
+            baseline=baseline_scores,
+            pairable=len(baseline_scores),
+            higher_is_better=metric.higher_is_better,
+            resamples=settings.eval_bootstrap_resamples or 1000,
+        )
+        for i, s in done.items():
+            stopper.add(i, s.get(config.metric, 0.0))
+        return stopper, None
+
+    async def _fingerprint(self) -> str | None:
+        """The weights fingerprint predictions are cached under; ``None``
+        when caching is off or the backend can't fingerprint its weights."""
+        if not settings.eval_prediction_cache:
+            return None
+        try:
+            return await self.backend.fingerprint()
+        except Exception:
+            logger.warning(
+                "could not fingerprint model weights for eval run=%s; not caching",
+                self.run.id,
+                exc_info=True,
+            )
+            return None
+
+    async def _lookup_cache(
+        self,
+        items: list[tuple[int, dict[str, Any]]],
+        fingerprint: str | None,
+    ) -> _Window:
+        """Split ``items`` into cached predictions and samples to predict."""
+        if fingerprint is None:
+            return _Window(hits=[], misses=items, keys={})
+        params = self.suite.inference_params
+        keys: dict[int, str] = {}
+        for i, sample in items:
+            try:
+                prompt = self.backend.prompt_of(sample)
+            except ValueError:
+                continue  # the backend reports the missing prompt per sample
+            keys[i] = _prediction_key(fingerprint, prompt, params)
+        async with self.db.read() as conn:
+            found = await repository.cached_predictions(conn, list(set(keys.values())))
+        window = _Window(hits=[], misses=[], keys=keys)
+        for i, sample in items:
+            if keys.get(i) in found:
+                window.hits.append((i, sample, found[keys[i]]))
+            else:
+                window.misses.append((i, sample))
+        return window
+
+    async def _run_shards(
+        self,
+        dataset: EvalDataset,
+        done: dict[int, dict[str, float]],
+        metrics: list[tuple[str, Metric]],
+        backends: list[InferenceBackend],
+        fingerprint: str | None,
+        stopper: SequentialComparison | None = None,
+    ) -> tuple[dict[int, dict[str, float]], dict[str, Any]]:
+        """Stream ``dataset`` past the ``done`` samples into one pipeline
+        per backend and merge the scores and stats once every shard's rows
+        are on disk.
+
+        The dataset is read ``eval_read_window`` samples at a time; shard
+        k gets every n-th pending sample of each window, so at most a few
+        windows are in memory whatever the suite's size. Reading stops
+        once ``stopper`` reaches a decision.
+        """
+        n = len(backends)
+        window_size = max(1, settings.eval_read_window)
+        inboxes: list[asyncio.Queue[_Window | None]] = [
+            asyncio.Queue(maxsize=1) for _ in range(n)
+        ]
+        cache = {"hits": 0, "misses": 0}
+
+        async def feed() -> None:
+            windows = dataset.windows(window_size)
+            while not _decided(stopper) and (
+                window := await asyncio.to_thread(next, windows, None)
+            ) is not None:
+                pending = [(i, sample) for i, sample in window if i not in done]
+                for k, inbox in enumerate(inboxes):
+                    if not pending[k::n]:
+                        continue
+                    share = await self._lookup_cache(pending[k::n], fingerprint)
+                    cache["hits"] += len(share.hits)
+                    cache["misses"] += len(share.misses)
+                    await inbox.put(share)
+            for inbox in inboxes:
+                await inbox.put(None)
+
+        started = time.perf_counter()
+        feeder = asyncio.create_task(feed())
+        tasks = [
+            asyncio.create_task(
+                self._run_pipeline(inboxes[k], metrics, backend, fingerprint, stopper)
+            )
+            for k, backend in enumerate(backends)
+        ]
+        try:
+            results = await asyncio.gather(feeder, *tasks)
+        except BaseException:
+            for task in (feeder, *tasks):
+                task.cancel()
+            await asyncio.gather(feeder, *tasks, return_exceptions=True)
+            raise
+        wall = time.perf_counter() - started
+
+        scores_by_index: dict[int, dict[str, float]] = {}
+        merged = {name: _StageStats() for name in ("predict", "score", "persist")}
+        shards = []
+        for k, (scores, stats, shard_wall) in enumerate(results[1:]):
+            scores_by_index.update(scores)
+            for name, stage in stats.items():
+                merged[name].merge(stage)
+            shards.append(
+                {
+                    "shard": k,
+                    "samples": stats["score"].items,
+                    "wall_sec": round(shard_wall, 4),
+                    "stages": {name: st.as_dict(shard_wall) for name, st in stats.items()},
+                }
+            )
+        pipeline_stats: dict[str, Any] = {
+            "wall_sec": round(wall, 4),
+            "batch_size": self.suite.inference_params.batch_size,
+            "score_workers": max(1, settings.eval_score_workers),
+            "queue_capacity": max(1, settings.eval_pipeline_depth),
+            "read_window": window_size,
+            # Utilization summed over shards: n shards fully busy read as n.
+            "stages": {name: stage.as_dict(wall) for name, stage in merged.items()},
+        }
+        if n > 1:
+            pipeline_stats["shards"] = shards
+        if fingerprint is not None:
+            pipeline_stats["prediction_cache"] = cache
+        return scores_by_index, pipeline_stats
+
+    async def _run_pipeline(
+        self,
+        inbox: "asyncio.Queue[_Window | None]",
+        metrics: list[tuple[str, Metric]],
+        backend: InferenceBackend,
+        fingerprint: str | None,
+        stopper: SequentialComparison | None = None,
+    ) -> tuple[dict[int, dict[str, float]], dict[str, _StageStats], float]:
+        """Predict the samples arriving in ``inbox`` with ``backend``
+        (cache hits skip it), score and persist them; returns their scores
+        by sample index, the stage stats and the wall time once all rows
+        are on disk. Scores feed ``stopper``; once it has decided, the
+        remaining batches are dropped unpredicted."""
+        workers = max(1, settings.eval_score_workers)
+        depth = max(1, settings.eval_pipeline_depth)
+        predicted: asyncio.Queue[_Predicted | None] = asyncio.Queue(maxsize=depth)
+        scored: asyncio.Queue[list[dict[str, Any]] | None] = asyncio.Queue(maxsize=depth)
+        stats = {"predict": _StageStats(), "score": _StageStats(), "persist": _StageStats()}
+        scores_by_index: dict[int, dict[str, float]] = {}
+        writes: list[asyncio.Future] = []
+        cache_writes: list[asyncio.Future] = []
+        running_scorers = workers
+        loop = asyncio.get_running_loop()
+        executor = ThreadPoolExecutor(workers, thread_name_prefix="trainpipe-eval-score")
+
+        async def predict() -> None:
+            batch_size = self.suite.inference_params.batch_size
+            opened = False
+            while (window := await inbox.get()) is not None:
+                if _decided(stopper):
+                    continue  # drain the inbox so the feeder can finish
+                for start in range(0, len(window.hits), batch_size):
+                    chunk = window.hits[start : start + batch_size]
+                    await predicted.put(
+                        (
+                            [i for i, _, _ in chunk],
+                            [sample for _, sample, _ in chunk],
+                            [(prediction, None) for _, _, prediction in chunk],
+                        )
+                    )
+                if window.misses and not opened:
+                    try:
+                        await backend.open()
+                    except Exception as e:
+                        raise _BackendOpenError(str(e)) from e
+                    opened = True
+                batches = length_buckets([s for _, s in window.misses], batch_size)
+                for positions in batches:
+                    if _decided(stopper):
+                        break
+                    indices = [window.misses[p][0] for p in positions]
+                    batch = [window.misses[p][1] for p in positions]
+                    t0 = time.perf_counter()
+                    predictions = await self._predict_batch(backend, batch)
+                    stats["predict"].busy_sec += time.perf_counter() - t0
+                    stats["predict"].items += len(batch)
+                    entries = [
+                        (window.keys[i], prediction)
+                        for i, (prediction, err) in zip(indices, predictions, strict=True)
+                        if err is None and i in window.keys
+                    ]
+                    if entries:
+                        cache_writes.append(
+                            await self.db.writes.enqueue(
+                                functools.partial(
+                                    repository.put_cached_predictions,
+                                    model_fingerprint=fingerprint,
+                                    entries=entries,
+                                    commit=False,
+                                )
+                            )
+                        )
+                    await predicted.put((indices, batch, predictions))
+            for _ in range(workers):
+                await predicted.put(None)
+
+        async def score() -> None:
+            nonlocal running_scorers
+            while True:
+                stats["score"].took(predicted)
+                item = await predicted.get()
+                if item is None:
+                    break
+                t0 = time.perf_counter()
+                rows = await loop.run_in_executor(
+                    executor, self._score_batch, item, metrics
+                )
+                stats["score"].busy_sec += time.perf_counter() - t0
+                stats["score"].items += len(rows)
+                for row in rows:
+                    scores_by_index[row["sample_index"]] = row["scores"]
+                await scored.put(rows)
+                if stopper is not None:
+                    metric = stopper.config.metric
+                    for row in rows:
+                        stopper.add(row["sample_index"], row["scores"].get(metric, 0.0))
+                    if (deltas := stopper.claim_look()) is not None:
+                        await loop.run_in_executor(executor, stopper.look, deltas)
+            running_scorers -= 1
+            if running_scorers == 0:
+                await scored.put(None)
+
+        async def persist() -> None:
+            while True:
+                stats["persist"].took(scored)
+                rows = await scored.get()
+                if rows is None:
+                    break
+                t0 = time.perf_counter()
+                writes.append(
+                    await self.db.writes.enqueue(
+                        functools.partial(
+                            repository.add_eval_results,
+                            run_id=self.run.id,
+                            rows=rows,
+                            commit=False,
+                        )
+                    )
+                )
+                stats["persist"].busy_sec += time.perf_counter() - t0
+                stats["persist"].items += len(rows)
+            # Every result row must be on disk before the run reads as
+            # completed; a failed insert fails the run like it used to.
+            t0 = time.perf_counter()
+            await self.db.writes.flush()
+            for fut in writes:
+                fut.result()
+            stats["persist"].busy_sec += time.perf_counter() - t0
+            # The cache is an optimisation: a failed insert only costs a
+            # regeneration next time.
+            for fut in cache_writes:
+                if fut.exception() is not None:
+                    logger.warning(
+                        "prediction cache write failed for eval run=%s: %s",
+                        self.run.id,
+                        fut.exception(),
+                    )
+
+        started = time.perf_counter()
+        tasks = [
+            asyncio.create_task(predict()),
+            *(asyncio.create_task(score()) for _ in range(workers)),
+            asyncio.create_task(persist()),
+        ]
+        try:
+            await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+        return scores_by_index, stats, time.perf_counter() - started
+
+    @classmethod
+    def _score_batch(
+        cls,
+        predicted: _Predicted,
+        metrics: list[tuple[str, Metric]],
+    ) -> list[dict[str, Any]]:
+        """Result rows for one predicted batch. Runs on the scoring pool."""
+        indices, samples, outcomes = predicted
+        predictions = [prediction for prediction, _ in outcomes]
+        errors: list[list[str]] = [[] for _ in samples]
+        values = {
+            name: cls._score_metric(name, metric, predictions, samples, errors)
+            for name, metric in metrics
+        }
+        rows = []
+        for k, (idx, sample) in enumerate(zip(indices, samples, strict=True)):
+            gold = sample.get("gold") if isinstance(sample.get("gold"), dict) else None
+            rows.append(
+                {
+                    "sample_index": idx,
+                    "input": sample,
+                    "prediction": predictions[k],
+                    "gold": gold,
+                    "scores": {name: values[name][k] for name, _ in metrics},
+                    "error": outcomes[k][1] or ("; ".join(errors[k]) or None),
+                }
+            )
+        return rows
+
+    @staticmethod
+    def _score_metric(
+        name: str,
+        metric: Metric,
+        predictions: list[str],
+        samples: list[dict[str, Any]],
+        errors: list[list[str]],
+    ) -> list[float]:
+        """``metric.score_batch`` over the batch. If it raises, score one
+        by one so the error (and the 0.0) lands on the failing sample."""
+        try:
+            values = [float(v) for v in metric.score_batch(predictions, samples)]
+            if len(values) != len(samples):
+                raise ValueError(
+                    f"score_batch returned {len(values)} scores for {len(samples)} samples"
+                )
+            return values
+        except Exception as e:
+            logger.warning(
+                "metric %s raised on a batch of %d, scoring one by one: %s",
+                name,
+                len(samples),
+                e,
+            )
+        values = []
+        for k, (prediction, sample) in enumerate(zip(predictions, samples, strict=True)):
+            try:
+                values.append(float(metric.score(prediction, sample)))
+            except Exception as e:
+                logger.warning("metric %s raised on sample: %s", name, e)
+                values.append(0.0)
+                errors[k].append(f"{name}: {e}")
+        return values
+
+    async def _predict_batch(
+        self, backend: InferenceBackend, batch: list[dict[str, Any]]
+    ) -> list[tuple[str, str | None]]:
+        """Predict a batch in one backend call. If the batch fails, retry
+        its samples one by one so the error lands on the sample that
+        caused it and its neighbours still get scored."""
+        if len(batch) == 1:
+            return [await self._predict_one(backend, batch[0])]
+        try:
+            predictions = await backend.predict_batch(
+                batch, self.suite.inference_params
+            )
+        except Exception as e:
+            logger.warning(
+                "batch predict failed for run=%s (%d samples), retrying one by one: %s",
+                self.run.id,
+                len(batch),
+                e,
+            )
+            return [await self._predict_one(backend, sample) for sample in batch]
+        return [(prediction, None) for prediction in predictions]
+
     async def _predict_one(
-        self, sample: dict[str, Any]
+        self, backend: InferenceBackend, sample: dict[str, Any]
     ) -> tuple[str, str | None]:
         try:
-            return await self.backend.predict(sample, self.suite.inference_params), None
+            return await backend.predict(sample, self.suite.inference_params), None
         except Exception as e:
             logger.warning(
                 "predict failed for run=%s sample=%s: %s",
@@ -254,26 +775,6 @@ class EvalDriver:
             )
             return "", f"predict failed: {e}"
 
-    @staticmethod
-    def _score_one(
-        prediction: str,
-        sample: dict[str, Any],
-        metrics: list[tuple[str, Metric]],
-        per_metric_scores: dict[str, list[float]],
-    ) -> tuple[dict[str, float], str | None]:
-        scores: dict[str, float] = {}
-        errs: list[str] = []
-        for name, metric in metrics:
-            try:
-                value = float(metric.score(prediction, sample))
-            except Exception as e:
-                logger.warning("metric %s raised on sample: %s", name, e)
-                value = 0.0
-                errs.append(f"{name}: {e}")
-            scores[name] = value
-            per_metric_scores[name].append(value)
-        return scores, "; ".join(errs) if errs else None
-
     @staticmethod
     def _aggregate(
         metrics: list[tuple[str, Metric]],
@@ -295,13 +796,14 @@ class EvalDriver:
     async def _publish_aggregates_to_mlflow(
         self, aggregate: dict[str, MetricAggregate]
     ) -> None:
-        """Push per-metric mean scores to the originating experiment's MLflow run.
-
-        Best-effort: if the eval wasn't triggered by an experiment, or the
-        experiment never produced an MLflow run, or the MLflow server is
-        unreachable, the eval still finalizes normally — we just log a
-        warning. The metrics surface in the MLflow UI as ``eval.<suite>.<metric>``
-        so users can sort / filter their experiment table by them.
+        """Queue per-metric scores for the originating experiment's MLflow run.
+
+        The records go into the MLflow gateway's outbox and are replayed by
+        its background flusher, so a slow or unreachable tracking server
+        never delays finalization. Skipped if the eval wasn't triggered by
+        an experiment or the experiment has no MLflow run. The metrics
+        surface in the MLflow UI as ``eval.<suite>.<metric>`` so users can
+        sort / filter their experiment table by them.
         """
         if not self.run.experiment_id:
             return
@@ -309,13 +811,11 @@ class EvalDriver:
             exp = await repository.get_experiment(conn, self.run.experiment_id)
         if exp is None or not exp.mlflow_run_id:
             return
+        metrics, tags = _eval_mlflow_records(self.suite.name, self.run.id, aggregate)
+        run_id = exp.mlflow_run_id
         try:
-            await asyncio.to_thread(
-                _log_eval_to_mlflow,
-                exp.mlflow_run_id,
-                self.suite.name,
-                self.run.id,
-                aggregate,
+            await self.db.writes.execute(
+                lambda conn: mlflow_gateway.enqueue(conn, run_id, metrics=metrics, tags=tags)
             )
         except Exception:
             logger.warning(
@@ -325,40 +825,41 @@ class EvalDriver:
             )
 
 
-def _log_eval_to_mlflow(
-    mlflow_run_id: str,
+def _decided(stopper: SequentialComparison | None) -> bool:
+    return stopper is not None and stopper.decision is not None
+
+
+def _eval_mlflow_records(
     suite_name: str,
     eval_run_id: str,
     aggregate: dict[str, MetricAggregate],
-) -> None:
-    """Synchronous MLflow client call. Imported lazily to keep the cold path light.
+) -> tuple[dict[str, float], dict[str, str]]:
+    """Return the ``(metrics, tags)`` an eval publishes to MLflow.
 
-    For each metric ``m`` we log:
+    For each metric ``m``:
 
     * metric ``eval.<suite>.<m>``        — the mean (sortable in MLflow UI)
     * metric ``eval.<suite>.<m>.std``    — standard deviation
+    * metrics ``eval.<suite>.<m>.ci_low`` / ``.ci_high`` — bootstrap CI
     * metric ``eval.<suite>.<m>.count``  — sample count
     * tag ``trainpipe.eval.<suite>``     — set to the eval_run_id so users
       can drill back from MLflow to the eval run
     * tag ``trainpipe.eval.<suite>.completed`` — ``"true"`` so MLflow
       search like ``tags."trainpipe.eval.foo.completed" = "true"`` works
     """
-    import mlflow
-    from mlflow.tracking import MlflowClient
-
-    mlflow.set_tracking_uri(settings.mlflow_tracking_uri)
-    client = MlflowClient()
     safe_suite = _mlflow_key(suite_name)
+    metrics: dict[str, float] = {}
     for metric_name, agg in aggregate.items():
-        safe_metric = _mlflow_key(metric_name)
-        base = f"eval.{safe_suite}.{safe_metric}"
-        client.log_metric(mlflow_run_id, base, float(agg.mean))
+        base = f"eval.{safe_suite}.{_mlflow_key(metric_name)}"
+        metrics[base] = float(agg.mean)
         if agg.std is not None:
-            client.log_metric(mlflow_run_id, f"{base}.std", float(agg.std))
-        client.log_metric(mlflow_run_id, f"{base}.count", float(agg.count))
-    client.set_tag(
-        mlflow_run_id, f"trainpipe.eval.{safe_suite}", eval_run_id,
-    )
-    client.set_tag(
-        mlflow_run_id, f"trainpipe.eval.{safe_suite}.completed", "true",
-    )
+            metrics[f"{base}.std"] = float(agg.std)
+        if agg.ci_low is not None and agg.ci_high is not None:
+            metrics[f"{base}.ci_low"] = float(agg.ci_low)
+            metrics[f"{base}.ci_high"] = float(agg.ci_high)
+        metrics[f"{base}.count"] = float(agg.count)
+    tags = {
+        f"trainpipe.eval.{safe_suite}": eval_run_id,
+        f"trainpipe.eval.{safe_suite}.completed": "true",
+    }
+    return metrics, tags
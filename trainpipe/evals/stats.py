@@ -0,0 +1,196 @@
+"""Streaming estimates, bootstrap confidence intervals and the sequential
+early-stopping test for eval runs.
+
+* :class:`RunningMean` — Welford mean / variance, fed batch by batch.
+* :func:`bootstrap_ci` — percentile bootstrap interval of a mean; numpy
+  when it's importable (resamples drawn in chunks), pure Python otherwise.
+  Seeded, so the same scores always give the same interval.
+* :class:`SequentialComparison` — paired per-sample Δ of a running eval
+  against a finished baseline run on one metric. It looks at the data
+  when the paired count reaches ``min_samples`` and then each time it
+  doubles; every look uses a bootstrap interval at
+  ``1 - (1 - confidence) / K`` for the ``K`` looks the suite allows
+  (Bonferroni), so peeking doesn't inflate the error rate above
+  ``1 - confidence``.
+"""
+
+from __future__ import annotations
+
+import math
+import random
+from collections.abc import Sequence
+from typing import Any
+
+from ..api.schemas import EarlyStopConfig
+
+# Resample-by-sample index matrix cells drawn per numpy chunk.
+_CHUNK_CELLS = 1 << 22
+
+
+class RunningMean:
+    """Mean and sample variance, updated one value at a time."""
+
+    __slots__ = ("_m2", "count", "mean")
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+
+    def add(self, value: float) -> None:
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (value - self.mean)
+
+    @property
+    def std(self) -> float:
+        return math.sqrt(self._m2 / (self.count - 1)) if self.count > 1 else 0.0
+
+
+def bootstrap_ci(
+    values: Sequence[float], *, level: float, resamples: int, seed: int = 0
+) -> tuple[float, float]:
+    """Percentile bootstrap interval at ``level`` for the mean of ``values``."""
+    n = len(values)
+    if n == 0:
+        raise ValueError("bootstrap_ci needs at least one value")
+    if n == 1:
+        return values[0], values[0]
+    means = _bootstrap_means_numpy(values, resamples, seed)
+    if means is None:
+        rng = random.Random(seed)
+        means = sorted(math.fsum(rng.choices(values, k=n)) / n for _ in range(resamples))
+    alpha = 1.0 - level
+    return _quantile(means, alpha / 2), _quantile(means, 1.0 - alpha / 2)
+
+
+def _bootstrap_means_numpy(
+    values: Sequence[float], resamples: int, seed: int
+) -> list[float] | None:
+    try:
+        import numpy as np
+    except ImportError:
+        return None
+    data = np.asarray(values, dtype=np.float64)
+    n = data.size
+    rng = np.random.default_rng(seed)
+    per_chunk = max(1, _CHUNK_CELLS // n)
+    means = []
+    for start in range(0, resamples, per_chunk):
+        rows = min(per_chunk, resamples - start)
+        means.append(data[rng.integers(0, n, size=(rows, n))].mean(axis=1))
+    return np.sort(np.concatenate(means)).tolist()
+
+
+def _quantile(ordered: list[float], q: float) -> float:
+    """Linear-interpolated quantile of an ascending list (numpy's default)."""
+    pos = q * (len(ordered) - 1)
+    lo = math.floor(pos)
+    hi = min(lo + 1, len(ordered) - 1)
+    return ordered[lo] + (ordered[hi] - ordered[lo]) * (pos - lo)
+
+
+class SequentialComparison:
+    """Decides, while a run is scored, whether it beats, trails or matches
+    a baseline run on one metric.
+
+    ``baseline`` holds the baseline's score per sample index; samples the
+    baseline never scored don't pair and are ignored. ``pairable`` is how
+    many samples of this run can pair at most, which fixes the number of
+    looks ``K``. ``decision`` is ``"better"`` / ``"worse"`` (interval
+    clear of ``±margin`` in the metric's direction) or ``"equivalent"``
+    (interval inside ``[-margin, margin]``), and ``None`` until then.
+    """
+
+    def __init__(
+        self,
+        config: EarlyStopConfig,
+        *,
+        baseline_run_id: str,
+        baseline: dict[int, float],
+        pairable: int,
+        higher_is_better: bool = True,
+        resamples: int = 1000,
+    ) -> None:
+        self.config = config
+        self.baseline_run_id = baseline_run_id
+        self.baseline = baseline
+        self.higher_is_better = higher_is_better
+        self.resamples = resamples
+        self.deltas: dict[int, float] = {}
+        self.delta = RunningMean()
+        self.planned_looks = 1
+        first = config.min_samples
+        while first * 2 ** self.planned_looks <= pairable:
+            self.planned_looks += 1
+        self.looks = 0
+        self.next_look = first
+        self.decision: str | None = None
+        self.ci: tuple[float, float] | None = None
+        self._looking = False
+
+    @property
+    def look_level(self) -> float:
+        return 1.0 - (1.0 - self.config.confidence) / self.planned_looks
+
+    def add(self, index: int, score: float) -> None:
+        base = self.baseline.get(index)
+        if base is None or index in self.deltas:
+            return
+        self.deltas[index] = score - base
+        self.delta.add(score - base)
+
+    def claim_look(self) -> list[float] | None:
+        """The paired Δs to look at if a look is due, else ``None``.
+
+        Advances the schedule, so a look is claimed once; looks overtaken
+        by data that arrived at once (a resumed run) count as spent.
+        """
+        if self.decision is not None or self._looking or self.looks >= self.planned_looks:
+            return None
+        if len(self.deltas) < self.next_look:
+            return None
+        while self.next_look <= len(self.deltas) and self.looks < self.planned_looks:
+            self.looks += 1
+            self.next_look *= 2
+        self._looking = True
+        return list(self.deltas.values())
+
+    def look(self, deltas: list[float]) -> str | None:
+        """Bootstrap ``deltas`` (from :meth:`claim_look`) and record the
+        decision, if the interval settles one."""
+        try:
+            low, high = bootstrap_ci(
+                deltas, level=self.look_level, resamples=self.resamples, seed=len(deltas)
+            )
+            self.ci = (low, high)
+            if not self.higher_is_better:
+                low, high = -high, -low
+            margin = self.config.margin
+            if low > margin:
+                self.decision = "better"
+            elif high < -margin:
+                self.decision = "worse"
+            elif margin > 0 and -margin <= low and high <= margin:
+                self.decision = "equivalent"
+        finally:
+            self._looking = False
+        return self.decision
+
+    def summary(self) -> dict[str, Any]:
+        """What the run records in ``pipeline_stats["early_stop"]``."""
+        return {
+            "baseline": self.config.baseline,
+            "baseline_run_id": self.baseline_run_id,
+            "metric": self.config.metric,
+            "margin": self.config.margin,
+            "confidence": self.config.confidence,
+            "decision": self.decision,
+            "paired": self.delta.count,
+            "mean_delta": self.delta.mean if self.delta.count else None,
+            "ci_low": self.ci[0] if self.ci else None,
+            "ci_high": self.ci[1] if self.ci else None,
+            "looks": self.looks,
+            "planned_looks": self.planned_looks,
+        }
@@ -1,9 +1,17 @@
 """Inference / playground service (Phase 8).
 
-Loads a base model + optional adapter on demand, caches up to N backends
-LRU-style, and serves single + streaming + compare predictions.
+Loads a base model + optional adapter on demand, keeps up to N backends
+resident (shared with eval runs, see :mod:`.residency`), and serves
+single + streaming + compare predictions.
 """
 
+from .residency import ModelResidency, ResidentBackend
 from .service import InferenceService, ModelRef, resolve_model_ref
 
-__all__ = ["InferenceService", "ModelRef", "resolve_model_ref"]
+__all__ = [
+    "InferenceService",
+    "ModelRef",
+    "ModelResidency",
+    "ResidentBackend",
+    "resolve_model_ref",
+]
@@ -0,0 +1,302 @@
+"""Process-wide residency of loaded model backends.
+
+One :class:`ModelResidency` is shared by the inference playground
+(:class:`~trainpipe.inference.service.InferenceService`) and the eval
+dispatcher, so a model both want is loaded once. Entries are keyed by
+the weights they serve, ``(base_model, adapter_path)``:
+
+* :meth:`ModelResidency.acquire` returns the opened backend and pins it
+  (reference count); a miss loads it first. Concurrent misses on the
+  same key share one load.
+* :meth:`ModelResidency.release` unpins it. An idle (unpinned) entry
+  stays loaded for the next borrower until it is the least recently
+  used one when another model needs room (``max_loaded``), or, with
+  ``keep_idle_sec``, until it has been idle that long.
+* Pinned entries are never evicted. A load with every slot pinned goes
+  over ``max_loaded`` (logged) rather than waiting on borrowers that
+  may hold their model for an entire eval.
+
+:class:`ResidentBackend` wraps that for code written against a plain
+:class:`InferenceBackend` (the eval driver): ``open`` borrows, ``close``
+gives back.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from collections import OrderedDict
+from collections.abc import AsyncIterator, Awaitable, Callable
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import Any
+
+from ..api.schemas import InferenceParams
+from ..evals.inference import InferenceBackend
+
+logger = logging.getLogger(__name__)
+
+ModelKey = tuple[str, str | None]
+OnClose = Callable[[], Awaitable[None]]
+
+
+@dataclass(eq=False)
+class _Resident:
+    backend: InferenceBackend
+    refs: int = 0
+    keep_idle_sec: float | None = None
+    on_close: OnClose | None = None
+    expiry: asyncio.TimerHandle | None = field(default=None, repr=False)
+
+
+class ModelResidency:
+    """Reference-counted, LRU-bounded set of opened backends."""
+
+    def __init__(self, *, max_loaded: int = 2) -> None:
+        self.max_loaded = max_loaded
+        self._resident: OrderedDict[ModelKey, _Resident] = OrderedDict()
+        # Invalidated while pinned: closed when the last borrower releases.
+        self._retired: list[_Resident] = []
+        # Short-held; never across backend.open() / close().
+        self._map_lock = asyncio.Lock()
+        self._load_locks: dict[ModelKey, asyncio.Lock] = {}
+        self.loads = 0
+        self.reuses = 0
+
+    async def acquire(
+        self,
+        key: ModelKey,
+        factory: Callable[[], InferenceBackend],
+        *,
+        keep_idle_sec: float | None = None,
+        on_close: OnClose | None = None,
+    ) -> InferenceBackend:
+        """The opened, pinned backend for ``key``; loads it with
+        ``factory`` if it isn't resident. ``keep_idle_sec`` and
+        ``on_close`` (run after the backend is closed) apply only to a
+        backend this call loads."""
+        async with self._map_lock:
+            if (backend := self._pin(key)) is not None:
+                return backend
+            load_lock = self._load_locks.setdefault(key, asyncio.Lock())
+
+        async with load_lock:
+            async with self._map_lock:
+                if (backend := self._pin(key)) is not None:
+                    return backend
+                evicted = self._make_room()
+            for entry in evicted:
+                await self._close(entry)
+
+            backend = factory()
+            try:
+                await backend.open()
+            except Exception:
+                logger.exception("backend.open() failed for %s", key)
+                try:
+                    await backend.close()
+                except Exception:
+                    logger.exception("post-failure close also raised")
+                raise
+            async with self._map_lock:
+                self._resident[key] = _Resident(
+                    backend, refs=1, keep_idle_sec=keep_idle_sec, on_close=on_close
+                )
+                self.loads += 1
+            return backend
+
+    async def pin(self, key: ModelKey) -> InferenceBackend | None:
+        """Pin ``key`` only if it is resident (never loads); release as
+        after :meth:`acquire`."""
+        async with self._map_lock:
+            return self._pin(key)
+
+    def _pin(self, key: ModelKey) -> InferenceBackend | None:
+        entry = self._resident.get(key)
+        if entry is None:
+            return None
+        entry.refs += 1
+        if entry.expiry is not None:
+            entry.expiry.cancel()
+            entry.expiry = None
+        self._resident.move_to_end(key)
+        self.reuses += 1
+        return entry.backend
+
+    def _make_room(self) -> list[_Resident]:
+        """Unmap idle entries, least recently used first, until a new one
+        fits; returns them for closing outside the lock."""
+        evicted: list[_Resident] = []
+        idle = [k for k, e in self._resident.items() if e.refs == 0]
+        while len(self._resident) >= self.max_loaded and idle:
+            evicted.append(self._resident.pop(idle.pop(0)))
+        if len(self._resident) >= self.max_loaded:
+            logger.warning(
+                "loading a model over max_loaded=%d: every resident model is in use",
+                self.max_loaded,
+            )
+        return evicted
+
+    async def release(self, key: ModelKey, backend: InferenceBackend) -> None:
+        """Unpin ``backend`` (as returned by :meth:`acquire` for ``key``)."""
+        to_close: _Resident | None = None
+        async with self._map_lock:
+            entry = self._resident.get(key)
+            if entry is not None and entry.backend is backend:
+                entry.refs -= 1
+                if entry.refs == 0 and entry.keep_idle_sec is not None:
+                    entry.expiry = asyncio.get_running_loop().call_later(
+                        entry.keep_idle_sec,
+                        lambda: asyncio.ensure_future(self._expire(key, entry)),
+                    )
+            else:
+                for retired in self._retired:
+                    if retired.backend is backend:
+                        retired.refs -= 1
+                        if retired.refs == 0:
+                            self._retired.remove(retired)
+                            to_close = retired
+                        break
+        if to_close is not None:
+            await self._close(to_close)
+
+    @asynccontextmanager
+    async def borrow(
+        self, key: ModelKey, factory: Callable[[], InferenceBackend]
+    ) -> AsyncIterator[InferenceBackend]:
+        """``acquire`` for the ``async with`` block."""
+        backend = await self.acquire(key, factory)
+        try:
+            yield backend
+        finally:
+            await self.release(key, backend)
+
+    async def _expire(self, key: ModelKey, entry: _Resident) -> None:
+        async with self._map_lock:
+            if self._resident.get(key) is not entry or entry.refs:
+                return
+            del self._resident[key]
+        await self._close(entry)
+
+    async def invalidate(self, key: ModelKey) -> None:
+        """Drop ``key`` so the next acquire loads it afresh (e.g. after a
+        predict failure left the backend suspect). Borrowers keep their
+        handle; it's closed when the last one releases."""
+        async with self._map_lock:
+            entry = self._resident.pop(key, None)
+            if entry is not None and entry.refs:
+                self._retired.append(entry)
+                return
+        if entry is not None:
+            await self._close(entry)
+
+    async def evict_idle(self, keys: set[ModelKey]) -> int:
+        """Close the idle entries among ``keys`` now; returns how many."""
+        async with self._map_lock:
+            evicted = [
+                self._resident.pop(k)
+                for k in [k for k in keys if k in self._resident]
+                if self._resident[k].refs == 0
+            ]
+        for entry in evicted:
+            await self._close(entry)
+        return len(evicted)
+
+    async def close_all(self) -> None:
+        async with self._map_lock:
+            entries = [*self._resident.values(), *self._retired]
+            self._resident.clear()
+            self._retired.clear()
+        for entry in entries:
+            await self._close(entry)
+
+    async def _close(self, entry: _Resident) -> None:
+        if entry.expiry is not None:
+            entry.expiry.cancel()
+        try:
+            await entry.backend.close()
+        except Exception:
+            logger.exception("closing a resident backend failed")
+        if entry.on_close is not None:
+            try:
+                await entry.on_close()
+            except Exception:
+                logger.exception("resident backend on_close hook failed")
+
+    def keys(self) -> list[ModelKey]:
+        """Resident keys, least recently used first."""
+        return list(self._resident)
+
+    def refs(self, key: ModelKey) -> int:
+        entry = self._resident.get(key)
+        return entry.refs if entry is not None else 0
+
+
+class ResidentBackend(InferenceBackend):
+    """An :class:`InferenceBackend` whose model lives in a
+    :class:`ModelResidency`.
+
+    ``template`` is the unopened backend to load on a miss; it also
+    answers ``fingerprint`` and ``prompt_of`` before the model is needed,
+    so a run served entirely from the prediction cache never borrows.
+    ``on_load`` runs after a miss this backend loaded itself.
+    """
+
+    def __init__(
+        self,
+        residency: ModelResidency,
+        key: ModelKey,
+        template: InferenceBackend,
+        *,
+        keep_idle_sec: float | None = None,
+        on_load: OnClose | None = None,
+        on_close: OnClose | None = None,
+    ) -> None:
+        self.residency = residency
+        self.key = key
+        self.template = template
+        self.keep_idle_sec = keep_idle_sec
+        self.on_load = on_load
+        self.on_close = on_close
+        self.loaded = False
+        self._backend: InferenceBackend | None = None
+
+    def _factory(self) -> InferenceBackend:
+        self.loaded = True
+        return self.template
+
+    async def open(self) -> None:
+        if self._backend is not None:
+            return
+        self._backend = await self.residency.acquire(
+            self.key,
+            self._factory,
+            keep_idle_sec=self.keep_idle_sec,
+            on_close=self.on_close,
+        )
+        if self.loaded and self.on_load is not None:
+            await self.on_load()
+
+    def _opened(self) -> InferenceBackend:
+        if self._backend is None:
+            raise RuntimeError("backend not opened")
+        return self._backend
+
+    async def predict(self, sample: dict[str, Any], params: InferenceParams) -> str:
+        return await self._opened().predict(sample, params)
+
+    async def predict_batch(
+        self, samples: list[dict[str, Any]], params: InferenceParams
+    ) -> list[str]:
+        return await self._opened().predict_batch(samples, params)
+
+    async def fingerprint(self) -> str | None:
+        return await self.template.fingerprint()
+
+    def prompt_of(self, sample: dict[str, Any]) -> str:
+        return (self._backend or self.template).prompt_of(sample)
+
+    async def close(self) -> None:
+        backend, self._backend = self._backend, None
+        if backend is not None:
+            await self.residency.release(self.key, backend)
@@ -11,17 +11,19 @@ forms (resolved against the DB):
 * ``<name>@<version:int>`` — explicit registered version
   (``invoice-extractor@3``).
 
-``InferenceService`` keeps an LRU cache of opened :class:`InferenceBackend`
-instances keyed by the resolved ``(base_model, adapter_path)`` tuple, so
-two refs that point at the same artifact share a load.
+``InferenceService`` keeps opened :class:`InferenceBackend` instances in a
+:class:`~.residency.ModelResidency` keyed by the resolved
+``(base_model, adapter_path)`` tuple, so two refs that point at the same
+artifact — and eval runs of it — share a load.
 """
 
 from __future__ import annotations
 
-import asyncio
 import logging
-from collections import OrderedDict
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
 from dataclasses import dataclass
+from functools import partial
 from pathlib import Path
 
 import aiosqlite
@@ -30,6 +32,7 @@ from ..core import repository
 from ..core.db import Database
 from ..evals.inference import InferenceBackend
 from ..settings import settings
+from .residency import ModelResidency
 
 logger = logging.getLogger(__name__)
 
@@ -107,11 +110,14 @@ BackendFactory = "callable[[ModelRef], InferenceBackend]"
 
 
 class InferenceService:
-    """Process-wide cache of opened inference backends.
+    """Opened inference backends for the playground and active learning.
 
-    The cache is bounded LRU (``max_loaded``); evicting an entry calls
-    its :meth:`InferenceBackend.close` to free GPU memory before loading
-    the replacement.
+    Backends live in a :class:`ModelResidency` — pass the process-wide one
+    so eval runs borrow the same loaded models (``api/main.py`` does);
+    without one the service keeps its own, bounded LRU at ``max_loaded``.
+    Evicting an entry calls its :meth:`InferenceBackend.close` to free GPU
+    memory before loading the replacement; a model that is borrowed
+    (:meth:`borrow`, or by an eval run) is never evicted.
 
     ``backend_factory`` lets tests inject :class:`MockInferenceBackend`;
     the default factory builds a :class:`TransformersInferenceBackend`
@@ -124,84 +130,33 @@ class InferenceService:
         *,
         max_loaded: int = 2,
         backend_factory=None,
+        residency: ModelResidency | None = None,
     ) -> None:
         self.db = db
-        self.max_loaded = max_loaded
-        self._cache: OrderedDict[tuple[str, str | None], InferenceBackend] = OrderedDict()
-        # Short-held lock: protects cache map + per-key load lock map. NOT
-        # held across slow backend.open() — that would queue every cache
-        # hit behind a cold load.
-        self._map_lock = asyncio.Lock()
-        # Per-key load locks: only the cold-load path takes one. Two
-        # concurrent gets for the same uncached ref serialize; gets for
-        # different refs (or cache hits) don't.
-        self._load_locks: dict[tuple[str, str | None], asyncio.Lock] = {}
+        self.residency = residency or ModelResidency(max_loaded=max_loaded)
         self._factory = backend_factory or _default_factory
 
-    async def _get_load_lock(self, key: tuple[str, str | None]) -> asyncio.Lock:
-        async with self._map_lock:
-            lock = self._load_locks.get(key)
-            if lock is None:
-                lock = asyncio.Lock()
-                self._load_locks[key] = lock
-            return lock
+    @property
+    def max_loaded(self) -> int:
+        return self.residency.max_loaded
 
     async def get(self, ref: ModelRef) -> InferenceBackend:
-        """Return an opened backend for ``ref``.
+        """Return an opened backend for ``ref``, loading it on a miss.
 
-        Cache hits are O(1) and contention-free; cold loads serialize per
-        ``ref`` so two concurrent requests for the same uncached model
-        share one load instead of double-allocating.
+        Resident hits are O(1); cold loads serialize per ``ref`` so two
+        concurrent requests for the same uncached model share one load
+        instead of double-allocating. The backend isn't pinned: use
+        :meth:`borrow` to keep it loaded while predicting.
         """
-        key = ref.cache_key
-
-        # Fast path: cache hit, just bump LRU order.
-        async with self._map_lock:
-            backend = self._cache.get(key)
-            if backend is not None:
-                self._cache.move_to_end(key)
-                return backend
-
-        # Cold path: per-key load lock. A second waiter for the same key
-        # finds the cache populated when it acquires the lock.
-        load_lock = await self._get_load_lock(key)
-        async with load_lock:
-            async with self._map_lock:
-                backend = self._cache.get(key)
-                if backend is not None:
-                    self._cache.move_to_end(key)
-                    return backend
-                # Evict before we allocate the new entry so peak GPU usage
-                # stays bounded by ``max_loaded`` even mid-load.
-                to_close: list[InferenceBackend] = []
-                while len(self._cache) >= self.max_loaded and self._cache:
-                    _ek, ev = self._cache.popitem(last=False)
-                    to_close.append(ev)
-            # Close evicted backends OUTSIDE the map lock — their close
-            # may also do slow GPU work and we don't want to block the
-            # cache map on it.
-            for ev in to_close:
-                try:
-                    await ev.close()
-                except Exception:
-                    logger.exception("eviction close failed")
-
-            new_backend = self._factory(ref)
-            try:
-                await new_backend.open()
-            except Exception:
-                # Don't leak a half-initialized backend if open() failed
-                # — call close() best-effort to free whatever it did
-                # acquire, then re-raise so the caller sees the load error.
-                logger.exception("backend.open() failed for %s", key)
-                try:
-                    await new_backend.close()
-                except Exception:
-                    logger.exception("post-failure close also raised")
-                raise
-            async with self._map_lock:
-                self._cache[key] = new_backend
-            return new_backend
+        async with self.borrow(ref) as backend:
+            return backend
+
+    @asynccontextmanager
+    async def borrow(self, ref: ModelRef) -> AsyncIterator[InferenceBackend]:
+        """The opened backend for ``ref``, pinned against eviction for the
+        ``async with`` block."""
+        async with self.residency.borrow(ref.cache_key, partial(self._factory, ref)) as backend:
+            yield backend
 
     async def invalidate(self, ref: ModelRef) -> None:
         """Drop ``ref`` from the cache and close its backend.
@@ -210,32 +165,18 @@ class InferenceService:
         broken state (corrupted CUDA context, etc.), so the next request
         triggers a fresh load instead of reusing the bad one.
         """
-        key = ref.cache_key
-        async with self._map_lock:
-            backend = self._cache.pop(key, None)
-        if backend is not None:
-            try:
-                await backend.close()
-            except Exception:
-                logger.exception("invalidate close failed")
+        await self.residency.invalidate(ref.cache_key)
 
     async def resolve(self, raw: str) -> ModelRef:
         async with self.db.connect() as conn:
             return await resolve_model_ref(raw, conn)
 
     async def close_all(self) -> None:
-        async with self._map_lock:
-            backends = list(self._cache.values())
-            self._cache.clear()
-        for backend in backends:
-            try:
-                await backend.close()
-            except Exception:
-                logger.exception("close_all failed for one backend")
+        await self.residency.close_all()
 
     def cache_keys(self) -> list[tuple[str, str | None]]:
         """Snapshot of currently-loaded backend keys (oldest → newest)."""
-        return list(self._cache.keys())
+        return self.residency.keys()
 
 
 def _default_factory(ref: ModelRef) -> InferenceBackend:
@@ -0,0 +1,323 @@
+"""Process-wide MLflow access with a persistent write outbox.
+
+Launches used to build a fresh ``MlflowClient`` and look the experiment
+up by name on every run, and eval aggregates / run finalization were
+pushed synchronously — a slow or down tracking server stalled both.
+:data:`gateway` instead keeps:
+
+* one cached client and an experiment-name → id map, so creating a run
+  is a single round trip;
+* a short circuit breaker: after a failure, :meth:`MlflowGateway.create_run`
+  fails fast for ``mlflow_retry_sec`` and the scheduler launches the run
+  untracked rather than waiting on retries;
+* the ``mlflow_outbox`` table (migration v21). Metric / param / tag
+  writes and run termination are *enqueued* in the caller's own
+  transaction with :func:`enqueue` — nothing talks to MLflow on those
+  paths. A background task replays the outbox in ``log_batch`` calls
+  every ``mlflow_outbox_flush_sec`` and keeps rows until the server
+  accepts them, so writes survive both an outage and a restart.
+
+Rows for one run replay in insertion order, with termination after the
+run's pending metrics. Batches the server accepted are deleted even when a
+later call for the same run fails, so they are never sent twice. Only an
+unreachable or failing server (connection errors, timeouts, 5xx) trips the
+breaker and ends a flush; a batch the server rejects (a deleted run, a
+param conflict — 4xx) only costs that run an attempt while the other runs'
+rows still go out. A row the server keeps rejecting is dropped after
+``mlflow_outbox_max_attempts`` tries.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import threading
+import time
+from collections.abc import Callable
+from typing import TYPE_CHECKING, Any
+
+import aiosqlite
+
+from ..settings import settings
+
+if TYPE_CHECKING:
+    from ..core.db import Database
+
+logger = logging.getLogger(__name__)
+
+# MLflow's per-request log_batch limits.
+_MAX_BATCH = {"metric": 1000, "param": 100, "tag": 100}
+_MAX_BATCH_TOTAL = 1000
+
+
+class MlflowUnavailable(RuntimeError):
+    """The tracking server failed recently; not retried until the breaker resets."""
+
+
+def _server_unreachable(error: Exception) -> bool:
+    """Whether ``error`` says the tracking server is down rather than that
+    it rejected this request. MLflow reports transport failures after its
+    own retries as an ``MlflowException`` with HTTP status 500."""
+    if isinstance(error, (OSError, TimeoutError)):
+        return True
+    status = getattr(error, "get_http_status_code", None)
+    return callable(status) and (status() >= 500 or status() == 429)
+
+
+def _default_client() -> Any:
+    from mlflow.tracking import MlflowClient
+
+    return MlflowClient(tracking_uri=settings.mlflow_tracking_uri)
+
+
+async def enqueue(
+    conn: aiosqlite.Connection,
+    run_id: str,
+    *,
+    metrics: dict[str, float] | None = None,
+    params: dict[str, Any] | None = None,
+    tags: dict[str, Any] | None = None,
+    terminate: str | None = None,
+    step: int = 0,
+) -> None:
+    """Queue writes for ``run_id`` in the caller's transaction (no commit).
+
+    ``terminate`` is a final run status: FINISHED | FAILED | KILLED.
+    """
+    now_ms = int(time.time() * 1000)
+    rows: list[tuple[str, str, str | None, str | None, int, int]] = []
+    for key, value in (metrics or {}).items():
+        rows.append((run_id, "metric", key, json.dumps(float(value)), step, now_ms))
+    for key, value in (params or {}).items():
+        rows.append((run_id, "param", key, str(value), step, now_ms))
+    for key, value in (tags or {}).items():
+        rows.append((run_id, "tag", key, str(value), step, now_ms))
+    if terminate is not None:
+        rows.append((run_id, "terminate", None, terminate, step, now_ms))
+    await conn.executemany(
+        "INSERT INTO mlflow_outbox (run_id, kind, key, value, step, timestamp_ms) "
+        "VALUES (?, ?, ?, ?, ?, ?)",
+        rows,
+    )
+
+
+class MlflowGateway:
+    def __init__(self, *, client_factory: Callable[[], Any] | None = None) -> None:
+        self._client_factory = client_factory or _default_client
+        self._client: Any = None
+        self._experiment_ids: dict[str, str] = {}
+        # create_run is called from worker threads.
+        self._lock = threading.Lock()
+        self._down_until = 0.0
+        self.db: Database | None = None
+        self._task: asyncio.Task | None = None
+        self._stats: dict[str, int] = {
+            "runs_created": 0,
+            "create_failures": 0,
+            "ops_sent": 0,
+            "batches_sent": 0,
+            "flush_failures": 0,
+            "ops_dropped": 0,
+        }
+
+    def client(self) -> Any:
+        with self._lock:
+            if self._client is None:
+                self._client = self._client_factory()
+            return self._client
+
+    def reset(self) -> None:
+        """Forget the client and cached ids (tracking URI changed, tests)."""
+        with self._lock:
+            self._client = None
+            self._experiment_ids.clear()
+            self._down_until = 0.0
+
+    @property
+    def available(self) -> bool:
+        return time.monotonic() >= self._down_until
+
+    def mark_down(self) -> None:
+        self._down_until = time.monotonic() + settings.mlflow_retry_sec
+
+    def experiment_id(self, name: str) -> str:
+        cached = self._experiment_ids.get(name)
+        if cached is not None:
+            return cached
+        client = self.client()
+        existing = client.get_experiment_by_name(name)
+        exp_id = existing.experiment_id if existing else client.create_experiment(name)
+        self._experiment_ids[name] = exp_id
+        return exp_id
+
+    def create_run(
+        self, experiment_name: str, run_name: str, tags: dict[str, str]
+    ) -> tuple[str, str]:
+        """Blocking. Returns ``(mlflow_experiment_id, run_id)``."""
+        if not self.available:
+            raise MlflowUnavailable(
+                f"MLflow at {settings.mlflow_tracking_uri} unreachable; retrying later"
+            )
+        try:
+            exp_id = self.experiment_id(experiment_name)
+            run = self.client().create_run(experiment_id=exp_id, run_name=run_name, tags=tags)
+        except Exception:
+            self._stats["create_failures"] += 1
+            # The cached id may point at a deleted experiment.
+            self._experiment_ids.pop(experiment_name, None)
+            self.mark_down()
+            raise
+        self._stats["runs_created"] += 1
+        return exp_id, run.info.run_id
+
+    # -- outbox replay --------------------------------------------------
+
+    async def start(self, db: Database) -> None:
+        self.db = db
+        self._task = asyncio.create_task(self._run(), name="trainpipe-mlflow-outbox")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        # No final flush: a down server would hold shutdown hostage to the
+        # client's retries. Leftover rows replay after the next start.
+        self.db = None
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(settings.mlflow_outbox_flush_sec)
+            try:
+                await self.flush()
+            except Exception:
+                logger.exception("mlflow outbox flush failed")
+
+    async def flush(self, limit: int = 5000) -> int:
+        """Send pending outbox rows; returns how many were accepted."""
+        if self.db is None or not self.available:
+            return 0
+        async with self.db.read() as conn:
+            cur = await conn.execute(
+                "SELECT id, run_id, kind, key, value, step, timestamp_ms, attempts "
+                "FROM mlflow_outbox ORDER BY id LIMIT ?",
+                (limit,),
+            )
+            rows = list(await cur.fetchall())
+        if not rows:
+            return 0
+        by_run: dict[str, list[tuple]] = {}
+        for row in rows:
+            by_run.setdefault(row[1], []).append(tuple(row))
+
+        sent = 0
+        for run_id, run_rows in by_run.items():
+            accepted: list[int] = []
+            try:
+                await asyncio.to_thread(self._send, run_id, run_rows, accepted)
+                error = None
+            except Exception as e:
+                error = e
+            if accepted:
+                # Delete what MLflow took even if a later call failed, or
+                # the next flush sends it twice.
+                await self.db.writes.execute(lambda conn, ids=accepted: _delete(conn, ids))
+                sent += len(accepted)
+            if error is None:
+                continue
+            self._stats["flush_failures"] += 1
+            done = set(accepted)
+            await self._record_failure([r for r in run_rows if r[0] not in done], error)
+            if _server_unreachable(error):
+                # Every other run would fail the same way.
+                self.mark_down()
+                break
+        self._stats["ops_sent"] += sent
+        return sent
+
+    def _send(self, run_id: str, rows: list[tuple], accepted: list[int]) -> None:
+        """Replay one run's rows in order; appends each row id to
+        ``accepted`` as soon as the call carrying it succeeds."""
+        from mlflow.entities import Metric, Param, RunTag
+
+        client = self.client()
+        batch: dict[str, list] = {"metric": [], "param": [], "tag": []}
+        batch_ids: list[int] = []
+
+        def send_batch() -> None:
+            if any(batch.values()):
+                client.log_batch(
+                    run_id, metrics=batch["metric"], params=batch["param"], tags=batch["tag"]
+                )
+                self._stats["batches_sent"] += 1
+                accepted.extend(batch_ids)
+                batch_ids.clear()
+                for entries in batch.values():
+                    entries.clear()
+
+        for row_id, _run, kind, key, value, step, ts, _attempts in rows:
+            if kind == "terminate":
+                send_batch()
+                client.set_terminated(run_id, status=value)
+                accepted.append(row_id)
+                continue
+            if (
+                len(batch[kind]) >= _MAX_BATCH[kind]
+                or sum(map(len, batch.values())) >= _MAX_BATCH_TOTAL
+            ):
+                send_batch()
+            batch_ids.append(row_id)
+            if kind == "metric":
+                batch[kind].append(Metric(key, json.loads(value), ts, step))
+            elif kind == "param":
+                batch[kind].append(Param(key, value))
+            else:
+                batch[kind].append(RunTag(key, value))
+        send_batch()
+
+    async def _record_failure(self, rows: list[tuple], error: Exception) -> None:
+        assert self.db is not None
+        ids = [r[0] for r in rows]
+        dead = [r[0] for r in rows if r[7] + 1 >= settings.mlflow_outbox_max_attempts]
+        logger.warning(
+            "mlflow outbox: %d op(s) for run %s not accepted (%s)", len(rows), rows[0][1], error
+        )
+        if dead:
+            logger.error("mlflow outbox: dropping %d op(s) after repeated failures", len(dead))
+            self._stats["ops_dropped"] += len(dead)
+
+        async def op(conn: aiosqlite.Connection) -> None:
+            marks = ",".join("?" * len(ids))
+            await conn.execute(
+                f"UPDATE mlflow_outbox SET attempts = attempts + 1 WHERE id IN ({marks})", ids
+            )
+            if dead:
+                await _delete(conn, dead)
+
+        await self.db.writes.execute(op)
+
+    async def pending(self) -> int:
+        if self.db is None:
+            return 0
+        async with self.db.read() as conn:
+            cur = await conn.execute("SELECT COUNT(*) FROM mlflow_outbox")
+            return int((await cur.fetchone())[0])
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            **self._stats,
+            "available": self.available,
+            "cached_experiments": len(self._experiment_ids),
+        }
+
+
+async def _delete(conn: aiosqlite.Connection, ids: list[int]) -> None:
+    marks = ",".join("?" * len(ids))
+    await conn.execute(f"DELETE FROM mlflow_outbox WHERE id IN ({marks})", ids)
+
+
+gateway = MlflowGateway()
@@ -105,7 +105,9 @@ def cancel_experiment(experiment_id: str) -> dict:
 @mcp.tool()
 def tail_logs(experiment_id: str, n_lines: int = 80) -> str:
     """Return the last ``n_lines`` of the experiment's training log."""
-    body = _unwrap(_get_client().get(f"/experiments/{experiment_id}/logs"))
+    body = _unwrap(
+        _get_client().get(f"/experiments/{experiment_id}/logs", params={"tail": n_lines})
+    )
     if not isinstance(body, str):
         body = str(body)
     lines = body.splitlines()
@@ -462,15 +464,20 @@ def cancel_eval_run(run_id: str) -> dict:
 
 
 @mcp.tool()
-def compare_evals(run_ids: list[str]) -> dict:
+def compare_evals(run_ids: list[str], limit: int = 100, offset: int = 0) -> dict:
     """Compare 2+ eval runs against the same suite. Returns per-metric
-    ``aggregate_delta`` (mean per run) and the ``regressions`` list —
-    samples where runs disagree. Use this to decide whether a retrained
-    model actually improved over the previous version."""
+    ``aggregate_delta`` (mean per run), ``vs_baseline`` (mean Δ and
+    win/loss/tie counts of each run against the first one) and a page of
+    the ``regressions`` list — samples where runs disagree, with
+    ``regressions_total`` for paging. Use this to decide whether a
+    retrained model actually improved over the previous version."""
     if len(run_ids) < 2:
         raise RuntimeError("compare_evals requires at least two run_ids")
     return _unwrap(
-        _get_client().get("/evals/compare", params={"run_ids": ",".join(run_ids)})
+        _get_client().get(
+            "/evals/compare",
+            params={"run_ids": ",".join(run_ids), "limit": limit, "offset": offset},
+        )
     )
 
 
@@ -504,13 +511,16 @@ def forget_scan(
 
     async def _do():
         db = Database(settings.sqlite_path)
-        async with db.connect() as conn:
-            report = await scan_datasets_for_term(
-                conn,
-                term,
-                is_regex=regex,
-                case_sensitive=case_sensitive,
-            )
+        try:
+            async with db.read() as conn:
+                report = await scan_datasets_for_term(
+                    conn,
+                    term,
+                    is_regex=regex,
+                    case_sensitive=case_sensitive,
+                )
+        finally:
+            await db.close()
         return report.to_dict()
 
     return asyncio.run(_do())
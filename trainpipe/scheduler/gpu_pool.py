@@ -4,16 +4,45 @@ Detection uses pynvml; on hosts without NVIDIA drivers we degrade gracefully to
 an empty pool so the API still boots (no experiment will ever leave 'queued').
 
 Leases are persisted in the gpu_leases table so a process restart can recover
-state and orphaned leases are released on boot.
+state and orphaned leases are released on boot. A lease is one row per
+(gpu_index, holder): ``vram_mb IS NULL`` holds the whole device, otherwise
+the holder reserved that many MB and other fractional leases may share the
+GPU. Fractional requests are bin-packed best-fit — onto the GPU whose free
+memory (by reservations and, when available, live NVML readings) leaves the
+least slack — so small LoRA jobs and eval runs stop monopolizing 80 GB cards.
+``TRAINPIPE_GPU_ALLOCATION=exclusive`` turns packing off.
+
+Holders that only cache something (models an eval left resident) register
+a *reclaimer* under their holder prefix; :meth:`GpuPool.reclaim` calls them
+when a job would fit without those leases, so idle caches never keep a
+queued job waiting.
+
+With a :class:`~.topology.GpuTopology`, device sets are chosen to minimize
+interconnect cost first (NVLink pair over a cross-socket pair), then
+slack, then fragmentation — how poorly connected the idle GPUs left
+behind are, so a 1-GPU job doesn't split the only NVLink pair.
 """
 
+from __future__ import annotations
+
 import asyncio
 import logging
+from collections.abc import Awaitable, Callable, Collection
 from dataclasses import dataclass
 from datetime import datetime, timezone
+from itertools import combinations
+from math import comb
+from typing import TYPE_CHECKING
 
 import aiosqlite
 
+from ..core import notify
+from ..settings import settings
+from .topology import GpuTopology
+
+if TYPE_CHECKING:
+    from .resources import NvmlBackend
+
 logger = logging.getLogger(__name__)
 
 
@@ -59,15 +88,159 @@ def detect_gpus(visible: list[int] | None = None) -> list[GpuInfo]:
             pass
 
 
+@dataclass
+class _DeviceState:
+    index: int
+    total_mb: int
+    exclusive: bool = False
+    reserved_mb: int = 0
+    used_mb: float | None = None
+
+    @property
+    def idle(self) -> bool:
+        return not self.exclusive and self.reserved_mb == 0
+
+    @property
+    def free_mb(self) -> float:
+        if self.exclusive:
+            return 0.0
+        free = float(self.total_mb - self.reserved_mb)
+        if self.used_mb is not None:
+            free = min(free, self.total_mb - self.used_mb)
+        return free
+
+
+# Above this many candidate device sets, placement switches from
+# exhaustive search to greedy growth from each seed GPU.
+_MAX_EXHAUSTIVE_SETS = 5000
+
+
+class GpuCapacity:
+    """Point-in-time view of every device's leases, for placement decisions."""
+
+    def __init__(
+        self, devices: list[_DeviceState], topology: GpuTopology | None = None
+    ) -> None:
+        self.devices = devices
+        self.topology = topology
+
+    @property
+    def idle_count(self) -> int:
+        return sum(1 for d in self.devices if d.idle)
+
+    def pick(self, count: int, vram_mb: int | None) -> list[int] | None:
+        """GPU indices for a ``count``-GPU lease, or None if it doesn't fit.
+
+        ``vram_mb=None`` takes the lowest-indexed idle devices whole;
+        otherwise best-fit: the devices with the least free memory that
+        still hold ``vram_mb``.
+        """
+        if settings.gpu_allocation == "exclusive":
+            vram_mb = None
+        if vram_mb is None:
+            slack = {d.index: 0.0 for d in self.devices if d.idle}
+        else:
+            slack = {
+                d.index: d.free_mb - vram_mb for d in self.devices if d.free_mb >= vram_mb
+            }
+        if len(slack) < count:
+            return None
+        if self.topology is None:
+            return sorted(sorted(slack, key=lambda i: (slack[i], i))[:count])
+        return self._best_set(slack, count)
+
+    def fits(self, count: int, vram_mb: int | None) -> bool:
+        return self.pick(count, vram_mb) is not None
+
+    def _best_set(self, slack: dict[int, float], count: int) -> list[int]:
+        topo = self.topology
+        assert topo is not None
+        idle = [d.index for d in self.devices if d.idle]
+
+        def key(chosen: tuple[int, ...]) -> tuple:
+            left = [i for i in idle if i not in chosen]
+            return (
+                topo.set_cost(chosen),
+                sum(slack[i] for i in chosen),
+                topo.set_cost(left),
+                chosen,
+            )
+
+        candidates = sorted(slack)
+        if comb(len(candidates), count) <= _MAX_EXHAUSTIVE_SETS:
+            sets = combinations(candidates, count)
+        else:
+            sets = (self._grow(seed, candidates, count) for seed in candidates)
+        return list(min(sets, key=key))
+
+    def _grow(self, seed: int, candidates: list[int], count: int) -> tuple[int, ...]:
+        topo = self.topology
+        assert topo is not None
+        chosen = [seed]
+        rest = [i for i in candidates if i != seed]
+        while len(chosen) < count:
+            nxt = min(rest, key=lambda i: (sum(topo.cost(i, c) for c in chosen), i))
+            chosen.append(nxt)
+            rest.remove(nxt)
+        return tuple(sorted(chosen))
+
+
+@dataclass(frozen=True)
+class LeaseSnapshot:
+    """One read of the lease table and NVML, from which capacities with
+    different holders left out are derived in memory."""
+
+    gpus: dict[int, GpuInfo]
+    leases: list[tuple[int, str, int | None]]  # (gpu, holder, vram_mb)
+    used_mb: dict[int, float]
+    topology: GpuTopology | None = None
+
+    def capacity(self, *, excluding: Collection[str] = ()) -> GpuCapacity:
+        """Capacity as if ``excluding``'s leases were already released."""
+        devices = {
+            idx: _DeviceState(index=idx, total_mb=g.memory_total_mb)
+            for idx, g in self.gpus.items()
+        }
+        # Live NVML usage still includes the excluded holders' memory.
+        vacated: set[int] = set()
+        for gpu_index, holder, vram_mb in self.leases:
+            dev = devices.get(gpu_index)
+            if dev is None:
+                continue
+            if holder in excluding:
+                vacated.add(dev.index)
+            elif vram_mb is None:
+                dev.exclusive = True
+            else:
+                dev.reserved_mb += int(vram_mb)
+        for idx, used in self.used_mb.items():
+            if idx in devices and idx not in vacated:
+                devices[idx].used_mb = used
+        return GpuCapacity([devices[i] for i in sorted(devices)], self.topology)
+
+
 class GpuPool:
     """SQLite-backed GPU lease tracker.
 
     All mutations go through an asyncio lock so concurrent dispatch attempts
-    don't double-allocate.
+    don't double-allocate. ``telemetry`` (an NVML backend) lets packing see
+    memory used outside our reservations; without it only reservations count.
+    ``topology`` makes multi-GPU placement interconnect-aware.
+    ``reclaimers`` maps a holder prefix to a callback that releases that
+    prefix's idle leases and returns how many holders it freed.
     """
 
-    def __init__(self, gpus: list[GpuInfo]) -> None:
+    def __init__(
+        self,
+        gpus: list[GpuInfo],
+        *,
+        telemetry: NvmlBackend | None = None,
+        topology: GpuTopology | None = None,
+    ) -> None:
         self.gpus = {g.index: g for g in gpus}
+        self.telemetry = telemetry
+        self.topology = topology
+        self.reclaimers: dict[str, Callable[[], Awaitable[int]]] = {}
         self._lock = asyncio.Lock()
 
     @property
@@ -79,81 +252,162 @@ class GpuPool:
         return len(self.gpus)
 
     async def sync_leases(self, conn: aiosqlite.Connection) -> None:
-        """Ensure one row per detected GPU; release any orphaned leases.
+        """Release any orphaned leases.
 
         Note: the ``experiment_id`` column is overloaded — both experiments
-        and eval_runs share this pool, identified by their primary key. We
-        exempt both running tables from the orphan sweep.
+        and eval_runs share this pool, identified by their primary key (a
+        sharded eval run's extra shards hold ``<run id>#<shard>``). We
+        exempt both running tables from the orphan sweep. Leases of models
+        an eval left resident (``resident:<run id>``) don't survive the
+        process, so they're always swept.
         """
-        cur = await conn.execute("SELECT gpu_index FROM gpu_leases")
-        existing = {row[0] for row in await cur.fetchall()}
-
-        for idx in self.indices:
-            if idx not in existing:
-                await conn.execute(
-                    "INSERT INTO gpu_leases (gpu_index, experiment_id, leased_at) "
-                    "VALUES (?, NULL, NULL)",
-                    (idx,),
-                )
-
         await conn.execute(
-            "UPDATE gpu_leases SET experiment_id = NULL, leased_at = NULL "
-            "WHERE experiment_id IS NOT NULL "
-            "AND experiment_id NOT IN (SELECT id FROM experiments WHERE status = 'running') "
-            "AND experiment_id NOT IN (SELECT id FROM eval_runs WHERE status = 'running')"
+            "DELETE FROM gpu_leases "
+            "WHERE experiment_id NOT IN (SELECT id FROM experiments WHERE status = 'running') "
+            "AND experiment_id NOT IN (SELECT id FROM eval_runs WHERE status = 'running') "
+            "AND NOT EXISTS (SELECT 1 FROM eval_runs r WHERE r.status = 'running' "
+            "AND gpu_leases.experiment_id LIKE r.id || '#%')"
         )
         await conn.commit()
 
+    async def snapshot(self, conn: aiosqlite.Connection) -> LeaseSnapshot:
+        """Leases and live NVML usage as of now, for planning several
+        placements without re-reading either."""
+        cur = await conn.execute("SELECT gpu_index, experiment_id, vram_mb FROM gpu_leases")
+        leases = [(int(i), holder, vram_mb) for i, holder, vram_mb in await cur.fetchall()]
+        used: dict[int, float] = {}
+        if self.telemetry is not None and self.gpus:
+            readings = await asyncio.to_thread(self.telemetry.sample, sorted(self.gpus))
+            used = {r.index: r.memory_used_mb for r in readings if r.index in self.gpus}
+        return LeaseSnapshot(self.gpus, leases, used, self.topology)
+
+    async def capacity(
+        self, conn: aiosqlite.Connection, *, excluding: Collection[str] = ()
+    ) -> GpuCapacity:
+        """Current capacity; ``excluding`` pretends those holders' leases
+        are already released (preemption planning)."""
+        return (await self.snapshot(conn)).capacity(excluding=excluding)
+
+    def placement_score(self, indices: list[int]) -> float | None:
+        """Interconnect quality of ``indices`` (see :mod:`.topology`)."""
+        return self.topology.score(indices) if self.topology is not None else None
+
     async def try_allocate(
         self,
         conn: aiosqlite.Connection,
         count: int,
         experiment_id: str,
+        *,
+        vram_mb: int | None = None,
     ) -> list[int] | None:
-        """Reserve ``count`` free GPUs for ``experiment_id``. Returns indices or None."""
+        """Reserve ``count`` GPUs for ``experiment_id``. Returns indices or None.
+
+        With ``vram_mb`` (per GPU) the lease is fractional and may share
+        devices; without it each GPU is taken whole.
+        """
+        if settings.gpu_allocation == "exclusive":
+            vram_mb = None
         async with self._lock:
-            cur = await conn.execute(
-                "SELECT gpu_index FROM gpu_leases WHERE experiment_id IS NULL "
-                "ORDER BY gpu_index LIMIT ?",
-                (count,),
-            )
-            rows = await cur.fetchall()
-            if len(rows) < count:
+            indices = (await self.capacity(conn)).pick(count, vram_mb)
+            if indices is None:
                 return None
-            indices = [int(r[0]) for r in rows]
             now = datetime.now(timezone.utc).isoformat()
             await conn.executemany(
-                "UPDATE gpu_leases SET experiment_id = ?, leased_at = ? WHERE gpu_index = ?",
-                [(experiment_id, now, idx) for idx in indices],
+                "INSERT INTO gpu_leases (gpu_index, experiment_id, vram_mb, leased_at) "
+                "VALUES (?, ?, ?, ?)",
+                [(idx, experiment_id, vram_mb, now) for idx in indices],
             )
             await conn.commit()
             return indices
 
-    async def release(self, conn: aiosqlite.Connection, experiment_id: str) -> None:
+    async def reclaim(
+        self, conn: aiosqlite.Connection, count: int, vram_mb: int | None
+    ) -> bool:
+        """Run the reclaimers if ``count`` GPUs (``vram_mb`` each) don't fit
+        now but would without the reclaimable leases. True if that freed
+        anything; the caller re-checks capacity.
+        """
+        if not self.reclaimers:
+            return False
+        if settings.gpu_allocation == "exclusive":
+            vram_mb = None
+        cur = await conn.execute("SELECT DISTINCT experiment_id FROM gpu_leases")
+        reclaimable = [
+            holder
+            for (holder,) in await cur.fetchall()
+            if any(holder.startswith(prefix) for prefix in self.reclaimers)
+        ]
+        if not reclaimable:
+            return False
+        snapshot = await self.snapshot(conn)
+        if snapshot.capacity().fits(count, vram_mb) or not snapshot.capacity(
+            excluding=reclaimable
+        ).fits(count, vram_mb):
+            return False
+        freed = 0
+        for prefix, reclaimer in tuple(self.reclaimers.items()):
+            try:
+                freed += await reclaimer()
+            except Exception:
+                logger.exception("reclaiming %s leases failed", prefix)
+        return freed > 0
+
+    async def transfer(
+        self, conn: aiosqlite.Connection, holder: str, new_holder: str
+    ) -> None:
+        """Hand ``holder``'s leases to ``new_holder`` as they are (an eval
+        run's GPU to the model it left resident)."""
         async with self._lock:
             await conn.execute(
-                "UPDATE gpu_leases SET experiment_id = NULL, leased_at = NULL "
-                "WHERE experiment_id = ?",
-                (experiment_id,),
+                "UPDATE gpu_leases SET experiment_id = ? WHERE experiment_id = ?",
+                (new_holder, holder),
             )
             await conn.commit()
 
+    async def release(
+        self, conn: aiosqlite.Connection, experiment_id: str, *, commit: bool = True
+    ) -> None:
+        """Drop ``experiment_id``'s leases. ``commit=False`` leaves the
+        commit to the caller (a write-queue op); claims need the writer
+        connection, so a woken scheduler still sees the release only once
+        it is committed."""
+        async with self._lock:
+            await conn.execute(
+                "DELETE FROM gpu_leases WHERE experiment_id = ?",
+                (experiment_id,),
+            )
+            if commit:
+                await conn.commit()
+        notify.bus.publish(notify.LEASE_RELEASED)
+
     async def status(self, conn: aiosqlite.Connection) -> list[dict]:
+        """One entry per detected GPU.
+
+        ``experiment_id`` / ``leased_at`` describe the earliest holder (so
+        single-tenant clients keep working); ``holders`` lists every lease.
+        """
         cur = await conn.execute(
-            "SELECT gpu_index, experiment_id, leased_at FROM gpu_leases ORDER BY gpu_index"
+            "SELECT gpu_index, experiment_id, vram_mb, leased_at FROM gpu_leases "
+            "ORDER BY gpu_index, leased_at"
         )
-        rows = await cur.fetchall()
+        holders: dict[int, list[dict]] = {}
+        for r in await cur.fetchall():
+            holders.setdefault(int(r[0]), []).append(
+                {"experiment_id": r[1], "vram_mb": r[2], "leased_at": r[3]}
+            )
         out: list[dict] = []
-        for r in rows:
-            idx = int(r[0])
+        for idx in sorted(set(self.gpus) | set(holders)):
             gpu = self.gpus.get(idx)
+            leases = holders.get(idx, [])
             out.append(
                 {
                     "index": idx,
                     "name": gpu.name if gpu else "unknown",
                     "memory_total_mb": gpu.memory_total_mb if gpu else 0,
-                    "experiment_id": r[1],
-                    "leased_at": r[2],
+                    "experiment_id": leases[0]["experiment_id"] if leases else None,
+                    "leased_at": leases[0]["leased_at"] if leases else None,
+                    "reserved_mb": sum(h["vram_mb"] or 0 for h in leases),
+                    "holders": leases,
                 }
             )
         return out
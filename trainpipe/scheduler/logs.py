@@ -0,0 +1,586 @@
+"""Training log files: size-based rotation, compressed segments, and an
+in-memory tail of recent lines.
+
+The tee task in :mod:`.runner` writes through :class:`RotatingLog`. When the
+live file ``<id>.log`` passes ``log_max_bytes`` it is renamed to
+``<id>.log.<n>`` (``n`` counts up from 1, oldest first) and compressed in a
+worker thread to ``<id>.log.<n>.zst``. Without the ``[logs]`` extra
+(``zstandard``) segments fall back to gzip. Only the newest
+``log_max_segments`` segments are kept. Rotation happens between lines, so
+every segment ends on a newline. A resumed run appends to the same live file
+and continues the segment numbering.
+
+A compressed segment is a run of independent frames (zstd frames or gzip
+members) of about ``FRAME_BYTES`` each, cut after a newline. Their positions
+go to a ``<segment>.frames`` sidecar, so a tail read decompresses only the
+last frame or two instead of the whole segment.
+
+The writer also keeps a sparse line-offset index (``<id>.log.idx``, see
+:class:`LogIndex`) so the API can serve byte ranges, line ranges and
+``since_offset`` cursors by seeking instead of reading the whole log.
+
+Every line also lands in the process's :class:`LogRing`, registered in
+:data:`tails` while the subprocess runs. The API's tail and the SSE stream
+read recent output from there instead of re-reading the file.
+"""
+
+from __future__ import annotations
+
+import bisect
+import gzip
+import logging
+import os
+import re
+from collections import deque
+from collections.abc import Callable, Iterator
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import BinaryIO
+
+logger = logging.getLogger(__name__)
+
+_SUFFIXES = {"zstd": ".zst", "gzip": ".gz", "none": ""}
+_READ_CHUNK = 64 * 1024
+FRAME_BYTES = 256 * 1024
+
+
+class LogRing:
+    """The last ``maxlen`` lines of one run, addressed by sequence number.
+
+    Line ``k`` (0-based, counted from the start of this process) stays
+    readable until ``maxlen`` newer lines have pushed it out. Each line also
+    remembers its logical byte offset in the log (see :class:`LogIndex`), so
+    offset cursors can be answered from memory. ``listeners`` are called
+    (no arguments, on the tee's loop) after every append.
+    """
+
+    def __init__(self, maxlen: int, *, offset: int = 0) -> None:
+        self._lines: deque[tuple[int, str]] = deque(maxlen=maxlen)
+        self.total = 0
+        self.end_offset = offset
+        self.closed = False
+        self.listeners: set[Callable[[], None]] = set()
+
+    def __len__(self) -> int:
+        return len(self._lines)
+
+    @property
+    def first(self) -> int:
+        """Sequence number of the oldest line still held."""
+        return self.total - len(self._lines)
+
+    def append(self, line: str, nbytes: int | None = None) -> None:
+        self._lines.append((self.end_offset, line))
+        self.end_offset += len(line.encode()) if nbytes is None else nbytes
+        self.total += 1
+        for listener in tuple(self.listeners):
+            listener()
+
+    def since(self, seq: int) -> tuple[list[str], int]:
+        """Lines from ``seq`` on (clamped to the oldest held) and the next seq."""
+        start = max(seq, self.first)
+        skip = start - self.first
+        return [self._lines[i][1] for i in range(skip, len(self._lines))], self.total
+
+    def tail(self, n: int) -> tuple[list[str], int]:
+        """The last ``n`` lines and the byte offset of the first of them."""
+        if n <= 0 or not self._lines:
+            return [], self.end_offset
+        held = list(self._lines)[-n:]
+        return [line for _, line in held], held[0][0]
+
+    def from_offset(self, offset: int, max_bytes: int) -> tuple[list[str], int] | None:
+        """Lines from byte ``offset`` (at most ``max_bytes``, at least one
+        line) and the offset after them; None if ``offset`` isn't the start
+        of a line still held, so the caller falls back to disk."""
+        if offset == self.end_offset:
+            return [], offset
+        held = list(self._lines)
+        i = bisect.bisect_left(held, offset, key=lambda entry: entry[0])
+        if i == len(held) or held[i][0] != offset:
+            return None
+        out: list[str] = []
+        end = offset
+        for j in range(i, len(held)):
+            after = held[j + 1][0] if j + 1 < len(held) else self.end_offset
+            if out and after - offset > max_bytes:
+                break
+            out.append(held[j][1])
+            end = after
+        return out, end
+
+
+# experiment id → ring of the live subprocess. Stale entries are replaced on
+# relaunch and removed when the tee task ends.
+tails: dict[str, LogRing] = {}
+
+
+def _codec(name: str) -> str:
+    if name == "zstd":
+        try:
+            import zstandard  # noqa: F401
+        except ImportError:
+            return "gzip"
+    return name
+
+
+def _segment_re(path: Path) -> re.Pattern[str]:
+    return re.compile(rf"^{re.escape(path.name)}\.(\d+)(\.zst|\.gz)?$")
+
+
+def log_segments(path: Path) -> list[Path]:
+    """Rolled segments of ``path``, oldest first.
+
+    A segment still being compressed exists both plain and compressed; the
+    plain file is complete, so it wins.
+    """
+    if not path.parent.is_dir():
+        return []
+    pattern = _segment_re(path)
+    found: dict[int, Path] = {}
+    for candidate in path.parent.iterdir():
+        m = pattern.match(candidate.name)
+        if m is None:
+            continue
+        n = int(m.group(1))
+        if n not in found or not m.group(2):
+            found[n] = candidate
+    return [found[n] for n in sorted(found)]
+
+
+def open_segment(segment: Path, at: int = 0) -> BinaryIO:
+    """Open a (possibly compressed) segment for reading decompressed bytes.
+
+    ``at`` is a position in the file itself; for a compressed segment it
+    must be a frame start from :func:`segment_frames`.
+    """
+    if segment.suffix == ".gz":
+        gz = gzip.open(segment, "rb")
+        gz.fileobj.seek(at)  # type: ignore[union-attr]  # nothing read yet
+        return gz  # type: ignore[return-value]
+    f = segment.open("rb")
+    f.seek(at)
+    if segment.suffix == ".zst":
+        import zstandard
+
+        return zstandard.ZstdDecompressor().stream_reader(f, read_across_frames=True, closefd=True)
+    return f
+
+
+def frames_path(segment: Path) -> Path:
+    return segment.with_name(segment.name + ".frames")
+
+
+@dataclass(frozen=True)
+class Frame:
+    """Where one frame of a compressed segment starts."""
+
+    offset: int  # decompressed, from the start of the segment
+    at: int  # in the compressed file
+    line: int  # lines before it in the segment
+
+
+def segment_frames(segment: Path) -> list[Frame]:
+    """The frame table of a compressed segment, with a closing entry for its
+    end; empty if the segment has none (compressed before frames existed)."""
+    try:
+        text = frames_path(segment).read_text(encoding="ascii")
+    except FileNotFoundError:
+        return []
+    try:
+        return [Frame(*map(int, row.split())) for row in text.splitlines()]
+    except (TypeError, ValueError):
+        return []
+
+
+def iter_log(path: Path) -> Iterator[bytes]:
+    """The whole log — rolled segments then the live file — in chunks."""
+    for part in [*log_segments(path), path]:
+        try:
+            f = open_segment(part)
+        except FileNotFoundError:
+            # Pruned or renamed between listing and opening.
+            continue
+        with f:
+            while chunk := f.read(_READ_CHUNK):
+                yield chunk
+
+
+# -- line-offset index -------------------------------------------------------
+#
+# Offsets and line numbers are *logical*: counted from the first byte the
+# experiment ever logged, across all segments (pruned ones included). The
+# sidecar ``<id>.log.idx`` is appended by the writer:
+#
+#   c <line> <offset>            line <line> starts at byte <offset>
+#                                (every INDEX_EVERY lines)
+#   r <n> <line> <offset>        segment <n> ends here; the next part starts
+#                                at this line / offset
+#
+# so a line or byte lookup seeks to the nearest checkpoint and scans at most
+# INDEX_EVERY lines.
+
+INDEX_EVERY = 1000
+
+
+def index_path(path: Path) -> Path:
+    return path.with_name(path.name + ".idx")
+
+
+@dataclass(frozen=True)
+class LogPart:
+    """One on-disk piece of the log and its logical position."""
+
+    path: Path
+    start: int
+    end: int
+    line: int  # logical line number of the part's first line
+
+
+@dataclass
+class LogIndex:
+    checkpoints: list[tuple[int, int]] = field(default_factory=list)  # (line, offset)
+    rolls: dict[int, tuple[int, int]] = field(default_factory=dict)  # n → (line, offset)
+
+    @classmethod
+    def load(cls, path: Path) -> LogIndex:
+        index = cls()
+        try:
+            text = index_path(path).read_text(encoding="ascii", errors="replace")
+        except FileNotFoundError:
+            return index
+        for row in text.splitlines():
+            fields = row.split()
+            try:
+                if fields[0] == "c" and len(fields) == 3:
+                    index.checkpoints.append((int(fields[1]), int(fields[2])))
+                elif fields[0] == "r" and len(fields) == 4:
+                    index.rolls[int(fields[1])] = (int(fields[2]), int(fields[3]))
+            except (IndexError, ValueError):
+                continue  # torn write from a crash
+        index.checkpoints.sort()
+        return index
+
+    def parts(self, path: Path) -> list[LogPart]:
+        """Segments still on disk plus the live file, oldest first.
+
+        A segment whose start isn't indexed (rotated before the index
+        existed) can't be placed and is left out.
+        """
+        pattern = _segment_re(path)
+        out: list[LogPart] = []
+        last = 0
+        for segment in log_segments(path):
+            n = int(pattern.match(segment.name).group(1))  # type: ignore[union-attr]
+            begin = self.rolls.get(n - 1, (0, 0)) if n > 1 else (0, 0)
+            if (n > 1 and n - 1 not in self.rolls) or n not in self.rolls:
+                continue
+            out.append(LogPart(segment, begin[1], self.rolls[n][1], begin[0]))
+            last = n
+        # The roll entry is written just before the rename, so trust only
+        # rolls whose segment is on disk for where the live file starts.
+        line, start = self.rolls.get(last, (0, 0)) if last else (0, 0)
+        try:
+            size = path.stat().st_size
+        except FileNotFoundError:
+            size = 0
+        out.append(LogPart(path, start, start + size, line))
+        return out
+
+
+def _skip(f: BinaryIO, n: int) -> None:
+    if n <= 0:
+        return
+    if f.seekable() and not isinstance(f, gzip.GzipFile):
+        f.seek(n)
+        return
+    while n > 0:
+        got = f.read(min(n, _READ_CHUNK))
+        if not got:
+            return
+        n -= len(got)
+
+
+def _stream(parts: list[LogPart], start: int) -> Iterator[bytes]:
+    """Logical bytes from ``start`` to the end of ``parts``."""
+    for part in parts:
+        if part.end <= start:
+            continue
+        try:
+            f = open_segment(part.path)
+        except FileNotFoundError:
+            continue
+        with f:
+            _skip(f, max(0, start - part.start))
+            remaining = part.end - max(start, part.start)
+            while remaining > 0:
+                chunk = f.read(min(_READ_CHUNK, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                yield chunk
+
+
+def log_size(path: Path) -> int:
+    """Logical size of the log: one past its last byte."""
+    return LogIndex.load(path).parts(path)[-1].end
+
+
+def read_range(path: Path, start: int, end: int) -> tuple[bytes, int]:
+    """Bytes ``[start, end)`` and the offset they actually start at.
+
+    ``start`` is clamped to the oldest byte still on disk.
+    """
+    parts = LogIndex.load(path).parts(path)
+    start = max(start, parts[0].start)
+    out = bytearray()
+    for chunk in _stream(parts, start):
+        out += chunk[: max(0, end - start - len(out))]
+        if start + len(out) >= end:
+            break
+    return bytes(out), start
+
+
+def read_since(path: Path, offset: int, max_bytes: int) -> tuple[bytes, int]:
+    """Up to ``max_bytes`` from cursor ``offset``, cut back to a line end
+    when there is more to come. Returns ``(data, start)``; the next cursor
+    is ``start + len(data)``."""
+    data, start = read_range(path, offset, offset + max_bytes)
+    if len(data) == max_bytes:
+        cut = data.rfind(b"\n")
+        if cut >= 0:
+            data = data[: cut + 1]
+    return data, start
+
+
+def read_lines(
+    path: Path, first: int, last: int | None, max_bytes: int
+) -> tuple[bytes, int, int]:
+    """Lines ``[first, last)`` (``last=None``: to the end), at most
+    ``max_bytes`` but never less than one line. Returns ``(data, start
+    offset, first line)``; ``first`` is clamped to the oldest line on disk.
+    """
+    index = LogIndex.load(path)
+    parts = index.parts(path)
+    first = max(first, parts[0].line)
+    anchors = [(p.line, p.start) for p in parts]
+    anchors += [c for c in index.checkpoints if c[1] >= parts[0].start]
+    line, offset = max((a for a in anchors if a[0] <= first), default=anchors[0])
+
+    out = bytearray()
+    start = offset
+    taken = 0
+    buf = b""
+    for chunk in _stream(parts, offset):
+        buf = buf + chunk if buf else chunk
+        pos = 0
+        while (nl := buf.find(b"\n", pos)) >= 0:
+            if line < first:
+                start += nl + 1 - pos
+            elif (last is not None and line >= last) or (
+                taken and len(out) + nl + 1 - pos > max_bytes
+            ):
+                return bytes(out), start, first
+            else:
+                out += buf[pos : min(nl + 1, pos + max_bytes)]
+                taken += 1
+            line += 1
+            pos = nl + 1
+        buf = buf[pos:]
+    # A trailing line without its newline yet.
+    if buf and line >= first and (last is None or line < last) and not (
+        taken and len(out) + len(buf) > max_bytes
+    ):
+        out += buf[:max_bytes]
+    return bytes(out), start, first
+
+
+def _read_tail(path: Path, n: int) -> list[bytes]:
+    """Last ``n`` lines of an uncompressed file, reading backwards."""
+    with path.open("rb") as f:
+        f.seek(0, os.SEEK_END)
+        pos = f.tell()
+        buf = b""
+        while pos > 0 and buf.count(b"\n") <= n:
+            step = min(_READ_CHUNK, pos)
+            pos -= step
+            f.seek(pos)
+            buf = f.read(step) + buf
+    lines = buf.splitlines(keepends=True)
+    if pos > 0:
+        lines = lines[1:]  # first one is partial
+    return lines[-n:]
+
+
+def _read_tail_compressed(segment: Path, n: int) -> list[bytes]:
+    """Last ``n`` lines of a compressed segment, decompressing from the
+    newest frame that still has ``n`` lines after it."""
+    frames = segment_frames(segment)
+    at = 0
+    if frames:
+        total = frames[-1].line
+        at = max((fr.at for fr in frames[:-1] if fr.line <= total - n), default=0)
+    with open_segment(segment, at) as f:
+        return f.read().splitlines(keepends=True)[-n:]
+
+
+def read_tail(path: Path, n: int) -> tuple[bytes, int]:
+    """Last ``n`` lines of the whole log, reaching into segments if needed,
+    and the byte offset they start at."""
+    parts = LogIndex.load(path).parts(path)
+    out: list[bytes] = []
+    if n > 0:
+        for part in reversed(parts):
+            want = n - len(out)
+            try:
+                if part.path.suffix not in (".zst", ".gz"):
+                    lines = _read_tail(part.path, want)
+                else:
+                    lines = _read_tail_compressed(part.path, want)
+            except FileNotFoundError:
+                continue
+            out[:0] = lines
+            if len(out) >= n:
+                break
+    data = b"".join(out)
+    return data, parts[-1].end - len(data)
+
+
+def tail_lines(path: Path, n: int) -> list[str]:
+    """Last ``n`` lines of the whole log as text."""
+    data, _ = read_tail(path, n)
+    return data.decode("utf-8", errors="replace").splitlines(keepends=True)
+
+
+# -- writing -----------------------------------------------------------------
+
+
+def _blocks(src: BinaryIO) -> Iterator[bytes]:
+    """``src`` in pieces of about ``FRAME_BYTES``, each ending on a newline
+    (except a trailing partial line)."""
+    buf = b""
+    while chunk := src.read(FRAME_BYTES):
+        buf += chunk
+        cut = buf.rfind(b"\n") + 1
+        if cut:
+            yield buf[:cut]
+            buf = buf[cut:]
+    if buf:
+        yield buf
+
+
+def _compress(segment: Path, codec: str) -> None:
+    if codec == "none":
+        return
+    target = segment.with_name(segment.name + _SUFFIXES[codec])
+    partial = target.with_name(target.name + ".part")
+    if codec == "zstd":
+        import zstandard
+
+        frame = zstandard.ZstdCompressor(level=3).compress
+    else:
+        def frame(block: bytes) -> bytes:
+            return gzip.compress(block, compresslevel=6, mtime=0)
+
+    rows: list[str] = []
+    offset = line = 0
+    with segment.open("rb") as src, partial.open("wb") as dst:
+        for block in _blocks(src):
+            rows.append(f"{offset} {dst.tell()} {line}\n")
+            dst.write(frame(block))
+            offset += len(block)
+            line += block.count(b"\n")
+        rows.append(f"{offset} {dst.tell()} {line}\n")
+    # The table lands first: a compressed segment without one is read whole.
+    frames_path(target).write_text("".join(rows), encoding="ascii")
+    os.replace(partial, target)
+    segment.unlink()
+
+
+def _prune(path: Path, keep: int) -> None:
+    # The newest segment always stays: it anchors where the live file starts.
+    segments = log_segments(path)
+    for old in segments[: max(0, len(segments) - max(keep, 1))]:
+        old.unlink(missing_ok=True)
+        frames_path(old).unlink(missing_ok=True)
+
+
+def finish_segment(path: Path, segment: Path, codec: str, keep: int) -> None:
+    """Compress a freshly rolled segment and drop the oldest ones. Blocking."""
+    try:
+        _compress(segment, codec)
+    except Exception:
+        # The plain segment is still there and readable.
+        logger.exception("compressing log segment %s failed", segment)
+    _prune(path, keep)
+
+
+class RotatingLog:
+    """Append-only writer for one experiment's live log file.
+
+    :meth:`write` takes whole lines and keeps the line-offset index. Once
+    the file reaches ``max_bytes`` (``0`` disables rotation) it is rolled and
+    :meth:`write` returns the segment; the caller compresses it off the
+    event loop with :func:`finish_segment`. Reopening an existing log (a
+    resumed run) picks up its offsets, line count and segment numbering.
+    """
+
+    def __init__(
+        self, path: Path, *, max_bytes: int, compression: str = "zstd"
+    ) -> None:
+        self.path = path
+        self.max_bytes = max_bytes
+        self.codec = _codec(compression)
+        index = LogIndex.load(path)
+        live = index.parts(path)[-1]
+        on_disk = [
+            int(_segment_re(path).match(s.name).group(1))  # type: ignore[union-attr]
+            for s in log_segments(path)
+        ]
+        self._next_segment = max(on_disk, default=0) + 1
+        self._f = path.open("ab")
+        self._size = self._f.tell()
+        self.offset = live.start + self._size
+        # Line count: scan the live file from the newest anchor inside it.
+        line, anchor = max(
+            [(live.line, live.start)]
+            + [c for c in index.checkpoints if live.start <= c[1] <= self.offset]
+        )
+        counted = 0
+        with path.open("rb") as f:
+            f.seek(anchor - live.start)
+            while chunk := f.read(_READ_CHUNK):
+                counted += chunk.count(b"\n")
+        self.lines = line + counted
+        self._idx = index_path(path).open("a", encoding="ascii")
+
+    def write(self, line: bytes) -> Path | None:
+        if self.lines % INDEX_EVERY == 0:
+            self._idx.write(f"c {self.lines} {self.offset}\n")
+        self._f.write(line)
+        self._size += len(line)
+        self.offset += len(line)
+        self.lines += line.endswith(b"\n")
+        if self.max_bytes and self._size >= self.max_bytes:
+            return self._roll()
+        return None
+
+    def flush(self) -> None:
+        self._f.flush()
+        self._idx.flush()
+
+    def close(self) -> None:
+        self._f.close()
+        self._idx.close()
+
+    def _roll(self) -> Path:
+        self._f.close()
+        n = self._next_segment
+        self._idx.write(f"r {n} {self.lines} {self.offset}\n")
+        self._idx.flush()
+        segment = self.path.with_name(f"{self.path.name}.{n}")
+        os.replace(self.path, segment)
+        self._next_segment += 1
+        self._f = self.path.open("ab")
+        self._size = 0
+        return segment
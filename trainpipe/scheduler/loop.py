@@ -1,29 +1,69 @@
 """Main scheduler loop.
 
-One asyncio task polls SQLite for queued experiments. Per tick it walks the
-queue under a dispatch lock and *claims* (atomic CAS UPDATE) one experiment
-at a time: allocate GPUs, flip status to 'running'. Each claim then fires
-a background launch task that does the slow work (MLflow run creation +
+One asyncio task watches SQLite for queued experiments. It ticks whenever
+the in-process notification bus (:mod:`trainpipe.core.notify`) reports a
+submit, cancel, lease release or subprocess exit, and otherwise every
+``scheduler_safety_poll_sec`` to catch writes from other processes. Per
+tick it picks candidates from an in-memory :class:`QueueIndex` under a
+dispatch lock and *claims* (atomic CAS UPDATE) one experiment at a time:
+allocate GPUs, flip status to 'running'. Each claim then fires a
+background launch task that does the slow work (MLflow run creation +
 subprocess spawn) outside the lock, so an MLflow stall can't serialize
-concurrent submits.
+concurrent submits. Run creation goes through the cached MLflow gateway
+and is bounded by ``mlflow_timeout_sec``; if the tracking server is down
+the run launches untracked (``--report_to none``) instead of waiting. The
+worker thread can't be cancelled, so a run it still creates after the
+timeout is terminated as KILLED through the outbox rather than left
+RUNNING beside the untracked training.
 
 A per-experiment monitor task watches the subprocess exit, releases GPUs,
 finalizes the MLflow run, and persists final state.
+
+Status transitions after the claim (started, finished, preempted, failed
+launch) and the events, resource usage and lease release that go with
+them are durable write-queue ops (``db.writes.execute``), one op per
+transition. Three writes deliberately stay off the queue: the claim CAS,
+which must commit together with the GPU allocation under the dispatch
+lock; the unschedulable-job failures ``_sync_queue`` makes inside that
+same claim transaction; and crash recovery in :meth:`Scheduler.start`,
+which runs before anything else writes.
+
+On start, experiments a crash or restart left 'running' are requeued.
+If their output dir holds a complete ms-swift checkpoint the relaunch
+resumes from it instead of starting over.
+
+With ``preemption_enabled``, a tick that can't place the best queued job
+picks the cheapest set of strictly lower-priority runs whose leases would
+make it fit (lowest priority, then most recently started), signals them
+to checkpoint and exit, and holds lower-priority claims back until they
+have. Victims that exit non-zero return to the queue with their original
+``queued_at`` and resume from their newest checkpoint; one that finishes
+cleanly within its grace period is simply completed.
+
+Before either, a job that doesn't fit asks :meth:`GpuPool.reclaim` to drop
+leases that only cache something (models an eval left resident, see
+:mod:`trainpipe.evals.dispatcher`) when that alone would make room.
 """
 
 import asyncio
 import json
 import logging
+import time
+from dataclasses import dataclass
 from datetime import datetime, timezone
 from pathlib import Path
 from typing import Any
 
-from ..api.schemas import ExperimentSpec
-from ..core import repository
+from ..api.schemas import ExperimentRecord, ExperimentSpec
+from ..core import notify, repository
 from ..core.db import Database
+from ..integrations import mlflow_gateway
 from ..settings import settings
+from ..training.checkpoints import Checkpoint, find_latest_checkpoint
 from ..training.swift_builder import build_swift_command
 from .gpu_pool import GpuPool
+from .queue_index import QueuedJob, QueueIndex
+from .resources import ResourceSampler
 from .runner import RunningProcess, spawn_training_subprocess
 
 logger = logging.getLogger(__name__)
@@ -33,53 +73,192 @@ def _utcnow_iso() -> str:
     return datetime.now(timezone.utc).isoformat()
 
 
+def _output_dir(spec: ExperimentSpec, experiment_id: str) -> Path:
+    return Path(spec.output_dir) if spec.output_dir else settings.output_base_dir / experiment_id
+
+
+async def _resume_point(
+    spec: ExperimentSpec,
+    experiment_id: str,
+    started_at: str | None,
+    gpu_count: int,
+    prev_saved: float | None,
+) -> tuple[Checkpoint | None, float | None]:
+    """Newest checkpoint to resume from, and GPU-seconds saved including it.
+
+    The saving is the leased time between the attempt's start and the
+    checkpoint; a checkpoint from an earlier attempt adds nothing.
+    """
+    ckpt = await asyncio.to_thread(find_latest_checkpoint, _output_dir(spec, experiment_id))
+    saved = prev_saved
+    if ckpt is not None and started_at and gpu_count:
+        elapsed = ckpt.saved_at - datetime.fromisoformat(started_at).timestamp()
+        saved = (prev_saved or 0.0) + max(0.0, elapsed) * gpu_count
+    return ckpt, saved
+
+
+@dataclass
+class _Placement:
+    """What preemption needs to know about a launched experiment."""
+
+    priority: int
+    started: float  # time.monotonic() at claim
+
+
+@dataclass
+class _Eviction:
+    urgent_id: str
+    urgent_priority: int
+    signalled: float  # time.monotonic() when the signal went out
+
+
+_WAKE_TOPICS = (
+    notify.EXPERIMENT_QUEUED,
+    notify.EXPERIMENT_CANCELLED,
+    notify.LEASE_RELEASED,
+    notify.PROCESS_EXITED,
+)
+
+
 class Scheduler:
-    def __init__(self, db: Database, gpu_pool: GpuPool) -> None:
+    def __init__(
+        self,
+        db: Database,
+        gpu_pool: GpuPool,
+        *,
+        notifications: notify.NotificationBus | None = notify.bus,
+        sampler: ResourceSampler | None = None,
+    ) -> None:
+        """``notifications=None`` falls back to plain polling every
+        ``poll_interval_sec`` (the pre-bus behaviour; used by the latency
+        benchmark as its baseline). ``sampler`` records heartbeats, peak
+        VRAM and energy for running experiments."""
         self.db = db
         self.gpu_pool = gpu_pool
+        self.sampler = sampler
+        self._bus = notifications
+        self._wakeups: notify.Subscription | None = None
+        # Why each tick after the first happened: a bus topic or "poll".
+        self.wakeup_counts: dict[str, int] = {}
         self._running: dict[str, RunningProcess] = {}
         self._monitors: dict[str, asyncio.Task] = {}
         self._launches: set[asyncio.Task] = set()
         self._stop_event = asyncio.Event()
         self._main_task: asyncio.Task | None = None
         self._dispatch_lock = asyncio.Lock()
+        self._queue = QueueIndex()
+        # Highest experiments.rowid already folded into the index; new
+        # submits are picked up with a cheap ``rowid > ?`` range scan.
+        self._queue_rowid = 0
+        self._queue_stale = True
+        self._placements: dict[str, _Placement] = {}
+        # Victim experiment id → the job it is making room for.
+        self._evicting: dict[str, _Eviction] = {}
+        self._preemptions: set[asyncio.Task] = set()
+        # Closing out MLflow runs whose creation outlived the launch timeout.
+        self._orphans: set[asyncio.Task] = set()
+        self.preemption_stats: dict[str, float] = {
+            "preemptions": 0,
+            "lost_gpu_seconds": 0.0,
+            "drain_seconds": 0.0,
+        }
 
     async def start(self) -> None:
         async with self.db.connect() as conn:
             # Recover from a crash: requeue 'running' rows BEFORE syncing
             # leases, so sync_leases can free the leases those experiments
-            # held. Reset queued_at to now so old crashed experiments don't
-            # starve newer submissions in the FIFO tie-break.
-            now = _utcnow_iso()
+            # held.
+            await self._recover_running(conn)
+            await self.gpu_pool.sync_leases(conn)
+            self._queue_stale = True
+            await self._sync_queue(conn)
+        if self._bus is not None:
+            self._wakeups = self._bus.subscribe(*_WAKE_TOPICS)
+        if self.sampler is not None:
+            await self.sampler.start()
+        self._main_task = asyncio.create_task(self._loop(), name="trainpipe-scheduler")
+
+    async def _recover_running(self, conn) -> None:
+        """Requeue experiments left 'running', resuming from checkpoints.
+
+        queued_at is reset to now so old crashed experiments don't starve
+        newer submissions in the FIFO tie-break. GPU-seconds saved is the
+        leased time between the attempt's start and its newest checkpoint.
+        """
+        cur = await conn.execute(
+            "SELECT id, spec_json, study_id, started_at, gpu_ids, gpu_seconds_saved "
+            "FROM experiments WHERE status = 'running'"
+        )
+        rows = list(await cur.fetchall())
+        now = _utcnow_iso()
+        for exp_id, spec_json, study_id, started_at, gpu_ids, prev_saved in rows:
+            spec = ExperimentSpec.model_validate_json(spec_json)
+            ckpt, saved = await _resume_point(
+                spec, exp_id, started_at, len(json.loads(gpu_ids or "[]")), prev_saved
+            )
             await conn.execute(
                 "UPDATE experiments SET status = 'queued', queued_at = ?, "
-                "started_at = NULL, pid = NULL, gpu_ids = NULL, "
-                "mlflow_run_id = NULL, mlflow_experiment_id = NULL, "
-                "log_path = NULL WHERE status = 'running'",
-                (now,),
+                "started_at = NULL, pid = NULL, gpu_ids = NULL, placement_score = NULL, "
+                "mlflow_run_id = NULL, mlflow_experiment_id = NULL, log_path = NULL, "
+                "resume_from_checkpoint = ?, resumed_from_step = ?, gpu_seconds_saved = ? "
+                "WHERE id = ? AND status = 'running'",
+                (
+                    now,
+                    str(ckpt.path) if ckpt else None,
+                    ckpt.step if ckpt else None,
+                    saved,
+                    exp_id,
+                ),
             )
-            await conn.commit()
-            await self.gpu_pool.sync_leases(conn)
-        self._main_task = asyncio.create_task(self._loop(), name="trainpipe-scheduler")
+            if ckpt is not None:
+                await repository.log_event(
+                    conn,
+                    experiment_id=exp_id,
+                    study_id=study_id,
+                    kind="recovered",
+                    payload={
+                        "checkpoint": str(ckpt.path),
+                        "step": ckpt.step,
+                        "gpu_seconds_saved": saved,
+                    },
+                )
+                logger.info(
+                    "recovering experiment=%s from %s (step %d)", exp_id, ckpt.path, ckpt.step
+                )
+        await conn.commit()
 
     async def stop(self) -> None:
         self._stop_event.set()
+        if self._wakeups is not None:
+            self._wakeups.notify("stop")
         if self._main_task is not None:
             try:
                 await self._main_task
             except asyncio.CancelledError:
                 pass
+        if self._wakeups is not None:
+            self._wakeups.close()
+            self._wakeups = None
         # Wait for in-flight launches to finish (or fail) so their cleanup
         # paths can run before we tear down running processes.
         if self._launches:
             await asyncio.gather(*self._launches, return_exceptions=True)
         for rp in list(self._running.values()):
-            await rp.cancel()
+            if not rp.preempted:
+                await rp.cancel()
+        # Victims already signalled get their full grace to checkpoint, so
+        # their monitors requeue them instead of recording a cancel.
+        if self._preemptions:
+            await asyncio.gather(*self._preemptions, return_exceptions=True)
         for task in list(self._monitors.values()):
             try:
                 await task
             except Exception:
                 logger.exception("monitor task raised during shutdown")
+        for task in list(self._orphans):
+            task.cancel()
+        if self.sampler is not None:
+            await self.sampler.stop()
 
     async def cancel_experiment(self, experiment_id: str) -> bool:
         """Cancel a running experiment by sending SIGTERM. Returns True if found."""
@@ -96,13 +275,31 @@ class Scheduler:
                 await self._tick()
             except Exception:
                 logger.exception("scheduler tick failed")
+            self._note_wakeup(await self._sleep())
+        logger.info("Scheduler stopped")
+
+    def _note_wakeup(self, fired: set[str]) -> None:
+        """Mark the queue index stale when the incremental rowid sync can't
+        see what changed: a cancel (the row stays, its status flips), or
+        nothing in-process for a while (another process may have written)."""
+        if "poll" in fired or notify.EXPERIMENT_CANCELLED in fired:
+            self._queue_stale = True
+
+    async def _sleep(self) -> set[str]:
+        """Wait for the next reason to tick; returns why we woke up."""
+        if self._wakeups is None:
             try:
                 await asyncio.wait_for(
                     self._stop_event.wait(), timeout=settings.poll_interval_sec
                 )
             except asyncio.TimeoutError:
                 pass
-        logger.info("Scheduler stopped")
+            fired = {"poll"}
+        else:
+            fired = await self._wakeups.wait(settings.scheduler_safety_poll_sec) or {"poll"}
+        for reason in fired:
+            self.wakeup_counts[reason] = self.wakeup_counts.get(reason, 0) + 1
+        return fired
 
     async def _tick(self) -> None:
         if self.gpu_pool.total == 0:
@@ -114,6 +311,8 @@ class Scheduler:
         while not self._stop_event.is_set():
             claim = await self._claim_next()
             if claim is None:
+                if settings.preemption_enabled:
+                    await self._maybe_preempt()
                 return
             task = asyncio.create_task(
                 self._launch(*claim),
@@ -124,54 +323,75 @@ class Scheduler:
 
     async def _claim_next(
         self,
-    ) -> tuple[str, ExperimentSpec, list[int], str | None, int | None] | None:
+    ) -> tuple[str, ExperimentSpec, list[int], str | None, int | None, str | None] | None:
         """Atomically claim the next dispatchable queued experiment.
 
-        Returns (experiment_id, spec, gpu_indices, study_id, trial_number) or
-        None if nothing is currently dispatchable.
+        Returns (experiment_id, spec, gpu_indices, study_id, trial_number,
+        resume_from) or None if nothing is currently dispatchable.
         """
         async with self._dispatch_lock:
             async with self.db.connect() as conn:
-                cur = await conn.execute(
-                    "SELECT id, spec_json, study_id, trial_number FROM experiments "
-                    "WHERE status = 'queued' "
-                    "ORDER BY priority DESC, queued_at ASC"
+                await self._sync_queue(conn)
+                capacity = await self.gpu_pool.capacity(conn)
+                reserved = max(
+                    (e.urgent_priority for e in self._evicting.values()), default=None
                 )
-                queued = await cur.fetchall()
-                for row in queued:
-                    exp_id = row[0]
-                    spec = ExperimentSpec.model_validate_json(row[1])
-                    study_id = row[2]
-                    trial_number = row[3]
-
-                    if spec.gpu_count > self.gpu_pool.total:
-                        await conn.execute(
-                            "UPDATE experiments SET status = 'failed', error = ?, "
-                            "finished_at = ? WHERE id = ? AND status = 'queued'",
-                            (
-                                f"gpu_count={spec.gpu_count} exceeds pool size "
-                                f"{self.gpu_pool.total}",
-                                _utcnow_iso(),
-                                exp_id,
-                            ),
-                        )
-                        await conn.commit()
+                reclaimed = False
+                while True:
+                    job = self._queue.best(capacity.fits)
+                    if job is None:
+                        # Nothing fits; idle GPU caches (models an eval left
+                        # resident) give way to the best queued job, once.
+                        top = self._queue.best(lambda count, vram_mb: True)
+                        if (
+                            reclaimed
+                            or top is None
+                            or (reserved is not None and top.priority < reserved)
+                            or not await self.gpu_pool.reclaim(conn, top.gpu_count, top.vram_mb)
+                        ):
+                            return None
+                        reclaimed = True
+                        capacity = await self.gpu_pool.capacity(conn)
+                        continue
+                    if reserved is not None and job.priority < reserved:
+                        # GPUs being vacated by preemption are held for
+                        # the job that asked for them.
+                        return None
+                    exp_id = job.experiment_id
+                    self._queue.discard(exp_id)
+                    # A cancel since the last resync (or from another
+                    # process) may not have reached the index yet; a PK
+                    # lookup is cheaper than allocating and releasing GPUs.
+                    cur = await conn.execute(
+                        "SELECT status FROM experiments WHERE id = ?", (exp_id,)
+                    )
+                    row = await cur.fetchone()
+                    if row is None or row[0] != "queued":
                         continue
 
                     gpu_indices = await self.gpu_pool.try_allocate(
-                        conn, spec.gpu_count, exp_id
+                        conn, job.gpu_count, exp_id, vram_mb=job.vram_mb
                     )
                     if gpu_indices is None:
-                        continue
+                        # Leases changed under us (eval dispatcher); retry
+                        # next tick.
+                        self._queue.add(job)
+                        return None
 
                     # Atomic claim: only succeeds if the row is still 'queued'
                     # (i.e. nobody cancelled it between our SELECT and now).
                     now = _utcnow_iso()
                     cur2 = await conn.execute(
                         "UPDATE experiments SET status = 'running', started_at = ?, "
-                        "gpu_ids = ?, last_heartbeat_at = ? "
+                        "gpu_ids = ?, placement_score = ?, last_heartbeat_at = ? "
                         "WHERE id = ? AND status = 'queued'",
-                        (now, json.dumps(gpu_indices), now, exp_id),
+                        (
+                            now,
+                            json.dumps(gpu_indices),
+                            self.gpu_pool.placement_score(gpu_indices),
+                            now,
+                            exp_id,
+                        ),
                     )
                     if cur2.rowcount == 0:
                         # Lost a race against cancellation.
@@ -179,8 +399,274 @@ class Scheduler:
                         await conn.commit()
                         continue
                     await conn.commit()
-                    return exp_id, spec, gpu_indices, study_id, trial_number
-                return None
+                    self._placements[exp_id] = _Placement(job.priority, time.monotonic())
+                    return (
+                        exp_id,
+                        job.spec,
+                        gpu_indices,
+                        job.study_id,
+                        job.trial_number,
+                        job.resume_from,
+                    )
+
+    async def _maybe_preempt(self) -> None:
+        """Evict lower-priority runs for the best queued job that doesn't fit."""
+        if self._evicting:
+            # One preemption at a time: wait for the victims to exit.
+            return
+        async with self._dispatch_lock, self.db.read() as conn:
+            while (job := self._queue.best(lambda count, vram_mb: True)) is not None:
+                # Same check as _claim_next: a job cancelled since the last
+                # resync must not evict anyone.
+                cur = await conn.execute(
+                    "SELECT status FROM experiments WHERE id = ?", (job.experiment_id,)
+                )
+                row = await cur.fetchone()
+                if row is not None and row[0] == "queued":
+                    break
+                self._queue.discard(job.experiment_id)
+            else:
+                return
+            if await self.gpu_pool.reclaim(conn, job.gpu_count, job.vram_mb):
+                return  # idle resident models made room; the next tick claims it
+            now = time.monotonic()
+            candidates = sorted(
+                (p.priority, -p.started, exp_id)
+                for exp_id, p in self._placements.items()
+                if p.priority < job.priority
+                and exp_id in self._running
+                and now - p.started >= settings.preemption_min_runtime_sec
+            )
+            if not candidates:
+                return
+
+            # One lease read and NVML sample for the whole plan; the
+            # victim sets are tried against it in memory.
+            snapshot = await self.gpu_pool.snapshot(conn)
+
+            def fits(excluding: list[str]) -> bool:
+                capacity = snapshot.capacity(excluding=excluding)
+                return capacity.fits(job.gpu_count, job.vram_mb)
+
+            if fits([]):
+                return  # lost a lease race; the next tick claims it
+            victims: list[str] = []
+            for *_key, exp_id in candidates:
+                victims.append(exp_id)
+                if fits(victims):
+                    break
+            else:
+                return
+            # Spare the more valuable victims the job doesn't need.
+            for exp_id in reversed(victims[:-1]):
+                rest = [v for v in victims if v != exp_id]
+                if fits(rest):
+                    victims = rest
+
+            for exp_id in victims:
+                self._evicting[exp_id] = _Eviction(
+                    job.experiment_id, job.priority, time.monotonic()
+                )
+                logger.info(
+                    "preempting experiment=%s (priority %d) for %s (priority %d)",
+                    exp_id,
+                    self._placements[exp_id].priority,
+                    job.experiment_id,
+                    job.priority,
+                )
+                task = asyncio.create_task(
+                    self._running[exp_id].preempt(
+                        settings.preemption_grace_sec, settings.preemption_signal
+                    ),
+                    name=f"trainpipe-preempt-{exp_id}",
+                )
+                self._preemptions.add(task)
+                task.add_done_callback(self._preemptions.discard)
+
+    async def _requeue_preempted(
+        self,
+        experiment_id: str,
+        study_id: str | None,
+        return_code: int,
+        mlflow_run_id: str | None,
+    ) -> QueuedJob | None:
+        """Put an evicted run back in the queue, resumable from its
+        checkpoint, and release its GPUs.
+
+        The checkpoint scan reads the output dir before the write op, on a
+        reader connection, so the writer never waits on that I/O. Returns
+        the job to re-index once the op has committed, or None if the row
+        was no longer running.
+        """
+        eviction = self._evicting.get(experiment_id)
+        async with self.db.read() as conn:
+            rec = await repository.get_experiment(conn, experiment_id)
+        ckpt: Checkpoint | None = None
+        saved: float | None = None
+        gpu_count = 0
+        if rec is not None:
+            gpu_count = len(rec.gpu_ids or [])
+            ckpt, saved = await _resume_point(
+                rec.spec,
+                experiment_id,
+                rec.started_at.isoformat() if rec.started_at else None,
+                gpu_count,
+                rec.gpu_seconds_saved,
+            )
+
+        async def record_preempted(conn) -> QueuedJob | None:
+            job = None
+            if rec is not None and await self._mark_requeued(
+                conn, rec, ckpt, saved, gpu_count, eviction, study_id, return_code
+            ):
+                job = QueuedJob(
+                    experiment_id,
+                    rec.spec,
+                    rec.priority,
+                    rec.queued_at.isoformat(),
+                    rec.study_id,
+                    rec.trial_number,
+                    str(ckpt.path) if ckpt else None,
+                )
+            if mlflow_run_id is not None:
+                await mlflow_gateway.enqueue(conn, mlflow_run_id, terminate="KILLED")
+            await self.gpu_pool.release(conn, experiment_id, commit=False)
+            return job
+
+        return await self.db.writes.execute(record_preempted)
+
+    async def _mark_requeued(
+        self,
+        conn,
+        rec: ExperimentRecord,
+        ckpt: Checkpoint | None,
+        saved: float | None,
+        gpu_count: int,
+        eviction: _Eviction | None,
+        study_id: str | None,
+        return_code: int,
+    ) -> bool:
+        """The write half of :meth:`_requeue_preempted`: flip the row back
+        to queued and record the preemption. False if it wasn't running."""
+        # Work after the newest checkpoint of this attempt is redone.
+        now = time.time()
+        start_ts = rec.started_at.timestamp() if rec.started_at else now
+        kept_until = max(start_ts, ckpt.saved_at) if ckpt is not None else start_ts
+        lost = max(0.0, now - kept_until) * gpu_count
+        drain = time.monotonic() - eviction.signalled if eviction is not None else 0.0
+        cur = await conn.execute(
+            "UPDATE experiments SET status = 'queued', started_at = NULL, pid = NULL, "
+            "gpu_ids = NULL, placement_score = NULL, mlflow_run_id = NULL, "
+            "mlflow_experiment_id = NULL, log_path = NULL, "
+            "resume_from_checkpoint = ?, resumed_from_step = ?, gpu_seconds_saved = ?, "
+            "preemptions = preemptions + 1, "
+            "preemption_lost_gpu_seconds = COALESCE(preemption_lost_gpu_seconds, 0) + ? "
+            "WHERE id = ? AND status = 'running'",
+            (
+                str(ckpt.path) if ckpt else None,
+                ckpt.step if ckpt else None,
+                saved,
+                lost,
+                rec.id,
+            ),
+        )
+        if not cur.rowcount:
+            return False
+        await repository.log_event(
+            conn,
+            experiment_id=rec.id,
+            study_id=study_id,
+            kind="preempted",
+            payload={
+                "by": eviction.urgent_id if eviction is not None else None,
+                "return_code": return_code,
+                "checkpoint": str(ckpt.path) if ckpt else None,
+                "step": ckpt.step if ckpt else None,
+                "lost_gpu_seconds": round(lost, 1),
+                "drain_seconds": round(drain, 1),
+            },
+        )
+        self.preemption_stats["preemptions"] += 1
+        self.preemption_stats["lost_gpu_seconds"] += lost
+        self.preemption_stats["drain_seconds"] += drain
+        return True
+
+    async def _sync_queue(self, conn) -> None:
+        """Fold new (or, when stale, all) queued rows into the index.
+
+        Only rows not yet indexed get their ``spec_json`` parsed. Jobs that
+        can never fit the pool are failed here instead of being indexed.
+        """
+        if self.gpu_pool.total == 0:
+            # A GPU-less host never dispatches; don't fail the whole queue.
+            return
+        cur = await conn.execute("SELECT COALESCE(MAX(rowid), 0) FROM experiments")
+        high = int((await cur.fetchone())[0])
+        cols = (
+            "id, spec_json, priority, queued_at, study_id, trial_number, "
+            "resume_from_checkpoint"
+        )
+        if self._queue_stale:
+            cur = await conn.execute(
+                f"SELECT {cols} FROM experiments WHERE status = 'queued'"
+            )
+            rows = list(await cur.fetchall())
+            live = {row[0] for row in rows}
+            for exp_id in self._queue.ids() - live:
+                self._queue.discard(exp_id)
+            self._queue.compact()
+            self._queue_stale = False
+        elif high > self._queue_rowid:
+            cur = await conn.execute(
+                f"SELECT {cols} FROM experiments WHERE rowid > ? AND status = 'queued'",
+                (self._queue_rowid,),
+            )
+            rows = list(await cur.fetchall())
+        else:
+            return
+        self._queue_rowid = high
+
+        oversized: list[str] = []
+        for row in rows:
+            exp_id, priority, queued_at = row[0], int(row[2]), row[3]
+            known = self._queue.get(exp_id)
+            if known is not None:
+                if (known.priority, known.queued_at) == (priority, queued_at):
+                    continue
+                # Already parsed; re-add so a requeue's new queued_at counts.
+                self._queue.add(
+                    QueuedJob(exp_id, known.spec, priority, queued_at, *row[4:7])
+                )
+                continue
+            spec = ExperimentSpec.model_validate_json(row[1])
+            error = self._unschedulable(spec)
+            if error is not None:
+                oversized.append(exp_id)
+                await conn.execute(
+                    "UPDATE experiments SET status = 'failed', error = ?, "
+                    "finished_at = ? WHERE id = ? AND status = 'queued'",
+                    (error, _utcnow_iso(), exp_id),
+                )
+                continue
+            self._queue.add(QueuedJob(exp_id, spec, priority, queued_at, *row[4:7]))
+        if oversized:
+            await conn.commit()
+
+    def _unschedulable(self, spec: ExperimentSpec) -> str | None:
+        """Why ``spec`` can never be placed on this pool, or None."""
+        total = self.gpu_pool.total
+        if spec.gpu_count > total:
+            return f"gpu_count={spec.gpu_count} exceeds pool size {total}"
+        if spec.vram_mb is not None and settings.gpu_allocation == "binpack":
+            big_enough = sum(
+                1 for g in self.gpu_pool.gpus.values() if g.memory_total_mb >= spec.vram_mb
+            )
+            if big_enough < spec.gpu_count:
+                return (
+                    f"vram_mb={spec.vram_mb} exceeds device memory on "
+                    f"{total - big_enough} of {total} GPUs"
+                )
+        return None
 
     async def _launch(
         self,
@@ -189,13 +675,17 @@ class Scheduler:
         gpu_indices: list[int],
         study_id: str | None,
         trial_number: int | None,
+        resume_from: str | None = None,
     ) -> None:
         """Slow path: create MLflow run, spawn subprocess. Runs outside the lock."""
         mlflow_experiment_name = spec.tags.get("mlflow_experiment") or "default"
         run_name = spec.name or f"exp-{experiment_id[:8]}"
 
-        try:
-            mlflow_exp_id, mlflow_run_id = await asyncio.to_thread(
+        mlflow_exp_id: str | None = None
+        mlflow_run_id: str | None = None
+        mlflow_error: str | None = None
+        create = asyncio.ensure_future(
+            asyncio.to_thread(
                 _create_mlflow_run,
                 mlflow_experiment_name,
                 run_name,
@@ -204,22 +694,38 @@ class Scheduler:
                 trial_number,
                 spec.tags,
             )
+        )
+        try:
+            mlflow_exp_id, mlflow_run_id = await asyncio.wait_for(
+                asyncio.shield(create), timeout=settings.mlflow_timeout_sec
+            )
         except Exception as e:
-            logger.exception("failed to create MLflow run for %s", experiment_id)
-            await self._abort_launch(experiment_id, study_id, None, str(e))
-            return
+            if not create.done():
+                self._close_out_late_run(experiment_id, study_id, create)
+            # GPUs are already leased; don't idle them on the tracking
+            # server. The run trains untracked and the gap is on record.
+            mlflow_gateway.gateway.mark_down()
+            mlflow_error = str(e) or type(e).__name__
+            logger.warning(
+                "MLflow unavailable for %s (%s); launching untracked",
+                experiment_id,
+                mlflow_error,
+            )
 
-        output_dir = (
-            Path(spec.output_dir)
-            if spec.output_dir
-            else settings.output_base_dir / experiment_id
-        )
+        output_dir = _output_dir(spec, experiment_id)
         log_path = settings.logs_dir / f"{experiment_id}.log"
 
-        argv, env = build_swift_command(spec, gpu_indices, output_dir)
-        env["MLFLOW_TRACKING_URI"] = settings.mlflow_tracking_uri
-        env["MLFLOW_RUN_ID"] = mlflow_run_id
-        env["MLFLOW_EXPERIMENT_NAME"] = mlflow_experiment_name
+        argv, env = build_swift_command(
+            spec,
+            gpu_indices,
+            output_dir,
+            resume_from=Path(resume_from) if resume_from else None,
+            report_to="mlflow" if mlflow_run_id else "none",
+        )
+        if mlflow_run_id is not None:
+            env["MLFLOW_TRACKING_URI"] = settings.mlflow_tracking_uri
+            env["MLFLOW_RUN_ID"] = mlflow_run_id
+            env["MLFLOW_EXPERIMENT_NAME"] = mlflow_experiment_name
 
         try:
             rp = await spawn_training_subprocess(experiment_id, argv, env, log_path)
@@ -231,7 +737,10 @@ class Scheduler:
             return
 
         self._running[experiment_id] = rp
-        async with self.db.connect() as conn:
+        if self.sampler is not None:
+            self.sampler.watch(experiment_id, gpu_indices, spec.vram_mb)
+
+        async def record_started(conn) -> None:
             await conn.execute(
                 "UPDATE experiments SET mlflow_run_id = ?, mlflow_experiment_id = ?, "
                 "log_path = ?, pid = ? WHERE id = ?",
@@ -248,9 +757,25 @@ class Scheduler:
                 experiment_id=experiment_id,
                 study_id=study_id,
                 kind="started",
-                payload={"gpu_ids": gpu_indices, "pid": rp.pid},
+                payload={
+                    "gpu_ids": gpu_indices,
+                    "pid": rp.pid,
+                    "placement_score": self.gpu_pool.placement_score(gpu_indices),
+                },
             )
-            await conn.commit()
+            if mlflow_error is not None:
+                await repository.log_event(
+                    conn,
+                    experiment_id=experiment_id,
+                    study_id=study_id,
+                    kind="mlflow_unavailable",
+                    payload={"error": mlflow_error},
+                )
+
+        # Durable: a sweep launching many trials at once shares one commit.
+        await self.db.writes.execute(record_started)
+        if self._bus is not None:
+            self._bus.publish(notify.EXPERIMENT_STARTED)
 
         self._monitors[experiment_id] = asyncio.create_task(
             self._monitor(experiment_id, rp, study_id, mlflow_run_id),
@@ -263,6 +788,38 @@ class Scheduler:
             rp.pid,
         )
 
+    def _close_out_late_run(
+        self, experiment_id: str, study_id: str | None, create: asyncio.Future
+    ) -> None:
+        """Terminate the MLflow run a timed-out ``create`` may still make."""
+
+        async def close_out() -> None:
+            try:
+                _exp_id, run_id = await create
+            except Exception:
+                return
+            logger.warning(
+                "MLflow run %s for %s arrived after the launch timeout; terminating it",
+                run_id,
+                experiment_id,
+            )
+
+            async def record_abandoned(conn) -> None:
+                await mlflow_gateway.enqueue(conn, run_id, terminate="KILLED")
+                await repository.log_event(
+                    conn,
+                    experiment_id=experiment_id,
+                    study_id=study_id,
+                    kind="mlflow_run_abandoned",
+                    payload={"mlflow_run_id": run_id},
+                )
+
+            await self.db.writes.execute(record_abandoned)
+
+        task = asyncio.create_task(close_out(), name=f"trainpipe-mlflow-late-{experiment_id}")
+        self._orphans.add(task)
+        task.add_done_callback(self._orphans.discard)
+
     async def _abort_launch(
         self,
         experiment_id: str,
@@ -276,7 +833,9 @@ class Scheduler:
         error after a successful create_run), persist its id on the row so
         callers can still find the terminated FAILED run in MLflow.
         """
-        async with self.db.connect() as conn:
+        self._placements.pop(experiment_id, None)
+
+        async def record_failed(conn) -> None:
             if mlflow_run_id is not None:
                 await conn.execute(
                     "UPDATE experiments SET status = 'failed', finished_at = ?, "
@@ -297,20 +856,40 @@ class Scheduler:
                 kind="failed",
                 payload={"error": error},
             )
-            await self.gpu_pool.release(conn, experiment_id)
-            await conn.commit()
-        if mlflow_run_id is not None:
-            await asyncio.to_thread(_terminate_mlflow_run, mlflow_run_id, "FAILED")
+            if mlflow_run_id is not None:
+                await mlflow_gateway.enqueue(conn, mlflow_run_id, terminate="FAILED")
+            await self.gpu_pool.release(conn, experiment_id, commit=False)
+
+        await self.db.writes.execute(record_failed)
 
     async def _monitor(
         self,
         experiment_id: str,
         rp: RunningProcess,
         study_id: str | None,
-        mlflow_run_id: str,
+        mlflow_run_id: str | None,
     ) -> None:
         try:
             return_code = await rp.wait()
+            usage = (
+                await self.sampler.unwatch(experiment_id)
+                if self.sampler is not None
+                else None
+            )
+            # A victim that exits 0 finished its training before the
+            # signal took; it's completed like any other run.
+            if rp.preempted and not rp.cancelled and return_code != 0:
+                job = await self._requeue_preempted(
+                    experiment_id, study_id, return_code, mlflow_run_id
+                )
+                if job is not None:
+                    # The incremental rowid sync won't see an old row come back.
+                    self._queue.add(job)
+                self._evicting.pop(experiment_id, None)
+                if self._bus is not None:
+                    self._bus.publish(notify.PROCESS_EXITED)
+                logger.info("experiment=%s preempted rc=%s", experiment_id, return_code)
+                return
             if rp.cancelled:
                 status = "cancelled"
                 mlflow_status = "KILLED"
@@ -324,16 +903,18 @@ class Scheduler:
                 mlflow_status = "FAILED"
                 error = f"swift exited with code {return_code}"
 
-            async with self.db.connect() as conn:
+            async def record_finished(conn) -> None:
                 await conn.execute(
                     "UPDATE experiments SET status = ?, finished_at = ?, error = ? "
                     "WHERE id = ?",
                     (status, _utcnow_iso(), error, experiment_id),
                 )
-                # Phase 20: compute gpu_seconds = gpu_count * wall_clock.
+                # Phase 20: compute gpu_seconds = gpu_count * wall_clock;
+                # peak VRAM / energy come from the resource sampler.
                 exp_for_cost = await repository.get_experiment(
                     conn, experiment_id
                 )
+                gpu_sec: float | None = None
                 if (
                     exp_for_cost is not None
                     and exp_for_cost.started_at
@@ -344,11 +925,14 @@ class Scheduler:
                         exp_for_cost.finished_at - exp_for_cost.started_at
                     ).total_seconds()
                     gpu_sec = wall * len(exp_for_cost.gpu_ids)
-                    await repository.set_experiment_resource_usage(
-                        conn,
-                        experiment_id,
-                        gpu_seconds=gpu_sec,
-                    )
+                await repository.set_experiment_resource_usage(
+                    conn,
+                    experiment_id,
+                    gpu_seconds=gpu_sec,
+                    peak_vram_mb=usage.peak_vram_mb if usage else None,
+                    energy_wh=usage.energy_wh if usage and usage.samples > 1 else None,
+                    commit=False,
+                )
                 await repository.log_event(
                     conn,
                     experiment_id=experiment_id,
@@ -356,15 +940,25 @@ class Scheduler:
                     kind=status,
                     payload={"return_code": return_code},
                 )
-                await self.gpu_pool.release(conn, experiment_id)
-                await conn.commit()
+                if mlflow_run_id is not None:
+                    await mlflow_gateway.enqueue(conn, mlflow_run_id, terminate=mlflow_status)
+                await self.gpu_pool.release(conn, experiment_id, commit=False)
+
+            await self.db.writes.execute(record_finished)
+            if self._bus is not None:
+                self._bus.publish(notify.PROCESS_EXITED)
 
-            await asyncio.to_thread(_terminate_mlflow_run, mlflow_run_id, mlflow_status)
             logger.info(
-                "experiment=%s finished status=%s rc=%s",
+                "experiment=%s finished status=%s rc=%s peak_vram_mb=%s util=%s",
                 experiment_id,
                 status,
                 return_code,
+                usage.peak_vram_mb if usage else None,
+                (
+                    f"{usage.mean_utilization_pct:.0f}%"
+                    if usage and usage.mean_utilization_pct is not None
+                    else None
+                ),
             )
 
             if status == "completed":
@@ -374,6 +968,8 @@ class Scheduler:
         finally:
             self._running.pop(experiment_id, None)
             self._monitors.pop(experiment_id, None)
+            self._placements.pop(experiment_id, None)
+            self._evicting.pop(experiment_id, None)
 
     async def _enqueue_auto_evals(self, experiment_id: str) -> None:
         """After a successful training run, enqueue one eval per suite in
@@ -418,17 +1014,6 @@ def _create_mlflow_run(
     user_tags: dict[str, Any],
 ) -> tuple[str, str]:
     """Synchronous helper (called via to_thread) to create an MLflow run."""
-    import mlflow
-    from mlflow.tracking import MlflowClient
-
-    mlflow.set_tracking_uri(settings.mlflow_tracking_uri)
-    client = MlflowClient()
-
-    existing = client.get_experiment_by_name(experiment_name)
-    mlflow_experiment_id = (
-        existing.experiment_id if existing else client.create_experiment(experiment_name)
-    )
-
     tags = {
         "trainpipe.experiment_id": experiment_id,
         "trainpipe.study_id": study_id or "",
@@ -436,17 +1021,4 @@ def _create_mlflow_run(
     }
     for k, v in user_tags.items():
         tags[f"user.{k}"] = v
-    run = client.create_run(experiment_id=mlflow_experiment_id, run_name=run_name, tags=tags)
-    return mlflow_experiment_id, run.info.run_id
-
-
-def _terminate_mlflow_run(run_id: str, status: str) -> None:
-    """Best-effort finalize an MLflow run. Status: FINISHED | FAILED | KILLED."""
-    try:
-        import mlflow
-        from mlflow.tracking import MlflowClient
-
-        mlflow.set_tracking_uri(settings.mlflow_tracking_uri)
-        MlflowClient().set_terminated(run_id, status=status)
-    except Exception:
-        logger.exception("failed to terminate mlflow run %s", run_id)
+    return mlflow_gateway.gateway.create_run(experiment_name, run_name, tags)
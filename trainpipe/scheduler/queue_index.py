@@ -0,0 +1,116 @@
+"""In-memory index of queued experiments for the scheduler's claim path.
+
+``_claim_next`` used to SELECT every queued row and re-parse its
+``spec_json`` on each claim attempt — O(queue) JSON work per tick, which
+hurts with thousands of queued sweep trials. The scheduler instead keeps
+the parsed jobs here, bucketed by resource shape (``gpu_count``,
+``vram_mb``) with one heap per bucket ordered like the old
+``ORDER BY priority DESC, queued_at ASC``. Whether a shape fits the pool
+right now doesn't depend on which job has it, so picking the best job
+that fits peeks one heap per distinct shape (a handful) — a claim is
+O(log n).
+
+SQLite stays the source of truth: the index is rebuilt on scheduler
+start, picks up new rows incrementally by rowid, and is resynced on the
+safety poll. Removals are lazy — :meth:`QueueIndex.discard` forgets the
+job and its heap entry is dropped when it reaches the top.
+"""
+
+from __future__ import annotations
+
+import heapq
+from collections.abc import Callable
+from dataclasses import dataclass
+
+from ..api.schemas import ExperimentSpec
+
+# (gpu_count, vram_mb per GPU or None for whole GPUs)
+Shape = tuple[int, int | None]
+
+
+@dataclass(frozen=True)
+class QueuedJob:
+    experiment_id: str
+    spec: ExperimentSpec
+    priority: int
+    queued_at: str
+    study_id: str | None = None
+    trial_number: int | None = None
+    # Checkpoint dir to resume from, set by crash recovery.
+    resume_from: str | None = None
+
+    @property
+    def gpu_count(self) -> int:
+        return self.spec.gpu_count
+
+    @property
+    def vram_mb(self) -> int | None:
+        return self.spec.vram_mb
+
+    @property
+    def shape(self) -> Shape:
+        return (self.spec.gpu_count, self.spec.vram_mb)
+
+    @property
+    def sort_key(self) -> tuple[int, str, str]:
+        return (-self.priority, self.queued_at, self.experiment_id)
+
+
+class QueueIndex:
+    def __init__(self) -> None:
+        self._jobs: dict[str, QueuedJob] = {}
+        self._buckets: dict[Shape, list[tuple[tuple[int, str, str], QueuedJob]]] = {}
+
+    def __len__(self) -> int:
+        return len(self._jobs)
+
+    def __contains__(self, experiment_id: object) -> bool:
+        return experiment_id in self._jobs
+
+    def ids(self) -> set[str]:
+        return set(self._jobs)
+
+    def clear(self) -> None:
+        self._jobs.clear()
+        self._buckets.clear()
+
+    def add(self, job: QueuedJob) -> None:
+        """Insert ``job``, replacing any entry with the same experiment id."""
+        self._jobs[job.experiment_id] = job
+        heapq.heappush(self._buckets.setdefault(job.shape, []), (job.sort_key, job))
+
+    def get(self, experiment_id: str) -> QueuedJob | None:
+        return self._jobs.get(experiment_id)
+
+    def discard(self, experiment_id: str) -> QueuedJob | None:
+        return self._jobs.pop(experiment_id, None)
+
+    def compact(self) -> None:
+        """Rebuild the heaps without entries left behind by lazy removal."""
+        self._buckets = {}
+        for job in self._jobs.values():
+            self._buckets.setdefault(job.shape, []).append((job.sort_key, job))
+        for heap in self._buckets.values():
+            heapq.heapify(heap)
+
+    def best(self, fits: Callable[[int, int | None], bool]) -> QueuedJob | None:
+        """Highest-priority, oldest job whose shape ``fits(gpu_count, vram_mb)``."""
+        best: QueuedJob | None = None
+        for shape in list(self._buckets):
+            if not fits(*shape):
+                continue
+            top = self._peek(shape)
+            if top is not None and (best is None or top.sort_key < best.sort_key):
+                best = top
+        return best
+
+    def _peek(self, shape: Shape) -> QueuedJob | None:
+        heap = self._buckets[shape]
+        while heap:
+            _key, job = heap[0]
+            # Skip entries that were discarded or superseded by a re-add.
+            if self._jobs.get(job.experiment_id) is job:
+                return job
+            heapq.heappop(heap)
+        del self._buckets[shape]
+        return None
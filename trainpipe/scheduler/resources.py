@@ -0,0 +1,291 @@
+"""Per-lease GPU resource sampling: VRAM, utilization, power, heartbeats.
+
+The scheduler registers each launched experiment with
+:class:`ResourceSampler` (``watch``) and hands it back when the
+subprocess exits (``unwatch``). One background task reads every leased
+GPU each ``resource_sample_interval_sec`` and folds the readings into a
+:class:`LeaseUsage` per experiment:
+
+* ``peak_vram_mb`` — the highest per-GPU memory reading seen,
+* ``energy_wh`` — board power summed over the lease's GPUs, integrated
+  with the trapezoid rule,
+* mean utilization, for logs.
+
+NVML reads whole devices. When fractional leases share a GPU, each
+watched tenant is credited the device's memory and power in proportion
+to its ``vram_mb`` reservation, so co-tenants don't each record the whole
+card and study cost summaries don't count its energy once per tenant.
+Utilization is left as read (it is a rate, not an amount).
+
+Every ``heartbeat_interval_sec`` the running rollups and
+``last_heartbeat_at`` go to SQLite through the write queue, so the Phase
+20 cost columns (and :func:`repository.study_cost_summary`) fill in
+while a run is still going. Without NVML the sampler still writes
+heartbeats.
+
+Backends:
+
+* :class:`PynvmlBackend` — production. Lazy-imports ``pynvml`` the same
+  way :func:`.gpu_pool.detect_gpus` does and caches device handles.
+* :class:`FakeNvmlBackend` — for tests. Readings are set by hand.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field, replace
+
+from ..core import repository
+from ..core.db import Database
+from ..settings import settings
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class GpuSample:
+    index: int
+    memory_used_mb: float
+    utilization_pct: float
+    power_w: float
+
+
+class NvmlBackend(ABC):
+    """Blocking reads; the sampler calls :meth:`sample` via ``to_thread``."""
+
+    @abstractmethod
+    def sample(self, indices: list[int]) -> list[GpuSample]: ...
+
+    @abstractmethod
+    def close(self) -> None: ...
+
+
+class PynvmlBackend(NvmlBackend):
+    def __init__(self, pynvml) -> None:
+        self._nvml = pynvml
+        self._handles: dict[int, object] = {}
+
+    @classmethod
+    def open(cls) -> PynvmlBackend | None:
+        """Initialize NVML. Returns ``None`` if no driver/library."""
+        try:
+            import pynvml  # type: ignore[import-not-found]
+        except ImportError:
+            return None
+        try:
+            pynvml.nvmlInit()
+        except Exception as e:
+            logger.warning("NVML init failed (%s); resource sampling disabled", e)
+            return None
+        return cls(pynvml)
+
+    def sample(self, indices: list[int]) -> list[GpuSample]:
+        nvml = self._nvml
+        out: list[GpuSample] = []
+        for idx in indices:
+            try:
+                handle = self._handles.get(idx)
+                if handle is None:
+                    handle = self._handles[idx] = nvml.nvmlDeviceGetHandleByIndex(idx)
+                mem = nvml.nvmlDeviceGetMemoryInfo(handle)
+                util = nvml.nvmlDeviceGetUtilizationRates(handle)
+                power_mw = nvml.nvmlDeviceGetPowerUsage(handle)
+            except Exception as e:
+                logger.debug("NVML read failed for gpu %d: %s", idx, e)
+                continue
+            out.append(
+                GpuSample(
+                    index=idx,
+                    memory_used_mb=mem.used / (1024 * 1024),
+                    utilization_pct=float(util.gpu),
+                    power_w=power_mw / 1000.0,
+                )
+            )
+        return out
+
+    def close(self) -> None:
+        self._handles.clear()
+        try:
+            self._nvml.nvmlShutdown()
+        except Exception:
+            pass
+
+
+class FakeNvmlBackend(NvmlBackend):
+    """Returns whatever :meth:`set` last stored per GPU index."""
+
+    def __init__(self) -> None:
+        self.readings: dict[int, GpuSample] = {}
+        self.calls = 0
+        self.closed = False
+
+    def set(
+        self,
+        index: int,
+        *,
+        memory_used_mb: float = 0.0,
+        utilization_pct: float = 0.0,
+        power_w: float = 0.0,
+    ) -> None:
+        self.readings[index] = GpuSample(index, memory_used_mb, utilization_pct, power_w)
+
+    def sample(self, indices: list[int]) -> list[GpuSample]:
+        self.calls += 1
+        return [self.readings[i] for i in indices if i in self.readings]
+
+    def close(self) -> None:
+        self.closed = True
+
+
+@dataclass
+class LeaseUsage:
+    experiment_id: str
+    gpu_indices: list[int]
+    vram_mb: int | None = None  # per-GPU reservation; None = whole devices
+    peak_vram_mb: float | None = None
+    energy_wh: float = 0.0
+    samples: int = 0
+    utilization_sum: float = 0.0
+    _last_power_w: float | None = field(default=None, repr=False)
+    _last_at: float | None = field(default=None, repr=False)
+
+    @property
+    def mean_utilization_pct(self) -> float | None:
+        return self.utilization_sum / self.samples if self.samples else None
+
+    def add(self, readings: list[GpuSample], at: float) -> None:
+        if not readings:
+            return
+        peak = max(r.memory_used_mb for r in readings)
+        power = sum(r.power_w for r in readings)
+        self.peak_vram_mb = peak if self.peak_vram_mb is None else max(self.peak_vram_mb, peak)
+        if self._last_power_w is not None and self._last_at is not None:
+            self.energy_wh += (self._last_power_w + power) / 2 * (at - self._last_at) / 3600
+        self._last_power_w, self._last_at = power, at
+        self.samples += 1
+        self.utilization_sum += sum(r.utilization_pct for r in readings) / len(readings)
+
+
+def _share(reading: GpuSample, usage: LeaseUsage, tenants: list[LeaseUsage]) -> GpuSample:
+    """``usage``'s part of a device reading shared by ``tenants``."""
+    if len(tenants) == 1:
+        return reading
+    reserved = sum(t.vram_mb or 0 for t in tenants)
+    if usage.vram_mb and reserved:
+        fraction = usage.vram_mb / reserved
+    else:
+        fraction = 1 / len(tenants)
+    return replace(
+        reading,
+        memory_used_mb=reading.memory_used_mb * fraction,
+        power_w=reading.power_w * fraction,
+    )
+
+
+class ResourceSampler:
+    def __init__(
+        self,
+        db: Database,
+        backend: NvmlBackend | None,
+        *,
+        sample_interval_sec: float | None = None,
+        heartbeat_interval_sec: float | None = None,
+    ) -> None:
+        self.db = db
+        self.backend = backend
+        self.sample_interval_sec = (
+            sample_interval_sec or settings.resource_sample_interval_sec
+        )
+        self.heartbeat_interval_sec = (
+            heartbeat_interval_sec or settings.heartbeat_interval_sec
+        )
+        self._leases: dict[str, LeaseUsage] = {}
+        self.latest: dict[int, GpuSample] = {}
+        self._task: asyncio.Task | None = None
+        self._last_flush = 0.0
+
+    async def start(self) -> None:
+        self._task = asyncio.create_task(self._run(), name="trainpipe-resource-sampler")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self.backend is not None:
+            self.backend.close()
+
+    def watch(
+        self, experiment_id: str, gpu_indices: list[int], vram_mb: int | None = None
+    ) -> None:
+        self._leases[experiment_id] = LeaseUsage(experiment_id, list(gpu_indices), vram_mb)
+
+    async def unwatch(self, experiment_id: str) -> LeaseUsage | None:
+        """Stop sampling ``experiment_id`` and return its final rollup.
+
+        Waits for in-flight heartbeat writes so they can't land after the
+        caller's final status update.
+        """
+        usage = self._leases.pop(experiment_id, None)
+        await self.db.writes.flush()
+        return usage
+
+    def usage(self, experiment_id: str) -> LeaseUsage | None:
+        return self._leases.get(experiment_id)
+
+    async def sample_once(self) -> None:
+        if self.backend is None or not self._leases:
+            return
+        indices = sorted({i for u in self._leases.values() for i in u.gpu_indices})
+        readings = await asyncio.to_thread(self.backend.sample, indices)
+        at = time.monotonic()
+        by_index = {r.index: r for r in readings}
+        self.latest.update(by_index)
+        tenants: dict[int, list[LeaseUsage]] = {}
+        for usage in self._leases.values():
+            for i in usage.gpu_indices:
+                tenants.setdefault(i, []).append(usage)
+        for usage in self._leases.values():
+            usage.add(
+                [
+                    _share(by_index[i], usage, tenants[i])
+                    for i in usage.gpu_indices
+                    if i in by_index
+                ],
+                at,
+            )
+
+    async def flush(self) -> None:
+        """Queue heartbeat + rollup writes for every watched experiment."""
+        self._last_flush = time.monotonic()
+        snapshot = [
+            (u.experiment_id, u.peak_vram_mb, u.energy_wh if u.samples > 1 else None)
+            for u in self._leases.values()
+        ]
+        if not snapshot:
+            return
+
+        async def write(conn) -> None:
+            for exp_id, peak, energy in snapshot:
+                await repository.touch_experiment_heartbeat(conn, exp_id, commit=False)
+                await repository.set_experiment_resource_usage(
+                    conn, exp_id, peak_vram_mb=peak, energy_wh=energy, commit=False
+                )
+
+        await self.db.writes.enqueue(write)
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.sample_interval_sec)
+            try:
+                await self.sample_once()
+                if time.monotonic() - self._last_flush >= self.heartbeat_interval_sec:
+                    await self.flush()
+            except Exception:
+                logger.exception("resource sampling failed")
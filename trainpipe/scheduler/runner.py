@@ -2,7 +2,13 @@
 
 The process is started in its own process group on POSIX so SIGTERM (and a
 SIGKILL fallback) take down any torchrun/python children. Stdout and stderr
-are merged and tailed into a per-experiment log file.
+are merged and tailed into a per-experiment log file, which rotates into
+compressed segments, and into an in-memory ring of recent lines (see
+:mod:`.logs`).
+
+Preemption uses the same group: :meth:`RunningProcess.preempt` sends a
+configurable signal so the trainer can write a checkpoint, and only
+SIGKILLs after a (longer) grace period.
 """
 
 import asyncio
@@ -12,6 +18,9 @@ import signal
 import time
 from pathlib import Path
 
+from ..settings import settings
+from . import logs
+
 logger = logging.getLogger(__name__)
 
 
@@ -22,12 +31,15 @@ class RunningProcess:
         process: asyncio.subprocess.Process,
         log_path: Path,
         tee_task: asyncio.Task,
+        ring: logs.LogRing | None = None,
     ) -> None:
         self.experiment_id = experiment_id
         self.process = process
         self.log_path = log_path
         self.tee_task = tee_task
+        self.ring = ring
         self.cancelled = False
+        self.preempted = False
 
     @property
     def pid(self) -> int:
@@ -43,17 +55,27 @@ class RunningProcess:
 
     async def cancel(self, term_grace_sec: float = 10.0) -> None:
         self.cancelled = True
+        await self._stop("SIGTERM", term_grace_sec)
+
+    async def preempt(self, grace_sec: float, signal_name: str = "SIGTERM") -> None:
+        """Ask the run to checkpoint and exit; SIGKILL after ``grace_sec``."""
+        if self.process.returncode is not None:
+            return
+        self.preempted = True
+        await self._stop(signal_name, grace_sec)
+
+    async def _stop(self, signal_name: str, grace_sec: float) -> None:
         if self.process.returncode is not None:
             return
         try:
             if os.name == "posix":
-                os.killpg(os.getpgid(self.process.pid), signal.SIGTERM)
+                os.killpg(os.getpgid(self.process.pid), getattr(signal, signal_name))
             else:
                 self.process.terminate()
         except ProcessLookupError:
             return
         try:
-            await asyncio.wait_for(self.process.wait(), timeout=term_grace_sec)
+            await asyncio.wait_for(self.process.wait(), timeout=grace_sec)
         except asyncio.TimeoutError:
             try:
                 if os.name == "posix":
@@ -91,22 +113,48 @@ async def spawn_training_subprocess(
         **kwargs,
     )
 
+    out = logs.RotatingLog(
+        log_path,
+        max_bytes=settings.log_max_bytes,
+        compression=settings.log_compression,
+    )
+    ring = logs.LogRing(settings.log_ring_lines, offset=out.offset)
+    logs.tails[experiment_id] = ring
+    # Rolled segments are compressed one at a time, off the event loop.
+    compress_lock = asyncio.Lock()
+
+    async def finish(segment: Path) -> None:
+        async with compress_lock:
+            await asyncio.to_thread(
+                logs.finish_segment, log_path, segment, out.codec, settings.log_max_segments
+            )
+
     async def tee() -> None:
         # Per-line flush would burn the event loop on tqdm-style progress
-        # output. Buffer in user space and flush at most once a second so the
-        # SSE log tail still sees fresh data without blocking the scheduler.
+        # output. Buffer in user space and flush at most once a second; live
+        # readers get fresh lines from the ring without touching the file.
         assert process.stdout is not None
         last_flush = time.monotonic()
-        with log_path.open("ab") as f:
+        rolled: list[asyncio.Task] = []
+        try:
             while True:
                 chunk = await process.stdout.readline()
                 if not chunk:
                     break
-                f.write(chunk)
+                ring.append(chunk.decode("utf-8", errors="replace"), len(chunk))
+                segment = out.write(chunk)
+                if segment is not None:
+                    rolled.append(asyncio.create_task(finish(segment)))
                 now = time.monotonic()
                 if now - last_flush >= 1.0:
-                    f.flush()
+                    out.flush()
                     last_flush = now
+        finally:
+            out.close()
+            ring.closed = True
+            if logs.tails.get(experiment_id) is ring:
+                del logs.tails[experiment_id]
+            await asyncio.gather(*rolled, return_exceptions=True)
 
     tee_task = asyncio.create_task(
         tee(), name=f"trainpipe-tee-{experiment_id}"
@@ -116,4 +164,5 @@ async def spawn_training_subprocess(
         process=process,
         log_path=log_path,
         tee_task=tee_task,
+        ring=ring,
     )
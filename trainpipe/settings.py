@@ -1,4 +1,5 @@
 from pathlib import Path
+from typing import Literal
 
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -16,11 +17,82 @@ class Settings(BaseSettings):
     port: int = 8080
 
     mlflow_tracking_uri: str = "http://localhost:5000"
+    # MLflow gateway (integrations/mlflow_gateway.py): after a failed call,
+    # run creation fails fast for ``mlflow_retry_sec`` (launches go ahead
+    # untracked); outbox writes replay every ``mlflow_outbox_flush_sec``.
+    # A launch waits at most ``mlflow_timeout_sec`` for its run id.
+    mlflow_timeout_sec: float = 10.0
+    mlflow_retry_sec: float = 30.0
+    mlflow_outbox_flush_sec: float = 2.0
+    mlflow_outbox_max_attempts: int = 50
 
     visible_gpus: list[int] | None = None
 
     poll_interval_sec: float = 1.0
+    # "binpack": specs / eval suites that declare ``vram_mb`` may share a
+    # GPU (scheduler/gpu_pool.py). "exclusive": every lease takes whole GPUs.
+    gpu_allocation: Literal["binpack", "exclusive"] = "binpack"
+    # The scheduler wakes on in-process notifications (core/notify.py);
+    # this slow poll only catches writes from other processes.
+    scheduler_safety_poll_sec: float = 10.0
+    # Priority preemption (scheduler/loop.py): a queued experiment that
+    # doesn't fit may evict strictly lower-priority runs. Victims get
+    # ``preemption_signal`` so they can checkpoint, are SIGKILLed after
+    # ``preemption_grace_sec``, and requeue to resume from their newest
+    # checkpoint. Runs younger than ``preemption_min_runtime_sec`` are
+    # never evicted, so a burst of urgent jobs can't thrash the pool.
+    preemption_enabled: bool = False
+    preemption_signal: Literal["SIGTERM", "SIGINT", "SIGUSR1"] = "SIGTERM"
+    preemption_grace_sec: float = 120.0
+    preemption_min_runtime_sec: float = 300.0
     heartbeat_interval_sec: float = 5.0
+    # Training logs (scheduler/logs.py): the live file rolls over at
+    # ``log_max_bytes`` (0 = never) into compressed segments, of which the
+    # newest ``log_max_segments`` are kept. zstd needs the ``[logs]`` extra
+    # and falls back to gzip without it. The last ``log_ring_lines`` lines
+    # of each running experiment stay in memory for tails and SSE.
+    log_max_bytes: int = 256 * 1024 * 1024
+    log_max_segments: int = 20
+    log_compression: Literal["zstd", "gzip", "none"] = "zstd"
+    log_ring_lines: int = 2000
+    # SSE log streams share one broadcaster per experiment (api/log_hub.py).
+    # A subscriber more than ``sse_subscriber_queue`` events behind is
+    # dropped and reconnects with Last-Event-ID; status is re-read on bus
+    # wakeups plus this safety poll.
+    sse_subscriber_queue: int = 256
+    sse_status_poll_sec: float = 5.0
+    # Eval pipeline (evals/runner.py): threads scoring predicted batches
+    # with the suite's metrics, and how many batches may wait between the
+    # predict, score and persist stages.
+    eval_score_workers: int = 4
+    eval_pipeline_depth: int = 8
+    # Samples read from a suite's dataset at a time: bounds the runner's
+    # memory and is the span batches are grouped by prompt length in.
+    eval_read_window: int = 1024
+    # Reuse predictions of the same weights, prompt and generation params
+    # from earlier runs (eval_prediction_cache table) instead of
+    # regenerating them.
+    eval_prediction_cache: bool = True
+    # Loaded models shared by the inference playground and eval runs
+    # (inference/residency.py): how many stay resident, and how long a
+    # model an eval loaded is kept (with its GPU lease) for the next eval
+    # of the same weights.
+    model_residency_max_loaded: int = 2
+    eval_model_keepalive_sec: float = 300.0
+    # Bootstrap confidence interval on every metric aggregate (and the
+    # resamples behind early-stopping looks); 0 skips the aggregate CIs.
+    eval_bootstrap_resamples: int = 1000
+    eval_ci_level: float = 0.95
+    # NVML read cadence for peak VRAM / energy (scheduler/resources.py);
+    # rollups are written once per heartbeat.
+    resource_sample_interval_sec: float = 1.0
+
+    # Read-only SQLite connections kept open by Database.read(), on top of
+    # the single writer connection behind Database.connect().
+    db_pool_readers: int = 4
+    # Group-commit window + cap for Database.writes (core/write_queue.py).
+    write_queue_delay_ms: float = 5.0
+    write_queue_max_batch: int = 500
 
     # Maximum size for an uploaded dataset file. Default: 5 GiB.
     max_dataset_upload_bytes: int = 5 * 1024 * 1024 * 1024
@@ -41,5 +113,9 @@ class Settings(BaseSettings):
     def datasets_dir(self) -> Path:
         return self.data_dir / "datasets"
 
+    @property
+    def judge_cache_path(self) -> Path:
+        return self.data_dir / "judge_cache.sqlite3"
+
 
 settings = Settings()
@@ -0,0 +1,49 @@
+"""Find the newest resumable ms-swift checkpoint in an output dir.
+
+ms-swift writes ``<output_dir>/v<N>-<timestamp>/checkpoint-<step>/`` (or
+``<output_dir>/checkpoint-<step>/`` with ``--add_version false``). The HF
+trainer saves ``trainer_state.json`` after the weights and optimizer
+state, so a checkpoint without it is a half-written save from the crash
+and is skipped. A resumed run starts a fresh ``v<N+1>-*`` dir; scanning
+every version dir picks up checkpoints from all earlier attempts.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import re
+from dataclasses import dataclass
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+_CHECKPOINT_RE = re.compile(r"^checkpoint-(\d+)$")
+
+
+@dataclass(frozen=True)
+class Checkpoint:
+    path: Path
+    step: int
+    saved_at: float  # mtime of trainer_state.json, epoch seconds
+
+
+def find_latest_checkpoint(output_dir: Path) -> Checkpoint | None:
+    """Highest-step complete checkpoint under ``output_dir``, or None."""
+    if not output_dir.is_dir():
+        return None
+    best: Checkpoint | None = None
+    for candidate in [*output_dir.glob("checkpoint-*"), *output_dir.glob("*/checkpoint-*")]:
+        m = _CHECKPOINT_RE.match(candidate.name)
+        state = candidate / "trainer_state.json"
+        if m is None or not state.is_file():
+            continue
+        try:
+            step = int(json.loads(state.read_text(encoding="utf-8"))["global_step"])
+        except (OSError, ValueError, KeyError, TypeError):
+            # Unreadable state: trust the directory name.
+            step = int(m.group(1))
+        ckpt = Checkpoint(candidate, step, state.stat().st_mtime)
+        if best is None or (ckpt.step, ckpt.saved_at) > (best.step, best.saved_at):
+            best = ckpt
+    return best
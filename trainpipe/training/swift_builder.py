@@ -38,8 +38,18 @@ def build_swift_command(
     spec: ExperimentSpec,
     gpu_ids: list[int],
     output_dir: Path,
+    *,
+    resume_from: Path | None = None,
+    report_to: str = "mlflow",
 ) -> tuple[list[str], dict[str, str]]:
-    """Return ``(argv, env)`` for ``asyncio.create_subprocess_exec``."""
+    """Return ``(argv, env)`` for ``asyncio.create_subprocess_exec``.
+
+    ``resume_from`` is a ``checkpoint-<step>`` dir from an interrupted run
+    (see :mod:`.checkpoints`); ms-swift restores weights, optimizer,
+    scheduler and RNG state from it and continues at that step.
+    ``report_to="none"`` launches without MLflow reporting (the scheduler
+    does this when the tracking server is unreachable).
+    """
 
     if not gpu_ids:
         raise ValueError("gpu_ids must contain at least one GPU index")
@@ -114,7 +124,9 @@ def build_swift_command(
             argv += ["--temperature", str(rl.temperature)]
 
     argv += ["--output_dir", str(output_dir)]
-    argv += ["--report_to", "mlflow"]
+    argv += ["--report_to", report_to]
+    if resume_from is not None:
+        argv += ["--resume_from_checkpoint", str(resume_from)]
 
     # Phase 18: deepspeed ZeRO. ms-swift accepts ``--deepspeed_zero<N>``
     # for stages 1/2/3 (no-op flag — sets the bundled DS config). Stage 0